@@ -0,0 +1,147 @@
+"""
+Live notebook kernel for Code Workspace
+WebSocket-based cell execution that streams outputs as they are produced
+"""
+
+import asyncio
+import json
+import logging
+
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from .models import Notebook
+from .services.jupyter_service import NotebookExecutor
+from .services.kernel_pool import KernelError, get_kernel_pool
+
+logger = logging.getLogger(__name__)
+
+
+class NotebookKernelConsumer(AsyncWebsocketConsumer):
+    """
+    WebSocket consumer bound to a notebook's live kernel
+
+    Client messages:
+        {"type": "execute", "cell_index": 3}
+        {"type": "execute_all"}
+        {"type": "interrupt"}
+        {"type": "restart"}
+
+    Server messages:
+        {"type": "output", "cell_index": 3, "output": {...nbformat output...}}
+        {"type": "execute_reply", "cell_index": 3, "success": true, ...}
+        {"type": "execute_all_reply", "success": true, ...}
+        {"type": "kernel_restarted"} / {"type": "error", "error": "..."}
+
+    Executions run as background tasks, one at a time in the order they
+    were requested, so interrupt and restart are handled while a cell runs.
+    """
+
+    async def connect(self):
+        """Accept the connection if the notebook belongs to the user"""
+        self.user = self.scope['user']
+        self.notebook_id = str(self.scope['url_route']['kwargs']['notebook_id'])
+
+        if not self.user.is_authenticated or not await self._load_notebook():
+            await self.close()
+            return
+
+        self.loop = asyncio.get_running_loop()
+        self.executor = NotebookExecutor()
+        self.runs = set()
+        self.run_lock = asyncio.Lock()
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        # The kernel stays bound so reconnecting keeps the notebook's state;
+        # the pool shuts it down once it has been idle long enough.
+        # A cell already running in a worker thread finishes on its own.
+        for run in getattr(self, 'runs', ()):
+            run.cancel()
+
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            message = json.loads(text_data or '{}')
+        except json.JSONDecodeError:
+            await self._send({'type': 'error', 'error': 'Invalid JSON'})
+            return
+
+        message_type = message.get('type')
+        try:
+            if message_type == 'execute':
+                self._start_run(self._execute_cell, message.get('cell_index'))
+            elif message_type == 'execute_all':
+                self._start_run(self._execute_all)
+            elif message_type == 'interrupt':
+                await asyncio.to_thread(self._interrupt)
+            elif message_type == 'restart':
+                await asyncio.to_thread(get_kernel_pool().restart, self.notebook_id)
+                await self._send({'type': 'kernel_restarted'})
+            else:
+                await self._send({'type': 'error', 'error': f'Unknown message type: {message_type}'})
+        except KernelError as e:
+            await self._send({'type': 'error', 'error': str(e)})
+
+    def _start_run(self, execute, *args):
+        """Run an execution without blocking receive()"""
+        run = asyncio.create_task(self._run(execute, *args))
+        self.runs.add(run)
+        run.add_done_callback(self.runs.discard)
+
+    async def _run(self, execute, *args):
+        # The kernel executes one request at a time; queue in arrival order
+        async with self.run_lock:
+            try:
+                await execute(*args)
+            except KernelError as e:
+                await self._send({'type': 'error', 'error': str(e)})
+            except Exception as e:
+                logger.error(f"Notebook {self.notebook_id} execution failed: {e}", exc_info=True)
+                await self._send({'type': 'error', 'error': 'Execution failed'})
+
+    async def _execute_cell(self, cell_index):
+        if not isinstance(cell_index, int) or cell_index < 0:
+            await self._send({'type': 'error', 'error': 'cell_index must be a non-negative integer'})
+            return
+
+        # Reload so edits saved over HTTP since the last run are executed
+        notebook = await self._load_notebook()
+        if notebook is None:
+            await self._send({'type': 'error', 'error': 'Notebook not found'})
+            return
+        success, result = await asyncio.to_thread(
+            self.executor.execute_cell, notebook, cell_index, self._stream_output
+        )
+        await self._send({'type': 'execute_reply', 'cell_index': cell_index, 'success': success, **result})
+
+    async def _execute_all(self):
+        notebook = await self._load_notebook()
+        if notebook is None:
+            await self._send({'type': 'error', 'error': 'Notebook not found'})
+            return
+        success, result = await asyncio.to_thread(
+            self.executor.execute_notebook, notebook, None, self._stream_output
+        )
+        await self._send({'type': 'execute_all_reply', 'success': success, **result})
+
+    def _interrupt(self):
+        kernel = get_kernel_pool().get(self.notebook_id)
+        if kernel is not None:
+            kernel.interrupt()
+
+    def _stream_output(self, cell_index, output):
+        """Forward an output from the executing thread to the client"""
+        asyncio.run_coroutine_threadsafe(
+            self._send({'type': 'output', 'cell_index': cell_index, 'output': output}),
+            self.loop,
+        )
+
+    async def _load_notebook(self):
+        try:
+            return await asyncio.to_thread(
+                Notebook.objects.get, notebook_id=self.notebook_id, user=self.user
+            )
+        except Notebook.DoesNotExist:
+            return None
+
+    async def _send(self, payload):
+        await self.send(text_data=json.dumps(payload, default=str))
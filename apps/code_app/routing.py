@@ -3,8 +3,12 @@ WebSocket routing for Code Workspace
 """
 
 from django.urls import path
-from . import terminal_views
+from . import kernel_views, terminal_views
 
 websocket_urlpatterns = [
     path('ws/code/terminal/', terminal_views.TerminalConsumer.as_asgi()),
+    path(
+        'ws/code/notebooks/<uuid:notebook_id>/kernel/',
+        kernel_views.NotebookKernelConsumer.as_asgi(),
+    ),
 ]
@@ -13,5 +13,6 @@ Contains business logic and service classes.
 __all__ = [
     "jupyter_service",
     "environment_manager",
+    "environment_store",
     "visualization_pipeline",
 ]
@@ -8,7 +8,6 @@ import os
 import json
 import subprocess
 import tempfile
-import venv
 import uuid
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
@@ -18,6 +17,8 @@ from django.conf import settings
 from django.utils import timezone
 from django.contrib.auth.models import User
 
+from .environment_store import get_environment_store
+
 
 logger = logging.getLogger(__name__)
 
@@ -240,50 +241,26 @@ class EnvironmentManager:
         return True
 
     def setup_environment(self, env_id: str) -> Tuple[bool, str]:
-        """Set up the Python virtual environment with packages."""
+        """
+        Set up the Python virtual environment with packages.
+
+        The environment is cloned from the shared environment store, which
+        only runs pip for requirement sets it has not resolved before.
+        """
         env = self.get_environment(env_id)
         if not env:
             return False, "Environment not found"
 
         try:
-            # Create virtual environment
-            venv.create(env.env_path, with_pip=True, clear=True)
-
-            # Get pip executable path
-            pip_path = env.env_path / "bin" / "pip"
-            if not pip_path.exists():  # Windows
-                pip_path = env.env_path / "Scripts" / "pip.exe"
-
-            # Upgrade pip
-            subprocess.run(
-                [str(pip_path), "install", "--upgrade", "pip"],
-                check=True,
-                capture_output=True,
-                text=True,
+            store = get_environment_store()
+            built = store.checkout(
+                env.get_requirements_file().splitlines(), env.env_path
             )
 
-            # Install packages
-            requirements_content = env.get_requirements_file()
-            with tempfile.NamedTemporaryFile(
-                mode="w", suffix=".txt", delete=False
-            ) as f:
-                f.write(requirements_content)
-                req_file = f.name
-
-            try:
-                result = subprocess.run(
-                    [str(pip_path), "install", "-r", req_file],
-                    check=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=600,
-                )
-
-                logger.info(f"Successfully set up environment {env_id}")
-                return True, f"Environment setup completed: {result.stdout}"
-
-            finally:
-                os.unlink(req_file)
+            logger.info(f"Successfully set up environment {env_id}")
+            if built:
+                return True, "Environment setup completed: packages installed"
+            return True, "Environment setup completed: reused cached environment"
 
         except subprocess.CalledProcessError as e:
             error_msg = f"Failed to setup environment: {e.stderr}"
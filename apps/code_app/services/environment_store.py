@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store of resolved Python environments for SciTeX-Code.
+
+Environments are keyed by a hash of the interpreter version and the
+normalized requirement set, so users asking for the same packages share one
+resolved environment instead of each paying for a full ``pip install``.
+
+- Packages are built into a shared wheelhouse (backed by pip's shared HTTP
+  cache) and installed from it with ``--no-index``, so rebuilding a known
+  requirement set works offline.
+- A new requirement set starts from a clone of the closest stored
+  environment whose requirements it contains, and only installs the rest.
+- User environments are clones of a stored environment. Clones are
+  independent copies (reflinks on copy-on-write filesystems), never
+  hardlinks: users can write to their environments, and a shared inode
+  would carry those edits into the store and every other clone.
+- Least recently used stored environments are removed beyond a size cap.
+"""
+
+import errno
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import venv
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ENV_STORE_ROOT = Path(
+    getattr(
+        settings,
+        "SCITEX_CODE_ENV_STORE_ROOT",
+        Path(settings.MEDIA_ROOT) / "environments" / "_store",
+    )
+)
+ENV_STORE_MAX_ENVIRONMENTS = getattr(settings, "SCITEX_CODE_ENV_STORE_MAX_ENVIRONMENTS", 20)
+ENV_STORE_OFFLINE = getattr(settings, "SCITEX_CODE_ENV_STORE_OFFLINE", False)
+ENV_INSTALL_TIMEOUT = getattr(settings, "SCITEX_CODE_ENV_INSTALL_TIMEOUT", 600)
+
+MARKER_FILE = ".scitex-env.json"
+# linux/fs.h: share the source file's extents (btrfs, XFS, OCFS2, ...)
+FICLONE = 0x40049409
+REQUIREMENT_NAME_PATTERN = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+def canonical_name(name: str) -> str:
+    """PEP 503 normalized project name."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def normalize_requirements(lines: Iterable[str]) -> List[str]:
+    """
+    Canonical form of a requirement set.
+
+    Comments and blank lines are dropped, names are PEP 503 normalized,
+    whitespace is removed, later duplicates of a name win and the result is
+    sorted, so equivalent requirement files produce the same list.
+    """
+    by_name: Dict[str, str] = {}
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        match = REQUIREMENT_NAME_PATTERN.match(line)
+        if not match:
+            continue
+        name = canonical_name(match.group(1))
+        spec = re.sub(r"\s+", "", line[match.end():])
+        by_name[name] = name + spec
+    return sorted(by_name.values())
+
+
+def requirements_key(
+    requirements: List[str], system_site_packages: bool = False
+) -> str:
+    """Content address of a normalized requirement set on this interpreter."""
+    payload = json.dumps(
+        {
+            "python": "%d.%d" % sys.version_info[:2],
+            "platform": sys.platform,
+            "system_site_packages": system_site_packages,
+            "requirements": requirements,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _reflink_or_copy(src: str, dst: str) -> str:
+    """
+    Copy a file, sharing its blocks copy-on-write where the filesystem can.
+
+    The result is always a separate inode, so writing to it never changes src.
+    """
+    try:
+        with open(src, "rb") as source, open(dst, "wb") as target:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+    except OSError as e:
+        if e.errno not in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL):
+            raise
+        # No reflink support here; fall back to a full copy
+        shutil.copy2(src, dst)
+    else:
+        shutil.copystat(src, dst)
+    return dst
+
+
+def clone_environment(source: Path, target: Path):
+    """
+    Materialize an independent copy of an environment.
+
+    Scripts and activation files embed the environment's absolute path; those
+    are rewritten for the target.
+    """
+    shutil.copytree(source, target, symlinks=True, copy_function=_reflink_or_copy)
+
+    old_prefix = str(source).encode()
+    new_prefix = str(target).encode()
+    for bin_dir in (target / "bin", target / "Scripts"):
+        if not bin_dir.is_dir():
+            continue
+        for script in bin_dir.iterdir():
+            if script.is_symlink() or not script.is_file():
+                continue
+            content = script.read_bytes()
+            if old_prefix not in content:
+                continue
+            script.write_bytes(content.replace(old_prefix, new_prefix))
+
+    marker = target / MARKER_FILE
+    if marker.exists():
+        marker.unlink()
+
+
+class EnvironmentStore:
+    """Shared, content-addressed environments with a wheelhouse and LRU GC."""
+
+    def __init__(
+        self,
+        root: Path = ENV_STORE_ROOT,
+        max_environments: int = ENV_STORE_MAX_ENVIRONMENTS,
+        offline: bool = ENV_STORE_OFFLINE,
+    ):
+        self.root = Path(root)
+        self.max_environments = max_environments
+        self.offline = offline
+        self.envs_dir = self.root / "envs"
+        self.wheelhouse = self.root / "wheelhouse"
+        self.pip_cache = self.root / "pip-cache"
+        self.locks_dir = self.root / "locks"
+        for path in (self.envs_dir, self.wheelhouse, self.pip_cache, self.locks_dir):
+            path.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        return self.envs_dir / key
+
+    def is_ready(self, key: str) -> bool:
+        return (self.path_for(key) / MARKER_FILE).exists()
+
+    @contextmanager
+    def _locked(self, key: str):
+        with open(self.locks_dir / f"{key}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def ensure(
+        self, requirement_lines: Iterable[str], system_site_packages: bool = False
+    ) -> Tuple[Path, bool]:
+        """
+        Stored environment for a requirement set, building it if needed.
+
+        Returns:
+            (environment path, whether it was built now)
+
+        Raises:
+            subprocess.CalledProcessError: pip failed to resolve or install
+        """
+        requirements = normalize_requirements(requirement_lines)
+        key = requirements_key(requirements, system_site_packages)
+        env_path = self.path_for(key)
+
+        if self.is_ready(key):
+            self._touch(key)
+            return env_path, False
+
+        with self._locked(key):
+            # Another worker may have finished the build while we waited
+            if self.is_ready(key):
+                self._touch(key)
+                return env_path, False
+            if env_path.exists():
+                shutil.rmtree(env_path)
+            try:
+                self._build(env_path, requirements, system_site_packages)
+            except Exception:
+                shutil.rmtree(env_path, ignore_errors=True)
+                raise
+            self._write_marker(key, requirements, system_site_packages)
+
+        self.collect_garbage(keep=key)
+        return env_path, True
+
+    def materialize(self, env_path: Path, target: Path) -> bool:
+        """
+        Replace target with a clone of a stored environment.
+
+        Returns:
+            False if the stored environment was collected in the meantime
+        """
+        with self._locked(env_path.name):
+            if not self.is_ready(env_path.name):
+                return False
+            if target.is_symlink() or target.is_file():
+                target.unlink()
+            elif target.exists():
+                shutil.rmtree(target)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            clone_environment(env_path, target)
+        return True
+
+    def checkout(
+        self,
+        requirement_lines: Iterable[str],
+        target: Path,
+        system_site_packages: bool = False,
+    ) -> bool:
+        """
+        Materialize the environment for a requirement set at target.
+
+        Returns:
+            Whether the stored environment had to be built
+        """
+        requirement_lines = list(requirement_lines)
+        env_path, built = self.ensure(requirement_lines, system_site_packages)
+        if not self.materialize(env_path, target):
+            env_path, built = self.ensure(requirement_lines, system_site_packages)
+            if not self.materialize(env_path, target):
+                raise RuntimeError(f"Environment {env_path.name} was removed during checkout")
+        return built
+
+    def collect_garbage(self, keep: Optional[str] = None) -> int:
+        """Remove least recently used environments beyond max_environments."""
+        markers = sorted(
+            self.envs_dir.glob(f"*/{MARKER_FILE}"), key=lambda m: m.stat().st_mtime
+        )
+        excess = len(markers) - self.max_environments
+        removed = 0
+        for marker in markers:
+            if removed >= excess:
+                break
+            key = marker.parent.name
+            if key == keep:
+                continue
+            with self._locked(key):
+                if not marker.exists():
+                    continue
+                marker.unlink()
+                shutil.rmtree(marker.parent, ignore_errors=True)
+            removed += 1
+        if removed:
+            logger.info(f"[EnvironmentStore] Removed {removed} unused environment(s)")
+        return removed
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _touch(self, key: str):
+        try:
+            os.utime(self.path_for(key) / MARKER_FILE)
+        except OSError:
+            pass
+
+    def _read_marker(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self.path_for(key) / MARKER_FILE) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_marker(self, key: str, requirements: List[str], system_site_packages: bool):
+        marker = {
+            "key": key,
+            "requirements": requirements,
+            "system_site_packages": system_site_packages,
+            "python": "%d.%d" % sys.version_info[:2],
+            "created_at": timezone.now().isoformat(),
+        }
+        with open(self.path_for(key) / MARKER_FILE, "w") as f:
+            json.dump(marker, f, indent=2)
+
+    def _closest_base(
+        self, requirements: List[str], system_site_packages: bool
+    ) -> Optional[Tuple[Path, List[str]]]:
+        """Stored environment with the most requirements that are all wanted."""
+        wanted = set(requirements)
+        best = None
+        for marker_path in self.envs_dir.glob(f"*/{MARKER_FILE}"):
+            marker = self._read_marker(marker_path.parent.name)
+            if not marker or marker.get("system_site_packages") != system_site_packages:
+                continue
+            if marker.get("python") != "%d.%d" % sys.version_info[:2]:
+                continue
+            have = set(marker.get("requirements", []))
+            if have <= wanted and (best is None or len(have) > len(best[1])):
+                best = (marker_path.parent, sorted(have))
+        return best
+
+    def _build(self, env_path: Path, requirements: List[str], system_site_packages: bool):
+        base = self._closest_base(requirements, system_site_packages)
+        if base:
+            base_path, installed = base
+            logger.info(
+                f"[EnvironmentStore] Cloning {base_path.name[:12]} for {env_path.name[:12]}"
+            )
+            with self._locked(base_path.name):
+                if self.is_ready(base_path.name):
+                    clone_environment(base_path, env_path)
+                else:
+                    base = None
+        if base:
+            missing = [req for req in requirements if req not in installed]
+        else:
+            venv.create(env_path, with_pip=True, system_site_packages=system_site_packages)
+            missing = requirements
+
+        if missing:
+            self._install(env_path, missing)
+
+    def _install(self, env_path: Path, requirements: List[str]):
+        python = env_path / "bin" / "python"
+        if not python.exists():  # Windows
+            python = env_path / "Scripts" / "python.exe"
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
+            f.write("\n".join(requirements))
+            req_file = f.name
+
+        pip = [str(python), "-m", "pip", "--disable-pip-version-check"]
+        try:
+            # Resolve into the shared wheelhouse; later installs need no index
+            wheel_cmd = pip + [
+                "wheel",
+                "-r", req_file,
+                "--wheel-dir", str(self.wheelhouse),
+                "--find-links", str(self.wheelhouse),
+                "--cache-dir", str(self.pip_cache),
+            ]
+            if self.offline:
+                wheel_cmd.append("--no-index")
+            subprocess.run(
+                wheel_cmd,
+                check=True,
+                capture_output=True,
+                text=True,
+                timeout=ENV_INSTALL_TIMEOUT,
+            )
+            subprocess.run(
+                pip + [
+                    "install",
+                    "-r", req_file,
+                    "--no-index",
+                    "--find-links", str(self.wheelhouse),
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+                timeout=ENV_INSTALL_TIMEOUT,
+            )
+        finally:
+            os.unlink(req_file)
+
+
+_store: Optional[EnvironmentStore] = None
+
+
+def get_environment_store() -> EnvironmentStore:
+    """Environment store at the configured root (created on first use)."""
+    global _store
+    if _store is None:
+        _store = EnvironmentStore()
+    return _store
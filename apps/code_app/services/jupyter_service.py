@@ -6,18 +6,17 @@ Provides secure notebook execution, conversion, and management.
 
 import os
 import json
-import tempfile
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import logging
 
 import nbformat
 from nbconvert import HTMLExporter, PythonExporter, MarkdownExporter
-from nbconvert.preprocessors import ExecutePreprocessor
 from django.conf import settings
 from django.utils import timezone
 
 from ..models import Notebook, CodeExecutionJob
+from .kernel_pool import KernelError, get_kernel_pool
 
 logger = logging.getLogger(__name__)
 
@@ -248,17 +247,97 @@ class NotebookManager:
 
 
 class NotebookExecutor:
-    """Executes Jupyter notebooks safely."""
+    """
+    Executes notebook cells on the notebook's live kernel.
+
+    Kernels come from the warm pool in ``kernel_pool``: cells run
+    incrementally against the kernel bound to the notebook, so state is kept
+    between cell executions, and each output is passed to ``on_output`` as
+    soon as the kernel publishes it.
+    """
 
     def __init__(self, timeout: int = 300, memory_limit: int = 512):
         self.timeout = timeout
         self.memory_limit = memory_limit
 
+    @staticmethod
+    def summarize_outputs(cell_outputs: List[dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Split nbformat outputs into the simplified outputs and errors lists."""
+        outputs = []
+        errors = []
+        for output in cell_outputs:
+            output_type = output.get("output_type")
+            if output_type == "stream":
+                text = output.get("text", "")
+                outputs.append(
+                    {
+                        "type": "stream",
+                        "name": output.get("name"),
+                        "text": "".join(text) if isinstance(text, list) else text,
+                    }
+                )
+            elif output_type == "execute_result":
+                outputs.append(
+                    {
+                        "type": "result",
+                        "execution_count": output.get("execution_count"),
+                        "data": output.get("data", {}),
+                    }
+                )
+            elif output_type == "display_data":
+                outputs.append({"type": "display", "data": output.get("data", {})})
+            elif output_type == "error":
+                errors.append(
+                    {
+                        "ename": output.get("ename"),
+                        "evalue": output.get("evalue"),
+                        "traceback": output.get("traceback", []),
+                    }
+                )
+        return outputs, errors
+
+    def _run_cell(self, kernel, cell, cell_index: int, on_output=None) -> Dict:
+        """Execute one code cell on a kernel and store its outputs in the cell."""
+        source = cell.get("source", "")
+        if isinstance(source, list):
+            source = "".join(source)
+
+        callback = None
+        if on_output:
+            callback = lambda output: on_output(cell_index, output)  # noqa: E731
+
+        with kernel.lock:
+            result = kernel.execute(source, timeout=self.timeout, on_output=callback)
+
+        cell["outputs"] = [nbformat.to_dict(output) for output in result["outputs"]]
+        cell["execution_count"] = result["execution_count"]
+        return result
+
+    def _check_memory(self, notebook_key: str) -> List[Dict]:
+        """Errors to report if the kernel was shut down for its memory use."""
+        if not get_kernel_pool().enforce_memory_limit(notebook_key):
+            return []
+        return [
+            {
+                "ename": "KernelRestarted",
+                "evalue": "Kernel exceeded its memory limit and was restarted",
+                "traceback": [],
+            }
+        ]
+
     def execute_notebook(
-        self, notebook: Notebook, execution_job: Optional[CodeExecutionJob] = None
+        self,
+        notebook: Notebook,
+        execution_job: Optional[CodeExecutionJob] = None,
+        on_output=None,
     ) -> Tuple[bool, Dict]:
         """
-        Execute a Jupyter notebook safely.
+        Execute all code cells of a notebook on a fresh kernel.
+
+        Args:
+            notebook: Notebook to execute
+            execution_job: Job to update with status and results
+            on_output: Called as on_output(cell_index, output) for each output
 
         Returns:
             (success, result_data)
@@ -268,93 +347,62 @@ class NotebookExecutor:
             execution_job.started_at = timezone.now()
             execution_job.save()
 
+        notebook_key = str(notebook.notebook_id)
         try:
-            # Load notebook content
             nb_content = notebook.content
-            nb = nbformat.from_dict(nb_content)
+            cells = nb_content.get("cells", [])
 
-            # Create execution environment
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_path = Path(temp_dir)
+            # Run All starts from a clean namespace, like a fresh nbconvert run
+            kernel = get_kernel_pool().restart(notebook_key)
 
-                # Set up execution preprocessor
-                ep = ExecutePreprocessor(
-                    timeout=self.timeout, kernel_name="python3", allow_errors=True
-                )
+            start_time = timezone.now()
+            outputs = []
+            errors = []
+            cells_executed = 0
+            for cell_index, cell in enumerate(cells):
+                if cell.get("cell_type") != "code":
+                    continue
+                result = self._run_cell(kernel, cell, cell_index, on_output)
+                cells_executed += 1
+                cell_outputs, cell_errors = self.summarize_outputs(result["outputs"])
+                outputs.extend(cell_outputs)
+                errors.extend(cell_errors)
+            end_time = timezone.now()
+
+            execution_time = (end_time - start_time).total_seconds()
+            errors.extend(self._check_memory(notebook_key))
+
+            # Update notebook with execution results
+            notebook.content = nb_content
+            notebook.last_executed = timezone.now()
+            notebook.execution_count += 1
+            notebook.status = "completed" if not errors else "failed"
+            notebook.save()
 
-                # Execute notebook
-                start_time = timezone.now()
-                executed_nb, resources = ep.preprocess(
-                    nb, {"metadata": {"path": str(temp_path)}}
-                )
-                end_time = timezone.now()
-
-                # Extract results
-                execution_time = (end_time - start_time).total_seconds()
-                outputs = []
-                errors = []
-
-                for cell in executed_nb.cells:
-                    if cell.cell_type == "code" and cell.outputs:
-                        for output in cell.outputs:
-                            if output.output_type == "stream":
-                                outputs.append(
-                                    {
-                                        "type": "stream",
-                                        "name": output.name,
-                                        "text": "".join(output.text),
-                                    }
-                                )
-                            elif output.output_type == "execute_result":
-                                outputs.append(
-                                    {
-                                        "type": "result",
-                                        "execution_count": output.execution_count,
-                                        "data": output.data,
-                                    }
-                                )
-                            elif output.output_type == "display_data":
-                                outputs.append({"type": "display", "data": output.data})
-                            elif output.output_type == "error":
-                                errors.append(
-                                    {
-                                        "ename": output.ename,
-                                        "evalue": output.evalue,
-                                        "traceback": output.traceback,
-                                    }
-                                )
-
-                # Update notebook with execution results
-                notebook.content = nbformat.to_dict(executed_nb)
-                notebook.last_executed = timezone.now()
-                notebook.execution_count += 1
-                notebook.status = "completed" if not errors else "failed"
-                notebook.save()
-
-                # Update execution job if provided
-                if execution_job:
-                    execution_job.status = "completed" if not errors else "failed"
-                    execution_job.completed_at = timezone.now()
-                    execution_job.execution_time = execution_time
-                    execution_job.output = json.dumps(outputs, indent=2)
-                    if errors:
-                        execution_job.error_output = json.dumps(errors, indent=2)
-                    execution_job.save()
-
-                result_data = {
-                    "execution_time": execution_time,
-                    "outputs": outputs,
-                    "errors": errors,
-                    "cells_executed": len(
-                        [c for c in executed_nb.cells if c.cell_type == "code"]
-                    ),
-                }
-
-                logger.info(f"Successfully executed notebook {notebook.notebook_id}")
-                return True, result_data
+            # Update execution job if provided
+            if execution_job:
+                execution_job.status = "completed" if not errors else "failed"
+                execution_job.completed_at = timezone.now()
+                execution_job.execution_time = execution_time
+                execution_job.output = json.dumps(outputs, indent=2)
+                if errors:
+                    execution_job.error_output = json.dumps(errors, indent=2)
+                execution_job.save()
+
+            result_data = {
+                "execution_time": execution_time,
+                "outputs": outputs,
+                "errors": errors,
+                "cells_executed": cells_executed,
+            }
+
+            logger.info(f"Successfully executed notebook {notebook.notebook_id}")
+            return True, result_data
 
         except Exception as e:
             logger.error(f"Error executing notebook {notebook.notebook_id}: {e}")
+            if isinstance(e, KernelError):
+                get_kernel_pool().release(notebook_key)
 
             # Update job status
             if execution_job:
@@ -369,8 +417,20 @@ class NotebookExecutor:
 
             return False, {"error": str(e)}
 
-    def execute_cell(self, notebook: Notebook, cell_index: int) -> Tuple[bool, Dict]:
-        """Execute a single cell in the notebook."""
+    def execute_cell(
+        self, notebook: Notebook, cell_index: int, on_output=None
+    ) -> Tuple[bool, Dict]:
+        """
+        Execute a single cell on the notebook's live kernel.
+
+        Earlier cells' variables and imports remain available, as in Jupyter.
+
+        Args:
+            notebook: Notebook containing the cell
+            cell_index: Index of the code cell
+            on_output: Called as on_output(cell_index, output) for each output
+        """
+        notebook_key = str(notebook.notebook_id)
         try:
             nb_content = notebook.content
             if cell_index >= len(nb_content.get("cells", [])):
@@ -380,67 +440,28 @@ class NotebookExecutor:
             if cell.get("cell_type") != "code":
                 return False, {"error": "Can only execute code cells"}
 
-            # Create a temporary notebook with just this cell
-            temp_nb_content = {
-                "cells": [cell],
-                "metadata": nb_content.get("metadata", {}),
-                "nbformat": nb_content.get("nbformat", 4),
-                "nbformat_minor": nb_content.get("nbformat_minor", 4),
-            }
-
-            temp_nb = nbformat.from_dict(temp_nb_content)
-
-            # Execute
-            ep = ExecutePreprocessor(
-                timeout=60,  # Shorter timeout for single cell
-                kernel_name="python3",
-                allow_errors=True,
-            )
-
-            executed_nb, _ = ep.preprocess(temp_nb)
-            executed_cell = executed_nb.cells[0]
-
-            # Extract outputs
-            outputs = []
-            errors = []
-
-            for output in executed_cell.outputs:
-                if output.output_type == "stream":
-                    outputs.append(
-                        {
-                            "type": "stream",
-                            "name": output.name,
-                            "text": "".join(output.text),
-                        }
-                    )
-                elif output.output_type == "execute_result":
-                    outputs.append(
-                        {
-                            "type": "result",
-                            "execution_count": output.execution_count,
-                            "data": output.data,
-                        }
-                    )
-                elif output.output_type == "error":
-                    errors.append(
-                        {
-                            "ename": output.ename,
-                            "evalue": output.evalue,
-                            "traceback": output.traceback,
-                        }
-                    )
+            kernel = get_kernel_pool().acquire(notebook_key)
+            result = self._run_cell(kernel, cell, cell_index, on_output)
+            outputs, errors = self.summarize_outputs(result["outputs"])
+            errors.extend(self._check_memory(notebook_key))
 
             # Update the cell in the original notebook
-            nb_content["cells"][cell_index] = nbformat.to_dict(executed_cell)
             notebook.content = nb_content
             notebook.save()
 
             return True, {
                 "outputs": outputs,
                 "errors": errors,
-                "execution_count": executed_cell.execution_count,
+                "execution_count": result["execution_count"],
             }
 
+        except KernelError as e:
+            # A dead kernel must not be reused for the next cell
+            get_kernel_pool().release(notebook_key)
+            logger.error(
+                f"Kernel error executing cell {cell_index} in notebook {notebook.notebook_id}: {e}"
+            )
+            return False, {"error": str(e)}
         except Exception as e:
             logger.error(
                 f"Error executing cell {cell_index} in notebook {notebook.notebook_id}: {e}"
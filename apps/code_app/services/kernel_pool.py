@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Warm Jupyter kernel pool for SciTeX-Code notebooks.
+
+Starting a python3 kernel takes 1-3 seconds, so the pool keeps a few
+pre-started kernels ready and binds one live kernel to each open notebook.
+Cells then run incrementally against the bound kernel (variables survive
+between cells) and outputs are handed to a callback as the kernel
+publishes them.
+
+Kernels are per process and bounded: at most ``max_kernels`` run at once
+(least recently used idle notebooks give theirs up first), kernels idle
+for ``idle_timeout`` seconds are shut down, and a kernel whose resident
+memory exceeds ``memory_limit_mb`` after a cell is replaced.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import nbformat
+from django.conf import settings
+from jupyter_client.manager import KernelManager
+
+logger = logging.getLogger(__name__)
+
+KERNEL_NAME = "python3"
+KERNEL_WARM_POOL_SIZE = getattr(settings, "SCITEX_CODE_KERNEL_WARM_POOL_SIZE", 2)
+KERNEL_MAX_KERNELS = getattr(settings, "SCITEX_CODE_KERNEL_MAX_KERNELS", 16)
+KERNEL_IDLE_TIMEOUT = getattr(settings, "SCITEX_CODE_KERNEL_IDLE_TIMEOUT", 1800)
+KERNEL_MEMORY_LIMIT_MB = getattr(settings, "SCITEX_CODE_KERNEL_MEMORY_LIMIT_MB", 2048)
+KERNEL_STARTUP_TIMEOUT = 60
+REAPER_INTERVAL = 60
+
+OutputCallback = Callable[[dict], None]
+
+
+class KernelError(Exception):
+    """Raised when a kernel cannot be started or died during execution."""
+
+    pass
+
+
+class KernelPoolExhausted(KernelError):
+    """Raised when every kernel slot is busy executing."""
+
+    pass
+
+
+class LiveKernel:
+    """A running kernel with a blocking client, executing one cell at a time."""
+
+    def __init__(self, manager: KernelManager, client, workdir: str):
+        self.manager = manager
+        self.client = client
+        self.workdir = workdir
+        self.notebook_key: Optional[str] = None
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+    @classmethod
+    def start(cls, kernel_name: str = KERNEL_NAME) -> "LiveKernel":
+        """Launch a kernel and wait until it answers."""
+        workdir = tempfile.mkdtemp(prefix="scitex-kernel-")
+        manager = KernelManager(kernel_name=kernel_name)
+        try:
+            manager.start_kernel(cwd=workdir)
+            client = manager.blocking_client()
+            client.start_channels()
+            client.wait_for_ready(timeout=KERNEL_STARTUP_TIMEOUT)
+        except Exception as e:
+            if manager.has_kernel:
+                manager.shutdown_kernel(now=True)
+            shutil.rmtree(workdir, ignore_errors=True)
+            raise KernelError(f"Kernel failed to start: {e}") from e
+        return cls(manager, client, workdir)
+
+    @property
+    def busy(self) -> bool:
+        return self.lock.locked()
+
+    def touch(self):
+        self.last_used = time.monotonic()
+
+    def is_alive(self) -> bool:
+        try:
+            return self.manager.is_alive()
+        except Exception:
+            return False
+
+    def interrupt(self):
+        self.manager.interrupt_kernel()
+
+    def rss_mb(self) -> Optional[float]:
+        """Resident memory of the kernel process (Linux), if known."""
+        provisioner = getattr(self.manager, "provisioner", None)
+        pid = getattr(provisioner, "pid", None) or getattr(
+            getattr(self.manager, "kernel", None), "pid", None
+        )
+        if not pid:
+            return None
+        try:
+            with open(f"/proc/{pid}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            return None
+        return None
+
+    def execute(
+        self, code: str, timeout: float, on_output: OutputCallback = None
+    ) -> Dict:
+        """
+        Run code and collect its outputs.
+
+        Callers hold ``lock`` while executing.
+
+        Args:
+            code: Cell source
+            timeout: Seconds before the kernel is interrupted
+            on_output: Called with each nbformat output as it is produced
+
+        Returns:
+            Dict with outputs (nbformat), execution_count and status
+            ('ok', 'error' or 'timeout')
+        """
+        self.touch()
+        msg_id = self.client.execute(code, store_history=True, allow_stdin=False)
+        deadline = time.monotonic() + timeout
+        outputs: List[dict] = []
+        execution_count = None
+        status = "ok"
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and status != "timeout":
+                status = "timeout"
+                self.interrupt()
+                # Give the interrupted cell a moment to report and go idle
+                deadline = time.monotonic() + 5
+                continue
+            if remaining <= 0:
+                break
+            try:
+                msg = self.client.get_iopub_msg(timeout=min(remaining, 1))
+            except queue.Empty:
+                if not self.is_alive():
+                    raise KernelError("Kernel died during execution") from None
+                continue
+            if msg["parent_header"].get("msg_id") != msg_id:
+                continue
+
+            msg_type = msg["msg_type"]
+            content = msg["content"]
+            if msg_type == "status" and content["execution_state"] == "idle":
+                break
+            if msg_type == "execute_input":
+                execution_count = content.get("execution_count")
+            elif msg_type == "clear_output":
+                outputs.clear()
+            elif msg_type in ("stream", "display_data", "execute_result", "error"):
+                output = nbformat.v4.output_from_msg(msg)
+                if msg_type == "error" and status == "ok":
+                    status = "error"
+                if on_output:
+                    # Stream chunks are merged into ``outputs`` below
+                    on_output(dict(output))
+                last = outputs[-1] if outputs else None
+                if (
+                    msg_type == "stream"
+                    and last is not None
+                    and last.get("output_type") == "stream"
+                    and last.get("name") == output["name"]
+                ):
+                    last["text"] += output["text"]
+                else:
+                    outputs.append(output)
+
+        if status == "timeout":
+            timeout_error = nbformat.v4.new_output(
+                "error",
+                ename="TimeoutError",
+                evalue=f"Cell execution exceeded {timeout:g} seconds",
+                traceback=[],
+            )
+            outputs.append(timeout_error)
+            if on_output:
+                on_output(timeout_error)
+
+        self.touch()
+        return {
+            "outputs": outputs,
+            "execution_count": execution_count,
+            "status": status,
+        }
+
+    def shutdown(self):
+        try:
+            self.client.stop_channels()
+            self.manager.shutdown_kernel(now=True)
+        except Exception as e:
+            logger.warning(f"[KernelPool] Error shutting down kernel: {e}")
+        finally:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+class KernelPool:
+    """Bounded pool of warm kernels, bound to notebooks while they are in use."""
+
+    def __init__(
+        self,
+        warm_size: int = KERNEL_WARM_POOL_SIZE,
+        max_kernels: int = KERNEL_MAX_KERNELS,
+        idle_timeout: float = KERNEL_IDLE_TIMEOUT,
+        memory_limit_mb: float = KERNEL_MEMORY_LIMIT_MB,
+        kernel_factory: Callable[[], LiveKernel] = LiveKernel.start,
+    ):
+        self.warm_size = warm_size
+        self.max_kernels = max_kernels
+        self.idle_timeout = idle_timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.kernel_factory = kernel_factory
+        self._lock = threading.Lock()
+        self._warm: List[LiveKernel] = []
+        self._bound: "OrderedDict[str, LiveKernel]" = OrderedDict()
+        self._starting = 0
+        self._refilling = False
+        self._reaper: Optional[threading.Thread] = None
+        self._closed = False
+        self._pid = os.getpid()
+
+    # ------------------------------------------------------------------
+    # Binding
+    # ------------------------------------------------------------------
+
+    def acquire(self, notebook_key: str) -> LiveKernel:
+        """
+        Live kernel bound to a notebook, binding a warm one if needed.
+
+        Raises:
+            KernelPoolExhausted: Every kernel slot is busy executing
+            KernelError: A new kernel could not be started
+        """
+        self._ensure_reaper()
+        retired = []
+        with self._lock:
+            kernel = self._bound.get(notebook_key)
+            if kernel is not None and kernel.is_alive():
+                self._bound.move_to_end(notebook_key)
+                kernel.touch()
+                return kernel
+            if kernel is not None:
+                retired.append(self._bound.pop(notebook_key))
+
+            kernel = self._take_warm_locked(retired)
+            if kernel is None:
+                if self._total_locked() >= self.max_kernels:
+                    retired.extend(self._evict_locked(1))
+                if self._total_locked() >= self.max_kernels:
+                    self._shutdown_all(retired)
+                    raise KernelPoolExhausted(
+                        f"All {self.max_kernels} kernels are busy, try again shortly"
+                    )
+                self._starting += 1
+
+        self._shutdown_all(retired)
+        if kernel is None:
+            try:
+                kernel = self.kernel_factory()
+            finally:
+                with self._lock:
+                    self._starting -= 1
+
+        with self._lock:
+            existing = self._bound.get(notebook_key)
+            if existing is not None and existing.is_alive():
+                # Bound concurrently by another request; keep ours warm
+                self._warm.append(kernel)
+                kernel = existing
+            else:
+                kernel.notebook_key = notebook_key
+                self._bound[notebook_key] = kernel
+            kernel.touch()
+
+        self._refill_async()
+        return kernel
+
+    def get(self, notebook_key: str) -> Optional[LiveKernel]:
+        """Kernel currently bound to a notebook, without binding one."""
+        with self._lock:
+            return self._bound.get(notebook_key)
+
+    def release(self, notebook_key: str):
+        """Shut down the kernel bound to a notebook (its state is lost)."""
+        with self._lock:
+            kernel = self._bound.pop(notebook_key, None)
+        if kernel is not None:
+            kernel.shutdown()
+        self._refill_async()
+
+    def restart(self, notebook_key: str) -> LiveKernel:
+        """Bind a fresh kernel to a notebook."""
+        self.release(notebook_key)
+        return self.acquire(notebook_key)
+
+    def enforce_memory_limit(self, notebook_key: str) -> bool:
+        """
+        Replace a notebook's kernel if it grew past the memory limit.
+
+        Returns:
+            True if the kernel was shut down
+        """
+        with self._lock:
+            kernel = self._bound.get(notebook_key)
+        if kernel is None:
+            return False
+        rss = kernel.rss_mb()
+        if rss is None or rss <= self.memory_limit_mb:
+            return False
+        logger.warning(
+            f"[KernelPool] Kernel of notebook {notebook_key} uses {rss:.0f} MB "
+            f"(limit {self.memory_limit_mb} MB), shutting it down"
+        )
+        self.release(notebook_key)
+        return True
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def reap_idle(self) -> int:
+        """Shut down bound kernels idle for longer than idle_timeout."""
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                key
+                for key, kernel in self._bound.items()
+                if not kernel.busy and now - kernel.last_used > self.idle_timeout
+            ]
+            retired = [self._bound.pop(key) for key in idle]
+        self._shutdown_all(retired)
+        if retired:
+            logger.info(f"[KernelPool] Shut down {len(retired)} idle kernel(s)")
+        return len(retired)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "warm": len(self._warm),
+                "bound": len(self._bound),
+                "starting": self._starting,
+                "max_kernels": self.max_kernels,
+            }
+
+    def shutdown(self):
+        """Shut down every kernel."""
+        with self._lock:
+            self._closed = True
+            retired = self._warm + list(self._bound.values())
+            self._warm, self._bound = [], OrderedDict()
+        self._shutdown_all(retired)
+
+    def fill(self):
+        """Start warm kernels until warm_size are ready (blocking)."""
+        while True:
+            with self._lock:
+                ready = len(self._warm) + self._starting
+                if (
+                    self._closed
+                    or ready >= self.warm_size
+                    or self._total_locked() >= self.max_kernels
+                ):
+                    return
+                self._starting += 1
+            try:
+                kernel = self.kernel_factory()
+            except KernelError as e:
+                logger.error(f"[KernelPool] {e}")
+                return
+            finally:
+                with self._lock:
+                    self._starting -= 1
+            with self._lock:
+                if self._closed:
+                    kernel.shutdown()
+                    return
+                self._warm.append(kernel)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _total_locked(self) -> int:
+        return len(self._warm) + len(self._bound) + self._starting
+
+    def _take_warm_locked(self, retired: list) -> Optional[LiveKernel]:
+        while self._warm:
+            kernel = self._warm.pop(0)
+            if kernel.is_alive():
+                return kernel
+            retired.append(kernel)
+        return None
+
+    def _evict_locked(self, count: int) -> List[LiveKernel]:
+        """Unbind the least recently used idle kernels."""
+        evicted = []
+        for key, kernel in list(self._bound.items()):
+            if len(evicted) >= count:
+                break
+            if not kernel.busy:
+                evicted.append(self._bound.pop(key))
+        return evicted
+
+    def _refill_async(self):
+        with self._lock:
+            if self._refilling or self._closed:
+                return
+            self._refilling = True
+
+        def refill():
+            try:
+                self.fill()
+            finally:
+                with self._lock:
+                    self._refilling = False
+
+        threading.Thread(target=refill, name="kernel-pool-refill", daemon=True).start()
+
+    def _ensure_reaper(self):
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(
+                target=self._reap_forever, name="kernel-pool-reaper", daemon=True
+            )
+        self._reaper.start()
+
+    def _reap_forever(self):
+        while not self._closed:
+            time.sleep(REAPER_INTERVAL)
+            try:
+                self.reap_idle()
+            except Exception as e:
+                logger.error(f"[KernelPool] Reaper error: {e}")
+
+    @staticmethod
+    def _shutdown_all(kernels: List[LiveKernel]):
+        for kernel in kernels:
+            kernel.shutdown()
+
+
+_pool: Optional[KernelPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_kernel_pool() -> KernelPool:
+    """Process-wide kernel pool (created on first use)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._pid != os.getpid():
+            _pool = KernelPool()
+            atexit.register(_pool.shutdown)
+        return _pool
@@ -10,12 +10,29 @@ This module contains unit tests for the code app, covering:
 - Service layer business logic
 """
 
-from django.test import TestCase, Client
+from channels.testing import WebsocketCommunicator
+from django.test import SimpleTestCase, TestCase, Client
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
+import asyncio
 import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+
+from .services import environment_store
+from .services.environment_store import (
+    EnvironmentStore,
+    clone_environment,
+    normalize_requirements,
+    requirements_key,
+)
+from .kernel_views import NotebookKernelConsumer
+from .services.kernel_pool import KernelPool, KernelPoolExhausted
 
 from .models.code_models import CodeExecutionJob, Notebook, CodeLibrary
 
@@ -323,4 +340,255 @@ class CodeLibraryModelTests(TestCase):
         self.assertEqual(library.version, "1.0.0")
 
 
+class FakeKernel:
+    """Stands in for LiveKernel without starting a Jupyter kernel"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_used = 0.0
+        self.notebook_key = None
+        self.alive = True
+        self.rss = 100.0
+        self.shut_down = False
+
+    @property
+    def busy(self):
+        return self.lock.locked()
+
+    def touch(self):
+        pass
+
+    def is_alive(self):
+        return self.alive
+
+    def rss_mb(self):
+        return self.rss
+
+    def shutdown(self):
+        self.shut_down = True
+
+
+class KernelPoolTests(SimpleTestCase):
+    """Tests for warm kernel binding, eviction and limits"""
+
+    def setUp(self):
+        self.started = []
+        self.pool = KernelPool(
+            warm_size=1,
+            max_kernels=2,
+            idle_timeout=60,
+            memory_limit_mb=500,
+            kernel_factory=self._start_kernel,
+        )
+        # Refill synchronously so tests are deterministic
+        self.pool._refill_async = self.pool.fill
+        self.pool._ensure_reaper = lambda: None
+        self.addCleanup(self.pool.shutdown)
+
+    def _start_kernel(self):
+        kernel = FakeKernel()
+        self.started.append(kernel)
+        return kernel
+
+    def test_warm_kernel_bound_and_refilled(self):
+        """Test a pre-started kernel is bound and a new spare is started"""
+        self.pool.fill()
+        warm = self.started[0]
+
+        kernel = self.pool.acquire("nb-1")
+
+        self.assertIs(kernel, warm)
+        self.assertEqual(kernel.notebook_key, "nb-1")
+        self.assertEqual(self.pool.stats()["warm"], 1)
+
+    def test_same_notebook_reuses_kernel(self):
+        """Test cells of one notebook run on the same live kernel"""
+        first = self.pool.acquire("nb-1")
+        self.assertIs(self.pool.acquire("nb-1"), first)
+
+    def test_dead_kernel_replaced(self):
+        """Test a crashed kernel is discarded on the next acquire"""
+        first = self.pool.acquire("nb-1")
+        first.alive = False
+
+        second = self.pool.acquire("nb-1")
+
+        self.assertIsNot(second, first)
+        self.assertTrue(first.shut_down)
+
+    def test_least_recently_used_idle_kernel_evicted(self):
+        """Test new notebooks take over the oldest idle kernel at the limit"""
+        self.pool.warm_size = 0
+        first = self.pool.acquire("nb-1")
+        self.pool.acquire("nb-2")
+
+        self.pool.acquire("nb-3")
+
+        self.assertTrue(first.shut_down)
+        self.assertIsNone(self.pool.get("nb-1"))
+
+    def test_busy_kernels_not_evicted(self):
+        """Test the pool refuses new notebooks while every kernel is executing"""
+        self.pool.warm_size = 0
+        for key in ("nb-1", "nb-2"):
+            self.pool.acquire(key).lock.acquire()
+
+        with self.assertRaises(KernelPoolExhausted):
+            self.pool.acquire("nb-3")
+
+    def test_idle_kernels_reaped(self):
+        """Test kernels idle past the timeout are shut down"""
+        kernel = self.pool.acquire("nb-1")
+        kernel.last_used = -3600
+
+        self.assertEqual(self.pool.reap_idle(), 1)
+        self.assertTrue(kernel.shut_down)
+
+    def test_memory_limit_enforced(self):
+        """Test a kernel over its memory cap is shut down"""
+        kernel = self.pool.acquire("nb-1")
+        self.assertFalse(self.pool.enforce_memory_limit("nb-1"))
+
+        kernel.rss = 800.0
+
+        self.assertTrue(self.pool.enforce_memory_limit("nb-1"))
+        self.assertTrue(kernel.shut_down)
+        self.assertIsNone(self.pool.get("nb-1"))
+
+
+class NotebookKernelConsumerTests(SimpleTestCase):
+    """Tests for the live kernel WebSocket consumer"""
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.kernel = mock.Mock()
+        self.kernel.interrupt.side_effect = self.release.set
+        pool = mock.Mock()
+        pool.get.return_value = self.kernel
+
+        def execute_cell(notebook, cell_index, on_output):
+            # Blocks like a long-running cell until the kernel is interrupted
+            interrupted = self.release.wait(5)
+            return interrupted, {"status": "interrupted" if interrupted else "ok"}
+
+        executor = mock.Mock()
+        executor.execute_cell.side_effect = execute_cell
+        for target, value in (
+            ("get_kernel_pool", mock.Mock(return_value=pool)),
+            ("NotebookExecutor", mock.Mock(return_value=executor)),
+        ):
+            patcher = mock.patch(f"apps.code_app.kernel_views.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(
+            NotebookKernelConsumer, "_load_notebook", mock.AsyncMock(return_value=object())
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_interrupt_handled_while_cell_runs(self):
+        """Test an interrupt reaches the kernel before the running cell returns"""
+        communicator = WebsocketCommunicator(
+            NotebookKernelConsumer.as_asgi(), "/ws/code/notebooks/nb/kernel/"
+        )
+        communicator.scope["user"] = mock.Mock(is_authenticated=True)
+        communicator.scope["url_route"] = {"kwargs": {"notebook_id": "nb"}}
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        await communicator.send_json_to({"type": "execute", "cell_index": 0})
+        await asyncio.sleep(0.1)
+        await communicator.send_json_to({"type": "interrupt"})
+
+        reply = await communicator.receive_json_from(timeout=5)
+        self.assertEqual(reply["type"], "execute_reply")
+        self.assertTrue(reply["success"])
+        self.assertEqual(reply["status"], "interrupted")
+        self.kernel.interrupt.assert_called_once()
+        await communicator.disconnect()
+
+
+class EnvironmentStoreTests(SimpleTestCase):
+    """Tests for the content-addressed environment store"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.store = EnvironmentStore(root=self.root / "store", max_environments=2)
+
+    def _fake_build(self, env_path, requirements, system_site_packages):
+        (env_path / "lib").mkdir(parents=True)
+        (env_path / "lib" / "module.py").write_text("x = 1\n")
+
+    def test_equivalent_requirements_share_key(self):
+        """Test order, case, comments and duplicates do not change the key"""
+        first = normalize_requirements(
+            ["NumPy == 1.24", "# pinned", "", "scikit_learn>=1.0", "numpy==1.25"]
+        )
+        second = normalize_requirements(["scikit-learn >= 1.0", "numpy==1.25"])
+
+        self.assertEqual(first, ["numpy==1.25", "scikit-learn>=1.0"])
+        self.assertEqual(requirements_key(first), requirements_key(second))
+        self.assertNotEqual(
+            requirements_key(first), requirements_key(first, system_site_packages=True)
+        )
+
+    def test_identical_requirements_built_once(self):
+        """Test a second environment with the same packages reuses the first"""
+        with mock.patch.object(self.store, "_build", side_effect=self._fake_build) as build:
+            first = self.store.checkout(["numpy==1.25"], self.root / "user1" / "env")
+            second = self.store.checkout(["numpy==1.25"], self.root / "user2" / "env")
+
+        self.assertTrue(first)
+        self.assertFalse(second)
+        self.assertEqual(build.call_count, 1)
+        self.assertTrue((self.root / "user2" / "env" / "lib" / "module.py").exists())
+
+    def test_closest_base_contains_only_wanted_packages(self):
+        """Test new sets start from the largest stored subset"""
+        with mock.patch.object(self.store, "_build", side_effect=self._fake_build):
+            self.store.ensure(["a==1"])
+            base, _ = self.store.ensure(["a==1", "b==1"])
+            self.store.max_environments = 3
+            self.store.ensure(["c==1"])
+
+        closest = self.store._closest_base(["a==1", "b==1", "d==1"], False)
+
+        self.assertEqual(closest, (base, ["a==1", "b==1"]))
+
+    def test_clone_is_independent_and_relocates_scripts(self):
+        """Test writes to a clone never reach the source, and scripts are relocated"""
+        source = self.root / "source"
+        (source / "bin").mkdir(parents=True)
+        (source / "lib").mkdir()
+        (source / "lib" / "module.py").write_text("x = 1\n")
+        script = source / "bin" / "tool"
+        script.write_text(f"#!{source}/bin/python\n")
+        target = self.root / "target"
+
+        clone_environment(source, target)
+
+        self.assertFalse(
+            os.path.samefile(source / "lib" / "module.py", target / "lib" / "module.py")
+        )
+        with open(target / "lib" / "module.py", "w") as f:
+            f.write("x = 2\n")
+        self.assertEqual((source / "lib" / "module.py").read_text(), "x = 1\n")
+        self.assertEqual((target / "bin" / "tool").read_text(), f"#!{target}/bin/python\n")
+        self.assertEqual(script.read_text(), f"#!{source}/bin/python\n")
+
+    def test_least_recently_used_environment_collected(self):
+        """Test environments beyond the cap are removed oldest first"""
+        with mock.patch.object(self.store, "_build", side_effect=self._fake_build):
+            oldest, _ = self.store.ensure(["a==1"])
+            newer, _ = self.store.ensure(["b==1"])
+            marker = oldest / environment_store.MARKER_FILE
+            os.utime(marker, (1, 1))
+            self.store.ensure(["c==1"])
+
+        self.assertFalse(oldest.exists())
+        self.assertTrue(newer.exists())
+
+
 # EOF
@@ -1,5 +1,13 @@
 """Common utility functions."""
 
 from .git_operations import auto_commit, get_file_history, revert_to_commit
+from .job_queue import InProcessPool, JobQueue, WorkerPool
 
-__all__ = ['auto_commit', 'get_file_history', 'revert_to_commit']
+__all__ = [
+    'InProcessPool',
+    'JobQueue',
+    'WorkerPool',
+    'auto_commit',
+    'get_file_history',
+    'revert_to_commit',
+]
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File: ./apps/common/utils/job_queue.py
+"""
+Database-backed job queues with crash recovery and worker threads.
+
+A model's rows are the queue: a job is claimed by atomically flipping its
+status from queued to running, and workers refresh ``heartbeat_at`` while
+they run it. A running job whose heartbeat is older than ``stale_after``
+lost its worker and is put back in the queue, or failed once it used up
+its attempts. The model needs ``status``, ``worker_id``, ``attempts``,
+``started_at``, ``heartbeat_at`` and ``completed_at`` fields.
+
+Used by the BibTeX enrichment queue (scholar_app) and the compilation
+scheduler (writer_app); each supplies its own claim order and job runner.
+
+Usage:
+    jobs = JobQueue(MyJob, queued="pending", running="processing", label="jobs")
+    pool = WorkerPool(
+        "my", size=2, claim=my_claim, process=run_job,
+        heartbeat=jobs.heartbeat,
+        recover=lambda: jobs.recover_stale(stale_after=120, max_attempts=3),
+    )
+    pool.start()
+"""
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import timedelta
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """Heartbeats and stale-job recovery for one job model."""
+
+    def __init__(
+        self, model, queued: str, running: str, label: str, failed: str = "failed"
+    ):
+        self.model = model
+        self.queued = queued
+        self.running = running
+        self.failed = failed
+        self.label = label
+
+    def heartbeat(self, job_ids) -> int:
+        """Mark running jobs as alive."""
+        if not job_ids:
+            return 0
+        return self.model.objects.filter(
+            pk__in=list(job_ids), status=self.running
+        ).update(heartbeat_at=timezone.now())
+
+    def recover_stale(
+        self,
+        stale_after: int,
+        max_attempts: int,
+        requeue: Optional[Callable] = None,
+        fail: Optional[Callable] = None,
+        fields=(),
+    ):
+        """Re-queue running jobs whose worker stopped sending heartbeats.
+
+        Jobs that already used ``max_attempts`` claims are failed instead of
+        retried forever. ``requeue`` and ``fail`` return extra fields to
+        update for a job (loaded with ``fields``), e.g. a log line.
+
+        Returns:
+            (requeued, failed) counts
+        """
+        cutoff = timezone.now() - timedelta(seconds=stale_after)
+        stale = self.model.objects.filter(status=self.running).filter(
+            Q(heartbeat_at__lt=cutoff)
+            | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+        )
+
+        requeued = failed = 0
+        for job in stale.only("pk", "attempts", "heartbeat_at", *fields):
+            # Matching the heartbeat we read guards against a worker that
+            # came back to life in the meantime
+            unchanged = self.model.objects.filter(
+                pk=job.pk, status=self.running, heartbeat_at=job.heartbeat_at
+            )
+            if job.attempts >= max_attempts:
+                failed += unchanged.update(
+                    status=self.failed,
+                    completed_at=timezone.now(),
+                    worker_id="",
+                    **(fail(job) if fail else {}),
+                )
+            else:
+                requeued += unchanged.update(
+                    status=self.queued,
+                    worker_id="",
+                    heartbeat_at=None,
+                    **(requeue(job) if requeue else {}),
+                )
+
+        if requeued or failed:
+            logger.warning(
+                f"Recovered stale {self.label}: {requeued} re-queued, {failed} failed"
+            )
+        return requeued, failed
+
+
+class WorkerPool:
+    """Threads that claim and run queued jobs.
+
+    ``size`` threads poll the queue (and wake immediately on ``notify``),
+    a separate thread keeps heartbeats fresh, recovers jobs of dead
+    workers and runs ``maintain``, if given.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        size: int,
+        claim: Callable,
+        process: Callable,
+        heartbeat: Callable,
+        recover: Callable,
+        maintain: Optional[Callable] = None,
+        poll_interval: float = 5,
+        heartbeat_interval: float = 30,
+    ):
+        self.name = name
+        self.size = size
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._claim = claim
+        self._process = process
+        self._heartbeat = heartbeat
+        self._recover = recover
+        self._maintain = maintain
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._running = set()
+        self._threads = []
+
+    @property
+    def started(self) -> bool:
+        return bool(self._threads)
+
+    def start(self):
+        """Recover orphaned jobs and start the worker threads."""
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(
+                    target=self._work, name=f"{self.name}-worker-{i}", daemon=True
+                )
+                for i in range(self.size)
+            ]
+            self._threads.append(
+                threading.Thread(
+                    target=self._keep_alive,
+                    name=f"{self.name}-heartbeat",
+                    daemon=True,
+                )
+            )
+        try:
+            self._recover()
+        finally:
+            close_old_connections()
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"{self.name} worker pool {self.worker_id} started ({self.size})")
+
+    def stop(self, timeout: float = None):
+        """Stop claiming jobs and wait for running ones to finish."""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        with self._lock:
+            self._threads = []
+
+    def notify(self):
+        """Wake idle workers (a job was queued)."""
+        self._wake.set()
+
+    def running_jobs(self):
+        with self._lock:
+            return set(self._running)
+
+    def _work(self):
+        while not self._stop.is_set():
+            job = None
+            try:
+                job = self._claim(self.worker_id)
+            except Exception as e:
+                logger.error(f"Could not claim {self.name} job: {e}")
+            finally:
+                close_old_connections()
+
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+
+            with self._lock:
+                self._running.add(job.pk)
+            try:
+                self._process(job)
+            except Exception as e:
+                logger.exception(f"{self.name} job {job.pk} crashed the worker: {e}")
+            finally:
+                with self._lock:
+                    self._running.discard(job.pk)
+                close_old_connections()
+                # A slot freed up; let idle threads re-check the queue
+                self._wake.set()
+
+    def _keep_alive(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            try:
+                self._heartbeat(self.running_jobs())
+                self._recover()
+                if self._maintain:
+                    self._maintain()
+            except Exception as e:
+                logger.error(f"{self.name} heartbeat failed: {e}")
+            finally:
+                close_old_connections()
+
+
+class InProcessPool:
+    """Process-wide worker pool, started on the first queued job.
+
+    With ``setting`` set to False the pool is never started here; a
+    management command runs the workers instead.
+    """
+
+    def __init__(self, factory: Callable, setting: str):
+        self._factory = factory
+        self._setting = setting
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """The pool (not started)."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = self._factory()
+            return self._pool
+
+    def wake(self) -> None:
+        """Start the pool if needed and let it check the queue."""
+        if not getattr(settings, self._setting, True):
+            return
+        pool = self.get()
+        if not pool.started:
+            pool.start()
+        pool.notify()
+
+
+__all__ = ["InProcessPool", "JobQueue", "WorkerPool"]
+
+# EOF
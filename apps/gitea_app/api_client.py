@@ -2,16 +2,79 @@
 Gitea API Client for SciTeX Cloud
 
 This module provides a Python wrapper for the Gitea REST API.
+
+All clients for a Gitea instance share one pooled requests.Session with
+timeouts and retries (with backoff) for idempotent requests. List
+endpoints are paginated transparently, and read endpoints are revalidated
+with ETag/Last-Modified against copies kept in the Django cache, so
+repeated health checks and file listings mostly get 304 responses.
 """
 
+import hashlib
+import json
+import threading
 import requests
 import re
-from typing import Dict, List
+from typing import Dict, Iterator, List, Tuple
 from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .exceptions import (
     GiteaAPIError,
 )
 
+# (connect, read) timeout in seconds
+GITEA_TIMEOUT = getattr(settings, "GITEA_TIMEOUT", (5, 30))
+GITEA_MAX_RETRIES = getattr(settings, "GITEA_MAX_RETRIES", 3)
+GITEA_RETRY_BACKOFF = getattr(settings, "GITEA_RETRY_BACKOFF", 0.5)
+GITEA_POOL_SIZE = getattr(settings, "GITEA_POOL_SIZE", 20)
+# Gitea's default MAX_RESPONSE_ITEMS
+GITEA_PAGE_LIMIT = getattr(settings, "GITEA_PAGE_LIMIT", 50)
+GITEA_ETAG_CACHE_TTL = getattr(settings, "GITEA_ETAG_CACHE_TTL", 24 * 3600)
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(base_url: str) -> requests.Session:
+    """
+    Shared, pooled session for a Gitea instance.
+
+    GET, HEAD, PUT and OPTIONS requests are retried on connection and read
+    errors and on 429/502/503/504 responses with exponential backoff
+    (honoring Retry-After). POST, PATCH and DELETE requests are only retried
+    when the connection could not be made: after a read error or a 502 the
+    change may already be applied, and repeating a DELETE would then turn a
+    success into a 404.
+
+    Args:
+        base_url: Gitea instance URL
+
+    Returns:
+        requests.Session
+    """
+    with _sessions_lock:
+        session = _sessions.get(base_url)
+        if session is None:
+            retry = Retry(
+                total=GITEA_MAX_RETRIES,
+                backoff_factor=GITEA_RETRY_BACKOFF,
+                status_forcelist=(429, 502, 503, 504),
+                allowed_methods=frozenset(["GET", "HEAD", "PUT", "OPTIONS"]),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=GITEA_POOL_SIZE,
+                pool_maxsize=GITEA_POOL_SIZE,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[base_url] = session
+        return session
+
 
 def convert_git_url_to_https(git_url: str) -> str:
     """
@@ -53,21 +116,33 @@ class GiteaClient:
     Documentation: https://docs.gitea.io/en-us/api-usage/
     """
 
-    def __init__(self, base_url: str = None, token: str = None):
+    def __init__(
+        self,
+        base_url: str = None,
+        token: str = None,
+        timeout=None,
+        page_limit: int = None,
+    ):
         """
         Initialize Gitea client
 
         Args:
             base_url: Gitea instance URL (defaults to settings.GITEA_URL)
             token: API token (defaults to settings.GITEA_TOKEN)
+            timeout: Seconds, or (connect, read) (defaults to GITEA_TIMEOUT)
+            page_limit: Items per page for list endpoints
         """
         self.base_url = base_url or settings.GITEA_URL
         self.api_url = f"{self.base_url}/api/v1"
         self.token = token or settings.GITEA_TOKEN
+        self.timeout = timeout or GITEA_TIMEOUT
+        self.page_limit = page_limit or GITEA_PAGE_LIMIT
 
         if not self.token:
             raise GiteaAPIError("Gitea API token not configured")
 
+        self.session = get_session(self.base_url)
+
     def _get_headers(self, extra_headers: Dict = None) -> Dict:
         """Build request headers with authentication"""
         headers = {
@@ -95,9 +170,10 @@ class GiteaClient:
         """
         url = f"{self.api_url}{endpoint}"
         headers = self._get_headers(kwargs.pop("headers", None))
+        kwargs.setdefault("timeout", self.timeout)
 
         try:
-            response = requests.request(
+            response = self.session.request(
                 method=method, url=url, headers=headers, **kwargs
             )
             response.raise_for_status()
@@ -118,14 +194,92 @@ class GiteaClient:
         except requests.RequestException as e:
             raise GiteaAPIError(f"Request failed: {e}")
 
+    def _cache_key(self, endpoint: str, params: Dict = None) -> str:
+        """Cache key for a read endpoint, scoped to the API token."""
+        raw = json.dumps(
+            [self.token, self.api_url, endpoint, sorted((params or {}).items())],
+            default=str,
+        )
+        return f"gitea_api:{hashlib.sha256(raw.encode()).hexdigest()[:32]}"
+
+    def _get(self, endpoint: str, params: Dict = None) -> Tuple[object, Dict]:
+        """
+        GET a read endpoint, revalidating a cached copy
+
+        Responses carrying an ETag or Last-Modified header are cached; the
+        next request for the same endpoint sends them back and a 304 is
+        answered from the cache.
+
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+
+        Returns:
+            (decoded JSON, pagination links parsed from the Link header)
+        """
+        key = self._cache_key(endpoint, params)
+        cached = cache.get(key)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = self._request("GET", endpoint, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached["data"], cached["links"]
+
+        data = response.json()
+        links = {rel: link["url"] for rel, link in response.links.items()}
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            cache.set(
+                key,
+                {
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "data": data,
+                    "links": links,
+                },
+                GITEA_ETAG_CACHE_TTL,
+            )
+        return data, links
+
+    def _paginate(self, endpoint: str, params: Dict = None) -> Iterator[Dict]:
+        """
+        Iterate over all items of a paginated list endpoint
+
+        Follows the Link header when Gitea sends one, otherwise stops at
+        the first page shorter than the page limit.
+
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+
+        Yields:
+            Items of every page
+        """
+        page = 1
+        while True:
+            items, links = self._get(
+                endpoint, {**(params or {}), "page": page, "limit": self.page_limit}
+            )
+            if not items:
+                return
+            yield from items
+            if "next" not in links and (links or len(items) < self.page_limit):
+                return
+            page += 1
+
     # ----------------------------------------
     # User Operations
     # ----------------------------------------
 
     def get_current_user(self) -> Dict:
         """Get current authenticated user info"""
-        response = self._request("GET", "/user")
-        return response.json()
+        return self._get("/user")[0]
 
     def delete_user(self, username: str) -> bool:
         """
@@ -144,23 +298,34 @@ class GiteaClient:
     # Repository Operations
     # ----------------------------------------
 
-    def list_repositories(self, username: str = None) -> List[Dict]:
+    def iter_repositories(self, username: str = None) -> Iterator[Dict]:
         """
-        List repositories
+        Iterate over repositories, page by page
 
         Args:
             username: Username to list repos for (defaults to current user)
 
-        Returns:
-            List of repository objects
+        Yields:
+            Repository objects
         """
         if username:
             endpoint = f"/users/{username}/repos"
         else:
             endpoint = "/user/repos"
 
-        response = self._request("GET", endpoint)
-        return response.json()
+        return self._paginate(endpoint)
+
+    def list_repositories(self, username: str = None) -> List[Dict]:
+        """
+        List repositories (all pages)
+
+        Args:
+            username: Username to list repos for (defaults to current user)
+
+        Returns:
+            List of repository objects
+        """
+        return list(self.iter_repositories(username))
 
     def create_repository(
         self,
@@ -223,8 +388,7 @@ class GiteaClient:
         Returns:
             Repository object
         """
-        response = self._request("GET", f"/repos/{owner}/{repo}")
-        return response.json()
+        return self._get(f"/repos/{owner}/{repo}")[0]
 
     def delete_repository(self, owner: str, repo: str) -> bool:
         """
@@ -332,10 +496,9 @@ class GiteaClient:
         Returns:
             File content object (base64 encoded)
         """
-        response = self._request(
-            "GET", f"/repos/{owner}/{repo}/contents/{filepath}", params={"ref": ref}
-        )
-        return response.json()
+        return self._get(
+            f"/repos/{owner}/{repo}/contents/{filepath}", params={"ref": ref}
+        )[0]
 
     def list_files(
         self, owner: str, repo: str, path: str = "", ref: str = "main"
@@ -350,14 +513,13 @@ class GiteaClient:
             ref: Branch/tag/commit (default: main)
 
         Returns:
-            List of file/directory objects
+            List of file/directory objects (Gitea returns whole directories)
         """
         endpoint = f"/repos/{owner}/{repo}/contents"
         if path:
             endpoint += f"/{path}"
 
-        response = self._request("GET", endpoint, params={"ref": ref})
-        return response.json()
+        return self._get(endpoint, params={"ref": ref})[0]
 
     # ----------------------------------------
     # Organization Operations
@@ -396,9 +558,8 @@ class GiteaClient:
         return response.json()
 
     def list_organizations(self) -> List[Dict]:
-        """List organizations for current user"""
-        response = self._request("GET", "/user/orgs")
-        return response.json()
+        """List organizations for current user (all pages)"""
+        return list(self._paginate("/user/orgs"))
 
     # ----------------------------------------
     # Fork Operations
@@ -435,15 +596,14 @@ class GiteaClient:
             username: Username to list keys for (defaults to current user)
 
         Returns:
-            List of SSH key objects
+            List of SSH key objects (all pages)
         """
         if username:
             endpoint = f"/users/{username}/keys"
         else:
             endpoint = "/user/keys"
 
-        response = self._request("GET", endpoint)
-        return response.json()
+        return list(self._paginate(endpoint))
 
     def add_ssh_key(
         self, title: str, key: str, username: str = None, read_only: bool = False
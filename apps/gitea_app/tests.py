@@ -1 +1,113 @@
-# Create your tests here.
+"""
+Tests for the Gitea API client.
+"""
+
+import json
+from unittest import mock
+
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from apps.gitea_app import api_client
+from apps.gitea_app.api_client import GiteaClient
+from apps.gitea_app.exceptions import GiteaAPIError
+
+
+def _response(status=200, data=None, headers=None, url="http://gitea.test"):
+    response = requests.Response()
+    response.status_code = status
+    response._content = b"" if data is None else json.dumps(data).encode()
+    response.headers.update(headers or {})
+    response.url = url
+    return response
+
+
+class GiteaClientTests(SimpleTestCase):
+    """Tests for pooled, paginated and conditionally cached requests"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = GiteaClient(
+            base_url="http://gitea.test", token="secret", page_limit=2
+        )
+        patcher = mock.patch.object(self.client.session, "request")
+        self.request = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_session_shared_per_instance(self):
+        """Test clients of one Gitea instance share a pooled session"""
+        other = GiteaClient(base_url="http://gitea.test", token="other")
+        adapter = other.session.get_adapter("http://gitea.test")
+
+        self.assertIs(other.session, self.client.session)
+        self.assertEqual(adapter.max_retries.total, api_client.GITEA_MAX_RETRIES)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+
+    def test_requests_use_timeout(self):
+        """Test every request is sent with the configured timeout"""
+        self.request.return_value = _response(data={"login": "alice"})
+        self.client.get_current_user()
+        self.assertEqual(
+            self.request.call_args.kwargs["timeout"], api_client.GITEA_TIMEOUT
+        )
+
+    def test_list_repositories_reads_all_pages(self):
+        """Test repositories beyond the first page are not dropped"""
+        self.request.side_effect = [
+            _response(data=[{"id": 1}, {"id": 2}]),
+            _response(data=[{"id": 3}, {"id": 4}]),
+            _response(data=[{"id": 5}]),
+        ]
+
+        repos = self.client.list_repositories("alice")
+
+        self.assertEqual([repo["id"] for repo in repos], [1, 2, 3, 4, 5])
+        pages = [call.kwargs["params"]["page"] for call in self.request.call_args_list]
+        self.assertEqual(pages, [1, 2, 3])
+
+    def test_pagination_follows_link_header(self):
+        """Test the Link header decides whether another page exists"""
+        self.request.side_effect = [
+            _response(
+                data=[{"id": 1}],
+                headers={"Link": '<http://gitea.test/api/v1/user/keys?page=2>; rel="next"'},
+            ),
+            _response(
+                data=[{"id": 2}],
+                headers={"Link": '<http://gitea.test/api/v1/user/keys?page=1>; rel="prev"'},
+            ),
+        ]
+
+        keys = self.client.list_ssh_keys()
+
+        self.assertEqual([key["id"] for key in keys], [1, 2])
+        self.assertEqual(self.request.call_count, 2)
+
+    def test_not_modified_served_from_cache(self):
+        """Test read endpoints revalidate with the cached ETag"""
+        self.request.side_effect = [
+            _response(data=[{"name": "main.tex"}], headers={"ETag": '"v1"'}),
+            _response(status=304),
+        ]
+
+        first = self.client.list_files("alice", "paper")
+        second = self.client.list_files("alice", "paper")
+
+        self.assertEqual(first, second)
+        headers = self.request.call_args_list[1].kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+
+    def test_cache_scoped_to_token(self):
+        """Test cached responses are never shared between tokens"""
+        other = GiteaClient(base_url="http://gitea.test", token="other")
+        self.assertNotEqual(
+            self.client._cache_key("/user/repos"), other._cache_key("/user/repos")
+        )
+
+    def test_http_error_message_surfaced(self):
+        """Test Gitea error messages are raised as GiteaAPIError"""
+        self.request.return_value = _response(status=404, data={"message": "Not Found"})
+        with self.assertRaisesMessage(GiteaAPIError, "Not Found"):
+            self.client.get_repository("alice", "missing")
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Commit history of a single file.
+
+One ``git log --follow --numstat`` process yields every commit together
+with its per-file line stats; output is parsed as it streams and the
+process is stopped once a page is full, so the first page of a long
+history costs the same as the first page of a short one.
+
+Pages are addressed by an opaque cursor, the hash of the last commit shown
+plus the file's path at that commit, so a following page resumes the walk
+there (and keeps following renames) instead of re-reading everything
+before it. Pages and summaries are cached per HEAD sha.
+"""
+
+import hashlib
+import logging
+import re
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from django.core.cache import cache
+
+from .git_metadata import get_head_sha
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "git_file_history"
+CACHE_TIMEOUT = 24 * 3600
+GIT_TIMEOUT = 30
+PAGE_SIZE = 30
+
+_RECORD = "\x1e"
+_FIELD = "\x1f"
+_BRACE_RENAME = re.compile(r"^(.*)\{(.*) => (.*)\}(.*)$")
+
+
+@dataclass
+class HistoryPage:
+    """One page of a file's history."""
+
+    commits: List[dict] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+def _rename_sides(path: str) -> Tuple[str, str]:
+    """(old, new) paths of a numstat path column (``a => b`` or ``d/{a => b}``)."""
+    match = _BRACE_RENAME.match(path)
+    if match:
+        prefix, old, new, suffix = match.groups()
+        return (
+            f"{prefix}{old}{suffix}".replace("//", "/"),
+            f"{prefix}{new}{suffix}".replace("//", "/"),
+        )
+    if " => " in path:
+        old, new = path.split(" => ", 1)
+        return old, new
+    return path, path
+
+
+def _author_matcher(author: str):
+    """Predicate mimicking ``git log --author`` (regex on "name <email>").
+
+    Applied while parsing rather than passed to git: with ``--follow``, git
+    would also drop other authors' rename commits and lose the file's
+    earlier history.
+    """
+    if not author:
+        return lambda name, email: True
+    try:
+        pattern = re.compile(author)
+    except re.error:
+        pattern = re.compile(re.escape(author))
+    return lambda name, email: bool(pattern.search(f"{name} <{email}>"))
+
+
+def _count(value: str) -> int:
+    # Binary files report "-"
+    return int(value) if value.isdigit() else 0
+
+
+def iter_file_history(
+    repo_path, file_path: str, author: str = "", start: str = None
+) -> Iterator[dict]:
+    """Stream commits that touched ``file_path``, newest first.
+
+    Args:
+        repo_path: Root of the git working tree
+        file_path: Path of the file at ``start`` (default: HEAD)
+        author: Optional ``git log --author`` style pattern
+        start: Commit to start walking from
+
+    Yields:
+        Commit dicts with hash, author, timestamp, subject, additions,
+        deletions and ``path`` (the file's name in that commit).
+        Closing the generator stops the git process.
+
+    Raises:
+        subprocess.TimeoutExpired: git ran longer than GIT_TIMEOUT
+    """
+    command = [
+        "git",
+        "-c",
+        "core.quotepath=off",
+        "log",
+        "--follow",
+        "--numstat",
+        f"--format={_RECORD}%H{_FIELD}%an{_FIELD}%ae{_FIELD}%at{_FIELD}%ar{_FIELD}%s",
+    ]
+    if start:
+        command.append(start)
+    command += ["--", file_path]
+
+    process = subprocess.Popen(
+        command,
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        errors="replace",
+    )
+    expired = threading.Event()
+
+    def expire():
+        expired.set()
+        process.kill()
+
+    # A timer rather than a check per line: git may go silent mid-walk
+    timer = threading.Timer(GIT_TIMEOUT, expire)
+    timer.daemon = True
+    timer.start()
+    matches_author = _author_matcher(author)
+    current_path = file_path
+    commit = None
+    try:
+        for line in process.stdout:
+            line = line.rstrip("\n")
+            if line.startswith(_RECORD):
+                if commit and matches_author(
+                    commit["author_name"], commit["author_email"]
+                ):
+                    yield commit
+                parts = line[1:].split(_FIELD, 5)
+                if len(parts) < 6:
+                    commit = None
+                    continue
+                commit_hash, name, email, timestamp, relative_time, subject = parts
+                commit = {
+                    "hash": commit_hash,
+                    "short_hash": commit_hash[:7],
+                    "author_name": name,
+                    "author_email": email,
+                    "timestamp": int(timestamp or 0),
+                    "relative_time": relative_time,
+                    "subject": subject,
+                    "additions": 0,
+                    "deletions": 0,
+                    "path": current_path,
+                }
+            elif commit and line.count("\t") >= 2:
+                additions, deletions, path = line.split("\t", 2)
+                old, new = _rename_sides(path)
+                if new != commit["path"] and old != commit["path"]:
+                    continue
+                commit["additions"] += _count(additions)
+                commit["deletions"] += _count(deletions)
+                commit["path"] = new
+                # Older commits know the file by its previous name
+                current_path = old
+        if expired.is_set():
+            raise subprocess.TimeoutExpired(command, GIT_TIMEOUT)
+        if commit and matches_author(commit["author_name"], commit["author_email"]):
+            yield commit
+    finally:
+        timer.cancel()
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        process.wait()
+
+
+def encode_cursor(commit: dict) -> str:
+    return f"{commit['hash']}:{commit['path']}"
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[str, str]]:
+    commit_hash, _, path = (cursor or "").partition(":")
+    if not re.fullmatch(r"[0-9a-f]{40}", commit_hash) or not path:
+        return None
+    return commit_hash, path
+
+
+def _cache_key(repo_path: Path, head: str, *parts) -> str:
+    repo_id = hashlib.sha1(str(Path(repo_path).resolve()).encode()).hexdigest()[:16]
+    detail = hashlib.sha1("\0".join(str(p) for p in parts).encode()).hexdigest()
+    return f"{CACHE_PREFIX}:{repo_id}:{head}:{detail[:24]}"
+
+
+def get_history_page(
+    repo_path,
+    file_path: str,
+    cursor: str = None,
+    author: str = "",
+    limit: int = PAGE_SIZE,
+) -> HistoryPage:
+    """A page of ``file_path``'s history, starting after ``cursor``.
+
+    Uses a single git process, stopped once ``limit + 1`` matching commits
+    have been read. Invalid cursors start from the newest commit.
+    """
+    head = get_head_sha(repo_path)
+    if not head:
+        return HistoryPage()
+
+    key = _cache_key(repo_path, head, "page", file_path, author, cursor, limit)
+    page = cache.get(key)
+    if page is not None:
+        return page
+
+    start = decode_cursor(cursor) if cursor else None
+    path = start[1] if start else file_path
+    commits = []
+    history = iter_file_history(
+        repo_path, path, author=author, start=start[0] if start else None
+    )
+    try:
+        for commit in history:
+            if start and commit["hash"] == start[0]:
+                continue
+            commits.append(commit)
+            if len(commits) > limit:
+                break
+    finally:
+        history.close()
+
+    page = HistoryPage(commits=commits[:limit])
+    if len(commits) > limit:
+        page.next_cursor = encode_cursor(commits[limit - 1])
+    cache.set(key, page, CACHE_TIMEOUT)
+    return page
+
+
+def get_history_summary(repo_path, file_path: str, author: str = "") -> dict:
+    """Commit count and authors of ``file_path``'s whole history.
+
+    A stats-free ``git log --follow`` walk (one process), cached per HEAD.
+    """
+    head = get_head_sha(repo_path)
+    if not head:
+        return {"total_commits": 0, "authors": []}
+
+    key = _cache_key(repo_path, head, "summary", file_path, author)
+    summary = cache.get(key)
+    if summary is not None:
+        return summary
+
+    result = subprocess.run(
+        ["git", "log", "--follow", f"--format=%an{_FIELD}%ae", "--", file_path],
+        cwd=repo_path,
+        capture_output=True,
+        text=True,
+        timeout=GIT_TIMEOUT,
+    )
+    matches_author = _author_matcher(author)
+    names = []
+    for line in result.stdout.splitlines() if result.returncode == 0 else []:
+        name, _, email = line.partition(_FIELD)
+        if matches_author(name, email):
+            names.append(name)
+    summary = {"total_commits": len(names), "authors": sorted(set(names))}
+    cache.set(key, summary, CACHE_TIMEOUT)
+    return summary
+
+
+__all__ = [
+    "HistoryPage",
+    "decode_cursor",
+    "encode_cursor",
+    "get_history_page",
+    "get_history_summary",
+    "iter_file_history",
+]
+
+# EOF
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Last-commit metadata for directory listings.
+
+The project browser shows, for every file and folder of a directory, the
+last commit that touched it. Asking ``git log -1 -- <path>`` per entry forks
+one git process per entry; this service walks the directory's history once
+(``git log --name-only -- <directory>``) and attributes each commit to the
+directory children it touched, stopping as soon as every child is known.
+
+Results are cached per (repository, HEAD sha, directory). Any commit, pull
+or push through the project clone moves HEAD, which changes the key, so
+stale listings are never served and no explicit invalidation is needed.
+"""
+
+import hashlib
+import logging
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "git_last_commits"
+CACHE_TIMEOUT = 24 * 3600
+GIT_TIMEOUT = 10
+MESSAGE_LENGTH = 80
+
+_RECORD = "\x1e"
+_FIELD = "\x1f"
+
+EMPTY_COMMIT_INFO = {"author": "", "time_ago": "", "message": "", "hash": ""}
+
+
+def _git_dir(repo_path: Path) -> Optional[Path]:
+    git_dir = repo_path / ".git"
+    if git_dir.is_file():
+        # Worktree/submodule: ".git" is a "gitdir: <path>" pointer
+        content = git_dir.read_text().strip()
+        if content.startswith("gitdir:"):
+            git_dir = (repo_path / content[len("gitdir:") :].strip()).resolve()
+    return git_dir if git_dir.is_dir() else None
+
+
+def get_head_sha(repo_path) -> Optional[str]:
+    """Commit sha of HEAD, read from the ref files (no git process)."""
+    repo_path = Path(repo_path)
+    git_dir = _git_dir(repo_path)
+    if git_dir is None:
+        return None
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+        if not head.startswith("ref:"):
+            return head or None
+        ref = head[len("ref:") :].strip()
+        ref_file = git_dir / ref
+        if ref_file.is_file():
+            return ref_file.read_text().strip() or None
+        packed = git_dir / "packed-refs"
+        if packed.is_file():
+            for line in packed.read_text().splitlines():
+                sha, _, name = line.partition(" ")
+                if name == ref:
+                    return sha
+        # Unborn branch (no commits yet)
+        return None
+    except OSError as e:
+        logger.debug(f"Could not read HEAD of {repo_path}: {e}")
+        return None
+
+
+def format_time_ago(timestamp: int, now: float = None) -> str:
+    """Relative age in git's ``%ar`` style ("3 days ago")."""
+    seconds = max(0, int((now or time.time()) - timestamp))
+    for limit, unit_seconds, unit in (
+        (90, 1, "second"),
+        (90 * 60, 60, "minute"),
+        (36 * 3600, 3600, "hour"),
+        (14 * 86400, 86400, "day"),
+        (70 * 86400, 7 * 86400, "week"),
+        (365 * 86400, 30 * 86400, "month"),
+    ):
+        if seconds < limit:
+            value = max(1, round(seconds / unit_seconds))
+            return f"{value} {unit}{'s' if value != 1 else ''} ago"
+    years = max(1, round(seconds / (365 * 86400)))
+    return f"{years} year{'s' if years != 1 else ''} ago"
+
+
+def _walk_history(repo_path: Path, directory: str, wanted: set):
+    """One ``git log`` walk attributing commits to children of ``directory``.
+
+    git is killed after GIT_TIMEOUT seconds, whether or not it is still
+    producing output.
+
+    Returns:
+        (found, complete): child name -> commit, and whether the walk
+        resolved every child it could (False if it was cut short)
+    """
+    prefix = f"{directory}/" if directory else ""
+    found = {}
+    command = [
+        "git",
+        "-c",
+        "core.quotepath=off",
+        "log",
+        f"--format={_RECORD}%h{_FIELD}%an{_FIELD}%at{_FIELD}%s",
+        "--name-only",
+        "--",
+        directory or ".",
+    ]
+    process = subprocess.Popen(
+        command,
+        cwd=repo_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        errors="replace",
+    )
+    # A timer rather than a check per line: git may go silent mid-walk
+    timer = threading.Timer(GIT_TIMEOUT, process.kill)
+    timer.daemon = True
+    timer.start()
+    complete = False
+    try:
+        commit = None
+        for line in process.stdout:
+            line = line.rstrip("\n")
+            if line.startswith(_RECORD):
+                commit_hash, author, timestamp, message = line[1:].split(_FIELD, 3)
+                commit = {
+                    "author": author,
+                    "timestamp": int(timestamp or 0),
+                    "message": message[:MESSAGE_LENGTH],
+                    "hash": commit_hash,
+                }
+                continue
+            if not line or commit is None or not line.startswith(prefix):
+                continue
+            child = line[len(prefix) :].split("/", 1)[0]
+            if child in wanted and child not in found:
+                found[child] = commit
+                if len(found) == len(wanted):
+                    complete = True
+                    break
+    finally:
+        timer.cancel()
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        process.wait()
+    if not complete:
+        # Reached the end of the history, unless git was killed or failed
+        complete = process.returncode == 0
+        if not complete:
+            logger.warning(
+                f"git history walk in {repo_path} did not finish "
+                f"(exit {process.returncode}); not caching it"
+            )
+    return found, complete
+
+
+def get_last_commits(repo_path, directory: str = "", names: Iterable[str] = None):
+    """Last commit touching each child of ``directory``.
+
+    Args:
+        repo_path: Root of the git working tree
+        directory: Directory relative to ``repo_path`` ("" for the root)
+        names: Child names to resolve (default: every entry on disk)
+
+    Returns:
+        Dict mapping child name to {"author", "time_ago", "message", "hash"};
+        children without history (untracked, or not a repository) map to
+        empty values.
+    """
+    repo_path = Path(repo_path)
+    directory = str(directory or "").strip("/")
+    if directory == ".":
+        directory = ""
+    if names is None:
+        target = repo_path / directory
+        names = [item.name for item in target.iterdir()] if target.is_dir() else []
+    wanted = {name for name in names if name != ".git"}
+
+    commits = {}
+    head = get_head_sha(repo_path)
+    if head and wanted:
+        repo_id = hashlib.sha1(str(repo_path.resolve()).encode()).hexdigest()[:16]
+        directory_id = hashlib.sha1(directory.encode()).hexdigest()[:16]
+        cache_key = f"{CACHE_PREFIX}:{repo_id}:{head}:{directory_id}"
+        commits = cache.get(cache_key)
+        if commits is None or not wanted <= set(commits):
+            try:
+                found, complete = _walk_history(repo_path, directory, wanted)
+                commits = {**(commits or {}), **dict.fromkeys(wanted), **found}
+                # Children a cut-short walk did not reach may still have
+                # history; caching them as empty would hide it until HEAD moves
+                if complete:
+                    cache.set(cache_key, commits, CACHE_TIMEOUT)
+            except Exception as e:
+                logger.debug(f"Error reading git history of {repo_path}: {e}")
+                commits = {}
+
+    now = time.time()
+    result = {}
+    for name in names:
+        commit = commits.get(name)
+        if commit:
+            result[name] = {
+                "author": commit["author"],
+                "time_ago": format_time_ago(commit["timestamp"], now),
+                "message": commit["message"],
+                "hash": commit["hash"],
+            }
+        else:
+            result[name] = dict(EMPTY_COMMIT_INFO)
+    return result
+
+
+__all__ = ["format_time_ago", "get_head_sha", "get_last_commits"]
+
+# EOF
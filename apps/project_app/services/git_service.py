@@ -8,16 +8,66 @@ Git operations for SciTeX Cloud
 
 Provides helper functions for git operations on Django projects
 that are backed by Gitea repositories.
+
+Writes to a repository are serialized with a per-repository lock (a thread
+lock plus an flock on .git, so web workers and background jobs do not race
+on the index). Files are staged with a single ``git add`` for all
+pathspecs, and auto-commits that arrive within a short debounce window are
+coalesced into one commit and one push.
 """
 
+import atexit
+import fcntl
 import subprocess
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
+# Seconds of quiet before coalesced auto-commits are committed (0 = at once),
+# and the longest an auto-commit may wait while saves keep arriving
+AUTO_COMMIT_DEBOUNCE = getattr(settings, "SCITEX_GIT_AUTO_COMMIT_DEBOUNCE", 2.0)
+AUTO_COMMIT_MAX_DELAY = getattr(settings, "SCITEX_GIT_AUTO_COMMIT_MAX_DELAY", 10.0)
+
+_repo_locks: Dict[str, threading.Lock] = {}
+_repo_locks_guard = threading.Lock()
+
+
+@contextmanager
+def repository_lock(project_dir: Path):
+    """
+    Serialize writes to one repository across threads and processes.
+
+    Args:
+        project_dir: Path to project directory (must be a git repo)
+    """
+    project_dir = Path(project_dir).resolve()
+    with _repo_locks_guard:
+        thread_lock = _repo_locks.setdefault(str(project_dir), threading.Lock())
+    with thread_lock:
+        with open(project_dir / ".git" / "scitex-write.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _git(project_dir: Path, *args, input: str = None, timeout: int = None):
+    return subprocess.run(
+        ["git", *args],
+        cwd=project_dir,
+        input=input,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+
 
 def git_commit_and_push(
     project_dir: Path,
@@ -45,75 +95,64 @@ def git_commit_and_push(
         if not (project_dir / ".git").exists():
             return False, f"Not a git repository: {project_dir}"
 
-        # Add files
-        if files:
-            for file in files:
-                result = subprocess.run(
-                    ["git", "add", file],
-                    cwd=project_dir,
-                    capture_output=True,
-                    text=True,
-                )
-                if result.returncode != 0:
-                    return False, f"git add failed: {result.stderr}"
-        else:
-            # Add all changes
-            result = subprocess.run(
-                ["git", "add", "."], cwd=project_dir, capture_output=True, text=True
-            )
-            if result.returncode != 0:
-                return False, f"git add failed: {result.stderr}"
+        with repository_lock(project_dir):
+            return _commit_and_push(project_dir, message, files, branch, push)
 
-        # Check if there are changes to commit
-        status = subprocess.run(
-            ["git", "status", "--porcelain"],
-            cwd=project_dir,
-            capture_output=True,
-            text=True,
-        )
+    except subprocess.TimeoutExpired:
+        return False, "git push timeout"
+    except Exception as e:
+        logger.exception(f"Git operation failed for {project_dir}")
+        return False, str(e)
 
-        if not status.stdout.strip():
-            return True, "No changes to commit"
 
-        # Commit
-        result = subprocess.run(
-            ["git", "commit", "-m", message],
-            cwd=project_dir,
-            capture_output=True,
-            text=True,
+def _commit_and_push(
+    project_dir: Path,
+    message: str,
+    files: Optional[List[str]],
+    branch: str,
+    push: bool,
+) -> Tuple[bool, str]:
+    # Stage all pathspecs with one git add (NUL-separated on stdin)
+    if files:
+        result = _git(
+            project_dir,
+            "add",
+            "-A",
+            "--pathspec-from-file=-",
+            "--pathspec-file-nul",
+            input="\0".join(files),
         )
+    else:
+        # Add all changes
+        result = _git(project_dir, "add", "-A")
+    if result.returncode != 0:
+        return False, f"git add failed: {result.stderr}"
 
-        if result.returncode != 0:
-            return False, f"git commit failed: {result.stderr}"
+    # Check if there are staged changes to commit
+    if _git(project_dir, "diff", "--cached", "--quiet").returncode == 0:
+        return True, "No changes to commit"
 
-        commit_output = result.stdout
+    # Commit
+    result = _git(project_dir, "commit", "-m", message)
+    if result.returncode != 0:
+        return False, f"git commit failed: {result.stderr}"
 
-        # Push to remote
-        if push:
-            result = subprocess.run(
-                ["git", "push", "origin", branch],
-                cwd=project_dir,
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
+    commit_output = result.stdout
 
-            if result.returncode != 0:
-                # If push fails, commit is still local
-                return (
-                    False,
-                    f"git push failed: {result.stderr}\nCommit succeeded locally: {commit_output}",
-                )
+    # Push to remote
+    if push:
+        result = _git(project_dir, "push", "origin", branch, timeout=30)
 
-            return True, f"✓ Committed and pushed to {branch}\n{commit_output}"
+        if result.returncode != 0:
+            # If push fails, commit is still local
+            return (
+                False,
+                f"git push failed: {result.stderr}\nCommit succeeded locally: {commit_output}",
+            )
 
-        return True, f"✓ Committed locally\n{commit_output}"
+        return True, f"✓ Committed and pushed to {branch}\n{commit_output}"
 
-    except subprocess.TimeoutExpired:
-        return False, "git push timeout"
-    except Exception as e:
-        logger.exception(f"Git operation failed for {project_dir}")
-        return False, str(e)
+    return True, f"✓ Committed locally\n{commit_output}"
 
 
 def git_pull(project_dir: Path, branch: str = "develop") -> Tuple[bool, str]:
@@ -133,31 +172,8 @@ def git_pull(project_dir: Path, branch: str = "develop") -> Tuple[bool, str]:
         if not (project_dir / ".git").exists():
             return False, f"Not a git repository: {project_dir}"
 
-        # Fetch first
-        result = subprocess.run(
-            ["git", "fetch", "origin"],
-            cwd=project_dir,
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
-
-        if result.returncode != 0:
-            return False, f"git fetch failed: {result.stderr}"
-
-        # Pull
-        result = subprocess.run(
-            ["git", "pull", "origin", branch],
-            cwd=project_dir,
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
-
-        if result.returncode != 0:
-            return False, f"git pull failed: {result.stderr}"
-
-        return True, result.stdout
+        with repository_lock(project_dir):
+            return _fetch_and_pull(project_dir, branch)
 
     except subprocess.TimeoutExpired:
         return False, "git pull timeout"
@@ -166,6 +182,22 @@ def git_pull(project_dir: Path, branch: str = "develop") -> Tuple[bool, str]:
         return False, str(e)
 
 
+def _fetch_and_pull(project_dir: Path, branch: str) -> Tuple[bool, str]:
+    # Fetch first
+    result = _git(project_dir, "fetch", "origin", timeout=30)
+
+    if result.returncode != 0:
+        return False, f"git fetch failed: {result.stderr}"
+
+    # Pull
+    result = _git(project_dir, "pull", "origin", branch, timeout=30)
+
+    if result.returncode != 0:
+        return False, f"git pull failed: {result.stderr}"
+
+    return True, result.stdout
+
+
 def configure_git_credentials(project_dir: Path, username: str, token: str):
     """
     Configure git credentials for pushing to Gitea.
@@ -224,18 +256,125 @@ def configure_git_credentials(project_dir: Path, username: str, token: str):
         return False
 
 
+class _PendingCommit:
+    """Auto-commits of one repository waiting for their debounce window."""
+
+    def __init__(self, project_dir: Path, branch: str, push: bool):
+        self.project_dir = project_dir
+        self.branch = branch
+        self.push = push
+        self.paths: Dict[str, None] = {}
+        self.messages: List[str] = []
+        self.first_at = time.monotonic()
+        self.timer: Optional[threading.Timer] = None
+        self.done = threading.Event()
+        self.result: Tuple[bool, str] = (False, "Auto-commit not run")
+
+    @property
+    def message(self) -> str:
+        if len(self.messages) == 1:
+            return self.messages[0]
+        details = "\n".join(f"- {message}" for message in self.messages)
+        return f"Auto-save: {len(self.paths)} files\n\n{details}"
+
+
+class AutoCommitCoalescer:
+    """
+    Coalesce bursts of auto-commits into one commit and push per repository.
+
+    Each submission restarts the repository's debounce timer; once no file
+    was saved for ``debounce`` seconds (or ``max_delay`` after the first
+    save), all pending paths are committed with one git_commit_and_push.
+    """
+
+    def __init__(self, debounce: float, max_delay: float):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._pending: Dict[tuple, _PendingCommit] = {}
+
+    def submit(
+        self,
+        project_dir: Path,
+        paths: List[str],
+        message: str,
+        branch: str = "develop",
+        push: bool = True,
+    ) -> _PendingCommit:
+        """
+        Add paths to the repository's pending commit.
+
+        Returns:
+            The pending commit; wait on its ``done`` event for the result
+        """
+        project_dir = Path(project_dir).resolve()
+        key = (str(project_dir), branch, push)
+        with self._lock:
+            batch = self._pending.get(key)
+            if batch is None:
+                batch = self._pending[key] = _PendingCommit(project_dir, branch, push)
+            batch.paths.update(dict.fromkeys(paths))
+            if message not in batch.messages:
+                batch.messages.append(message)
+            if batch.timer is not None:
+                batch.timer.cancel()
+            remaining = batch.first_at + self.max_delay - time.monotonic()
+            batch.timer = threading.Timer(
+                max(0.0, min(self.debounce, remaining)), self._flush, args=(key, batch)
+            )
+            batch.timer.daemon = True
+            batch.timer.start()
+        return batch
+
+    def flush_all(self):
+        """Commit everything still pending (e.g. at shutdown)."""
+        with self._lock:
+            pending = list(self._pending.items())
+        for key, batch in pending:
+            batch.timer.cancel()
+            self._flush(key, batch)
+
+    def _flush(self, key: tuple, batch: _PendingCommit):
+        with self._lock:
+            if self._pending.get(key) is not batch:
+                return  # Already committed by another trigger
+            del self._pending[key]
+        try:
+            batch.result = git_commit_and_push(
+                project_dir=batch.project_dir,
+                message=batch.message,
+                files=list(batch.paths),
+                branch=batch.branch,
+                push=batch.push,
+            )
+            if not batch.result[0]:
+                logger.warning(
+                    f"Auto-commit failed for {batch.project_dir}: {batch.result[1]}"
+                )
+        finally:
+            batch.done.set()
+
+
+auto_commit_coalescer = AutoCommitCoalescer(AUTO_COMMIT_DEBOUNCE, AUTO_COMMIT_MAX_DELAY)
+atexit.register(auto_commit_coalescer.flush_all)
+
+
 def auto_commit_file(
-    project_dir: Path, filepath: str, message: str = None
+    project_dir: Path, filepath: str, message: str = None, wait: bool = False
 ) -> Tuple[bool, str]:
     """
     Automatically commit and push a single file.
 
-    Useful for Writer and Scholar modules when files are edited.
+    Useful for Writer and Scholar modules when files are edited. Saves
+    within AUTO_COMMIT_DEBOUNCE seconds of each other are committed and
+    pushed together.
 
     Args:
         project_dir: Path to project directory
         filepath: Relative path to file (e.g., 'paper/manuscript.tex')
         message: Commit message (auto-generated if None)
+        wait: Block until the coalesced commit ran and return its result
+            (otherwise return as soon as the file is queued)
 
     Returns:
         Tuple of (success: bool, output: str)
@@ -251,13 +390,23 @@ def auto_commit_file(
     if message is None:
         message = f"Auto-save: {filepath}"
 
-    return git_commit_and_push(
-        project_dir=project_dir,
-        message=message,
-        files=[filepath],
-        branch="develop",
-        push=True,
-    )
+    if AUTO_COMMIT_DEBOUNCE <= 0:
+        return git_commit_and_push(
+            project_dir=project_dir,
+            message=message,
+            files=[filepath],
+            branch="develop",
+            push=True,
+        )
+
+    if not (Path(project_dir) / ".git").exists():
+        return False, f"Not a git repository: {project_dir}"
+
+    batch = auto_commit_coalescer.submit(project_dir, [filepath], message)
+    if wait:
+        batch.done.wait()
+        return batch.result
+    return True, f"Queued for commit: {filepath}"
 
 
 def init_git_repo_with_gitea_remote(
@@ -116,16 +116,37 @@ def get_file_diff(project_dir: Path, filepath: str) -> List[LineDiff]:
     Returns:
         List of LineDiff objects indicating which lines changed
     """
+    diffs = get_files_diff(project_dir, [filepath])
+    if len(diffs) == 1:
+        # The path git reports may be spelled differently (e.g. "./x")
+        return next(iter(diffs.values()))
+    return diffs.get(filepath, [])
+
+
+def get_files_diff(project_dir: Path, filepaths: List[str]) -> Dict[str, List[LineDiff]]:
+    """
+    Get line-level diffs for several files with a single git diff.
+
+    Args:
+        project_dir: Path to project directory
+        filepaths: Relative paths to files
+
+    Returns:
+        Dict mapping each changed file path to its LineDiff objects
+    """
     try:
         project_dir = Path(project_dir)
 
-        if not (project_dir / ".git").exists():
-            return []
+        if not filepaths or not (project_dir / ".git").exists():
+            return {}
 
-        # Run git diff HEAD -- filepath
+        # Run git diff HEAD -- filepaths
         # Use --unified=0 to only get changed lines without context
         result = subprocess.run(
-            ["git", "diff", "HEAD", "--unified=0", "--", filepath],
+            [
+                "git", "-c", "core.quotePath=off",
+                "diff", "HEAD", "--unified=0", "--no-color", "--", *filepaths,
+            ],
             cwd=project_dir,
             capture_output=True,
             text=True,
@@ -134,16 +155,48 @@ def get_file_diff(project_dir: Path, filepath: str) -> List[LineDiff]:
 
         if result.returncode != 0:
             logger.error(f"git diff failed: {result.stderr}")
-            return []
+            return {}
 
-        return parse_diff_output(result.stdout)
+        return {
+            path: parse_diff_output(output)
+            for path, output in split_diff_by_file(result.stdout).items()
+        }
 
     except subprocess.TimeoutExpired:
         logger.error("git diff timeout")
-        return []
+        return {}
     except Exception as e:
-        logger.exception(f"Failed to get diff for {filepath}")
-        return []
+        logger.exception(f"Failed to get diff for {filepaths}")
+        return {}
+
+
+def split_diff_by_file(diff_output: str) -> Dict[str, str]:
+    """
+    Split multi-file git diff output into per-file diffs.
+
+    Args:
+        diff_output: Raw git diff output
+
+    Returns:
+        Dict mapping file path (new path, or old path if deleted) to its diff
+    """
+    files = {}
+    sections = re.split(r'^(?=diff --git )', diff_output, flags=re.MULTILINE)
+    for section in sections:
+        if not section.startswith('diff --git '):
+            continue
+        old_path = new_path = None
+        for line in section.split('\n'):
+            if line.startswith('--- a/'):
+                old_path = line[len('--- a/'):]
+            elif line.startswith('+++ b/'):
+                new_path = line[len('+++ b/'):]
+            elif line.startswith('@@'):
+                break
+        path = new_path or old_path
+        if path:
+            files[path] = section
+    return files
 
 
 def parse_diff_output(diff_output: str) -> List[LineDiff]:
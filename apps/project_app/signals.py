@@ -170,7 +170,6 @@ def _setup_project_venv(project, project_dir):
     - This avoids reinstalling heavy dependencies (PyTorch, etc.) in every project
     - Users can install project-specific packages in .venv/bin/pip
     """
-    import subprocess
     from pathlib import Path
 
     try:
@@ -183,18 +182,10 @@ def _setup_project_venv(project, project_dir):
 
         logger.info(f"Creating virtual environment for {project.slug}")
 
-        # Create venv with --system-site-packages to access shared scitex
-        result = subprocess.run(
-            ["python3", "-m", "venv", "--system-site-packages", str(venv_path)],
-            cwd=project_dir,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        # Clone the shared base venv instead of running venv + ensurepip
+        from apps.code_app.services.environment_store import get_environment_store
 
-        if result.returncode != 0:
-            logger.error(f"Failed to create venv: {result.stderr}")
-            return
+        get_environment_store().checkout([], venv_path, system_site_packages=True)
 
         # Create requirements.txt template
         requirements_file = Path(project_dir) / "requirements.txt"
@@ -206,8 +197,6 @@ def _setup_project_venv(project, project_dir):
 
         logger.info(f"✓ Virtual environment created for {project.slug} (with system packages)")
 
-    except subprocess.TimeoutExpired:
-        logger.error(f"Timeout creating venv for {project.slug}")
     except Exception as e:
         logger.error(f"Failed to setup venv for {project.slug}: {e}")
 
@@ -6,8 +6,8 @@ console.log(
 
 function filterByAuthor(author: string) {
   if (author) {
-    window.location.href = "?page=1&author=" + encodeURIComponent(author);
+    window.location.href = "?author=" + encodeURIComponent(author);
   } else {
-    window.location.href = "?page=1";
+    window.location.href = "?";
   }
 }
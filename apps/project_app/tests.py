@@ -1 +1,325 @@
-# Create your tests here.
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for the project app.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from apps.project_app.services import file_history, git_metadata, git_service
+from apps.project_app.services.file_history import (
+    get_history_page,
+    get_history_summary,
+    iter_file_history,
+)
+from apps.project_app.services.git_metadata import (
+    format_time_ago,
+    get_head_sha,
+    get_last_commits,
+)
+from apps.project_app.services.git_service import (
+    AutoCommitCoalescer,
+    git_commit_and_push,
+)
+from apps.project_app.services.git_status import get_file_diff, get_files_diff
+
+
+class GitRepoTestCase(SimpleTestCase):
+    """Base class providing a throwaway git repository"""
+
+    def setUp(self):
+        cache.clear()
+        self.repo = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.repo, ignore_errors=True)
+        self._git("init", "-q", "-b", "main")
+
+    def _git(self, *args):
+        env = {
+            **os.environ,
+            "GIT_AUTHOR_NAME": "Alice",
+            "GIT_AUTHOR_EMAIL": "alice@example.com",
+            "GIT_COMMITTER_NAME": "Alice",
+            "GIT_COMMITTER_EMAIL": "alice@example.com",
+        }
+        return subprocess.run(
+            ["git", *args],
+            cwd=self.repo,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+
+    def _commit(self, files, message, author="Alice"):
+        for name, content in files.items():
+            path = self.repo / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        self._git("add", "-A")
+        self._git("commit", "-q", "-m", message, f"--author={author} <{author}@x>")
+
+    def _silent_git(self, module):
+        """Make ``module``'s streamed git processes hang without output"""
+        popen = subprocess.Popen
+        return mock.patch.object(
+            module.subprocess,
+            "Popen",
+            side_effect=lambda command, **kwargs: popen(["sleep", "30"], **kwargs),
+        )
+
+
+class GitMetadataTests(GitRepoTestCase):
+    """Tests for batched last-commit lookups (services.git_metadata)"""
+
+    def setUp(self):
+        super().setUp()
+        self._commit({"README.md": "# Demo", "scripts/a.py": "a"}, "Initial commit")
+        self._commit({"scripts/sub/b.py": "b"}, "Add nested script")
+        self._commit({"data/raw.csv": "1,2"}, "Add data")
+
+    def test_head_sha_matches_git(self):
+        """Test HEAD is read from the ref files like rev-parse does"""
+        self.assertEqual(get_head_sha(self.repo), self._git("rev-parse", "HEAD"))
+        self._git("pack-refs", "--all")
+        self.assertEqual(get_head_sha(self.repo), self._git("rev-parse", "HEAD"))
+        self.assertIsNone(get_head_sha(self.repo / "scripts"))
+
+    def test_root_listing(self):
+        """Test each root entry gets the last commit that touched it"""
+        commits = get_last_commits(self.repo)
+        self.assertEqual(set(commits), {"README.md", "scripts", "data", ".git"})
+        self.assertEqual(commits["README.md"]["message"], "Initial commit")
+        self.assertEqual(commits["scripts"]["message"], "Add nested script")
+        self.assertEqual(commits["data"]["message"], "Add data")
+        self.assertEqual(commits["data"]["author"], "Alice")
+        self.assertEqual(
+            commits["data"]["hash"], self._git("rev-parse", "--short", "HEAD")
+        )
+        self.assertEqual(commits[".git"]["hash"], "")
+
+    def test_subdirectory_listing(self):
+        """Test entries of a subdirectory are matched by their full path"""
+        (self.repo / "scripts" / "untracked.py").write_text("")
+        commits = get_last_commits(self.repo, "scripts")
+        self.assertEqual(commits["a.py"]["message"], "Initial commit")
+        self.assertEqual(commits["sub"]["message"], "Add nested script")
+        self.assertEqual(commits["untracked.py"]["message"], "")
+
+    def test_one_git_process_per_listing(self):
+        """Test the git process count does not grow with the entry count"""
+        self._commit({f"many/f{i}.txt": str(i) for i in range(30)}, "Many files")
+        walk = mock.patch.object(
+            git_metadata, "_walk_history", wraps=git_metadata._walk_history
+        )
+        with walk as walk_history:
+            commits = get_last_commits(self.repo, "many")
+            self.assertEqual(len(commits), 30)
+            self.assertEqual(walk_history.call_count, 1)
+
+            # Served from the cache until HEAD moves
+            get_last_commits(self.repo, "many")
+            self.assertEqual(walk_history.call_count, 1)
+
+        self._commit({"many/f0.txt": "changed"}, "Change f0")
+        with mock.patch.object(
+            git_metadata.subprocess, "Popen", wraps=subprocess.Popen
+        ) as popen:
+            commits = get_last_commits(self.repo, "many")
+            self.assertEqual(popen.call_count, 1)
+        self.assertEqual(commits["f0.txt"]["message"], "Change f0")
+        self.assertEqual(commits["f1.txt"]["message"], "Many files")
+
+    def test_silent_walk_times_out_and_is_not_cached(self):
+        """Test a hung git is killed and its partial result not cached"""
+        started = time.monotonic()
+        with mock.patch.object(git_metadata, "GIT_TIMEOUT", 0.2):
+            with self._silent_git(git_metadata):
+                commits = get_last_commits(self.repo)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(commits["data"]["message"], "")
+
+        # The next listing walks again instead of serving the empty columns
+        self.assertEqual(get_last_commits(self.repo)["data"]["message"], "Add data")
+
+    def test_not_a_repository(self):
+        """Test directories without git history get empty metadata"""
+        plain = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, plain, ignore_errors=True)
+        (plain / "file.txt").write_text("")
+        self.assertEqual(
+            get_last_commits(plain),
+            {"file.txt": {"author": "", "time_ago": "", "message": "", "hash": ""}},
+        )
+
+    def test_format_time_ago(self):
+        """Test relative ages follow git's %ar wording"""
+        now = 1_700_000_000
+        self.assertEqual(format_time_ago(now - 5, now), "5 seconds ago")
+        self.assertEqual(format_time_ago(now - 3600, now), "60 minutes ago")
+        self.assertEqual(format_time_ago(now - 3 * 86400, now), "3 days ago")
+        self.assertEqual(format_time_ago(now - 21 * 86400, now), "3 weeks ago")
+        self.assertEqual(format_time_ago(now - 2 * 365 * 86400, now), "2 years ago")
+
+
+class FileHistoryTests(GitRepoTestCase):
+    """Tests for streamed, cursor-paginated file history (services.file_history)"""
+
+    def setUp(self):
+        super().setUp()
+        self._commit({"notes.txt": "1\n"}, "Create notes", author="Alice")
+        self._commit({"notes.txt": "1\n2\n3\n"}, "Grow notes", author="Bob")
+        self._git("mv", "notes.txt", "docs.txt")
+        self._commit({}, "Rename notes")
+        for i in range(4):
+            self._commit({"docs.txt": f"{i}\n"}, f"Edit {i}", author="Alice")
+
+    def test_stats_and_renames_in_one_walk(self):
+        """Test numstat is parsed per commit and renames are followed"""
+        commits = list(iter_file_history(self.repo, "docs.txt"))
+        self.assertEqual(len(commits), 7)
+        self.assertEqual(commits[-1]["subject"], "Create notes")
+        self.assertEqual(commits[-1]["path"], "notes.txt")
+        self.assertEqual(commits[0]["path"], "docs.txt")
+        grow = commits[-2]
+        self.assertEqual((grow["additions"], grow["deletions"]), (2, 0))
+        self.assertEqual(grow["author_name"], "Bob")
+
+    def test_cursor_pages_cover_history_once(self):
+        """Test following cursors walks the full history without overlap"""
+        seen = []
+        cursor = None
+        with mock.patch.object(
+            file_history.subprocess, "Popen", wraps=subprocess.Popen
+        ) as popen:
+            while True:
+                page = get_history_page(self.repo, "docs.txt", cursor=cursor, limit=3)
+                seen += [commit["subject"] for commit in page.commits]
+                if not page.has_next:
+                    break
+                cursor = page.next_cursor
+            self.assertEqual(popen.call_count, 3)
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+        self.assertEqual(seen[-1], "Create notes")
+
+    def test_pages_cached_per_head(self):
+        """Test a page is served from cache until HEAD moves"""
+        first = get_history_page(self.repo, "docs.txt", limit=2)
+        with mock.patch.object(file_history, "iter_file_history") as walk:
+            self.assertEqual(
+                get_history_page(self.repo, "docs.txt", limit=2).commits,
+                first.commits,
+            )
+            walk.assert_not_called()
+
+        self._commit({"docs.txt": "new\n"}, "Newest edit")
+        page = get_history_page(self.repo, "docs.txt", limit=2)
+        self.assertEqual(page.commits[0]["subject"], "Newest edit")
+
+    def test_author_filter_and_summary(self):
+        """Test the author filter applies to pages and the summary"""
+        page = get_history_page(self.repo, "docs.txt", author="Bob")
+        self.assertEqual([c["subject"] for c in page.commits], ["Grow notes"])
+        self.assertFalse(page.has_next)
+        summary = get_history_summary(self.repo, "docs.txt")
+        self.assertEqual(summary["total_commits"], 7)
+        self.assertEqual(summary["authors"], ["Alice", "Bob"])
+
+    def test_invalid_cursor_starts_from_newest(self):
+        """Test a malformed cursor is ignored"""
+        page = get_history_page(self.repo, "docs.txt", cursor="nope", limit=1)
+        self.assertEqual(page.commits[0]["subject"], "Edit 3")
+
+    def test_hung_history_walk_times_out(self):
+        """Test a git log that stops producing output is killed"""
+        started = time.monotonic()
+        with mock.patch.object(file_history, "GIT_TIMEOUT", 0.2):
+            with self._silent_git(file_history):
+                with self.assertRaises(subprocess.TimeoutExpired):
+                    get_history_page(self.repo, "docs.txt")
+        self.assertLess(time.monotonic() - started, 5)
+        # Nothing was cached for the page
+        self.assertEqual(len(get_history_page(self.repo, "docs.txt").commits), 7)
+
+
+class GitServiceTests(GitRepoTestCase):
+    """Tests for batched, serialized and coalesced commits (services.git_service)"""
+
+    def setUp(self):
+        super().setUp()
+        self._git("config", "user.name", "Alice")
+        self._git("config", "user.email", "alice@example.com")
+        self._commit({"a.txt": "a\n", "b.txt": "b\n"}, "Initial commit")
+
+    def _write(self, files):
+        for name, content in files.items():
+            (self.repo / name).write_text(content)
+
+    def _git_calls(self, run):
+        return [call.args[0][1] for call in run.call_args_list]
+
+    def test_all_paths_staged_with_one_add(self):
+        """Test several files are staged and committed in one git add"""
+        self._write({"a.txt": "a2\n", "b.txt": "b2\n", "c.txt": "c\n"})
+        with mock.patch.object(
+            git_service.subprocess, "run", wraps=subprocess.run
+        ) as run:
+            success, _ = git_commit_and_push(
+                self.repo, "Edit files", files=["a.txt", "b.txt", "c.txt"], push=False
+            )
+
+        self.assertTrue(success)
+        self.assertEqual(self._git_calls(run), ["add", "diff", "commit"])
+        self.assertEqual(
+            self._git("show", "--name-only", "--format=").splitlines(),
+            ["a.txt", "b.txt", "c.txt"],
+        )
+
+    def test_unchanged_files_not_committed(self):
+        """Test nothing is committed when the given files are unchanged"""
+        self._write({"b.txt": "b2\n"})
+        success, output = git_commit_and_push(
+            self.repo, "Nothing", files=["a.txt"], push=False
+        )
+        self.assertTrue(success)
+        self.assertEqual(output, "No changes to commit")
+        self.assertEqual(self._git("rev-list", "--count", "HEAD"), "1")
+
+    def test_auto_commit_burst_coalesced(self):
+        """Test saves within the debounce window become one commit"""
+        coalescer = AutoCommitCoalescer(debounce=0.05, max_delay=5)
+        self._write({"a.txt": "a2\n", "b.txt": "b2\n"})
+        first = coalescer.submit(self.repo, ["a.txt"], "Save a", push=False)
+        second = coalescer.submit(self.repo, ["b.txt"], "Save b", push=False)
+
+        self.assertIs(first, second)
+        self.assertTrue(second.done.wait(5))
+        self.assertTrue(second.result[0])
+        self.assertEqual(self._git("rev-list", "--count", "HEAD"), "2")
+        self.assertEqual(
+            self._git("log", "-1", "--format=%B").splitlines(),
+            ["Auto-save: 2 files", "", "- Save a", "- Save b"],
+        )
+
+    def test_diffs_of_several_files_in_one_process(self):
+        """Test get_files_diff splits one git diff per file"""
+        self._write({"a.txt": "a2\n", "b.txt": "b\nmore\n"})
+        with mock.patch(
+            "apps.project_app.services.git_status.subprocess.run",
+            wraps=subprocess.run,
+        ) as run:
+            diffs = get_files_diff(self.repo, ["a.txt", "b.txt"])
+
+        self.assertEqual(run.call_count, 1)
+        self.assertEqual([d.status for d in diffs["a.txt"]], ["modified"])
+        self.assertEqual([(d.line_number, d.status) for d in diffs["b.txt"]], [(2, "added")])
+        self.assertEqual(get_file_diff(self.repo, "./b.txt"), diffs["b.txt"])
@@ -25,10 +25,15 @@ from datetime import datetime
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import HttpResponse
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.contrib.auth.models import User
 
 from ..models import Project
+from ..services.file_history import (
+    HistoryPage,
+    get_history_page,
+    get_history_summary,
+)
+from ..services.git_metadata import get_last_commits
 from ..services.syntax_highlighting import detect_language
 
 logger = logging.getLogger(__name__)
@@ -724,44 +729,15 @@ def project_directory(request, username, slug, directory, subpath=None):
     # Get directory contents
     contents = []
     try:
-        # Helper function to get git commit info for a file/folder
-        def get_git_info(path):
-            """Get last commit message, author, hash, and time for a file/folder"""
-            try:
-                # Get last commit for this file (including hash)
-                result = subprocess.run(
-                    [
-                        "git",
-                        "log",
-                        "-1",
-                        "--format=%an|%ar|%s|%h",
-                        "--",
-                        str(path.name),
-                    ],
-                    cwd=project_path,
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                )
-
-                if result.returncode == 0 and result.stdout.strip():
-                    author, time_ago, message, commit_hash = (
-                        result.stdout.strip().split("|", 3)
-                    )
-                    return {
-                        "author": author,
-                        "time_ago": time_ago,
-                        "message": message[:80],  # Truncate to 80 chars
-                        "hash": commit_hash,
-                    }
-            except Exception as e:
-                logger.debug(f"Error getting git info for {path}: {e}")
-
-            return {"author": "", "time_ago": "", "message": "", "hash": ""}
+        # Last commit per entry, resolved with one git walk per listing
+        last_commits = get_last_commits(
+            project_path,
+            directory_path.relative_to(project_path.resolve()).as_posix(),
+        )
 
         for item in directory_path.iterdir():
             # Show all files and directories including dotfiles
-            git_info = get_git_info(item)
+            git_info = last_commits.get(item.name, {})
 
             if item.is_file():
                 contents.append(
@@ -889,100 +865,16 @@ def file_history_view(request, username, slug, branch, file_path):
 
     # Get filter parameters
     author_filter = request.GET.get("author", "").strip()
-    page_number = request.GET.get("page", 1)
-
-    try:
-        page_number = int(page_number)
-    except (ValueError, TypeError):
-        page_number = 1
+    cursor = request.GET.get("after", "").strip() or None
 
-    # Get file history using git log --follow
-    commits = []
+    # One streaming git process per page; later pages resume at the cursor
+    page = HistoryPage()
+    summary = {"total_commits": 0, "authors": []}
     try:
-        # Build git log command
-        # Format: hash|author_name|author_email|timestamp|relative_time|subject
-        git_cmd = [
-            "git",
-            "log",
-            "--follow",
-            "--format=%H|%an|%ae|%at|%ar|%s",
-            "--",
-            file_path,
-        ]
-
-        # Add author filter if specified
-        if author_filter:
-            git_cmd.insert(3, f"--author={author_filter}")
-
-        result = subprocess.run(
-            git_cmd, cwd=project_path, capture_output=True, text=True, timeout=30
+        page = get_history_page(
+            project_path, file_path, cursor=cursor, author=author_filter
         )
-
-        if result.returncode == 0 and result.stdout.strip():
-            for line in result.stdout.strip().split("\n"):
-                if not line:
-                    continue
-
-                parts = line.split("|", 5)
-                if len(parts) < 6:
-                    continue
-
-                (
-                    commit_hash,
-                    author_name,
-                    author_email,
-                    timestamp,
-                    relative_time,
-                    subject,
-                ) = parts
-
-                # Get file-specific stats for this commit
-                stats_result = subprocess.run(
-                    [
-                        "git",
-                        "show",
-                        "--numstat",
-                        "--format=",
-                        commit_hash,
-                        "--",
-                        file_path,
-                    ],
-                    cwd=project_path,
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                )
-
-                additions = 0
-                deletions = 0
-                if stats_result.returncode == 0 and stats_result.stdout.strip():
-                    stat_line = stats_result.stdout.strip().split("\n")[0]
-                    stat_parts = stat_line.split("\t")
-                    if len(stat_parts) >= 2:
-                        try:
-                            additions = (
-                                int(stat_parts[0]) if stat_parts[0] != "-" else 0
-                            )
-                            deletions = (
-                                int(stat_parts[1]) if stat_parts[1] != "-" else 0
-                            )
-                        except ValueError:
-                            pass
-
-                commits.append(
-                    {
-                        "hash": commit_hash,
-                        "short_hash": commit_hash[:7],
-                        "author_name": author_name,
-                        "author_email": author_email,
-                        "timestamp": int(timestamp),
-                        "relative_time": relative_time,
-                        "subject": subject,
-                        "additions": additions,
-                        "deletions": deletions,
-                    }
-                )
-
+        summary = get_history_summary(project_path, file_path, author=author_filter)
     except subprocess.TimeoutExpired:
         logger.error(f"Git log timeout for {file_path} in {project.slug}")
         messages.error(request, "Timeout while fetching file history.")
@@ -990,23 +882,18 @@ def file_history_view(request, username, slug, branch, file_path):
         logger.error(f"Error getting file history for {file_path}: {e}")
         messages.error(request, f"Error fetching file history: {str(e)}")
 
-    # Pagination
-    paginator = Paginator(commits, 30)
-    commits_page = paginator.get_page(page_number)
-
-    # Get unique authors for filter dropdown
-    unique_authors = sorted(set(c["author_name"] for c in commits))
-
     context = {
         "project": project,
         "file_path": file_path,
         "file_name": Path(file_path).name,
         "branch": branch,
         "breadcrumbs": breadcrumbs,
-        "commits": commits_page,
-        "unique_authors": unique_authors,
+        "commits": page.commits,
+        "cursor": cursor,
+        "next_cursor": page.next_cursor,
+        "unique_authors": summary["authors"],
         "author_filter": author_filter,
-        "total_commits": len(commits),
+        "total_commits": summary["total_commits"],
     }
 
     return render(request, "project_app/repository/file_history.html", context)
@@ -30,6 +30,7 @@ from django.utils.safestring import mark_safe
 # Local imports
 from ..models import Project
 from ..decorators import project_access_required
+from ..services.git_metadata import get_last_commits
 
 logger = logging.getLogger(__name__)
 
@@ -220,46 +221,12 @@ def project_detail(request, username, slug):
 
     if project_path and project_path.exists():
         try:
-            # Helper function to get git commit info for a file/folder
-            def get_git_info(path):
-                """Get last commit message, author, hash, and time for a file/folder"""
-                try:
-                    import subprocess
-
-                    # Get last commit for this file (including hash)
-                    result = subprocess.run(
-                        [
-                            "git",
-                            "log",
-                            "-1",
-                            "--format=%an|%ar|%s|%h",
-                            "--",
-                            str(path.name),
-                        ],
-                        cwd=project_path,
-                        capture_output=True,
-                        text=True,
-                        timeout=5,
-                    )
-
-                    if result.returncode == 0 and result.stdout.strip():
-                        author, time_ago, message, commit_hash = (
-                            result.stdout.strip().split("|", 3)
-                        )
-                        return {
-                            "author": author,
-                            "time_ago": time_ago,
-                            "message": message[:80],  # Truncate to 80 chars
-                            "hash": commit_hash,
-                        }
-                except Exception as e:
-                    logger.debug(f"Error getting git info for {path}: {e}")
-
-                return {"author": "", "time_ago": "", "message": "", "hash": ""}
+            # Last commit per entry, resolved with one git walk per listing
+            last_commits = get_last_commits(project_path)
 
             for item in project_path.iterdir():
                 # Show all files including dotfiles
-                git_info = get_git_info(item)
+                git_info = last_commits.get(item.name, {})
 
                 if item.is_file():
                     files.append(
@@ -12,13 +12,13 @@ Handles directory browsing functionality for projects.
 from __future__ import annotations
 
 import logging
-import subprocess
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.models import User
 
 from apps.project_app.models import Project
+from apps.project_app.services.git_metadata import get_last_commits
 
 logger = logging.getLogger(__name__)
 
@@ -221,44 +221,15 @@ def project_directory(request, username, slug, directory, subpath=None):
     # Get directory contents
     contents = []
     try:
-        # Helper function to get git commit info for a file/folder
-        def get_git_info(path):
-            """Get last commit message, author, hash, and time for a file/folder"""
-            try:
-                # Get last commit for this file (including hash)
-                result = subprocess.run(
-                    [
-                        "git",
-                        "log",
-                        "-1",
-                        "--format=%an|%ar|%s|%h",
-                        "--",
-                        str(path.name),
-                    ],
-                    cwd=project_path,
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                )
-
-                if result.returncode == 0 and result.stdout.strip():
-                    author, time_ago, message, commit_hash = (
-                        result.stdout.strip().split("|", 3)
-                    )
-                    return {
-                        "author": author,
-                        "time_ago": time_ago,
-                        "message": message[:80],  # Truncate to 80 chars
-                        "hash": commit_hash,
-                    }
-            except Exception as e:
-                logger.debug(f"Error getting git info for {path}: {e}")
-
-            return {"author": "", "time_ago": "", "message": "", "hash": ""}
+        # Last commit per entry, resolved with one git walk per listing
+        last_commits = get_last_commits(
+            project_path,
+            directory_path.relative_to(project_path.resolve()).as_posix(),
+        )
 
         for item in directory_path.iterdir():
             # Show all files and directories including dotfiles
-            git_info = get_git_info(item)
+            git_info = last_commits.get(item.name, {})
 
             if item.is_file():
                 contents.append(
@@ -18,9 +18,13 @@ from pathlib import Path
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.models import User
-from django.core.paginator import Paginator
 
 from apps.project_app.models import Project
+from apps.project_app.services.file_history import (
+    HistoryPage,
+    get_history_page,
+    get_history_summary,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -83,100 +87,16 @@ def file_history_view(request, username, slug, branch, file_path):
 
     # Get filter parameters
     author_filter = request.GET.get("author", "").strip()
-    page_number = request.GET.get("page", 1)
+    cursor = request.GET.get("after", "").strip() or None
 
+    # One streaming git process per page; later pages resume at the cursor
+    page = HistoryPage()
+    summary = {"total_commits": 0, "authors": []}
     try:
-        page_number = int(page_number)
-    except (ValueError, TypeError):
-        page_number = 1
-
-    # Get file history using git log --follow
-    commits = []
-    try:
-        # Build git log command
-        # Format: hash|author_name|author_email|timestamp|relative_time|subject
-        git_cmd = [
-            "git",
-            "log",
-            "--follow",
-            "--format=%H|%an|%ae|%at|%ar|%s",
-            "--",
-            file_path,
-        ]
-
-        # Add author filter if specified
-        if author_filter:
-            git_cmd.insert(3, f"--author={author_filter}")
-
-        result = subprocess.run(
-            git_cmd, cwd=project_path, capture_output=True, text=True, timeout=30
+        page = get_history_page(
+            project_path, file_path, cursor=cursor, author=author_filter
         )
-
-        if result.returncode == 0 and result.stdout.strip():
-            for line in result.stdout.strip().split("\n"):
-                if not line:
-                    continue
-
-                parts = line.split("|", 5)
-                if len(parts) < 6:
-                    continue
-
-                (
-                    commit_hash,
-                    author_name,
-                    author_email,
-                    timestamp,
-                    relative_time,
-                    subject,
-                ) = parts
-
-                # Get file-specific stats for this commit
-                stats_result = subprocess.run(
-                    [
-                        "git",
-                        "show",
-                        "--numstat",
-                        "--format=",
-                        commit_hash,
-                        "--",
-                        file_path,
-                    ],
-                    cwd=project_path,
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                )
-
-                additions = 0
-                deletions = 0
-                if stats_result.returncode == 0 and stats_result.stdout.strip():
-                    stat_line = stats_result.stdout.strip().split("\n")[0]
-                    stat_parts = stat_line.split("\t")
-                    if len(stat_parts) >= 2:
-                        try:
-                            additions = (
-                                int(stat_parts[0]) if stat_parts[0] != "-" else 0
-                            )
-                            deletions = (
-                                int(stat_parts[1]) if stat_parts[1] != "-" else 0
-                            )
-                        except ValueError:
-                            pass
-
-                commits.append(
-                    {
-                        "hash": commit_hash,
-                        "short_hash": commit_hash[:7],
-                        "author_name": author_name,
-                        "author_email": author_email,
-                        "timestamp": int(timestamp),
-                        "relative_time": relative_time,
-                        "subject": subject,
-                        "additions": additions,
-                        "deletions": deletions,
-                    }
-                )
-
+        summary = get_history_summary(project_path, file_path, author=author_filter)
     except subprocess.TimeoutExpired:
         logger.error(f"Git log timeout for {file_path} in {project.slug}")
         messages.error(request, "Timeout while fetching file history.")
@@ -184,23 +104,18 @@ def file_history_view(request, username, slug, branch, file_path):
         logger.error(f"Error getting file history for {file_path}: {e}")
         messages.error(request, f"Error fetching file history: {str(e)}")
 
-    # Pagination
-    paginator = Paginator(commits, 30)
-    commits_page = paginator.get_page(page_number)
-
-    # Get unique authors for filter dropdown
-    unique_authors = sorted(set(c["author_name"] for c in commits))
-
     context = {
         "project": project,
         "file_path": file_path,
         "file_name": Path(file_path).name,
         "branch": branch,
         "breadcrumbs": breadcrumbs,
-        "commits": commits_page,
-        "unique_authors": unique_authors,
+        "commits": page.commits,
+        "cursor": cursor,
+        "next_cursor": page.next_cursor,
+        "unique_authors": summary["authors"],
         "author_filter": author_filter,
-        "total_commits": len(commits),
+        "total_commits": summary["total_commits"],
     }
 
     return render(request, "project_app/repository/file_history.html", context)
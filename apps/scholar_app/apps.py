@@ -5,3 +5,8 @@ class ScholarConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.scholar_app"
     verbose_name = "Scholar"
+
+    def ready(self):
+        """Initialize the app when Django starts."""
+        # Import signals to register them
+        import apps.scholar_app.signals  # noqa
@@ -0,0 +1,209 @@
+"""
+WebSocket consumers for SciTeX Scholar.
+
+Streams external search results to the browser engine by engine instead of
+waiting for the slowest engine of the parallel pipeline.
+"""
+
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+from scitex import logging
+
+from .integrations.scitex_search import get_engine_pipelines, submit_pipeline_coroutine
+from .services.search import (
+    IncrementalResultMerger,
+    schedule_bulk_store,
+    search_result_cache,
+    stream_engine_batches,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_STREAM_RESULTS = 200
+
+
+class ScholarSearchConsumer(AsyncWebsocketConsumer):
+    """
+    WebSocket consumer for streaming scholar search.
+
+    Client messages:
+    - {"type": "search", "query": ..., "sources": ..., "filters": {...},
+       "max_results": 30}
+    - {"type": "cancel"}
+
+    Server messages, per search:
+    - search_started: engines that will be queried
+    - results: one engine's new cards plus updates merged into earlier cards
+    - engine_error: one engine failed or timed out
+    - done: totals and per-engine timings
+    """
+
+    async def connect(self):
+        """Handle new WebSocket connection."""
+        self.search_task = None
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        """Handle WebSocket disconnect."""
+        await self.cancel_search()
+
+    async def receive(self, text_data):
+        """Handle incoming WebSocket messages."""
+        try:
+            data = json.loads(text_data)
+        except json.JSONDecodeError:
+            await self.send_json({"type": "error", "error": "Invalid JSON"})
+            return
+
+        message_type = data.get("type")
+        if message_type == "search":
+            query = (data.get("query") or "").strip()
+            if not query:
+                await self.send_json({"type": "error", "error": "Empty query"})
+                return
+            # A new search supersedes the one still streaming
+            await self.cancel_search()
+            self.search_task = asyncio.ensure_future(self.run_search(data, query))
+        elif message_type == "cancel":
+            await self.cancel_search()
+        else:
+            await self.send_json(
+                {"type": "error", "error": f"Unknown message type: {message_type}"}
+            )
+
+    async def cancel_search(self):
+        """Cancel the running search, if any (pending engines are cancelled)."""
+        task, self.search_task = self.search_task, None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def run_search(self, data, query):
+        """Run one search, reporting unexpected failures to the client."""
+        try:
+            await self.stream_search(data, query)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Streaming search failed: {e}")
+            await self.send_json(
+                {"type": "error", "search_id": data.get("search_id"), "error": str(e)}
+            )
+
+    async def stream_search(self, data, query):
+        """Stream one search: cached results, or each engine as it completes."""
+        search_id = data.get("search_id")
+        sources = data.get("sources") or ""
+        filters = data.get("filters") or {}
+        try:
+            max_results = min(int(data.get("max_results") or 30), MAX_STREAM_RESULTS)
+        except (TypeError, ValueError):
+            max_results = 30
+
+        started = time.perf_counter()
+        merger = IncrementalResultMerger()
+        cache_key = search_result_cache.make_key(
+            query, sources, filters, max_results=max_results
+        )
+
+        cached, state = await sync_to_async(search_result_cache.get)(cache_key)
+        if state == "fresh":
+            new_results, _ = merger.add("", cached)
+            await self.send_json(
+                {
+                    "type": "results",
+                    "search_id": search_id,
+                    "engine": "cache",
+                    "results": new_results,
+                    "merged": [],
+                    "total": len(merger),
+                }
+            )
+            await self.send_done(search_id, merger, [], {}, started, cached=True)
+            return
+
+        primary, fallback = await sync_to_async(get_engine_pipelines)()
+        await self.send_json(
+            {
+                "type": "search_started",
+                "search_id": search_id,
+                "engines": list(primary) + list(fallback),
+            }
+        )
+
+        engines_used, timings = [], {}
+        # Primary (local corpora) first; online engines only if it came up empty
+        for tier in (primary, fallback):
+            async for engine, results, error, elapsed in stream_engine_batches(
+                tier,
+                query,
+                filters=filters,
+                max_results=max_results,
+                run=lambda coro: asyncio.wrap_future(submit_pipeline_coroutine(coro)),
+            ):
+                timings[engine] = round(elapsed, 3)
+                if error:
+                    logger.warning(f"Streaming search: {engine} failed: {error}")
+                    await self.send_json(
+                        {
+                            "type": "engine_error",
+                            "search_id": search_id,
+                            "engine": engine,
+                            "error": error,
+                        }
+                    )
+                    continue
+
+                if results:
+                    engines_used.append(engine)
+                new_results, merged = merger.add(engine, results)
+                await self.send_json(
+                    {
+                        "type": "results",
+                        "search_id": search_id,
+                        "engine": engine,
+                        "elapsed": timings[engine],
+                        "results": new_results,
+                        "merged": merged,
+                        "total": len(merger),
+                    }
+                )
+            if len(merger):
+                break
+
+        await self.send_done(search_id, merger, engines_used, timings, started)
+
+        if engines_used:
+            results = merger.results()
+            await sync_to_async(search_result_cache.set)(
+                cache_key, results, engines_used
+            )
+            await database_sync_to_async(schedule_bulk_store)(results)
+
+    async def send_done(
+        self, search_id, merger, engines_used, timings, started, cached=False
+    ):
+        """Send the end-of-search summary."""
+        await self.send_json(
+            {
+                "type": "done",
+                "search_id": search_id,
+                "total": len(merger),
+                "engines_used": engines_used,
+                "timings": timings,
+                "search_time": round(time.perf_counter() - started, 3),
+                "cached": cached,
+            }
+        )
+
+    async def send_json(self, content):
+        """Send a JSON message to the client."""
+        await self.send(text_data=json.dumps(content, default=str))
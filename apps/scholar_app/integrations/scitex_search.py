@@ -14,6 +14,7 @@ metadata retrieval from multiple academic databases.
 
 import asyncio
 import logging
+import threading
 from typing import Dict
 from datetime import datetime
 
@@ -36,6 +37,7 @@ except ImportError as e:
     SCITEX_IMPORT_ERROR = str(e)
 
 from ..models import SearchIndex, SearchQuery
+from ..services.search.result_cache import search_result_cache
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +48,9 @@ logger = logging.getLogger(__name__)
 
 _single_pipeline = None
 _parallel_pipeline = None
+_engine_pipelines = None
+_pipeline_loop = None
+_pipeline_loop_lock = threading.Lock()
 
 
 def get_single_pipeline():
@@ -97,6 +102,76 @@ def get_parallel_pipeline():
     return _parallel_pipeline
 
 
+def get_engine_pipelines():
+    """
+    Get or create one single-engine pipeline per search engine.
+
+    Used for streaming, where each engine's results are sent as soon as that
+    engine answers. Returns (primary, fallback) dicts of engine name to
+    pipeline, mirroring the parallel pipeline's source tiers.
+    """
+    global _engine_pipelines
+
+    parallel = get_parallel_pipeline()
+    if parallel is None:
+        return {}, {}
+
+    if _engine_pipelines is None:
+        timeout = getattr(settings, "SCITEX_SCHOLAR_TIMEOUT_PER_ENGINE", 30)
+        primary_names = getattr(parallel, "primary_engines", parallel.engines)
+        tier_kwargs = {}
+        if hasattr(parallel, "source_tiers"):
+            tier_kwargs["source_tiers"] = parallel.source_tiers
+        primary, fallback = {}, {}
+        for name, engine in parallel.engines.items():
+            try:
+                pipeline = ScholarPipelineSearchParallel(
+                    max_workers=1,
+                    timeout_per_engine=timeout,
+                    use_cache=getattr(settings, "SCITEX_SCHOLAR_USE_CACHE", True),
+                    engines={name: engine},
+                    **tier_kwargs,
+                )
+            except Exception as e:
+                logger.error(f"Failed to initialize {name} pipeline: {e}")
+                continue
+            (primary if name in primary_names else fallback)[name] = pipeline
+        _engine_pipelines = (primary, fallback)
+        logger.info(
+            f"Initialized per-engine pipelines: {', '.join(primary)} "
+            f"(fallback: {', '.join(fallback)})"
+        )
+
+    return _engine_pipelines
+
+
+def submit_pipeline_coroutine(coro):
+    """
+    Schedule a pipeline coroutine on this process's long-lived event loop.
+
+    The shared pipelines are reused across requests, so their coroutines run
+    on one background loop instead of a new event loop per request. Returns
+    a concurrent.futures.Future.
+    """
+    global _pipeline_loop
+
+    with _pipeline_loop_lock:
+        if _pipeline_loop is None or _pipeline_loop.is_closed():
+            _pipeline_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_pipeline_loop.run_forever,
+                name="scitex-pipeline-loop",
+                daemon=True,
+            ).start()
+
+    return asyncio.run_coroutine_threadsafe(coro, _pipeline_loop)
+
+
+def run_pipeline_coroutine(coro, timeout=None):
+    """Run a pipeline coroutine on the shared loop and wait for its result."""
+    return submit_pipeline_coroutine(coro).result(timeout)
+
+
 # ============================================================================
 # Django-SciTeX Integration Functions
 # ============================================================================
@@ -419,21 +494,15 @@ def api_scitex_search(request):
             f"SciTeX search: query='{query[:50]}...', fields={search_fields}, filters={filters}"
         )
 
-        # Run async search in sync context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        try:
-            scitex_result = loop.run_until_complete(
-                pipeline.search_async(
-                    query=query,
-                    search_fields=search_fields,
-                    filters=filters,
-                    max_results=max_results,
-                )
+        # Run async search on the shared pipeline loop
+        scitex_result = run_pipeline_coroutine(
+            pipeline.search_async(
+                query=query,
+                search_fields=search_fields,
+                filters=filters,
+                max_results=max_results,
             )
-        finally:
-            loop.close()
+        )
 
         # Convert results to Django format
         django_results = []
@@ -563,17 +632,9 @@ def api_scitex_search_single(request):
         # Run async search
         # Note: ScholarPipelineSearchSingle does not accept search_fields parameter
         # It searches across all fields by default
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        try:
-            scitex_result = loop.run_until_complete(
-                pipeline.search_async(
-                    query=query, filters=filters, max_results=max_results
-                )
-            )
-        finally:
-            loop.close()
+        scitex_result = run_pipeline_coroutine(
+            pipeline.search_async(query=query, filters=filters, max_results=max_results)
+        )
 
         # Convert to Django format
         django_results = []
@@ -667,6 +728,7 @@ def api_scitex_capabilities(request):
             "available": True,
             "engines": capabilities,
             "statistics": pipeline.get_statistics(),
+            "search_cache": search_result_cache.stats(),
         }
     )
 
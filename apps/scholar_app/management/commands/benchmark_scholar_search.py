@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Django management command to benchmark local scholar search latency.
+
+Grows the SearchIndex with synthetic papers up to each requested size and
+times the first page of ranked full-text search (uncached) against the old
+``title__icontains`` scan for a fixed set of queries. Synthetic rows are
+tagged and removed afterwards unless --keep is given.
+
+Run against a disposable database - it writes up to max(--sizes) rows.
+
+Usage:
+    python manage.py benchmark_scholar_search
+    python manage.py benchmark_scholar_search --sizes 100000 1000000
+    python manage.py benchmark_scholar_search --sizes 10000 --repeat 20 --keep
+"""
+
+import random
+import statistics
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.scholar_app.models import SearchIndex
+from apps.scholar_app.services.search import (
+    paginate,
+    ranked_search_queryset,
+    supports_full_text,
+    update_search_vectors,
+)
+
+BENCHMARK_TAG = "scitex-search-benchmark"
+
+VOCABULARY = (
+    "neural network deep learning cortex hippocampus memory consolidation "
+    "sleep spindle oscillation synaptic plasticity dopamine reward epilepsy "
+    "seizure prediction electroencephalography transformer attention protein "
+    "folding genome sequencing single cell transcriptomics microbiome "
+    "climate model ocean circulation bayesian inference causal graph "
+    "reinforcement policy gradient graph convolution diffusion imaging "
+    "cardiac arrhythmia tumor immunotherapy vaccine antibody quantum "
+    "entanglement superconductivity catalysis polymer battery electrolyte"
+).split()
+
+QUERIES = [
+    "deep learning",
+    "memory consolidation sleep",
+    "seizure prediction",
+    "protein folding",
+    "bayesian causal inference",
+    "quantum superconductivity",
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark full-text scholar search latency at increasing index sizes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[100_000, 1_000_000],
+            help="Index sizes to benchmark (default: 100000 1000000)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=10,
+            help="Timed runs per query (default: 10)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows inserted per bulk_create (default: 5000)",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed for synthetic papers"
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep synthetic papers after the benchmark",
+        )
+
+    def handle(self, *args, **options):
+        if not supports_full_text():
+            self.stdout.write(
+                self.style.WARNING(
+                    "Database is not PostgreSQL - measuring the icontains fallback"
+                )
+            )
+
+        sizes = sorted(options["sizes"])
+        if sizes[0] < 1:
+            raise CommandError("--sizes must be positive")
+        rng = random.Random(options["seed"])
+
+        try:
+            for size in sizes:
+                self._grow_index(size, rng, options["batch_size"])
+                self.stdout.write(f"\n=== {size:,} papers ===")
+                self.stdout.write(
+                    f"{'query':<32} {'fulltext p50':>14} {'p95':>10} "
+                    f"{'icontains p50':>14} {'p95':>10}"
+                )
+                for query in QUERIES:
+                    ranked = self._time(
+                        lambda q=query: paginate(
+                            ranked_search_queryset(q).filter(status="active")
+                        ),
+                        options["repeat"],
+                    )
+                    scan = self._time(
+                        lambda q=query: list(
+                            SearchIndex.objects.filter(
+                                title__icontains=q, status="active"
+                            )[:10]
+                        ),
+                        options["repeat"],
+                    )
+                    self.stdout.write(
+                        f"{query:<32} {ranked[0]:>12.1f}ms {ranked[1]:>8.1f}ms "
+                        f"{scan[0]:>12.1f}ms {scan[1]:>8.1f}ms"
+                    )
+        finally:
+            if not options["keep"]:
+                deleted, _ = SearchIndex.objects.filter(
+                    keywords__contains=BENCHMARK_TAG
+                ).delete()
+                self.stdout.write(f"\nRemoved {deleted} synthetic rows")
+
+    def _time(self, func, repeat):
+        """Return (p50, p95) latency in milliseconds."""
+        samples = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return statistics.median(samples), p95
+
+    def _grow_index(self, size, rng, batch_size):
+        """Insert synthetic papers until the index holds ``size`` rows."""
+        missing = size - SearchIndex.objects.count()
+        if missing <= 0:
+            return
+
+        self.stdout.write(f"Inserting {missing:,} synthetic papers...")
+        while missing > 0:
+            papers = [
+                SearchIndex(
+                    title=" ".join(rng.choices(VOCABULARY, k=rng.randint(6, 14))),
+                    abstract=" ".join(rng.choices(VOCABULARY, k=rng.randint(80, 160))),
+                    keywords=", ".join(rng.sample(VOCABULARY, 4) + [BENCHMARK_TAG]),
+                    publication_date=date(rng.randint(1990, 2025), 1, 1),
+                    citation_count=rng.randint(0, 5000),
+                    relevance_score=rng.random(),
+                    source="internal",
+                )
+                for _ in range(min(batch_size, missing))
+            ]
+            with transaction.atomic():
+                created = SearchIndex.objects.bulk_create(papers)
+                update_search_vectors(paper.pk for paper in created)
+            missing -= len(created)
@@ -4,8 +4,9 @@
 Django management command to clean up stale BibTeX enrichment jobs.
 
 This should be run periodically (e.g., via cron or systemd timer) to:
-- Fail jobs stuck in processing for >10 minutes
-- Fail jobs stuck in pending for >5 minutes
+- Re-queue processing jobs whose worker stopped sending heartbeats
+  (failed after too many attempts)
+- Fail jobs that were never picked up from the queue (>24 hours)
 - Delete old completed/failed jobs (>30 days)
 - Prevent malicious resource exhaustion attacks
 
@@ -16,9 +17,12 @@ Usage:
 """
 
 from django.core.management.base import BaseCommand
+from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta
 from apps.scholar_app.models import BibTeXEnrichmentJob
+from apps.scholar_app.services.bibtex import recover_stale_jobs
+from apps.scholar_app.services.bibtex.queue import STALE_AFTER
 
 
 class Command(BaseCommand):
@@ -35,6 +39,12 @@ class Command(BaseCommand):
             action="store_true",
             help="Delete completed/failed jobs older than 30 days",
         )
+        parser.add_argument(
+            "--pending-hours",
+            type=int,
+            default=24,
+            help="Fail queued jobs not started within this many hours (default: 24)",
+        )
         parser.add_argument(
             "--retention-days",
             type=int,
@@ -46,68 +56,60 @@ class Command(BaseCommand):
         dry_run = options["dry_run"]
         delete_old = options["delete_old_jobs"]
         retention_days = options["retention_days"]
+        pending_hours = options["pending_hours"]
 
         if dry_run:
             self.stdout.write(
                 self.style.WARNING("DRY RUN MODE - No changes will be made")
             )
 
-        # 1. Find and fail stale processing jobs (>10 minutes)
+        # 1. Recover processing jobs whose worker died (stale heartbeat)
+        cutoff = timezone.now() - timedelta(seconds=STALE_AFTER)
         stale_processing = BibTeXEnrichmentJob.objects.filter(
-            status="processing", started_at__lt=timezone.now() - timedelta(minutes=10)
+            status="processing"
+        ).filter(
+            Q(heartbeat_at__lt=cutoff)
+            | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
         )
 
         processing_count = stale_processing.count()
         if processing_count > 0:
             self.stdout.write(
-                f"Found {processing_count} stale processing jobs (>10 minutes)"
+                f"Found {processing_count} processing jobs without a live worker"
             )
 
             if not dry_run:
-                for job in stale_processing:
-                    job.status = "failed"
-                    job.error_message = "Job timed out (automatic cleanup)"
-                    job.completed_at = timezone.now()
-                    job.processing_log += "\n\n✗ Automatically failed by cleanup task (processing >10 min)"
-                    job.save(
-                        update_fields=[
-                            "status",
-                            "error_message",
-                            "completed_at",
-                            "processing_log",
-                        ]
-                    )
-
+                requeued, failed = recover_stale_jobs()
                 self.stdout.write(
                     self.style.SUCCESS(
-                        f"✓ Failed {processing_count} stale processing jobs"
+                        f"✓ Re-queued {requeued} and failed {failed} stale processing jobs"
                     )
                 )
             else:
                 for job in stale_processing:
                     user = job.user.username if job.user else "anonymous"
-                    duration = (timezone.now() - job.started_at).total_seconds() / 60
                     self.stdout.write(
-                        f"  - Would fail: {job.original_filename} (user: {user}, running for {duration:.1f} min)"
+                        f"  - Would recover: {job.original_filename} (user: {user}, attempts: {job.attempts})"
                     )
 
-        # 2. Find and fail stale pending jobs (>5 minutes)
+        # 2. Find and fail jobs that were never picked up from the queue
         stale_pending = BibTeXEnrichmentJob.objects.filter(
-            status="pending", created_at__lt=timezone.now() - timedelta(minutes=5)
+            status="pending",
+            created_at__lt=timezone.now() - timedelta(hours=pending_hours),
         )
 
         pending_count = stale_pending.count()
         if pending_count > 0:
-            self.stdout.write(f"Found {pending_count} stale pending jobs (>5 minutes)")
+            self.stdout.write(
+                f"Found {pending_count} stale pending jobs (>{pending_hours} hours)"
+            )
 
             if not dry_run:
                 for job in stale_pending:
                     job.status = "failed"
                     job.error_message = "Job stuck in pending state (automatic cleanup)"
                     job.completed_at = timezone.now()
-                    job.processing_log += (
-                        "\n\n✗ Automatically failed by cleanup task (pending >5 min)"
-                    )
+                    job.processing_log += f"\n\n✗ Automatically failed by cleanup task (pending >{pending_hours} h)"
                     job.save(
                         update_fields=[
                             "status",
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Django management command to backfill SearchIndex full-text search vectors.
+
+Walks the SearchIndex table in primary-key order and recomputes
+``search_vector`` (title, abstract, keywords, author names) one batch per
+UPDATE, so it can be run against large indexes without long locks.
+
+Usage:
+    python manage.py rebuild_search_vectors
+    python manage.py rebuild_search_vectors --only-missing  # Skip indexed rows
+    python manage.py rebuild_search_vectors --batch-size 5000
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.scholar_app.models import SearchIndex
+from apps.scholar_app.services.search import (
+    supports_full_text,
+    update_search_vectors,
+)
+
+
+class Command(BaseCommand):
+    help = "Backfill full-text search vectors for SearchIndex rows in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Number of rows updated per statement (default: 2000)",
+        )
+        parser.add_argument(
+            "--only-missing",
+            action="store_true",
+            help="Only update rows whose search_vector is NULL",
+        )
+
+    def handle(self, *args, **options):
+        if not supports_full_text():
+            raise CommandError(
+                "Full-text search vectors require PostgreSQL; nothing to rebuild"
+            )
+
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive")
+
+        queryset = SearchIndex.objects.order_by("pk")
+        if options["only_missing"]:
+            queryset = queryset.filter(search_vector__isnull=True)
+
+        total = queryset.count()
+        self.stdout.write(f"Rebuilding search vectors for {total} papers...")
+
+        updated = 0
+        last_pk = None
+        started = time.perf_counter()
+        while True:
+            batch = queryset
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            ids = list(batch.values_list("pk", flat=True)[:batch_size])
+            if not ids:
+                break
+
+            with transaction.atomic():
+                updated += update_search_vectors(ids)
+            last_pk = ids[-1]
+
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"  {updated}/{total} rows ({updated / max(elapsed, 1e-6):.0f} rows/s)"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Rebuilt {updated} search vectors in "
+                f"{time.perf_counter() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Django management command to maintain precomputed paper similarity neighbors.
+
+By default only papers that have never been processed are added (their
+neighbor lists are computed and existing lists they now belong in are
+updated). Use --full after changing weights or for periodic re-scoring.
+
+This should be run periodically (e.g., via cron or systemd timer).
+
+Usage:
+    python manage.py refresh_paper_neighbors
+    python manage.py refresh_paper_neighbors --full
+    python manage.py refresh_paper_neighbors --top-k 30 --batch-size 256
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.scholar_app.services.search.similarity import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_TOP_K,
+    build_features,
+    rebuild_neighbors,
+    refresh_neighbors,
+)
+
+
+class Command(BaseCommand):
+    help = "Compute top-k similar papers for recommendations"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recompute neighbors for every active paper",
+        )
+        parser.add_argument(
+            "--top-k",
+            type=int,
+            default=DEFAULT_TOP_K,
+            help=f"Neighbors stored per paper (default: {DEFAULT_TOP_K})",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Papers scored per matrix block (default: {DEFAULT_BATCH_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        if options["top_k"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--top-k and --batch-size must be positive")
+
+        started = time.perf_counter()
+        features = build_features()
+        self.stdout.write(
+            f"Loaded {len(features)} papers in {time.perf_counter() - started:.1f}s "
+            f"({features.text.shape[1]} terms, {features.topics.shape[1]} topics, "
+            f"{features.authors.shape[1]} authors)"
+        )
+
+        kwargs = {
+            "top_k_neighbors": options["top_k"],
+            "batch_size": options["batch_size"],
+            "features": features,
+        }
+        if options["full"]:
+            count = rebuild_neighbors(**kwargs)
+        else:
+            count = refresh_neighbors(**kwargs)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Updated neighbors for {count} papers in "
+                f"{time.perf_counter() - started:.1f}s"
+            )
+        )
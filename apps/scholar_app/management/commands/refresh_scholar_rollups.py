@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Django management command to refresh trending/analytics rollups.
+
+Rebuilds the per-day aggregates of days marked dirty by paper saves and
+bulk ingestion (plus today), then the publication-year table and the
+corpus-wide analytics snapshot read by the trends dashboards.
+
+This should be run periodically (e.g., via cron or systemd timer); run
+with --full occasionally (e.g., nightly) to repair days edited outside the
+dirty-marker window.
+
+Usage:
+    python manage.py refresh_scholar_rollups
+    python manage.py refresh_scholar_rollups --full
+    python manage.py refresh_scholar_rollups --days 2025-01-01 2025-01-02
+"""
+
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.scholar_app.services.trending import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = "Refresh materialized trending and analytics aggregates"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rebuild every ingestion day instead of dirty days only",
+        )
+        parser.add_argument(
+            "--days",
+            nargs="+",
+            metavar="YYYY-MM-DD",
+            help="Rebuild these days only",
+        )
+
+    def handle(self, *args, **options):
+        days = None
+        if options["days"]:
+            try:
+                days = [date.fromisoformat(day) for day in options["days"]]
+            except ValueError as e:
+                raise CommandError(f"Invalid --days value: {e}") from e
+
+        started = time.perf_counter()
+        rebuilt = refresh_rollups(days=days, full=options["full"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Rebuilt rollups for {len(rebuilt)} days in "
+                f"{time.perf_counter() - started:.1f}s"
+            )
+        )
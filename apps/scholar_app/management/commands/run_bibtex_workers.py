@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Django management command to run BibTeX enrichment workers.
+
+Claims queued BibTeXEnrichmentJob rows and processes them until stopped.
+On start (and periodically) jobs left in processing by a dead worker are
+re-queued. Run this as a long-lived service (e.g., systemd) and set
+SCITEX_BIBTEX_INPROCESS_WORKERS = False so web processes only enqueue.
+
+Usage:
+    python manage.py run_bibtex_workers
+    python manage.py run_bibtex_workers --workers 4
+"""
+
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.scholar_app.services.bibtex import BibTeXWorkerPool
+
+
+class Command(BaseCommand):
+    help = "Run the BibTeX enrichment worker pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of jobs processed concurrently "
+            "(default: SCITEX_BIBTEX_MAX_CONCURRENT_JOBS)",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] is not None and options["workers"] < 1:
+            raise CommandError("--workers must be at least 1")
+
+        stopping = threading.Event()
+
+        def request_stop(signum, frame):
+            stopping.set()
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        pool = BibTeXWorkerPool(size=options["workers"])
+        pool.start()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ BibTeX worker pool {pool.worker_id} running {pool.size} workers"
+            )
+        )
+
+        stopping.wait()
+        self.stdout.write("Stopping; waiting for running jobs to finish...")
+        pool.stop()
+        self.stdout.write(self.style.SUCCESS("✓ BibTeX workers stopped"))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-16 18:55
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+GIN_INDEX_NAME = "scholar_app_searchindex_search_vector_gin"
+
+
+def create_gin_index(apps, schema_editor):
+    """Create the GIN index on PostgreSQL only (SQLite has no tsvector support)."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    SearchIndex = apps.get_model("scholar_app", "SearchIndex")
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {GIN_INDEX_NAME} "
+        f"ON {SearchIndex._meta.db_table} USING gin (search_vector)"
+    )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {GIN_INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("scholar_app", "0014_merge_20251025_0325"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="searchindex",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
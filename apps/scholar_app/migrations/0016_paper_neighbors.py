@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-16 19:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scholar_app", "0015_searchindex_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="searchindex",
+            name="neighbors_updated_at",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="PaperNeighbor",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("score", models.FloatField()),
+                ("reason", models.CharField(blank=True, max_length=255)),
+                ("computed_at", models.DateTimeField(auto_now=True)),
+                (
+                    "neighbor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="scholar_app.searchindex",
+                    ),
+                ),
+                (
+                    "source",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="neighbors",
+                        to="scholar_app.searchindex",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["source", "rank"],
+                "indexes": [
+                    models.Index(
+                        fields=["source", "rank"], name="scholar_app_source__08448a_idx"
+                    )
+                ],
+                "unique_together": {("source", "neighbor")},
+            },
+        ),
+    ]
@@ -0,0 +1,169 @@
+# Generated by Django 5.2.7 on 2026-10-16 19:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scholar_app", "0016_paper_neighbors"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalyticsSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("data", models.JSONField(default=dict)),
+                ("computed_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="AuthorDailyStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("paper_count", models.IntegerField(default=0)),
+                ("citation_count", models.IntegerField(default=0)),
+                ("citations_received", models.IntegerField(default=0)),
+                ("recent_titles", models.JSONField(blank=True, default=list)),
+            ],
+            options={
+                "ordering": ["-day", "-paper_count"],
+            },
+        ),
+        migrations.CreateModel(
+            name="JournalDailyStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("paper_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["-day", "-paper_count"],
+            },
+        ),
+        migrations.CreateModel(
+            name="KeywordDailyStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("keyword", models.CharField(max_length=200)),
+                ("paper_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["-day", "-paper_count"],
+            },
+        ),
+        migrations.CreateModel(
+            name="PaperDailyStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(unique=True)),
+                ("paper_count", models.IntegerField(default=0)),
+                ("with_keywords_count", models.IntegerField(default=0)),
+                ("open_access_count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["-day"],
+            },
+        ),
+        migrations.CreateModel(
+            name="PublicationYearStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.IntegerField(unique=True)),
+                ("paper_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["-year"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="searchindex",
+            index=models.Index(
+                fields=["created_at"], name="scholar_app_created_4f86af_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="authordailystat",
+            name="author",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="scholar_app.author",
+            ),
+        ),
+        migrations.AddField(
+            model_name="journaldailystat",
+            name="journal",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="scholar_app.journal",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="keyworddailystat",
+            unique_together={("day", "keyword")},
+        ),
+        migrations.AlterUniqueTogether(
+            name="authordailystat",
+            unique_together={("day", "author")},
+        ),
+        migrations.AlterUniqueTogether(
+            name="journaldailystat",
+            unique_together={("day", "journal")},
+        ),
+    ]
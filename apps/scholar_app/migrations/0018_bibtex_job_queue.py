@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-16 19:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scholar_app", "0017_trending_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bibtexenrichmentjob",
+            name="attempts",
+            field=models.IntegerField(default=0, help_text="Times the job was claimed"),
+        ),
+        migrations.AddField(
+            model_name="bibtexenrichmentjob",
+            name="heartbeat_at",
+            field=models.DateTimeField(
+                blank=True, help_text="Last liveness signal from the worker", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="bibtexenrichmentjob",
+            name="worker_id",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Worker running the job",
+                max_length=100,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bibtexenrichmentjob",
+            index=models.Index(
+                fields=["status", "created_at"], name="scholar_app_status_09b445_idx"
+            ),
+        ),
+    ]
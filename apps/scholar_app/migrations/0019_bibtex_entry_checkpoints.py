@@ -0,0 +1,94 @@
+# Generated by Django 5.2.7 on 2026-10-16 19:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("scholar_app", "0018_bibtex_job_queue"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EnrichedEntryCache",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        help_text="SHA-256 of identity", max_length=64, unique=True
+                    ),
+                ),
+                (
+                    "identity",
+                    models.CharField(help_text="doi:... or title:...", max_length=500),
+                ),
+                ("data", models.JSONField(default=dict)),
+                ("hits", models.IntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="BibTeXEntryResult",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "index",
+                    models.IntegerField(
+                        help_text="Position of the entry in the input file"
+                    ),
+                ),
+                ("success", models.BooleanField(default=False)),
+                (
+                    "from_cache",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Taken from the shared enriched-entry cache",
+                    ),
+                ),
+                ("error", models.TextField(blank=True)),
+                (
+                    "data",
+                    models.JSONField(
+                        default=dict, help_text="Enriched (or original) paper"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="entries",
+                        to="scholar_app.bibtexenrichmentjob",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["job", "index"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("job", "index"), name="unique_bibtex_entry_per_job"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-16 21:10
+
+from django.db import migrations
+
+
+def purge_enriched_entry_cache(apps, schema_editor):
+    """Rows written so far hold whole user entries (local paths, own fields)."""
+    EnrichedEntryCache = apps.get_model("scholar_app", "EnrichedEntryCache")
+    EnrichedEntryCache.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("scholar_app", "0019_bibtex_entry_checkpoints"),
+    ]
+
+    operations = [
+        migrations.RunPython(purge_enriched_entry_cache, migrations.RunPython.noop),
+    ]
@@ -9,6 +9,7 @@ Organized by domain for maintainability:
     - library: User library and collections
     - collaboration: Annotations and groups
     - bibtex: BibTeX enrichment
+    - trending: Materialized trending/analytics aggregates
 """
 
 # Core models
@@ -27,6 +28,7 @@ from .search import (
     SearchResult,
     SearchFilter,
     SavedSearch,
+    PaperNeighbor,
 )
 
 # Library models
@@ -51,6 +53,8 @@ from .annotation import (
 # BibTeX models
 from .bibtex import (
     BibTeXEnrichmentJob,
+    BibTeXEntryResult,
+    EnrichedEntryCache,
 )
 
 # Repository models
@@ -63,6 +67,16 @@ from .repository import (
     RepositorySync,
 )
 
+# Trending models (materialized dashboard aggregates)
+from .trending import (
+    PaperDailyStat,
+    KeywordDailyStat,
+    AuthorDailyStat,
+    JournalDailyStat,
+    PublicationYearStat,
+    AnalyticsSnapshot,
+)
+
 # Export all models
 __all__ = [
     # Core
@@ -77,6 +91,7 @@ __all__ = [
     "SearchResult",
     "SearchFilter",
     "SavedSearch",
+    "PaperNeighbor",
     # Library
     "Collection",
     "UserLibrary",
@@ -92,6 +107,8 @@ __all__ = [
     "GroupMembership",
     # BibTeX
     "BibTeXEnrichmentJob",
+    "BibTeXEntryResult",
+    "EnrichedEntryCache",
     # Repository
     "Repository",
     "RepositoryConnection",
@@ -99,6 +116,13 @@ __all__ = [
     "DatasetFile",
     "DatasetVersion",
     "RepositorySync",
+    # Trending
+    "PaperDailyStat",
+    "KeywordDailyStat",
+    "AuthorDailyStat",
+    "JournalDailyStat",
+    "PublicationYearStat",
+    "AnalyticsSnapshot",
 ]
 
 # EOF
@@ -1,5 +1,5 @@
 """BibTeX module - BibTeX import and enrichment models"""
 
-from .models import BibTeXEnrichmentJob
+from .models import BibTeXEnrichmentJob, BibTeXEntryResult, EnrichedEntryCache
 
-__all__ = ["BibTeXEnrichmentJob"]
+__all__ = ["BibTeXEnrichmentJob", "BibTeXEntryResult", "EnrichedEntryCache"]
@@ -90,6 +90,15 @@ class BibTeXEnrichmentJob(models.Model):
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
+    # Queue bookkeeping (see services/bibtex/queue.py)
+    worker_id = models.CharField(
+        max_length=100, blank=True, default="", help_text="Worker running the job"
+    )
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True, help_text="Last liveness signal from the worker"
+    )
+    attempts = models.IntegerField(default=0, help_text="Times the job was claimed")
+
     # Error handling
     error_message = models.TextField(blank=True)
 
@@ -111,6 +120,7 @@ class BibTeXEnrichmentJob(models.Model):
             models.Index(fields=["user", "-created_at"]),
             models.Index(fields=["session_key", "-created_at"]),
             models.Index(fields=["status"]),
+            models.Index(fields=["status", "created_at"]),
         ]
 
     def __str__(self):
@@ -147,4 +157,56 @@ class BibTeXEnrichmentJob(models.Model):
             return f"{duration / 3600:.1f} hours"
 
 
+class BibTeXEntryResult(models.Model):
+    """Checkpoint of one enriched entry of a BibTeX job.
+
+    Written as entries finish, so an interrupted or timed-out job resumes
+    with only the entries that have no row yet.
+    """
+
+    job = models.ForeignKey(
+        BibTeXEnrichmentJob, on_delete=models.CASCADE, related_name="entries"
+    )
+    index = models.IntegerField(help_text="Position of the entry in the input file")
+    success = models.BooleanField(default=False)
+    from_cache = models.BooleanField(
+        default=False, help_text="Taken from the shared enriched-entry cache"
+    )
+    error = models.TextField(blank=True)
+    data = models.JSONField(default=dict, help_text="Enriched (or original) paper")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["job", "index"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["job", "index"], name="unique_bibtex_entry_per_job"
+            )
+        ]
+
+    def __str__(self):
+        return f"Entry {self.index} of job {self.job_id}"
+
+
+class EnrichedEntryCache(models.Model):
+    """Deployment-wide cache of enriched entries.
+
+    Content-addressed by DOI or, without one, by normalized title, year and
+    first author, so a reference enriched for one user is reused for
+    everyone. ``data`` holds only the metadata fields enrichment found
+    (see services.bibtex.enrichment.enrichment_fields), never a user's own
+    entry.
+    """
+
+    key = models.CharField(max_length=64, unique=True, help_text="SHA-256 of identity")
+    identity = models.CharField(max_length=500, help_text="doi:... or title:...")
+    data = models.JSONField(default=dict)
+    hits = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.identity
+
+
 # EOF
@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 import uuid
 
@@ -168,7 +169,9 @@ class SearchIndex(models.Model):
     bibtex_content = models.TextField(blank=True, help_text="BibTeX citation content")
 
     # Search optimization
-    # search_vector = SearchVectorField(null=True)  # PostgreSQL full-text search - commented for compatibility
+    # PostgreSQL full-text search vector over title, abstract, keywords and author
+    # names. Maintained by services.search.fulltext; stays NULL on SQLite.
+    search_vector = SearchVectorField(null=True, editable=False)
     keywords = models.TextField(
         blank=True
     )  # Store as comma-separated values for SQLite compatibility
@@ -196,6 +199,9 @@ class SearchIndex(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     indexed_at = models.DateTimeField(null=True, blank=True)
+    # When this paper's PaperNeighbor rows were last computed; NULL means the
+    # paper is waiting for the next incremental similarity refresh
+    neighbors_updated_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     class Meta:
         ordering = ["-publication_date", "-relevance_score"]
@@ -204,7 +210,8 @@ class SearchIndex(models.Model):
             models.Index(fields=["doi"]),
             models.Index(fields=["pmid"]),
             models.Index(fields=["arxiv_id"]),
-            # GinIndex(fields=['search_vector']),  # PostgreSQL specific - commented for compatibility
+            models.Index(fields=["created_at"]),
+            # GIN index on search_vector is created by migration 0015 on PostgreSQL only
         ]
 
     def __str__(self):
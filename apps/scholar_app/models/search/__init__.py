@@ -1,5 +1,17 @@
 """Search module - Paper search and discovery models"""
 
-from .models import SearchQuery, SearchResult, SearchFilter, SavedSearch
+from .models import (
+    SearchQuery,
+    SearchResult,
+    SearchFilter,
+    SavedSearch,
+    PaperNeighbor,
+)
 
-__all__ = ["SearchQuery", "SearchResult", "SearchFilter", "SavedSearch"]
+__all__ = [
+    "SearchQuery",
+    "SearchResult",
+    "SearchFilter",
+    "SavedSearch",
+    "PaperNeighbor",
+]
@@ -129,3 +129,28 @@ class SavedSearch(models.Model):
 
     def __str__(self):
         return f"{self.user.username}: {self.name}"
+
+
+class PaperNeighbor(models.Model):
+    """Precomputed top-k similar papers (maintained by services.search.similarity)"""
+
+    source = models.ForeignKey(
+        "SearchIndex", on_delete=models.CASCADE, related_name="neighbors"
+    )
+    neighbor = models.ForeignKey(
+        "SearchIndex", on_delete=models.CASCADE, related_name="+"
+    )
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    reason = models.CharField(max_length=255, blank=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["source", "rank"]
+        unique_together = ["source", "neighbor"]
+        indexes = [
+            models.Index(fields=["source", "rank"]),
+        ]
+
+    def __str__(self):
+        return f"Neighbor {self.rank} of {self.source_id}: {self.score:.3f}"
@@ -0,0 +1,19 @@
+"""Trending module - Materialized trending and analytics aggregates"""
+
+from .models import (
+    AnalyticsSnapshot,
+    AuthorDailyStat,
+    JournalDailyStat,
+    KeywordDailyStat,
+    PaperDailyStat,
+    PublicationYearStat,
+)
+
+__all__ = [
+    "PaperDailyStat",
+    "KeywordDailyStat",
+    "AuthorDailyStat",
+    "JournalDailyStat",
+    "PublicationYearStat",
+    "AnalyticsSnapshot",
+]
@@ -0,0 +1,97 @@
+"""
+Materialized aggregates for trending and analytics dashboards.
+
+Rows are rebuilt per ingestion day by services.trending (see
+refresh_scholar_rollups), so dashboards read a few small tables instead of
+aggregating the whole SearchIndex on every request.
+"""
+
+from django.db import models
+
+
+class PaperDailyStat(models.Model):
+    """Active papers indexed on one day"""
+
+    day = models.DateField(unique=True)
+    paper_count = models.IntegerField(default=0)
+    with_keywords_count = models.IntegerField(default=0)
+    open_access_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-day"]
+
+    def __str__(self):
+        return f"{self.day}: {self.paper_count} papers"
+
+
+class KeywordDailyStat(models.Model):
+    """Papers indexed on one day per (normalized) keyword"""
+
+    day = models.DateField()
+    keyword = models.CharField(max_length=200)
+    paper_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["-day", "-paper_count"]
+        unique_together = ["day", "keyword"]
+
+    def __str__(self):
+        return f"{self.day} {self.keyword}: {self.paper_count}"
+
+
+class AuthorDailyStat(models.Model):
+    """Papers indexed on one day per author"""
+
+    day = models.DateField()
+    author = models.ForeignKey("Author", on_delete=models.CASCADE, related_name="+")
+    paper_count = models.IntegerField(default=0)
+    citation_count = models.IntegerField(default=0)  # Sum of papers' citation_count
+    citations_received = models.IntegerField(default=0)  # Citation rows in the index
+    recent_titles = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        ordering = ["-day", "-paper_count"]
+        unique_together = ["day", "author"]
+
+    def __str__(self):
+        return f"{self.day} {self.author_id}: {self.paper_count}"
+
+
+class JournalDailyStat(models.Model):
+    """Papers indexed on one day per journal"""
+
+    day = models.DateField()
+    journal = models.ForeignKey("Journal", on_delete=models.CASCADE, related_name="+")
+    paper_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["-day", "-paper_count"]
+        unique_together = ["day", "journal"]
+
+    def __str__(self):
+        return f"{self.day} {self.journal_id}: {self.paper_count}"
+
+
+class PublicationYearStat(models.Model):
+    """Active papers per publication year"""
+
+    year = models.IntegerField(unique=True)
+    paper_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["-year"]
+
+    def __str__(self):
+        return f"{self.year}: {self.paper_count}"
+
+
+class AnalyticsSnapshot(models.Model):
+    """Corpus-wide statistics computed by the periodic rollup refresh"""
+
+    name = models.CharField(max_length=100, unique=True)
+    data = models.JSONField(default=dict)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.computed_at}"
@@ -0,0 +1,10 @@
+"""
+WebSocket routing for SciTeX Scholar
+"""
+
+from django.urls import path
+from . import consumers
+
+websocket_urlpatterns = [
+    path("ws/scholar/search/", consumers.ScholarSearchConsumer.as_asgi()),
+]
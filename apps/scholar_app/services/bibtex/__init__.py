@@ -1,3 +1,25 @@
 """
 BibTeX services - BibTeX enrichment and processing
 """
+
+from .enrichment import job_scholar_config, job_scholar_dir, process_bibtex_job
+from .queue import (
+    BibTeXWorkerPool,
+    claim_next_job,
+    enqueue_job,
+    get_worker_pool,
+    heartbeat,
+    recover_stale_jobs,
+)
+
+__all__ = [
+    "BibTeXWorkerPool",
+    "claim_next_job",
+    "enqueue_job",
+    "get_worker_pool",
+    "heartbeat",
+    "job_scholar_config",
+    "job_scholar_dir",
+    "process_bibtex_job",
+    "recover_stale_jobs",
+]
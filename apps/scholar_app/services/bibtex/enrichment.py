@@ -0,0 +1,698 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BibTeX enrichment job execution.
+
+Runs one claimed BibTeXEnrichmentJob entry by entry with
+scitex.scholar.pipelines.ScholarPipelineMetadataSingle. Jobs are claimed
+and scheduled by the queue in queue.py.
+
+Every finished entry is checkpointed (BibTeXEntryResult), so a job that
+runs out of its time slice or loses its worker continues where it stopped
+instead of starting over. What enrichment added to an entry also goes
+into a deployment-wide cache (EnrichedEntryCache) keyed by DOI or by
+normalized title, year and first author, so a popular reference is enriched
+once for all users. Only bibliographic metadata that enrichment found is
+shared: the user's own BibTeX fields, local paths and library fields stay
+with their entry, and cached fields are merged into the other user's entry
+rather than replacing it. Progress is written in batches, appending to the
+job log in the database.
+
+Each job gets an explicit ScholarConfig pointing at its owner's scholar
+directory instead of setting SCITEX_DIR process-wide, so concurrent jobs of
+different users never share (or race on) a cache directory.
+"""
+
+import asyncio
+import hashlib
+import logging
+import queue
+import re
+import shutil
+import threading
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from ...models import BibTeXEnrichmentJob, BibTeXEntryResult, EnrichedEntryCache
+
+logger = logging.getLogger(__name__)
+
+# Wall-clock budget of one run; unfinished jobs are re-queued afterwards
+ENRICHMENT_TIMEOUT = 600
+# Finished entries are written every CHECKPOINT_BATCH entries or
+# CHECKPOINT_INTERVAL seconds, whichever comes first
+CHECKPOINT_BATCH = 25
+CHECKPOINT_INTERVAL = 2.0
+# How often the event loop checks for a stop request (seconds)
+STOP_POLL_INTERVAL = 0.5
+# Keys per shared-cache query (stays below SQLite's parameter limit)
+CACHE_LOOKUP_CHUNK = 500
+# Shape of EnrichedEntryCache.data; rows in any other format are ignored
+ENRICHMENT_CACHE_FORMAT = 2
+# Metadata sections that describe the publication itself. path (local
+# files), system and container hold per-user state and are never shared.
+SHARED_SECTIONS = ("id", "basic", "citation_count", "publication", "url", "access")
+# Fields in shared sections that depend on the user's institution or actions
+PRIVATE_FIELDS = frozenset(
+    [
+        "openurl_query",
+        "openurl_engines",
+        "openurl_resolved",
+        "openurl_resolved_engines",
+        "paywall_bypass_attempted",
+        "paywall_bypass_success",
+        "pdf_download_attempted_at",
+        "pdf_download_status",
+        "pdf_download_error",
+    ]
+)
+
+
+def job_scholar_dir(job) -> Path:
+    """Scholar data/cache directory of the job's owner."""
+    if job.user:
+        return (
+            Path(settings.BASE_DIR) / "data" / "users" / job.user.username / ".scitex"
+        )
+    # Anonymous users get session-based directory
+    session_key = job.session_key or "anonymous"
+    return Path(settings.BASE_DIR) / "data" / "anonymous" / session_key / ".scitex"
+
+
+def job_scholar_config(job):
+    """ScholarConfig bound to the job's own scholar directory."""
+    from scitex.scholar.config import ScholarConfig
+
+    scholar_dir = job_scholar_dir(job)
+    scholar_dir.mkdir(parents=True, exist_ok=True)
+    return ScholarConfig(scholar_dir=scholar_dir)
+
+
+def normalize_title(title: str) -> str:
+    """Lower-cased title with punctuation and repeated whitespace removed."""
+    return " ".join(re.sub(r"[^\w\s]", " ", (title or "").lower()).split())
+
+
+def _first_author_surname(authors) -> str:
+    if not authors:
+        return ""
+    name = str(authors[0])
+    surname = name.split(",", 1)[0] if "," in name else (name.split() or [""])[-1]
+    return normalize_title(surname)
+
+
+def entry_identity(paper) -> Optional[str]:
+    """
+    Cache identity of a paper.
+
+    Its DOI, else its normalized title with year and first author's surname,
+    so unrelated papers with a generic title ("Editorial", "Reply") do not
+    share an entry. Papers without a DOI that lack any of those are not
+    cached.
+    """
+    doi = (paper.metadata.id.doi or "").strip().lower()
+    doi = re.sub(r"^(https?://(dx\.)?doi\.org/|doi:)", "", doi)
+    if doi:
+        return f"doi:{doi}"
+    basic = paper.metadata.basic
+    title = normalize_title(basic.title)
+    surname = _first_author_surname(basic.authors)
+    if title and basic.year and surname:
+        return f"title:{title}|{basic.year}|{surname}"
+    return None
+
+
+def entry_cache_key(identity: str) -> str:
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+def enrichment_fields(before: dict, after: dict) -> dict:
+    """
+    Shareable metadata that enrichment added to a paper.
+
+    Compares the paper's data before and after enrichment and keeps the
+    changed fields (with their ``_engines`` lists) of SHARED_SECTIONS, so
+    values that came from the user's BibTeX file are never shared.
+
+    Returns:
+        {"metadata": {section: {field: value}}}; empty if nothing was found
+    """
+    metadata = {}
+    for section in SHARED_SECTIONS:
+        old = (before.get("metadata") or {}).get(section) or {}
+        new = (after.get("metadata") or {}).get(section) or {}
+        fields = {}
+        for field, value in new.items():
+            if field in PRIVATE_FIELDS or field.endswith("_engines"):
+                continue
+            if value in (None, "", [], {}) or value == old.get(field):
+                continue
+            fields[field] = value
+            engines = f"{field}_engines"
+            if new.get(engines):
+                fields[engines] = new[engines]
+        if fields:
+            metadata[section] = fields
+    return {"metadata": metadata} if metadata else {}
+
+
+def apply_enrichment(data: dict, enrichment: dict) -> dict:
+    """A paper's own data with cached enrichment fields merged in."""
+    merged = {**data, "metadata": dict(data.get("metadata") or {})}
+    for section, fields in enrichment.get("metadata", {}).items():
+        if section not in SHARED_SECTIONS:
+            continue
+        merged["metadata"][section] = {
+            **(merged["metadata"].get(section) or {}),
+            **{k: v for k, v in fields.items() if k not in PRIVATE_FIELDS},
+        }
+    return merged
+
+
+def _cached_entries(identities) -> Dict[str, dict]:
+    """Shared cache lookup: identity -> enrichment fields."""
+    keys = {entry_cache_key(identity): identity for identity in identities}
+    found = {}
+    key_list = list(keys)
+    for start in range(0, len(key_list), CACHE_LOOKUP_CHUNK):
+        for key, data in EnrichedEntryCache.objects.filter(
+            key__in=key_list[start : start + CACHE_LOOKUP_CHUNK]
+        ).values_list("key", "data"):
+            if data.get("format") == ENRICHMENT_CACHE_FORMAT and data.get("metadata"):
+                found[keys[key]] = {"metadata": data["metadata"]}
+    if found:
+        EnrichedEntryCache.objects.filter(
+            key__in=[entry_cache_key(identity) for identity in found]
+        ).update(hits=F("hits") + 1)
+    return found
+
+
+def _store_cached_entries(entries: Dict[str, dict]) -> None:
+    """Add or refresh enrichment fields in the shared cache."""
+    if not entries:
+        return
+    EnrichedEntryCache.objects.bulk_create(
+        [
+            EnrichedEntryCache(
+                key=entry_cache_key(identity),
+                identity=identity[:500],
+                data={"format": ENRICHMENT_CACHE_FORMAT, **enrichment},
+            )
+            for identity, enrichment in entries.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["key"],
+        update_fields=["data", "updated_at"],
+    )
+
+
+class _Checkpointer:
+    """Buffers finished entries and writes them in batches.
+
+    Each flush is one bulk insert of entry rows, an upsert into the shared
+    cache and a single UPDATE of the job counters that appends the new log
+    lines in the database. The UPDATE only matches a job that is still
+    ``processing``, so a cancelled (or re-queued) job is noticed on the next
+    flush.
+    """
+
+    def __init__(self, job, processed: int, failed: int):
+        self.job = job
+        self.processed = processed
+        self.failed = failed
+        self.stopped = False
+        self._entries = []
+        self._cache = {}
+        self._log = []
+        self._last_flush = time.monotonic()
+
+    def add(
+        self,
+        entry: BibTeXEntryResult,
+        identity: Optional[str],
+        title: str,
+        enrichment: Optional[dict] = None,
+    ):
+        self.processed += 1
+        self.failed += not entry.success
+        self._entries.append(entry)
+        if entry.success and not entry.from_cache and identity and enrichment:
+            self._cache[identity] = enrichment
+        if len(title) > 50:
+            title = title[:50] + "..."
+        status_icon = "✓" if entry.success else "✗"
+        cached = " (cached)" if entry.from_cache else ""
+        self._log.append(
+            f"[{self.processed}/{self.job.total_papers}] {status_icon} {title}{cached}"
+        )
+
+    @property
+    def due(self) -> bool:
+        return (
+            len(self._entries) >= CHECKPOINT_BATCH
+            or time.monotonic() - self._last_flush >= CHECKPOINT_INTERVAL
+        )
+
+    def flush(self) -> bool:
+        """Write buffered entries. Returns False once the job stopped running."""
+        self._last_flush = time.monotonic()
+        if not self._entries:
+            return not self.stopped
+
+        entries, cache_entries, log = self._entries, self._cache, self._log
+        self._entries, self._cache, self._log = [], {}, []
+        with transaction.atomic():
+            BibTeXEntryResult.objects.bulk_create(entries, ignore_conflicts=True)
+            updated = BibTeXEnrichmentJob.objects.filter(
+                pk=self.job.pk, status="processing"
+            ).update(
+                processed_papers=self.processed,
+                failed_papers=self.failed,
+                heartbeat_at=timezone.now(),
+                processing_log=Concat("processing_log", Value("\n" + "\n".join(log))),
+            )
+        try:
+            _store_cached_entries(cache_entries)
+        except Exception as e:
+            logger.warning(f"Could not update enriched-entry cache: {e}")
+
+        if not updated:
+            self.stopped = True
+        return not self.stopped
+
+
+def _paper_data(paper) -> dict:
+    """JSON-safe dump of a scitex Paper."""
+    return paper.model_dump(mode="json")
+
+
+def _enrich_in_background(job, papers, todo, config, results, stop):
+    """Event-loop thread: enrich ``todo`` entries and put them on ``results``.
+
+    Only network I/O happens here; the job's worker thread owns the database
+    connection and does the checkpointing. ``None`` marks the end.
+    """
+    from scitex.scholar.pipelines import ScholarPipelineMetadataSingle
+
+    async def enrich(semaphore, index, identity):
+        async with semaphore:
+            if stop.is_set():
+                return
+            paper = papers[index]
+            entry = BibTeXEntryResult(job_id=job.pk, index=index)
+            # Snapshot first: the pipeline may update the paper in place
+            before = _paper_data(paper)
+            try:
+                pipeline = ScholarPipelineMetadataSingle(config=config)
+                paper = await pipeline.enrich_paper_async(
+                    paper, force=not job.use_cache  # force=True means ignore cache
+                )
+                entry.success = True
+            except Exception as e:
+                entry.error = str(e)
+            entry.data = _paper_data(paper)
+            enrichment = enrichment_fields(before, entry.data) if entry.success else None
+            results.put(
+                (entry, identity, paper.metadata.basic.title or "Unknown", enrichment)
+            )
+
+    async def main():
+        semaphore = asyncio.Semaphore(max(1, min(job.num_workers, len(todo))))
+        tasks = [
+            asyncio.ensure_future(enrich(semaphore, index, identity))
+            for index, identity in todo
+        ]
+        pending = tasks
+        while pending and not stop.is_set():
+            _, pending = await asyncio.wait(pending, timeout=STOP_POLL_INTERVAL)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    try:
+        asyncio.run(main())
+    except Exception as e:
+        logger.error(f"BibTeX job {job.id} enrichment loop failed: {e}")
+    finally:
+        results.put(None)
+
+
+def _enrich_entries(job, papers, todo, checkpointer, config) -> bool:
+    """Enrich ``todo`` entries concurrently, checkpointing as they finish.
+
+    Returns True if every entry finished within ENRICHMENT_TIMEOUT.
+    """
+    results = queue.Queue()
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=_enrich_in_background,
+        args=(job, papers, todo, config, results, stop),
+        name=f"bibtex-enrich-{job.pk}",
+        daemon=True,
+    )
+    thread.start()
+
+    deadline = time.monotonic() + ENRICHMENT_TIMEOUT
+    finished = False
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            item = results.get(timeout=min(CHECKPOINT_INTERVAL, remaining))
+        except queue.Empty:
+            item = ()
+        if item is None:
+            finished = True
+            break
+        if item:
+            checkpointer.add(*item)
+        if checkpointer.due and not checkpointer.flush():
+            break
+
+    if not finished:
+        # Out of time or cancelled: keep whatever completes while stopping
+        stop.set()
+        thread.join(timeout=STOP_POLL_INTERVAL * 10)
+        while True:
+            try:
+                item = results.get_nowait()
+            except queue.Empty:
+                break
+            if item:
+                checkpointer.add(*item)
+    checkpointer.flush()
+    return finished
+
+
+def _fail(job, error_message, log_line):
+    """Mark the job failed, appending ``log_line`` to its log."""
+    job.status = "failed"
+    job.error_message = error_message
+    job.completed_at = timezone.now()
+    BibTeXEnrichmentJob.objects.filter(pk=job.pk).exclude(status="cancelled").update(
+        status=job.status,
+        error_message=job.error_message,
+        completed_at=job.completed_at,
+        processing_log=Concat("processing_log", Value(f"\n\n{log_line}")),
+    )
+
+
+def _requeue(job, message):
+    """Put a partially enriched job back in the queue to continue later."""
+    # The job made progress, so this is not counted as a failed attempt
+    BibTeXEnrichmentJob.objects.filter(pk=job.pk, status="processing").update(
+        status="pending",
+        worker_id="",
+        heartbeat_at=None,
+        attempts=0,
+        processing_log=Concat("processing_log", Value(f"\n\n↻ {message}")),
+    )
+
+
+def process_bibtex_job(job):
+    """Process a claimed BibTeX enrichment job.
+
+    Entries already checkpointed by an earlier run are skipped, entries in
+    the shared cache are reused, and the rest are enriched for up to
+    ENRICHMENT_TIMEOUT seconds before the job is re-queued to continue.
+    Failures are recorded on the job (status "failed") rather than raised.
+    """
+    try:
+        # Refresh first to avoid conflicts
+        try:
+            job.refresh_from_db()
+            # Check if job was cancelled before we even started
+            if job.status == "cancelled":
+                logger.info(f"Job {job.id} was cancelled before processing started")
+                return
+        except BibTeXEnrichmentJob.DoesNotExist:
+            logger.warning(f"Job {job.id} was deleted before processing started")
+            return
+
+        if job.processing_log:
+            job.processing_log += "\n\nLoading BibTeX file..."
+        else:
+            job.processing_log = "Loading BibTeX file..."
+        job.save(update_fields=["processing_log"])
+        logger.info(f"Starting BibTeX job {job.id} (attempt {job.attempts})")
+
+        # Import scholar components
+        from scitex.scholar.storage import BibTeXHandler
+        from scitex_scholar.core.Paper import Paper
+
+        config = job_scholar_config(job)
+
+        # Get input file path
+        input_path = Path(settings.MEDIA_ROOT) / job.input_file.name
+        logger.info(f"Input file path: {input_path}")
+
+        # Load papers from BibTeX
+        bibtex_handler = BibTeXHandler(project=job.project_name, config=config)
+        papers = bibtex_handler.papers_from_bibtex(input_path)
+        logger.info(f"Loaded {len(papers) if papers else 0} papers")
+
+        if not papers:
+            raise ValueError("No papers found in BibTeX file")
+
+        # Resume from checkpoints of earlier runs
+        done = dict(job.entries.values_list("index", "success"))
+        job.total_papers = len(papers)
+        job.processing_log += f"\nFound {len(papers)} papers in BibTeX file"
+        if done:
+            job.processing_log += f"\nResuming: {len(done)} entries already enriched"
+        job.save(update_fields=["total_papers", "processing_log"])
+
+        checkpointer = _Checkpointer(
+            job,
+            processed=len(done),
+            failed=sum(not success for success in done.values()),
+        )
+        todo = [
+            (index, entry_identity(paper))
+            for index, paper in enumerate(papers)
+            if index not in done
+        ]
+
+        # Entries someone already enriched come from the shared cache
+        if job.use_cache:
+            cached = _cached_entries({identity for _, identity in todo if identity})
+            misses = []
+            for index, identity in todo:
+                if identity in cached:
+                    checkpointer.add(
+                        BibTeXEntryResult(
+                            job_id=job.pk,
+                            index=index,
+                            success=True,
+                            from_cache=True,
+                            data=apply_enrichment(
+                                _paper_data(papers[index]), cached[identity]
+                            ),
+                        ),
+                        identity,
+                        papers[index].metadata.basic.title or "Unknown",
+                    )
+                else:
+                    misses.append((index, identity))
+            todo = misses
+        checkpointer.flush()
+
+        finished = True
+        if todo and not checkpointer.stopped:
+            finished = _enrich_entries(job, papers, todo, checkpointer, config)
+
+        if checkpointer.stopped:
+            logger.info(f"BibTeX job {job.id} stopped (cancelled or re-queued)")
+            return
+
+        if not finished:
+            if checkpointer.processed > len(done):
+                _requeue(
+                    job,
+                    f"Time slice used up after {checkpointer.processed}/"
+                    f"{len(papers)} entries; continuing shortly",
+                )
+                logger.info(f"BibTeX job {job.id} re-queued to continue")
+                return
+
+            # Mark job as failed: not a single entry finished in a whole slice
+            _fail(
+                job,
+                "Enrichment process timed out after 10 minutes. Please try with fewer papers or contact support.",
+                "✗ TIMEOUT: Job exceeded 10-minute limit",
+            )
+            logger.error(f"BibTeX job {job.id} timed out after 10 minutes")
+            return  # Exit the function without raising exception
+
+        entries = list(job.entries.order_by("index").values_list("data", flat=True))
+        enriched_papers = [Paper.from_dict(data) for data in entries]
+        job.enrichment_summary.update(
+            {
+                "enriched": checkpointer.processed - checkpointer.failed,
+                "failed": checkpointer.failed,
+                "from_cache": job.entries.filter(from_cache=True).count(),
+            }
+        )
+
+        # Create output path with format: originalname-enriched-by-scitex_timestamp.bib
+        # Use stored original filename (without .bib extension)
+        original_name = (
+            Path(job.original_filename).stem
+            if job.original_filename
+            else Path(job.input_file.name).stem
+        )
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_filename = f"{original_name}-enriched-by-scitex_{timestamp}.bib"
+
+        user_dir = str(job.user.id) if job.user else "anonymous"
+        output_path = (
+            Path(settings.MEDIA_ROOT) / "bibtex_enriched" / user_dir / output_filename
+        )
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Save enriched BibTeX
+        bibtex_handler.papers_to_bibtex(enriched_papers, output_path)
+
+        # Update job with results
+        job.total_papers = len(papers)
+        job.processed_papers = len(enriched_papers)
+        job.failed_papers = checkpointer.failed
+        job.output_file = str(output_path.relative_to(settings.MEDIA_ROOT))
+
+        # Gitea Integration: Auto-commit enriched .bib file to project repository
+        if job.project and job.project.git_clone_path:
+            _commit_to_project(job, output_path)
+
+        job.status = "completed"
+        job.completed_at = timezone.now()
+        job.save(
+            update_fields=[
+                "status",
+                "completed_at",
+                "total_papers",
+                "processed_papers",
+                "failed_papers",
+                "output_file",
+                "enrichment_summary",
+            ]
+        )
+
+    except Exception as e:
+        error_details = str(e)
+
+        # Provide user-friendly error messages
+        if "duplicate key" in error_details.lower():
+            error_message = "Database constraint error - this may be a temporary issue. Please try uploading the file again."
+        elif "no papers found" in error_details.lower():
+            error_message = "No valid BibTeX entries found in the uploaded file. Please check your file format."
+        else:
+            error_message = f"Processing failed: {error_details}"
+        _fail(job, error_message, f"✗ ERROR: {error_message}")
+
+        logger.error(
+            f"BibTeX job {job.id} failed: {error_details}\n{traceback.format_exc()}"
+        )
+
+
+def _commit_to_project(job, output_path):
+    """Copy original and enriched .bib files into the project and commit them."""
+    try:
+        from apps.project_app.services.bibliography_manager import (
+            ensure_bibliography_structure,
+            regenerate_bibliography,
+        )
+        from apps.project_app.services.git_service import auto_commit_file
+
+        # Create scitex/scholar/bib_files directory (no __init__.py, no Python conflict)
+        project_bib_dir = (
+            Path(job.project.git_clone_path) / "scitex" / "scholar" / "bib_files"
+        )
+        project_bib_dir.mkdir(parents=True, exist_ok=True)
+
+        # Generate filenames with original name and timestamp
+        original_name = (
+            Path(job.original_filename).stem if job.original_filename else "references"
+        )
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        original_filename = f"{original_name}_original-{timestamp}.bib"
+        enriched_filename = f"{original_name}_enriched-{timestamp}.bib"
+
+        # Copy both original and enriched .bib files to project repository
+        input_file_path = Path(settings.MEDIA_ROOT) / job.input_file.name
+
+        project_original_path = project_bib_dir / original_filename
+        shutil.copy(input_file_path, project_original_path)
+        logger.info(f"Copied original .bib to {project_original_path}")
+
+        project_enriched_path = project_bib_dir / enriched_filename
+        shutil.copy(output_path, project_enriched_path)
+        logger.info(f"Copied enriched .bib to {project_enriched_path}")
+
+        # ============================================================
+        # AUTO-MERGE: Regenerate bibliography using shared utility
+        # ============================================================
+        project_path = Path(job.project.git_clone_path)
+
+        # Ensure structure exists
+        ensure_bibliography_structure(project_path)
+
+        # Regenerate all bibliographies
+        results = regenerate_bibliography(project_path, job.project.name)
+
+        if results["success"]:
+            logger.info(
+                f"✓ Bibliography regenerated: "
+                f"scholar={results['scholar_count']}, "
+                f"writer={results['writer_count']}, "
+                f"total={results['total_count']}"
+            )
+            job.enrichment_summary["bibliography_merged"] = True
+            job.enrichment_summary["total_citations"] = results["total_count"]
+        else:
+            logger.warning(f"Bibliography regeneration had errors: {results['errors']}")
+
+        # Auto-commit both files to Gitea
+        commit_message = f"Scholar: Added bibliography - {job.processed_papers}/{job.total_papers} papers enriched"
+        success, output = auto_commit_file(
+            project_dir=Path(job.project.git_clone_path),
+            filepath="scitex/",  # Commit entire scitex directory
+            message=commit_message,
+            wait=True,
+        )
+
+        if success:
+            logger.info(f"✓ Auto-committed enriched .bib to Gitea: {output}")
+            job.enrichment_summary["gitea_commit"] = True
+            job.enrichment_summary["gitea_message"] = commit_message
+        else:
+            logger.warning(f"Failed to auto-commit to Gitea: {output}")
+            job.enrichment_summary["gitea_commit"] = False
+            job.enrichment_summary["gitea_error"] = output
+
+    except Exception as gitea_error:
+        logger.error(f"Gitea integration error: {gitea_error}")
+        job.enrichment_summary["gitea_commit"] = False
+        job.enrichment_summary["gitea_error"] = str(gitea_error)
+
+
+__all__ = [
+    "apply_enrichment",
+    "enrichment_fields",
+    "entry_identity",
+    "job_scholar_config",
+    "job_scholar_dir",
+    "normalize_title",
+    "process_bibtex_job",
+]
+
+# EOF
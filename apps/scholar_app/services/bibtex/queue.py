@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Durable queue and worker pool for BibTeX enrichment jobs.
+
+BibTeXEnrichmentJob rows are the queue: an upload creates a ``pending`` row
+and a worker claims it by atomically flipping it to ``processing``. Nothing
+lives only in memory, so a restart loses no jobs.
+
+Scheduling:
+- At most SCITEX_BIBTEX_MAX_CONCURRENT_JOBS jobs run at once and at most
+  SCITEX_BIBTEX_MAX_JOBS_PER_OWNER per user (or anonymous session).
+- Among pending jobs, owners with the fewest running jobs go first and the
+  oldest job breaks ties, so one user's backlog cannot starve others.
+
+Crash recovery: workers refresh ``heartbeat_at`` on their running jobs. A
+``processing`` job whose heartbeat is older than
+SCITEX_BIBTEX_STALE_AFTER seconds lost its worker and is put back to
+``pending`` (or failed after SCITEX_BIBTEX_MAX_ATTEMPTS claims).
+Heartbeats, recovery and the worker threads are shared with the
+compilation scheduler (apps.common.utils.job_queue); the claim order above
+is specific to this queue.
+
+Workers run in-process (started on first upload) unless
+SCITEX_BIBTEX_INPROCESS_WORKERS is False, in which case the
+``run_bibtex_workers`` command provides them.
+"""
+
+import logging
+from collections import Counter
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from apps.common.utils.job_queue import InProcessPool, JobQueue, WorkerPool
+
+from ...models import BibTeXEnrichmentJob
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_JOBS = getattr(settings, "SCITEX_BIBTEX_MAX_CONCURRENT_JOBS", 2)
+MAX_JOBS_PER_OWNER = getattr(settings, "SCITEX_BIBTEX_MAX_JOBS_PER_OWNER", 1)
+STALE_AFTER = getattr(settings, "SCITEX_BIBTEX_STALE_AFTER", 120)
+MAX_ATTEMPTS = getattr(settings, "SCITEX_BIBTEX_MAX_ATTEMPTS", 3)
+HEARTBEAT_INTERVAL = 30
+POLL_INTERVAL = 5
+# Pending jobs considered per claim; fairness is decided within this window
+CLAIM_WINDOW = 100
+
+JOBS = JobQueue(
+    BibTeXEnrichmentJob, queued="pending", running="processing", label="BibTeX jobs"
+)
+
+
+def owner_key(user_id, session_key) -> str:
+    """Fairness/concurrency bucket of a job."""
+    return f"user:{user_id}" if user_id else f"session:{session_key}"
+
+
+def _running_by_owner() -> Counter:
+    return Counter(
+        owner_key(user_id, session_key)
+        for user_id, session_key in BibTeXEnrichmentJob.objects.filter(
+            status="processing"
+        ).values_list("user_id", "session_key")
+    )
+
+
+def claim_next_job(
+    worker_id: str,
+    max_concurrent: int = None,
+    max_per_owner: int = None,
+) -> Optional[BibTeXEnrichmentJob]:
+    """Claim the next pending job for ``worker_id``, or None.
+
+    The claim is a conditional UPDATE (``pending`` -> ``processing``), so
+    two workers never get the same job. The concurrency limits are read
+    before claiming; across processes they can be exceeded by the number of
+    workers claiming at the same instant.
+    """
+    max_concurrent = max_concurrent or MAX_CONCURRENT_JOBS
+    max_per_owner = max_per_owner or MAX_JOBS_PER_OWNER
+
+    running = _running_by_owner()
+    if sum(running.values()) >= max_concurrent:
+        return None
+
+    candidates = (
+        BibTeXEnrichmentJob.objects.filter(status="pending")
+        .order_by("created_at")
+        .values_list("pk", "user_id", "session_key")[:CLAIM_WINDOW]
+    )
+    # Owners with fewer running jobs first, then oldest job first
+    eligible = []
+    for position, (pk, user_id, session_key) in enumerate(candidates):
+        owner = owner_key(user_id, session_key)
+        if running[owner] < max_per_owner:
+            eligible.append((running[owner], position, pk))
+    eligible.sort()
+
+    for _, _, pk in eligible:
+        now = timezone.now()
+        claimed = BibTeXEnrichmentJob.objects.filter(pk=pk, status="pending").update(
+            status="processing",
+            worker_id=worker_id,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return BibTeXEnrichmentJob.objects.select_related("user", "project").get(
+                pk=pk
+            )
+    return None
+
+
+def heartbeat(job_ids) -> int:
+    """Mark running jobs as alive."""
+    return JOBS.heartbeat(job_ids)
+
+
+def recover_stale_jobs(stale_after: int = None, max_attempts: int = None):
+    """Re-queue ``processing`` jobs whose worker stopped sending heartbeats.
+
+    Returns ``(requeued, failed)`` counts. Jobs that already used
+    ``max_attempts`` claims are failed instead of retried forever.
+    """
+    return JOBS.recover_stale(
+        stale_after or STALE_AFTER,
+        max_attempts or MAX_ATTEMPTS,
+        requeue=lambda job: {
+            "processing_log": job.processing_log
+            + "\n\n↻ Worker stopped unexpectedly; job re-queued"
+        },
+        fail=lambda job: {
+            "error_message": "Job was interrupted too many times",
+            "processing_log": job.processing_log
+            + "\n\n✗ Worker stopped unexpectedly; giving up",
+        },
+        fields=("processing_log",),
+    )
+
+
+def _process(job):
+    from .enrichment import process_bibtex_job
+
+    process_bibtex_job(job)
+
+
+class BibTeXWorkerPool(WorkerPool):
+    """Worker threads for queued BibTeX jobs (see WorkerPool)."""
+
+    def __init__(
+        self,
+        size: int = None,
+        process: Callable = None,
+        poll_interval: float = POLL_INTERVAL,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+    ):
+        super().__init__(
+            "bibtex",
+            size=size or MAX_CONCURRENT_JOBS,
+            claim=claim_next_job,
+            process=process or _process,
+            heartbeat=heartbeat,
+            recover=recover_stale_jobs,
+            poll_interval=poll_interval,
+            heartbeat_interval=heartbeat_interval,
+        )
+
+
+_pool = InProcessPool(BibTeXWorkerPool, "SCITEX_BIBTEX_INPROCESS_WORKERS")
+
+
+def get_worker_pool() -> BibTeXWorkerPool:
+    """The process-wide worker pool (not started)."""
+    return _pool.get()
+
+
+def enqueue_job(job) -> None:
+    """Signal that ``job`` (already saved as ``pending``) is ready to run."""
+    # Without in-process workers, run_bibtex_workers polls the queue
+    _pool.wake()
+
+
+__all__ = [
+    "BibTeXWorkerPool",
+    "claim_next_job",
+    "enqueue_job",
+    "get_worker_pool",
+    "heartbeat",
+    "recover_stale_jobs",
+]
+
+# EOF
@@ -1,3 +1,55 @@
 """
 Search services - Paper search and discovery
 """
+
+from .fulltext import (
+    DEFAULT_PAGE_SIZE,
+    build_search_vector,
+    paginate,
+    ranked_search_queryset,
+    supports_full_text,
+    update_search_vectors,
+)
+from .ingest import (
+    bulk_store_search_results,
+    parse_author_names,
+    schedule_bulk_store,
+    validate_citation_count,
+)
+from .result_cache import SearchResultCache, normalize_query, search_result_cache
+from .similarity import (
+    rebuild_neighbors,
+    refresh_neighbors,
+    similar_papers,
+    similar_papers_for_many,
+)
+from .streaming import (
+    IncrementalResultMerger,
+    paper_to_result,
+    pipeline_filters,
+    stream_engine_batches,
+)
+
+__all__ = [
+    "DEFAULT_PAGE_SIZE",
+    "build_search_vector",
+    "paginate",
+    "ranked_search_queryset",
+    "supports_full_text",
+    "update_search_vectors",
+    "bulk_store_search_results",
+    "parse_author_names",
+    "schedule_bulk_store",
+    "validate_citation_count",
+    "SearchResultCache",
+    "normalize_query",
+    "search_result_cache",
+    "rebuild_neighbors",
+    "refresh_neighbors",
+    "similar_papers",
+    "similar_papers_for_many",
+    "IncrementalResultMerger",
+    "paper_to_result",
+    "pipeline_filters",
+    "stream_engine_batches",
+]
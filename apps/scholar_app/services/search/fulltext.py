@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Full-text search over the local SearchIndex.
+
+On PostgreSQL every SearchIndex row carries a weighted ``search_vector``
+(title > abstract > keywords/author names) backed by a GIN index, and
+queries are answered with ``websearch_to_tsquery`` ranked by ``ts_rank``.
+Other database backends (SQLite in development) fall back to ``icontains``
+matching so the same API works everywhere.
+
+Vectors are maintained incrementally by ``update_search_vectors`` whenever
+papers are written, and ``manage.py rebuild_search_vectors`` backfills
+existing rows in batches.
+"""
+
+from typing import Iterable, Optional
+
+from django.db import connection
+from django.db.models import F, OuterRef, Q, QuerySet, Subquery, Value
+from django.db.models.functions import Concat
+
+from ...models import AuthorPaper, SearchIndex
+
+SEARCH_CONFIG = "english"
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+
+def supports_full_text() -> bool:
+    """Return True if the default database supports tsvector search."""
+    return connection.vendor == "postgresql"
+
+
+def _author_names_subquery() -> Subquery:
+    """Space-separated author names of the outer SearchIndex row."""
+    from django.contrib.postgres.aggregates import StringAgg
+
+    return Subquery(
+        AuthorPaper.objects.filter(paper=OuterRef("pk"))
+        .order_by()
+        .values("paper")
+        .annotate(
+            names=StringAgg(
+                Concat("author__first_name", Value(" "), "author__last_name"),
+                delimiter=" ",
+            )
+        )
+        .values("names")[:1]
+    )
+
+
+def build_search_vector():
+    """Weighted search vector expression for SearchIndex rows."""
+    from django.contrib.postgres.search import SearchVector
+
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("abstract", weight="B", config=SEARCH_CONFIG)
+        + SearchVector("keywords", weight="C", config=SEARCH_CONFIG)
+        + SearchVector(_author_names_subquery(), weight="C", config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(paper_ids: Iterable) -> int:
+    """
+    Recompute ``search_vector`` for the given papers in a single UPDATE.
+
+    Returns the number of rows updated (0 on non-PostgreSQL backends).
+    """
+    paper_ids = [pk for pk in paper_ids if pk is not None]
+    if not paper_ids or not supports_full_text():
+        return 0
+    return SearchIndex.objects.filter(pk__in=paper_ids).update(
+        search_vector=build_search_vector()
+    )
+
+
+def ranked_search_queryset(query: str) -> QuerySet:
+    """
+    SearchIndex queryset matching ``query``, ordered by relevance.
+
+    Rows are annotated with ``rank`` on PostgreSQL. The fallback orders by
+    the stored ``relevance_score`` instead.
+    """
+    if supports_full_text():
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        search_query = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+        return (
+            SearchIndex.objects.filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F("search_vector"), search_query))
+            .order_by("-rank", "-citation_count")
+        )
+
+    return SearchIndex.objects.filter(
+        Q(title__icontains=query)
+        | Q(abstract__icontains=query)
+        | Q(keywords__icontains=query)
+    ).order_by("-relevance_score", "-citation_count")
+
+
+def paginate(
+    queryset: QuerySet, page: int = 1, page_size: Optional[int] = None
+) -> list:
+    """Return one page of ``queryset`` as a list (1-based ``page``)."""
+    page_size = min(max(int(page_size or DEFAULT_PAGE_SIZE), 1), MAX_PAGE_SIZE)
+    page = max(int(page or 1), 1)
+    offset = (page - 1) * page_size
+    return list(queryset[offset : offset + page_size])
+
+
+__all__ = [
+    "SEARCH_CONFIG",
+    "DEFAULT_PAGE_SIZE",
+    "MAX_PAGE_SIZE",
+    "supports_full_text",
+    "build_search_vector",
+    "update_search_vectors",
+    "ranked_search_queryset",
+    "paginate",
+]
+
+# EOF
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bulk persistence of external search results into the SearchIndex.
+
+``bulk_store_search_results`` stores a whole batch of result dicts in one
+transaction with a constant number of queries: identifiers (DOI, PMID,
+arXiv ID, titles) are resolved with a handful of ``IN`` lookups, and papers,
+journals, authors and author links are written with ``bulk_create`` /
+``bulk_update``. ``schedule_bulk_store`` runs the same ingestion on a
+background worker once the current transaction commits, for callers that
+do not need the stored paper IDs in their response.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import reduce
+from operator import or_
+from typing import Dict, List, Optional
+
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from ...models import Author, AuthorPaper, Journal, SearchIndex
+from ..trending import day_of, mark_dirty
+from .fulltext import update_search_vectors
+
+logger = logging.getLogger(__name__)
+
+_background_executor = ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="scholar-ingest"
+)
+
+PAPER_UPDATE_FIELDS = [
+    "source_engines",
+    "citation_count",
+    "citation_source",
+    "citation_last_updated",
+    "abstract",
+    "pdf_url",
+    "doi",
+    "pmid",
+    "arxiv_id",
+    "updated_at",
+]
+
+
+def validate_citation_count(citation_count, source=None):
+    """
+    Validate and clean citation count data.
+    Returns (validated_count, is_reliable) tuple.
+    """
+    try:
+        count = int(citation_count) if citation_count is not None else 0
+
+        # Basic validation
+        if count < 0:
+            return 0, False
+
+        # Flag potentially unreliable data
+        is_reliable = True
+
+        # Very high citation counts need verification
+        if count > 10000:
+            logger.warning(f"Unusually high citation count: {count} from {source}")
+            is_reliable = False
+
+        # Mark zero citations from certain sources as less reliable
+        if count == 0 and source in ["pubmed", "arxiv"]:
+            is_reliable = False
+
+        return count, is_reliable
+
+    except (ValueError, TypeError):
+        return 0, False
+
+
+def parse_author_names(authors) -> List[tuple]:
+    """Split an author string or list into (first_name, last_name) pairs."""
+    if isinstance(authors, str):
+        names = authors.split(", ")
+    elif isinstance(authors, list):
+        names = authors
+    else:
+        return []
+
+    parsed = []
+    for name in names:
+        parts = str(name).strip().split()
+        if parts:
+            parsed.append((parts[0], " ".join(parts[1:])))
+    return parsed
+
+
+def _identifier(result: Dict, field: str) -> Optional[str]:
+    value = result.get(field)
+    return (str(value).strip() or None) if value else None
+
+
+def _publication_date(result: Dict) -> Optional[date]:
+    try:
+        return date(int(result.get("year", 2024)), 1, 1)
+    except (TypeError, ValueError):
+        return None
+
+
+def _title_key(title: str) -> str:
+    return (title or "").lower().strip()
+
+
+def _similar_title_fragment(title: str) -> Optional[str]:
+    """Fragment used for near-duplicate title matching (None if too short)."""
+    title_clean = " ".join(word for word in _title_key(title).split() if len(word) > 3)
+    return title_clean[:30] if len(title_clean) > 20 else None
+
+
+def _source_engines(result: Dict) -> List[str]:
+    source_engines = result.get("source_engines") or []
+    if not source_engines and result.get("source"):
+        source_engines = [result.get("source", "web")]
+    return list(source_engines)
+
+
+class _ExistingPapers:
+    """Existing SearchIndex rows for a batch, resolved with a few IN queries."""
+
+    def __init__(self, results: List[Dict]):
+        dois = {_identifier(r, "doi") for r in results} - {None}
+        pmids = {_identifier(r, "pmid") for r in results} - {None}
+        arxiv_ids = {_identifier(r, "arxiv_id") for r in results} - {None}
+        titles = {_title_key(r.get("title")) for r in results} - {""}
+
+        self.by_doi = {p.doi: p for p in SearchIndex.objects.filter(doi__in=dois)}
+        self.by_pmid = {p.pmid: p for p in SearchIndex.objects.filter(pmid__in=pmids)}
+        self.by_arxiv = {
+            p.arxiv_id: p for p in SearchIndex.objects.filter(arxiv_id__in=arxiv_ids)
+        }
+        self.by_title = {}
+        for paper in (
+            SearchIndex.objects.annotate(title_lower=Lower("title"))
+            .filter(title_lower__in=titles)
+            .order_by("created_at")
+        ):
+            self.by_title.setdefault(paper.title_lower, paper)
+
+        # Near-duplicate titles: one OR query for everything still unresolved
+        fragments = {
+            fragment
+            for r in results
+            if not self._exact(r)
+            for fragment in [_similar_title_fragment(r.get("title"))]
+            if fragment
+        }
+        self.similar = []
+        if fragments:
+            self.similar = list(
+                SearchIndex.objects.filter(
+                    reduce(or_, (Q(title__icontains=f) for f in fragments))
+                )
+            )
+
+    def _exact(self, result: Dict) -> Optional[SearchIndex]:
+        return (
+            self.by_doi.get(_identifier(result, "doi"))
+            or self.by_pmid.get(_identifier(result, "pmid"))
+            or self.by_arxiv.get(_identifier(result, "arxiv_id"))
+            or self.by_title.get(_title_key(result.get("title")))
+        )
+
+    def match(self, result: Dict) -> Optional[SearchIndex]:
+        paper = self._exact(result)
+        if paper or not result.get("title"):
+            return paper
+        fragment = _similar_title_fragment(result["title"])
+        if not fragment:
+            return None
+        for candidate in self.similar:
+            if (
+                fragment in candidate.title.lower()
+                and abs(len(candidate.title) - len(result["title"])) < 10
+            ):
+                return candidate
+        return None
+
+    def remember(self, paper: SearchIndex) -> None:
+        """Make a paper created earlier in the batch matchable by later results."""
+        if paper.doi:
+            self.by_doi.setdefault(paper.doi, paper)
+        if paper.pmid:
+            self.by_pmid.setdefault(paper.pmid, paper)
+        if paper.arxiv_id:
+            self.by_arxiv.setdefault(paper.arxiv_id, paper)
+        self.by_title.setdefault(_title_key(paper.title), paper)
+
+
+def _merge_into_existing(paper: SearchIndex, result: Dict) -> None:
+    """Apply a new result to an existing paper in memory (no query)."""
+    # Update source_engines list (merge sources)
+    result_sources = result.get("source_engines", [])
+    existing_sources = paper.source_engines or []
+    if isinstance(result_sources, list) and result_sources:
+        paper.source_engines = list(set(existing_sources + result_sources))
+    elif result.get("source"):
+        source = result.get("source", "unknown")
+        if source not in existing_sources:
+            paper.source_engines = existing_sources + [source]
+
+    # Update citation count if new source provides better data
+    new_citation_count, is_reliable = validate_citation_count(
+        result.get("citations", 0), result.get("source", "unknown")
+    )
+    if is_reliable and new_citation_count > paper.citation_count:
+        paper.citation_count = new_citation_count
+        paper.citation_source = result.get("source", "unknown")
+        paper.citation_last_updated = timezone.now()
+
+    # Update missing fields
+    if not paper.abstract and result.get("abstract"):
+        paper.abstract = result["abstract"]
+    if not paper.pdf_url and result.get("pdf_url"):
+        paper.pdf_url = result["pdf_url"]
+    for field in ("doi", "pmid", "arxiv_id"):
+        if not getattr(paper, field) and _identifier(result, field):
+            setattr(paper, field, _identifier(result, field))
+
+
+def _new_paper(result: Dict, journals: Dict[str, Journal]) -> SearchIndex:
+    citation_count = validate_citation_count(
+        result.get("citations", 0), result.get("source", "unknown")
+    )[0]
+    return SearchIndex(
+        title=result["title"],
+        abstract=result.get("abstract", ""),
+        publication_date=_publication_date(result),
+        journal=journals.get(result.get("journal")),
+        pdf_url=result.get("pdf_url", ""),
+        doi=_identifier(result, "doi"),
+        pmid=_identifier(result, "pmid"),
+        arxiv_id=_identifier(result, "arxiv_id"),
+        citation_count=citation_count,
+        citation_source=result.get("source", "unknown"),
+        citation_last_updated=timezone.now() if citation_count > 0 else None,
+        is_open_access=result.get("is_open_access", False),
+        source=result.get("source", "web"),
+        source_engines=_source_engines(result),
+        relevance_score=1.0,
+    )
+
+
+def _get_or_create_journals(names) -> Dict[str, Journal]:
+    names = {name for name in names if name}
+    if not names:
+        return {}
+    existing = {j.name: j for j in Journal.objects.filter(name__in=names)}
+    missing = [
+        Journal(name=name, abbreviation=name[:10])
+        for name in names
+        if name not in existing
+    ]
+    if missing:
+        Journal.objects.bulk_create(missing, ignore_conflicts=True)
+        existing.update(
+            {
+                j.name: j
+                for j in Journal.objects.filter(name__in=[j.name for j in missing])
+            }
+        )
+    return existing
+
+
+def _link_authors(author_lists: Dict[SearchIndex, List[tuple]]) -> None:
+    """Create missing authors and AuthorPaper links for all papers at once."""
+    pairs = {pair for names in author_lists.values() for pair in names}
+    if not pairs:
+        return
+
+    authors = {}
+    for author in Author.objects.filter(
+        first_name__in={first for first, _ in pairs},
+        last_name__in={last for _, last in pairs},
+    ).order_by("created_at"):
+        authors.setdefault((author.first_name, author.last_name), author)
+
+    missing = [
+        Author(first_name=first, last_name=last, email="")
+        for first, last in pairs
+        if (first, last) not in authors
+    ]
+    Author.objects.bulk_create(missing)
+    authors.update({(a.first_name, a.last_name): a for a in missing})
+
+    links = [
+        AuthorPaper(author=authors[pair], paper=paper, author_order=order)
+        for paper, names in author_lists.items()
+        for order, pair in enumerate(names, start=1)
+    ]
+    AuthorPaper.objects.bulk_create(links, ignore_conflicts=True)
+
+
+def bulk_store_search_results(results: List[Dict]) -> List[SearchIndex]:
+    """
+    Store search results in the SearchIndex with deduplication.
+
+    Returns the stored SearchIndex row for each input result, in order.
+    Results that resolve to the same paper (within the batch or in the
+    database) share one row.
+    """
+    if not results:
+        return []
+
+    try:
+        with transaction.atomic():
+            existing = _ExistingPapers(results)
+            journals = _get_or_create_journals(
+                r.get("journal") for r in results if not existing.match(r)
+            )
+
+            stored, to_create, to_update, author_lists = [], [], {}, {}
+            for result in results:
+                paper = existing.match(result)
+                if paper is None:
+                    paper = _new_paper(result, journals)
+                    existing.remember(paper)
+                    to_create.append(paper)
+                    author_lists[paper] = parse_author_names(result.get("authors"))
+                elif paper._state.adding:
+                    # Duplicate of a paper created earlier in this batch
+                    _merge_into_existing(paper, result)
+                else:
+                    _merge_into_existing(paper, result)
+                    to_update[paper.pk] = paper
+                stored.append(paper)
+
+            SearchIndex.objects.bulk_create(to_create)
+
+            if to_update:
+                now = timezone.now()
+                for paper in to_update.values():
+                    paper.updated_at = now
+                SearchIndex.objects.bulk_update(
+                    list(to_update.values()), PAPER_UPDATE_FIELDS, batch_size=500
+                )
+
+                # Existing papers without authors get them from this result set
+                with_authors = set(
+                    AuthorPaper.objects.filter(paper_id__in=to_update).values_list(
+                        "paper_id", flat=True
+                    )
+                )
+                for result, paper in zip(results, stored, strict=True):
+                    if paper.pk in to_update and paper.pk not in with_authors:
+                        names = parse_author_names(result.get("authors"))
+                        if names:
+                            author_lists.setdefault(paper, names)
+
+            _link_authors(author_lists)
+            update_search_vectors({paper.pk for paper in stored})
+
+        # bulk_create/bulk_update send no signals; flag the rollup days here.
+        # The papers are committed, so a cache failure must not reach the
+        # fallback below.
+        try:
+            mark_dirty({day_of(paper.created_at) for paper in stored})
+        except Exception as e:
+            # The next --full refresh repairs a missed marker
+            logger.warning(f"Could not mark rollup days dirty: {e}")
+
+        logger.info(
+            f"Stored {len(results)} search results: {len(to_create)} new, "
+            f"{len(to_update)} updated papers"
+        )
+        return stored
+
+    except Exception as e:
+        logger.error(f"Error storing search results: {e}")
+        # Return minimal paper objects if storage fails
+        return SearchIndex.objects.bulk_create(
+            [
+                SearchIndex(
+                    title=result.get("title", "Unknown Title"),
+                    abstract=result.get("abstract", ""),
+                    doi=None,  # Ensure unique constraint compliance
+                    pmid=None,  # Ensure unique constraint compliance
+                    arxiv_id=None,  # Ensure unique constraint compliance
+                    relevance_score=1.0,
+                )
+                for result in results
+            ]
+        )
+
+
+def _store_in_background(results: List[Dict]) -> None:
+    close_old_connections()
+    try:
+        bulk_store_search_results(results)
+    except Exception as e:
+        logger.error(f"Background search result ingestion failed: {e}")
+    finally:
+        close_old_connections()
+
+
+def schedule_bulk_store(results: List[Dict]) -> None:
+    """
+    Store results on a background worker after the current transaction commits.
+
+    Use when the caller does not need the stored paper IDs, so the response
+    is not delayed by the writes.
+    """
+    if not results:
+        return
+    results = list(results)
+    transaction.on_commit(
+        lambda: _background_executor.submit(_store_in_background, results)
+    )
+
+
+__all__ = [
+    "bulk_store_search_results",
+    "schedule_bulk_store",
+    "parse_author_names",
+    "validate_citation_count",
+]
+
+# EOF
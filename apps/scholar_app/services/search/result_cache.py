@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared cache for external scholar search fan-out.
+
+Results of a SciTeX-Scholar parallel search are cached per
+(normalized query, sources, filters) in the Django cache (Redis in
+production, so every worker shares them), with a small bounded LRU in
+front of it for the hottest queries of the current process.
+
+Entries are stored per search engine: when a refresh only gets answers
+from some engines (one timed out or errored), the other engines' previous
+results are kept instead of being thrown away.
+
+Freshness follows stale-while-revalidate: within ``fresh_ttl`` a hit is
+served as-is; within ``fresh_ttl + stale_ttl`` the stale results are
+served immediately and one background refresh is started (deduplicated
+across processes with a cache lock); after that the query is a miss.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+FetchResult = Tuple[List[Dict], Iterable[str]]
+
+METRIC_NAMES = ("hits", "stale_hits", "misses", "refreshes", "refresh_errors")
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query."""
+    return " ".join((query or "").casefold().split())
+
+
+class SearchResultCache:
+    """TTL- and size-bounded, per-engine cache for external search results."""
+
+    def __init__(
+        self,
+        prefix: str = "scholar_search",
+        fresh_ttl: int = 3600,
+        stale_ttl: int = 86400,
+        max_local_entries: int = 256,
+        max_results_per_engine: int = 500,
+        revalidate_lock_timeout: int = 120,
+    ):
+        self.prefix = prefix
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.max_local_entries = max_local_entries
+        self.max_results_per_engine = max_results_per_engine
+        self.revalidate_lock_timeout = revalidate_lock_timeout
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def make_key(self, query: str, sources=None, filters=None, **extra) -> str:
+        """Stable key for (normalized query, sources, filters, extra params)."""
+        if isinstance(sources, str):
+            sources = sources.split(",")
+        payload = {
+            "q": normalize_query(query),
+            "sources": sorted(s.strip() for s in (sources or []) if s.strip()),
+            "filters": {k: v for k, v in (filters or {}).items() if v},
+            **extra,
+        }
+        raw = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+    def _manifest_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def _engine_key(self, key: str, engine: str) -> str:
+        return f"{self.prefix}:{key}:engine:{engine}"
+
+    def _metric_key(self, name: str) -> str:
+        return f"{self.prefix}:metrics:{name}"
+
+    # ------------------------------------------------------------------
+    # Read / write
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Tuple[Optional[List[Dict]], str]:
+        """
+        Look up cached results.
+
+        Returns (results, state) where state is "fresh", "stale" or "miss".
+        """
+        with self._lock:
+            local = self._local.get(key)
+            if local is not None:
+                self._local.move_to_end(key)
+
+        if local is not None:
+            stored_at, results = local
+            state = self._state(stored_at)
+            if state != "miss":
+                return results, state
+
+        manifest = cache.get(self._manifest_key(key))
+        if not manifest:
+            return None, "miss"
+        state = self._state(manifest["stored_at"])
+        if state == "miss":
+            return None, "miss"
+
+        entries = cache.get_many(
+            [self._engine_key(key, engine) for engine in manifest["engines"]]
+        )
+        if not entries:
+            return None, "miss"
+        results = self._merge(entries.values())
+        self._remember(key, manifest["stored_at"], results)
+        return results, state
+
+    def set(self, key: str, results: List[Dict], engines_used: Iterable[str]) -> None:
+        """
+        Store results, replacing only the engines that answered this time.
+
+        Engines that did not answer keep their previous entry (if still
+        cached). Nothing is written when no engine answered, so a failed
+        fan-out never overwrites good results.
+        """
+        engines_used = [e for e in engines_used or [] if e]
+        buckets = self._split_by_engine(results, engines_used)
+        if not buckets:
+            return
+
+        timeout = self.fresh_ttl + self.stale_ttl
+        cache.set_many(
+            {
+                self._engine_key(key, engine): entries[: self.max_results_per_engine]
+                for engine, entries in buckets.items()
+            },
+            timeout,
+        )
+
+        previous = cache.get(self._manifest_key(key)) or {}
+        engines = list(buckets)
+        engines += [e for e in previous.get("engines", []) if e not in buckets]
+        stored_at = time.time()
+        cache.set(
+            self._manifest_key(key),
+            {"stored_at": stored_at, "engines": engines},
+            timeout,
+        )
+
+        merged = self._merge(
+            cache.get_many([self._engine_key(key, e) for e in engines]).values()
+        )
+        self._remember(key, stored_at, merged)
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], FetchResult]) -> List[Dict]:
+        """
+        Return cached results for ``key``, calling ``fetch`` on a miss.
+
+        ``fetch`` returns (results, engines_used). On a stale hit the stale
+        results are returned immediately and ``fetch`` runs in the background.
+        """
+        results, state = self.get(key)
+        if state == "fresh":
+            self._incr("hits")
+            return results
+        if state == "stale":
+            self._incr("stale_hits")
+            self._revalidate_in_background(key, fetch)
+            return results
+
+        self._incr("misses")
+        results, engines_used = fetch()
+        self.set(key, results, engines_used)
+        return results
+
+    def invalidate(self, key: str) -> None:
+        """Drop a cached query (all engines) from every tier."""
+        with self._lock:
+            self._local.pop(key, None)
+        manifest = cache.get(self._manifest_key(key)) or {}
+        cache.delete_many(
+            [self._manifest_key(key)]
+            + [self._engine_key(key, e) for e in manifest.get("engines", [])]
+        )
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict:
+        """Shared hit/miss counters plus this process's local cache size."""
+        values = cache.get_many([self._metric_key(n) for n in METRIC_NAMES])
+        stats = {n: values.get(self._metric_key(n), 0) for n in METRIC_NAMES}
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_rate"] = (
+            (stats["hits"] + stats["stale_hits"]) / lookups if lookups else 0.0
+        )
+        with self._lock:
+            stats["local_entries"] = len(self._local)
+        return stats
+
+    def _incr(self, name: str) -> None:
+        key = self._metric_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Counter missing (first use or evicted); add() avoids clobbering
+            # a concurrent initialisation from another worker.
+            if not cache.add(key, 1, None):
+                cache.incr(key)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _state(self, stored_at: float) -> str:
+        age = time.time() - stored_at
+        if age < self.fresh_ttl:
+            return "fresh"
+        if age < self.fresh_ttl + self.stale_ttl:
+            return "stale"
+        return "miss"
+
+    def _remember(self, key: str, stored_at: float, results: List[Dict]) -> None:
+        with self._lock:
+            self._local[key] = (stored_at, results)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+
+    @staticmethod
+    def _split_by_engine(
+        results: List[Dict], engines_used: List[str]
+    ) -> Dict[str, List[Tuple[int, Dict]]]:
+        """Bucket (rank, result) pairs by the engine credited with each result."""
+        buckets = {engine: [] for engine in engines_used}
+        for rank, result in enumerate(results):
+            found_by = result.get("source_engines") or []
+            engine = next((e for e in found_by if e in buckets), None)
+            if engine is None:
+                engine = found_by[0] if found_by else result.get("source", "unknown")
+                buckets.setdefault(engine, [])
+            buckets[engine].append((rank, result))
+        return {engine: entries for engine, entries in buckets.items() if entries}
+
+    @staticmethod
+    def _merge(engine_entries: Iterable[List[Tuple[int, Dict]]]) -> List[Dict]:
+        """Merge per-engine buckets back into one ranked, de-duplicated list."""
+        ranked = sorted(
+            (entry for entries in engine_entries for entry in entries),
+            key=lambda entry: entry[0],
+        )
+        seen = set()
+        merged = []
+        for _, result in ranked:
+            identity = (
+                result.get("doi")
+                or result.get("pmid")
+                or result.get("arxiv_id")
+                or normalize_query(result.get("title", ""))
+            )
+            if identity in seen:
+                continue
+            seen.add(identity)
+            merged.append(result)
+        return merged
+
+    def _revalidate_in_background(
+        self, key: str, fetch: Callable[[], FetchResult]
+    ) -> None:
+        lock_key = f"{self.prefix}:{key}:revalidating"
+        if not cache.add(lock_key, 1, self.revalidate_lock_timeout):
+            return  # Another worker is already refreshing this query
+
+        def _revalidate():
+            try:
+                results, engines_used = fetch()
+                self.set(key, results, engines_used)
+                self._incr("refreshes")
+            except Exception as e:
+                self._incr("refresh_errors")
+                logger.warning(f"Background search refresh failed: {e}")
+            finally:
+                cache.delete(lock_key)
+
+        threading.Thread(target=_revalidate, daemon=True).start()
+
+
+search_result_cache = SearchResultCache(
+    fresh_ttl=getattr(settings, "SCITEX_SCHOLAR_SEARCH_CACHE_TTL", 3600),
+    stale_ttl=getattr(settings, "SCITEX_SCHOLAR_SEARCH_CACHE_STALE_TTL", 86400),
+    max_local_entries=getattr(settings, "SCITEX_SCHOLAR_SEARCH_CACHE_MAX_ENTRIES", 256),
+)
+
+
+__all__ = [
+    "SearchResultCache",
+    "normalize_query",
+    "search_result_cache",
+]
+
+# EOF
@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Precomputed paper similarity for recommendations.
+
+Scoring every candidate against a paper at request time costs several
+queries per candidate. Instead, the whole active SearchIndex is turned into
+sparse matrices once per refresh:
+
+    topics      papers x topics incidence
+    authors     papers x authors incidence
+    journals    papers x journals one-hot
+    citations   papers x papers (citing -> cited)
+    text        papers x terms, L2-normalized TF-IDF over title + abstract
+
+and pairwise scores for a block of papers against all papers come out of a
+handful of sparse matrix products. The weights follow the original
+per-pair scoring (topics 0.3, authors 0.25, journal 0.15, citation
+relationship 0.2, text 0.1, plus small date/impact bonuses). The top-k
+neighbors of each paper are stored in PaperNeighbor, so a recommendation
+is a single indexed lookup.
+
+Papers whose ``neighbors_updated_at`` is NULL are picked up by
+``refresh_neighbors``: their rows are computed against the full corpus and,
+because the score is symmetric, the same block also updates the neighbor
+lists of existing papers the new ones now belong in.
+"""
+
+import logging
+import math
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from scipy import sparse
+
+from ...models import AuthorPaper, Citation, Journal, PaperNeighbor, SearchIndex
+
+logger = logging.getLogger(__name__)
+
+WEIGHTS = {
+    "topics": 0.3,
+    "authors": 0.25,
+    "journal": 0.15,
+    "citation": 0.2,
+    "text": 0.1,
+}
+MIN_SCORE = 0.1
+DEFAULT_TOP_K = 20
+DEFAULT_BATCH_SIZE = 512
+
+# Terms in more than this share of papers carry no signal (and would make
+# the text product dense); only applied once the corpus is large enough
+MAX_DOCUMENT_FREQUENCY = 0.5
+MIN_DOCS_FOR_MAX_DF = 50
+
+TOKEN_PATTERN = re.compile(r"\b[a-z][a-z0-9]{3,}\b")
+STOPWORDS = frozenset(
+    "about above after also among based been before below between both could "
+    "data does during each from have into more most much only other over paper "
+    "results same should show shown some such than that their them then there "
+    "these they this those through under using very were what when which while "
+    "will with within without would".split()
+)
+
+
+@dataclass
+class PaperFeatures:
+    """Sparse feature matrices for one snapshot of the active corpus."""
+
+    ids: List
+    row: Dict
+    topics: sparse.csr_matrix
+    authors: sparse.csr_matrix
+    journals: sparse.csr_matrix
+    journal_ids: List
+    citations: sparse.csr_matrix
+    text: sparse.csr_matrix
+    days: np.ndarray
+    citation_counts: np.ndarray
+
+    def __len__(self):
+        return len(self.ids)
+
+
+# ----------------------------------------------------------------------
+# Feature extraction
+# ----------------------------------------------------------------------
+
+
+def _incidence(pairs: Iterable[Tuple], row: Dict, n_rows: int) -> sparse.csr_matrix:
+    """Binary papers x items matrix from (paper_id, item_id) pairs."""
+    columns = {}
+    rows, cols = [], []
+    for paper_id, item_id in pairs:
+        r = row.get(paper_id)
+        if r is None or item_id is None:
+            continue
+        rows.append(r)
+        cols.append(columns.setdefault(item_id, len(columns)))
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(n_rows, max(len(columns), 1)),
+    )
+    matrix.sum_duplicates()
+    matrix.data[:] = 1.0
+    return matrix
+
+
+def _tfidf(texts: List[str]) -> sparse.csr_matrix:
+    """L2-normalized TF-IDF matrix (smoothed idf, as in scikit-learn)."""
+    vocabulary = {}
+    indptr, indices, counts = [0], [], []
+    for text in texts:
+        terms = defaultdict(int)
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            if token not in STOPWORDS:
+                terms[vocabulary.setdefault(token, len(vocabulary))] += 1
+        indices.extend(terms)
+        counts.extend(terms.values())
+        indptr.append(len(indices))
+
+    n_docs = len(texts)
+    tf = sparse.csr_matrix(
+        (np.asarray(counts, dtype=np.float32), indices, indptr),
+        shape=(n_docs, max(len(vocabulary), 1)),
+    )
+    df = np.bincount(tf.indices, minlength=tf.shape[1])
+    idf = np.log((1 + n_docs) / (1 + df)) + 1
+    if n_docs >= MIN_DOCS_FOR_MAX_DF:
+        idf[df > MAX_DOCUMENT_FREQUENCY * n_docs] = 0
+    matrix = tf @ sparse.diags(idf.astype(np.float32))
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    matrix = sparse.diags(1 / norms) @ matrix
+    matrix.eliminate_zeros()
+    return matrix.tocsr()
+
+
+def build_features(queryset=None) -> PaperFeatures:
+    """
+    Load the corpus into sparse matrices with a fixed number of queries.
+
+    ``queryset`` defaults to all active papers; every paper that may be
+    recommended must be part of it.
+    """
+    if queryset is None:
+        queryset = SearchIndex.objects.filter(status="active")
+
+    ids, texts, journal_codes, days, citation_counts = [], [], [], [], []
+    journal_index = {}
+    for paper_id, title, abstract, journal_id, published, cites in (
+        queryset.order_by()
+        .values_list(
+            "id",
+            "title",
+            "abstract",
+            "journal_id",
+            "publication_date",
+            "citation_count",
+        )
+        .iterator(chunk_size=5000)
+    ):
+        ids.append(paper_id)
+        texts.append(f"{title or ''} {abstract or ''}")
+        journal_codes.append(
+            journal_index.setdefault(journal_id, len(journal_index))
+            if journal_id
+            else -1
+        )
+        days.append(published.toordinal() if published else math.nan)
+        citation_counts.append(cites or 0)
+
+    row = {paper_id: i for i, paper_id in enumerate(ids)}
+    n = len(ids)
+
+    has_journal = np.asarray(journal_codes) >= 0 if n else np.zeros(0, dtype=bool)
+    journals = sparse.csr_matrix(
+        (
+            np.ones(int(has_journal.sum()), dtype=np.float32),
+            (np.flatnonzero(has_journal), np.asarray(journal_codes)[has_journal]),
+        ),
+        shape=(n, max(len(journal_index), 1)),
+    )
+
+    topic_through = SearchIndex.topics.through
+    topics = _incidence(
+        topic_through.objects.values_list("searchindex_id", "topic_id").iterator(
+            chunk_size=10000
+        ),
+        row,
+        n,
+    )
+    authors = _incidence(
+        AuthorPaper.objects.values_list("paper_id", "author_id").iterator(
+            chunk_size=10000
+        ),
+        row,
+        n,
+    )
+
+    citing, cited = [], []
+    for citing_id, cited_id in Citation.objects.values_list(
+        "citing_paper_id", "cited_paper_id"
+    ).iterator(chunk_size=10000):
+        if citing_id in row and cited_id in row:
+            citing.append(row[citing_id])
+            cited.append(row[cited_id])
+    citations = sparse.csr_matrix(
+        (np.ones(len(citing), dtype=np.float32), (citing, cited)), shape=(n, n)
+    )
+    citations.sum_duplicates()
+    citations.data[:] = 1.0
+
+    return PaperFeatures(
+        ids=ids,
+        row=row,
+        topics=topics,
+        authors=authors,
+        journals=journals,
+        journal_ids=list(journal_index),
+        citations=citations,
+        text=_tfidf(texts),
+        days=np.asarray(days, dtype=np.float64),
+        citation_counts=np.asarray(citation_counts, dtype=np.int64),
+    )
+
+
+# ----------------------------------------------------------------------
+# Scoring
+# ----------------------------------------------------------------------
+
+
+def _overlap(matrix: sparse.csr_matrix, rows: np.ndarray) -> sparse.csr_matrix:
+    """Shared-item counts divided by the larger item count of each pair."""
+    common = (matrix[rows] @ matrix.T).tocoo()
+    sizes = np.asarray(matrix.sum(axis=1)).ravel()
+    denominator = np.maximum(np.maximum(sizes[rows[common.row]], sizes[common.col]), 1)
+    return sparse.csr_matrix(
+        (common.data / denominator, (common.row, common.col)), shape=common.shape
+    )
+
+
+def _components(features: PaperFeatures, rows: np.ndarray) -> Dict:
+    """Per-signal B x n similarity matrices for a block of source rows."""
+    citations = features.citations
+    direct = citations[rows] + citations.T[rows]
+    co_cited = citations[rows] @ citations.T
+    co_cited.data = (co_cited.data >= 2).astype(np.float32)
+    related = direct + co_cited
+    related.data[:] = 1.0
+    related.eliminate_zeros()
+
+    return {
+        "topics": _overlap(features.topics, rows),
+        "topics_shared": (features.topics[rows] @ features.topics.T).tocsr(),
+        "authors": _overlap(features.authors, rows),
+        "authors_shared": (features.authors[rows] @ features.authors.T).tocsr(),
+        "journal": (features.journals[rows] @ features.journals.T).tocsr(),
+        "citation": related.tocsr(),
+        "text": (features.text[rows] @ features.text.T).tocsr(),
+    }
+
+
+def score_block(features: PaperFeatures, rows: np.ndarray) -> Tuple:
+    """
+    Score a block of source rows against the whole corpus.
+
+    Returns (scores, components): a B x n sparse matrix holding only pairs
+    above MIN_SCORE (self-pairs removed), plus the per-signal matrices used
+    to explain them.
+    """
+    rows = np.asarray(rows)
+    components = _components(features, rows)
+    scores = sum(WEIGHTS[name] * components[name] for name in WEIGHTS).tocoo()
+
+    # Date and impact bonuses only matter for pairs that already overlap:
+    # together they are worth at most MIN_SCORE
+    source = rows[scores.row]
+    days_apart = np.abs(features.days[source] - features.days[scores.col])
+    bonus = np.where(days_apart < 365, 0.05, np.where(days_apart < 730, 0.02, 0.0))
+    cites_apart = np.abs(
+        features.citation_counts[source] - features.citation_counts[scores.col]
+    )
+    bonus += np.where(cites_apart < 10, 0.05, 0.0)
+    data = np.minimum(scores.data + bonus, 1.0)
+
+    keep = (data > MIN_SCORE) & (source != scores.col)
+    scores = sparse.csr_matrix(
+        (data[keep], (scores.row[keep], scores.col[keep])), shape=scores.shape
+    )
+    return scores, components
+
+
+def top_k(scores: sparse.csr_matrix, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Per row, the (columns, scores) of the k best entries, best first."""
+    best = []
+    for i in range(scores.shape[0]):
+        start, end = scores.indptr[i], scores.indptr[i + 1]
+        cols, data = scores.indices[start:end], scores.data[start:end]
+        if len(data) > k:
+            part = np.argpartition(-data, k - 1)[:k]
+            cols, data = cols[part], data[part]
+        order = np.lexsort((cols, -data))
+        best.append((cols[order], data[order]))
+    return best
+
+
+def _reason(components: Dict, i: int, col: int, journal_name: Optional[str]) -> str:
+    """Human-readable explanation for one scored pair."""
+    reasons = []
+    topics = int(components["topics_shared"][i, col])
+    if topics:
+        reasons.append(f"{topics} shared topics")
+    authors = int(components["authors_shared"][i, col])
+    if authors:
+        reasons.append(f"{authors} shared authors")
+    if components["journal"][i, col] and journal_name:
+        reasons.append(f"Same journal: {journal_name}")
+    if components["citation"][i, col]:
+        reasons.append("Citation relationship")
+    if components["text"][i, col] > 0.3:
+        reasons.append("Similar content")
+    return ("; ".join(reasons) or "General similarity")[:255]
+
+
+def _journal_names(features: PaperFeatures) -> Dict:
+    return dict(
+        Journal.objects.filter(id__in=features.journal_ids).values_list("id", "name")
+    )
+
+
+def _paper_journal(features: PaperFeatures, index: int):
+    codes = features.journals[index].indices
+    return features.journal_ids[codes[0]] if len(codes) else None
+
+
+# ----------------------------------------------------------------------
+# Neighbor table maintenance
+# ----------------------------------------------------------------------
+
+
+def _block_neighbors(features, rows, k, journal_names):
+    """Top-k (neighbor_row, score, reason) lists for each row of a block."""
+    scores, components = score_block(features, rows)
+    neighbors = {}
+    for i, (cols, values) in enumerate(top_k(scores, k)):
+        journal = journal_names.get(_paper_journal(features, rows[i]))
+        neighbors[rows[i]] = [
+            (int(col), float(score), _reason(components, i, col, journal))
+            for col, score in zip(cols, values, strict=True)
+        ]
+    return scores, components, neighbors
+
+
+def _write_neighbors(features, neighbors: Dict, now) -> None:
+    """Replace the PaperNeighbor rows of every source in ``neighbors``."""
+    source_ids = [features.ids[r] for r in neighbors]
+    with transaction.atomic():
+        PaperNeighbor.objects.filter(source_id__in=source_ids).delete()
+        PaperNeighbor.objects.bulk_create(
+            [
+                PaperNeighbor(
+                    source_id=features.ids[source],
+                    neighbor_id=features.ids[col],
+                    rank=rank,
+                    score=round(score, 4),
+                    reason=reason,
+                )
+                for source, entries in neighbors.items()
+                for rank, (col, score, reason) in enumerate(entries)
+            ],
+            batch_size=2000,
+        )
+        SearchIndex.objects.filter(id__in=source_ids).update(neighbors_updated_at=now)
+
+
+def _batched(items: List, size: int):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def rebuild_neighbors(
+    top_k_neighbors: int = DEFAULT_TOP_K,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    features: Optional[PaperFeatures] = None,
+) -> int:
+    """Recompute the neighbor lists of every active paper. Returns papers done."""
+    features = features or build_features()
+    journal_names = _journal_names(features)
+    now = timezone.now()
+
+    for rows in _batched(list(range(len(features))), batch_size):
+        _, _, neighbors = _block_neighbors(
+            features, np.asarray(rows), top_k_neighbors, journal_names
+        )
+        _write_neighbors(features, neighbors, now)
+
+    # Papers that left the active set keep no stale recommendations
+    PaperNeighbor.objects.exclude(source__status="active").delete()
+    return len(features)
+
+
+def refresh_neighbors(
+    paper_ids: Optional[Iterable] = None,
+    top_k_neighbors: int = DEFAULT_TOP_K,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    features: Optional[PaperFeatures] = None,
+) -> int:
+    """
+    Incrementally add papers to the neighbor table.
+
+    Computes neighbor lists for ``paper_ids`` (default: active papers never
+    processed) and inserts them into the lists of existing papers where
+    they now rank in the top k. Returns the number of papers processed.
+    """
+    if paper_ids is None:
+        paper_ids = SearchIndex.objects.filter(
+            status="active", neighbors_updated_at__isnull=True
+        ).values_list("id", flat=True)
+    paper_ids = list(paper_ids)
+    if not paper_ids:
+        return 0
+
+    features = features or build_features()
+    pending = [features.row[pid] for pid in paper_ids if pid in features.row]
+    pending_set = set(pending)
+    journal_names = _journal_names(features)
+    now = timezone.now()
+
+    for rows in _batched(pending, batch_size):
+        rows = np.asarray(rows)
+        scores, components, neighbors = _block_neighbors(
+            features, rows, top_k_neighbors, journal_names
+        )
+
+        # Scores are symmetric: column j of this block is how well each new
+        # paper fits existing paper j
+        candidates = defaultdict(list)
+        by_column = scores.tocsc()
+        for col in np.unique(by_column.indices):
+            if col in pending_set:
+                continue
+            start, end = by_column.indptr[col], by_column.indptr[col + 1]
+            for i, score in zip(
+                by_column.indices[start:end], by_column.data[start:end], strict=True
+            ):
+                candidates[int(col)].append((int(i), float(score)))
+
+        neighbors.update(
+            _merge_reverse_candidates(
+                features,
+                rows,
+                components,
+                candidates,
+                top_k_neighbors,
+                journal_names,
+            )
+        )
+        _write_neighbors(features, neighbors, now)
+
+    return len(pending)
+
+
+def _merge_reverse_candidates(
+    features, rows, components, candidates, k, journal_names
+) -> Dict:
+    """Merge new papers into existing neighbor lists they now belong in."""
+    if not candidates:
+        return {}
+
+    existing = defaultdict(list)
+    for chunk in _batched(list(candidates), 2000):
+        for source_id, neighbor_id, score, reason in (
+            PaperNeighbor.objects.filter(source_id__in=[features.ids[c] for c in chunk])
+            .order_by("source_id", "rank")
+            .values_list("source_id", "neighbor_id", "score", "reason")
+        ):
+            if neighbor_id in features.row:
+                existing[features.row[source_id]].append(
+                    (features.row[neighbor_id], score, reason)
+                )
+
+    updated = {}
+    for col, entries in candidates.items():
+        current = existing.get(col, [])
+        floor = current[-1][1] if len(current) >= k else -1.0
+        better = [(i, score) for i, score in entries if score > floor]
+        if not better:
+            continue
+
+        journal = journal_names.get(_paper_journal(features, col))
+        known = {neighbor for neighbor, _, _ in current}
+        merged = list(current) + [
+            (int(rows[i]), score, _reason(components, i, col, journal))
+            for i, score in better
+            if int(rows[i]) not in known
+        ]
+        merged.sort(key=lambda entry: -entry[1])
+        updated[col] = merged[:k]
+    return updated
+
+
+# ----------------------------------------------------------------------
+# Lookup
+# ----------------------------------------------------------------------
+
+
+def similar_papers(paper, exclude_ids=None, limit: int = 10) -> List[Tuple]:
+    """Precomputed (paper, score, reason) neighbors, best first, in one query."""
+    neighbors = (
+        PaperNeighbor.objects.filter(source=paper, neighbor__status="active")
+        .select_related("neighbor__journal")
+        .order_by("rank")
+    )
+    if exclude_ids:
+        neighbors = neighbors.exclude(neighbor_id__in=exclude_ids)
+    return [(n.neighbor, n.score, n.reason) for n in neighbors[:limit]]
+
+
+def similar_papers_for_many(
+    paper_ids, exclude_ids=None, limit: int = 10
+) -> List[Tuple]:
+    """Best neighbors across several source papers, de-duplicated, in one query."""
+    neighbors = (
+        PaperNeighbor.objects.filter(
+            source_id__in=list(paper_ids), neighbor__status="active"
+        )
+        .exclude(neighbor_id__in=list(exclude_ids or []) + list(paper_ids))
+        .select_related("neighbor__journal")
+        .order_by("-score")
+    )
+    seen, results = set(), []
+    for n in neighbors[: limit * 4]:
+        if n.neighbor_id in seen:
+            continue
+        seen.add(n.neighbor_id)
+        results.append((n.neighbor, n.score, n.reason))
+        if len(results) == limit:
+            break
+    return results
+
+
+__all__ = [
+    "DEFAULT_TOP_K",
+    "PaperFeatures",
+    "build_features",
+    "rebuild_neighbors",
+    "refresh_neighbors",
+    "score_block",
+    "similar_papers",
+    "similar_papers_for_many",
+    "top_k",
+]
+
+# EOF
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming support for external scholar search.
+
+The parallel pipeline only returns once every engine has answered (or timed
+out), so the slowest engine sets the latency of the whole page. Streaming
+runs one single-engine pipeline per engine and hands each engine's batch to
+the client as soon as it completes.
+
+``IncrementalResultMerger`` de-duplicates across batches as they arrive: a
+paper seen for the first time becomes a new card, and a late duplicate from
+a slower engine is merged into the card that is already on screen.
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .result_cache import normalize_query
+
+# Fields a later engine may fill in when the first engine left them empty
+FILLABLE_FIELDS = (
+    "abstract",
+    "full_abstract",
+    "snippet",
+    "doi",
+    "pmid",
+    "arxiv_id",
+    "pdf_url",
+    "external_url",
+    "journal",
+    "impact_factor",
+)
+
+PLACEHOLDER_VALUES = ("", None, "Unknown Journal", "No abstract available.")
+
+
+def pipeline_filters(filters: Optional[Dict]) -> Dict:
+    """Translate view filters into SciTeX-Scholar pipeline filters."""
+    search_filters = {}
+    if filters:
+        if filters.get("year_from"):
+            search_filters["year_start"] = filters["year_from"]
+        if filters.get("year_to"):
+            search_filters["year_end"] = filters["year_to"]
+        if filters.get("min_citations"):
+            search_filters["min_citations"] = filters["min_citations"]
+        if filters.get("min_impact_factor"):
+            search_filters["min_impact_factor"] = filters["min_impact_factor"]
+        if filters.get("open_access"):
+            search_filters["open_access"] = filters["open_access"]
+    return search_filters
+
+
+def paper_to_result(paper: Dict) -> Dict:
+    """Convert a pipeline paper dict into the result dict used by the views."""
+    authors = paper.get("authors", [])
+    authors_str = ", ".join(authors) if isinstance(authors, list) else str(authors)
+    abstract = paper.get("abstract")
+
+    return {
+        "title": paper.get("title", "Unknown Title"),
+        "authors": authors_str,
+        "year": paper.get("year", "2024"),
+        "journal": paper.get("journal", "Unknown Journal"),
+        "abstract": abstract or "No abstract available.",
+        "full_abstract": abstract or "",
+        "snippet": abstract[:200] + "..." if abstract else "No abstract available.",
+        "external_url": paper.get("external_url", ""),
+        "pdf_url": paper.get("pdf_url", ""),
+        "doi": paper.get("doi", ""),
+        "pmid": paper.get("pmid", ""),
+        "arxiv_id": paper.get("arxiv_id", ""),
+        "citations": paper.get("citation_count", 0),
+        "citation_count": paper.get("citation_count", 0),
+        "citation_source": (paper.get("source_engines") or ["scitex"])[0],
+        "is_open_access": paper.get("is_open_access", False),
+        "source": "scitex_parallel",
+        "source_engines": paper.get("source_engines", []),
+        "impact_factor": paper.get("impact_factor"),
+    }
+
+
+def result_identities(result: Dict) -> List[str]:
+    """Every key under which ``result`` can be recognised as a duplicate."""
+    identities = []
+    for field, prefix in (("doi", "doi"), ("pmid", "pmid"), ("arxiv_id", "arxiv")):
+        value = str(result.get(field) or "").strip().lower()
+        if value:
+            identities.append(f"{prefix}:{value}")
+    title = normalize_query(result.get("title", ""))
+    if title and title != "unknown title":
+        identities.append(f"title:{title}")
+    return identities
+
+
+class IncrementalResultMerger:
+    """
+    De-duplicate search results across batches that arrive one by one.
+
+    Each distinct paper gets a stable ``card_id``. ``add`` returns the
+    results that are new (to render as cards) and the updates for cards
+    that a late duplicate enriched (to patch in place).
+    """
+
+    def __init__(self):
+        self._cards: List[Dict] = []
+        self._by_identity: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def add(self, engine: str, results: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Merge one engine's batch; return (new_results, merged_updates)."""
+        new_results = []
+        new_indexes = set()
+        updates = {}
+        for result in results:
+            result = dict(result)
+            engines = list(result.get("source_engines") or [])
+            if engine and engine not in engines:
+                engines.append(engine)
+            result["source_engines"] = engines
+
+            identities = result_identities(result)
+            index = next(
+                (self._by_identity[i] for i in identities if i in self._by_identity),
+                None,
+            )
+            if index is None:
+                index = len(self._cards)
+                result["card_id"] = f"r{index}"
+                self._cards.append(result)
+                new_results.append(result)
+                new_indexes.add(index)
+            else:
+                changed = self._merge_into(self._cards[index], result)
+                # Cards first seen in this batch already carry the merge
+                if changed and index not in new_indexes:
+                    update = updates.setdefault(
+                        index, {"card_id": self._cards[index]["card_id"]}
+                    )
+                    update.update(changed)
+
+            for identity in result_identities(self._cards[index]):
+                self._by_identity.setdefault(identity, index)
+
+        return new_results, list(updates.values())
+
+    def results(self) -> List[Dict]:
+        """All merged results in the order they were first seen."""
+        return [
+            {k: v for k, v in card.items() if k != "card_id"} for card in self._cards
+        ]
+
+    @staticmethod
+    def _merge_into(card: Dict, duplicate: Dict) -> Dict:
+        """Fold ``duplicate`` into ``card``; return the fields that changed."""
+        changed = {}
+
+        engines = list(card.get("source_engines") or [])
+        for engine in duplicate.get("source_engines") or []:
+            if engine not in engines:
+                engines.append(engine)
+        if engines != card.get("source_engines"):
+            changed["source_engines"] = engines
+
+        for field in FILLABLE_FIELDS:
+            if (
+                card.get(field) in PLACEHOLDER_VALUES
+                and duplicate.get(field) not in PLACEHOLDER_VALUES
+            ):
+                changed[field] = duplicate[field]
+
+        citations = max(
+            card.get("citation_count") or 0, duplicate.get("citation_count") or 0
+        )
+        if citations != (card.get("citation_count") or 0):
+            changed["citation_count"] = changed["citations"] = citations
+
+        if duplicate.get("is_open_access") and not card.get("is_open_access"):
+            changed["is_open_access"] = True
+
+        card.update(changed)
+        return changed
+
+
+async def stream_engine_batches(
+    engine_pipelines: Dict[str, object],
+    query: str,
+    filters: Optional[Dict] = None,
+    max_results: int = 30,
+    run=None,
+) -> AsyncIterator[Tuple[str, List[Dict], Optional[str], float]]:
+    """
+    Run single-engine pipelines concurrently, yielding in completion order.
+
+    Yields (engine, results, error, elapsed_seconds) per engine. ``run``
+    wraps each pipeline coroutine into an awaitable (e.g. to execute it on
+    the shared pipeline loop); by default the coroutine is awaited directly.
+    Pending engines are cancelled if the consumer stops iterating.
+    """
+    if not engine_pipelines:
+        return
+
+    search_filters = pipeline_filters(filters)
+    per_engine_limit = max(10, max_results // len(engine_pipelines))
+    started = time.perf_counter()
+
+    async def _search(engine, pipeline):
+        coro = pipeline.search_async(
+            query=query,
+            search_fields=["title", "abstract"],
+            filters=search_filters,
+            max_results=per_engine_limit,
+        )
+        try:
+            response = await (run(coro) if run else coro)
+            papers = response.get("results", [])
+            return engine, [paper_to_result(p) for p in papers], None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return engine, [], str(e)
+
+    tasks = [
+        asyncio.ensure_future(_search(engine, pipeline))
+        for engine, pipeline in engine_pipelines.items()
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            engine, results, error = await next_done
+            yield engine, results, error, time.perf_counter() - started
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+__all__ = [
+    "IncrementalResultMerger",
+    "paper_to_result",
+    "pipeline_filters",
+    "result_identities",
+    "stream_engine_batches",
+]
+
+# EOF
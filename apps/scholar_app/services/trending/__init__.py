@@ -0,0 +1,25 @@
+"""
+Trending services - Materialized trending and analytics rollups
+"""
+
+from .rollups import (
+    day_of,
+    mark_dirty,
+    parse_keywords,
+    rebuild_day,
+    refresh_rollups,
+    research_analytics,
+    trending_authors,
+    trending_keywords,
+)
+
+__all__ = [
+    "day_of",
+    "mark_dirty",
+    "parse_keywords",
+    "rebuild_day",
+    "refresh_rollups",
+    "research_analytics",
+    "trending_authors",
+    "trending_keywords",
+]
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Materialized rollups behind the trending and analytics endpoints.
+
+Aggregates are partitioned by the day a paper was indexed
+(``SearchIndex.created_at``). Saving or deleting a paper marks its day
+dirty (see signals.py); ``refresh_rollups`` - run periodically by the
+``refresh_scholar_rollups`` command - rebuilds only the dirty days plus
+today, then refreshes the small corpus-wide tables. Rebuilding a whole day
+instead of incrementing counters keeps the rollups idempotent and
+race-free across workers; a periodic ``full=True`` run repairs anything
+that changed outside the dirty window.
+
+Readers (``trending_keywords``, ``trending_authors``, ``research_analytics``)
+only touch rollup tables, so their cost depends on the requested window,
+not on the size of the index.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+from django.db.models.functions import ExtractYear, TruncDate
+from django.utils import timezone
+
+from ...models import (
+    AnalyticsSnapshot,
+    Author,
+    AuthorDailyStat,
+    AuthorPaper,
+    Citation,
+    Journal,
+    JournalDailyStat,
+    KeywordDailyStat,
+    PaperDailyStat,
+    PublicationYearStat,
+    SearchIndex,
+    Topic,
+)
+
+logger = logging.getLogger(__name__)
+
+DIRTY_KEY_PREFIX = "scholar_rollups:dirty"
+# Days checked for dirty markers on each refresh; older edits wait for --full
+DIRTY_LOOKBACK_DAYS = 120
+ANALYTICS_SNAPSHOT = "research_analytics"
+MIN_KEYWORD_LENGTH = 3
+RECENT_TITLES_PER_AUTHOR = 3
+
+
+def _dirty_key(day) -> str:
+    return f"{DIRTY_KEY_PREFIX}:{day.isoformat()}"
+
+
+def day_of(moment) -> "datetime.date":
+    """Rollup day (local date) of a timestamp."""
+    return timezone.localdate(moment) if moment else timezone.localdate()
+
+
+def mark_dirty(days: Iterable = None) -> None:
+    """Mark ingestion days (default: today) for the next rollup refresh."""
+    days = set(days or [timezone.localdate()])
+    cache.set_many(
+        {_dirty_key(day): 1 for day in days},
+        timeout=(DIRTY_LOOKBACK_DAYS + 1) * 86400,
+    )
+
+
+def dirty_days(lookback_days: int = DIRTY_LOOKBACK_DAYS) -> List:
+    """Days marked dirty within the lookback window."""
+    today = timezone.localdate()
+    candidates = [today - timedelta(days=i) for i in range(lookback_days + 1)]
+    marked = cache.get_many([_dirty_key(day) for day in candidates])
+    return [day for day in candidates if _dirty_key(day) in marked]
+
+
+def parse_keywords(keywords: str) -> List[str]:
+    """Normalized, de-duplicated keywords of one paper."""
+    seen = []
+    for keyword in (keywords or "").split(","):
+        keyword = keyword.strip().lower()[:200]
+        if len(keyword) >= MIN_KEYWORD_LENGTH and keyword not in seen:
+            seen.append(keyword)
+    return seen
+
+
+# ----------------------------------------------------------------------
+# Rebuild
+# ----------------------------------------------------------------------
+
+
+def _day_papers(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return SearchIndex.objects.filter(
+        status="active",
+        created_at__gte=start,
+        created_at__lt=start + timedelta(days=1),
+    )
+
+
+def rebuild_day(day) -> int:
+    """Recompute every per-day rollup for ``day``. Returns its paper count."""
+    papers = _day_papers(day)
+
+    keyword_counts = Counter()
+    totals = Counter()
+    for keywords, is_open_access in papers.values_list("keywords", "is_open_access"):
+        totals["papers"] += 1
+        parsed = parse_keywords(keywords)
+        totals["with_keywords"] += bool(parsed)
+        totals["open_access"] += is_open_access
+        keyword_counts.update(parsed)
+
+    authorships = AuthorPaper.objects.filter(paper__in=papers)
+    author_rows = {
+        row["author_id"]: row
+        for row in authorships.values("author_id").annotate(
+            papers=Count("paper_id", distinct=True),
+            citations=Sum("paper__citation_count"),
+        )
+    }
+    received = dict(
+        Citation.objects.filter(cited_paper__in=papers)
+        .values("cited_paper__authorpaper__author_id")
+        .annotate(count=Count("id", distinct=True))
+        .values_list("cited_paper__authorpaper__author_id", "count")
+    )
+    titles = defaultdict(list)
+    for author_id, title in authorships.order_by(
+        "author_id", "-paper__publication_date"
+    ).values_list("author_id", "paper__title"):
+        if len(titles[author_id]) < RECENT_TITLES_PER_AUTHOR:
+            titles[author_id].append(title)
+
+    journal_counts = (
+        papers.exclude(journal=None)
+        .values("journal_id")
+        .annotate(count=Count("id"))
+        .values_list("journal_id", "count")
+    )
+
+    with transaction.atomic():
+        PaperDailyStat.objects.filter(day=day).delete()
+        KeywordDailyStat.objects.filter(day=day).delete()
+        AuthorDailyStat.objects.filter(day=day).delete()
+        JournalDailyStat.objects.filter(day=day).delete()
+        if not totals["papers"]:
+            return 0
+
+        PaperDailyStat.objects.create(
+            day=day,
+            paper_count=totals["papers"],
+            with_keywords_count=totals["with_keywords"],
+            open_access_count=totals["open_access"],
+        )
+        KeywordDailyStat.objects.bulk_create(
+            [
+                KeywordDailyStat(day=day, keyword=keyword, paper_count=count)
+                for keyword, count in keyword_counts.items()
+            ],
+            batch_size=1000,
+        )
+        AuthorDailyStat.objects.bulk_create(
+            [
+                AuthorDailyStat(
+                    day=day,
+                    author_id=author_id,
+                    paper_count=row["papers"],
+                    citation_count=row["citations"] or 0,
+                    citations_received=received.get(author_id, 0),
+                    recent_titles=titles[author_id],
+                )
+                for author_id, row in author_rows.items()
+            ],
+            batch_size=1000,
+        )
+        JournalDailyStat.objects.bulk_create(
+            [
+                JournalDailyStat(day=day, journal_id=journal_id, paper_count=count)
+                for journal_id, count in journal_counts
+            ],
+            batch_size=1000,
+        )
+    return totals["papers"]
+
+
+def rebuild_publication_years() -> None:
+    """Recompute papers per publication year (one grouped query)."""
+    years = (
+        SearchIndex.objects.filter(status="active", publication_date__isnull=False)
+        .annotate(year=ExtractYear("publication_date"))
+        .values("year")
+        .annotate(count=Count("id"))
+        .values_list("year", "count")
+    )
+    with transaction.atomic():
+        PublicationYearStat.objects.all().delete()
+        PublicationYearStat.objects.bulk_create(
+            [PublicationYearStat(year=year, paper_count=count) for year, count in years]
+        )
+
+
+def rebuild_analytics_snapshot() -> Dict:
+    """Recompute corpus-wide statistics that have no per-day partition."""
+    active = SearchIndex.objects.filter(status="active")
+    totals = active.aggregate(
+        total_papers=Count("id"),
+        open_access=Count("id", filter=Q(is_open_access=True)),
+        avg_citations=Avg("citation_count"),
+        max_citations=Max("citation_count"),
+        min_citations=Min("citation_count"),
+    )
+    top_journals = (
+        Journal.objects.annotate(
+            paper_count=Count("searchindex", filter=Q(searchindex__status="active"))
+        )
+        .filter(paper_count__gt=0)
+        .order_by("-paper_count")[:10]
+    )
+    data = {
+        **totals,
+        "total_citations": Citation.objects.filter(
+            cited_paper__status="active"
+        ).count(),
+        "total_authors": Author.objects.count(),
+        "total_journals": Journal.objects.count(),
+        "active_topics": Topic.objects.filter(paper_count__gt=0).count(),
+        "top_journals": [
+            {
+                "name": journal.name,
+                "paper_count": journal.paper_count,
+                "impact_factor": (
+                    float(journal.impact_factor) if journal.impact_factor else None
+                ),
+            }
+            for journal in top_journals
+        ],
+        "document_types": list(
+            active.values("document_type")
+            .annotate(count=Count("id"))
+            .order_by("-count")
+        ),
+        "avg_impact_factor": float(
+            Journal.objects.aggregate(avg=Avg("impact_factor"))["avg"] or 0
+        ),
+    }
+    AnalyticsSnapshot.objects.update_or_create(
+        name=ANALYTICS_SNAPSHOT, defaults={"data": data}
+    )
+    return data
+
+
+def refresh_rollups(days: Optional[Iterable] = None, full: bool = False) -> List:
+    """
+    Rebuild dirty days (plus today), or every day with ``full=True``.
+
+    Returns the days that were rebuilt.
+    """
+    if full:
+        days = set(
+            SearchIndex.objects.annotate(day=TruncDate("created_at"))
+            .values_list("day", flat=True)
+            .distinct()
+        )
+        # Days that no longer have papers must disappear from the rollups
+        days |= set(PaperDailyStat.objects.values_list("day", flat=True))
+    elif days is None:
+        days = set(dirty_days()) | {timezone.localdate()}
+
+    days = sorted(days)
+    for day in days:
+        # Clear the marker first so saves during the rebuild mark it again
+        cache.delete(_dirty_key(day))
+        rebuild_day(day)
+
+    rebuild_publication_years()
+    rebuild_analytics_snapshot()
+    logger.info(f"Rebuilt scholar rollups for {len(days)} days")
+    return days
+
+
+# ----------------------------------------------------------------------
+# Readers
+# ----------------------------------------------------------------------
+
+
+def _since(days: int):
+    return timezone.localdate() - timedelta(days=max(days, 1) - 1)
+
+
+def trending_keywords(days: int = 30, limit: int = 15) -> Dict:
+    """Most frequent keywords among papers indexed in the last ``days`` days."""
+    since = _since(days)
+    keywords = (
+        KeywordDailyStat.objects.filter(day__gte=since)
+        .values("keyword")
+        .annotate(paper_count=Sum("paper_count"))
+        .order_by("-paper_count", "keyword")[:limit]
+    )
+    analyzed = PaperDailyStat.objects.filter(day__gte=since).aggregate(
+        total=Sum("with_keywords_count")
+    )["total"]
+    return {
+        "keywords": [(row["keyword"], row["paper_count"]) for row in keywords],
+        "analyzed_papers": analyzed or 0,
+    }
+
+
+def trending_authors(days: int = 90, limit: int = 15) -> List[Dict]:
+    """Authors with the most papers indexed in the last ``days`` days."""
+    since = _since(days)
+    rows = list(
+        AuthorDailyStat.objects.filter(day__gte=since)
+        .values("author_id")
+        .annotate(
+            recent_papers=Sum("paper_count"),
+            total_citations=Sum("citations_received"),
+            citation_sum=Sum("citation_count"),
+        )
+        .order_by("-recent_papers", "-total_citations", "author_id")[:limit]
+    )
+    author_ids = [row["author_id"] for row in rows]
+    authors = Author.objects.in_bulk(author_ids)
+
+    titles = defaultdict(list)
+    for author_id, recent_titles in (
+        AuthorDailyStat.objects.filter(day__gte=since, author_id__in=author_ids)
+        .order_by("-day")
+        .values_list("author_id", "recent_titles")
+    ):
+        for title in recent_titles:
+            if len(titles[author_id]) < RECENT_TITLES_PER_AUTHOR:
+                titles[author_id].append(title)
+
+    return [
+        {
+            "author": authors[row["author_id"]],
+            "recent_papers": row["recent_papers"],
+            "total_citations": row["total_citations"] or 0,
+            "avg_citations": (row["citation_sum"] or 0) / row["recent_papers"],
+            "recent_titles": titles[row["author_id"]],
+        }
+        for row in rows
+        if row["author_id"] in authors
+    ]
+
+
+def research_analytics(recent_days: int = 30, years: int = 10) -> Dict:
+    """Corpus statistics from the rollup tables (empty until first refresh)."""
+    snapshot = (
+        AnalyticsSnapshot.objects.filter(name=ANALYTICS_SNAPSHOT)
+        .values_list("data", "computed_at")
+        .first()
+    )
+    data, computed_at = snapshot or ({}, None)
+    recent_papers = PaperDailyStat.objects.filter(
+        day__gte=_since(recent_days)
+    ).aggregate(total=Sum("paper_count"))["total"]
+    # Last ``years`` years, oldest first
+    publication_years = list(
+        PublicationYearStat.objects.order_by("-year").values_list(
+            "year", "paper_count"
+        )[:years]
+    )[::-1]
+    return {
+        **data,
+        "recent_papers": recent_papers or 0,
+        "publication_years": publication_years,
+        "computed_at": computed_at,
+    }
+
+
+__all__ = [
+    "day_of",
+    "dirty_days",
+    "mark_dirty",
+    "parse_keywords",
+    "rebuild_analytics_snapshot",
+    "rebuild_day",
+    "rebuild_publication_years",
+    "refresh_rollups",
+    "research_analytics",
+    "trending_authors",
+    "trending_keywords",
+]
+
+# EOF
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Django signals for Scholar app - trending/analytics rollups
+
+Marks the ingestion day of saved or deleted papers (and author links) dirty,
+so the periodic rollup refresh rebuilds only the days that changed.
+Bulk ingestion sends no signals and marks its days itself.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import AuthorPaper, SearchIndex
+from .services.trending import day_of, mark_dirty
+
+logger = logging.getLogger(__name__)
+
+
+def _mark_dirty_on_commit(day):
+    def _mark():
+        try:
+            mark_dirty([day])
+        except Exception as e:
+            # The next --full refresh repairs a missed marker
+            logger.warning(f"Could not mark rollup day {day} dirty: {e}")
+
+    transaction.on_commit(_mark)
+
+
+@receiver(post_save, sender=SearchIndex)
+@receiver(post_delete, sender=SearchIndex)
+def mark_paper_day_dirty(sender, instance, **kwargs):
+    """Flag the paper's ingestion day for the next rollup refresh."""
+    _mark_dirty_on_commit(day_of(instance.created_at))
+
+
+@receiver(post_save, sender=AuthorPaper)
+@receiver(post_delete, sender=AuthorPaper)
+def mark_authorship_day_dirty(sender, instance, **kwargs):
+    """Flag the linked paper's ingestion day for the next rollup refresh."""
+    paper = SearchIndex.objects.filter(pk=instance.paper_id).only("created_at").first()
+    if paper is not None:
+        _mark_dirty_on_commit(day_of(paper.created_at))
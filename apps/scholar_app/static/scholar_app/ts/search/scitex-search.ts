@@ -33,6 +33,7 @@ export {};
  */
 interface SearchResult {
   id?: string;
+  card_id?: string;
   title?: string;
   authors?: string;
   year?: string | number;
@@ -47,8 +48,34 @@ interface SearchResult {
   pdf_url?: string;
   is_open_access?: boolean;
   impact_factor?: number | string;
+  citation_count?: number;
+  source_engines?: string[];
 }
 
+/**
+ * Message sent by the streaming search WebSocket (/ws/scholar/search/)
+ */
+interface StreamMessage {
+  type: "search_started" | "results" | "engine_error" | "done" | "error";
+  search_id?: number;
+  engine?: string;
+  engines?: string[];
+  results?: SearchResult[];
+  merged?: Array<Partial<SearchResult> & { card_id: string }>;
+  total?: number;
+  error?: string;
+}
+
+// Streaming engine names -> progress indicator data-source names
+const ENGINE_PROGRESS_SOURCES: Record<string, string> = {
+  PubMed: "pubmed",
+  arXiv: "arxiv",
+  Semantic_Scholar: "semantic",
+};
+
+let searchSocket: WebSocket | null = null;
+let currentSearchId = 0;
+
 /**
  * Source configuration
  */
@@ -170,9 +197,12 @@ function startUnifiedSearch(query: string): void {
     return;
   }
 
-  // Search each source in parallel
-  sourcesToSearch.forEach((source) => {
-    searchSource(source, query);
+  // Prefer one streamed search (results arrive per engine, duplicates merged
+  // server-side); fall back to one request per source without WebSockets
+  streamSearch(query, selectedSourceValues).catch(() => {
+    sourcesToSearch.forEach((source) => {
+      searchSource(source, query);
+    });
   });
 
   // Reset unselected sources
@@ -200,6 +230,130 @@ function startUnifiedSearch(query: string): void {
   });
 }
 
+/**
+ * Open (or reuse) the streaming search socket
+ */
+function openSearchSocket(): Promise<WebSocket> {
+  if (searchSocket && searchSocket.readyState === WebSocket.OPEN) {
+    return Promise.resolve(searchSocket);
+  }
+  return new Promise((resolve, reject) => {
+    if (typeof WebSocket === "undefined") {
+      reject(new Error("WebSocket not supported"));
+      return;
+    }
+    const protocol = window.location.protocol === "https:" ? "wss:" : "ws:";
+    const socket = new WebSocket(
+      `${protocol}//${window.location.host}/ws/scholar/search/`,
+    );
+    socket.onopen = () => {
+      searchSocket = socket;
+      resolve(socket);
+    };
+    socket.onerror = () => reject(new Error("WebSocket connection failed"));
+    socket.onclose = () => {
+      if (searchSocket === socket) searchSocket = null;
+    };
+    socket.onmessage = (event: MessageEvent) => {
+      handleStreamMessage(JSON.parse(event.data) as StreamMessage);
+    };
+  });
+}
+
+/**
+ * Stream a search over the WebSocket; rejects if the socket cannot open
+ */
+async function streamSearch(query: string, sources: string[]): Promise<void> {
+  const socket = await openSearchSocket();
+  currentSearchId += 1;
+  socket.send(
+    JSON.stringify({
+      type: "search",
+      search_id: currentSearchId,
+      query: query,
+      sources: sources.join(","),
+      max_results: 50,
+    }),
+  );
+}
+
+/**
+ * Render one streamed message (ignores messages of superseded searches)
+ */
+function handleStreamMessage(message: StreamMessage): void {
+  if (message.search_id !== undefined && message.search_id !== currentSearchId) {
+    return;
+  }
+
+  switch (message.type) {
+    case "results":
+      (message.results || []).forEach((result) => addResultToProgressive(result));
+      (message.merged || []).forEach((update) => mergeIntoCard(update));
+      updateEngineProgress(message.engine || "", "bg-success", message.total);
+      break;
+    case "engine_error":
+      handleSearchError(
+        ENGINE_PROGRESS_SOURCES[message.engine || ""] || message.engine || "",
+        message.error || "Unknown error",
+      );
+      break;
+    case "done":
+    case "error":
+      document.querySelectorAll(".progress-source .spinner-border").forEach(
+        (spinner) => ((spinner as HTMLElement).style.display = "none"),
+      );
+      if (message.type === "error") {
+        console.error("[SciTeX Search] Streaming search failed:", message.error);
+      }
+      break;
+  }
+}
+
+/**
+ * Mark an engine's progress indicator
+ */
+function updateEngineProgress(
+  engine: string,
+  badgeClass: string,
+  total?: number,
+): void {
+  const progressSource = document.querySelector(
+    `[data-source="${ENGINE_PROGRESS_SOURCES[engine] || engine}"]`,
+  ) as HTMLElement | null;
+  if (!progressSource) return;
+
+  const badge = progressSource.querySelector(".badge") as HTMLElement | null;
+  const spinner = progressSource.querySelector(
+    ".spinner-border",
+  ) as HTMLElement | null;
+  const count = progressSource.querySelector(".count") as HTMLElement | null;
+
+  if (badge) badge.className = `badge ${badgeClass}`;
+  if (spinner) spinner.style.display = "none";
+  if (count && total !== undefined) count.textContent = total.toString();
+}
+
+/**
+ * Patch an already rendered card with fields from a late duplicate
+ */
+function mergeIntoCard(
+  update: Partial<SearchResult> & { card_id: string },
+): void {
+  const card = document.querySelector(
+    `.result-card[data-card-id="${update.card_id}"]`,
+  ) as HTMLElement | null;
+  if (!card) return;
+
+  const merged: SearchResult = {
+    ...(JSON.parse(card.dataset.result || "{}") as SearchResult),
+    ...update,
+  };
+  if (update.citation_count !== undefined) merged.citations = update.citation_count;
+
+  const replacement = createResultCard(merged);
+  card.replaceWith(replacement);
+}
+
 /**
  * Search a single source
  */
@@ -281,6 +435,10 @@ function createResultCard(result: SearchResult): HTMLElement {
   cardDiv.setAttribute("data-authors", result.authors || "");
   cardDiv.setAttribute("data-year", (result.year || "").toString());
   cardDiv.setAttribute("data-journal", result.journal || "Unknown Journal");
+  if (result.card_id) {
+    cardDiv.setAttribute("data-card-id", result.card_id);
+    cardDiv.dataset.result = JSON.stringify(result);
+  }
 
   cardDiv.innerHTML = `
         <h6 class="result-title">
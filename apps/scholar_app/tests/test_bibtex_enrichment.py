@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for checkpointed BibTeX enrichment (services.bibtex.enrichment).
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from apps.scholar_app.models import (
+    BibTeXEnrichmentJob,
+    BibTeXEntryResult,
+    EnrichedEntryCache,
+)
+from apps.scholar_app.services.bibtex import enrichment
+from apps.scholar_app.services.bibtex.enrichment import (
+    apply_enrichment,
+    enrichment_fields,
+    entry_identity,
+    normalize_title,
+    process_bibtex_job,
+)
+
+BIBTEX = """@article{smith2020,
+  title = {Sleep Spindles and Memory},
+  author = {Smith, John},
+  journal = {Neuron},
+  year = {2020},
+  doi = {https://doi.org/10.1016/J.X.2020}
+}
+
+@article{doe2019,
+  title = {Slow Oscillations: A Review},
+  author = {Doe, Jane},
+  journal = {Brain},
+  year = {2019}
+}
+"""
+
+
+class _FakeSinglePipeline:
+    """Stands in for the network-bound per-paper enrichment pipeline."""
+
+    calls = []
+    delay = 0
+    finds = True
+
+    def __init__(self, config=None):
+        pass
+
+    async def enrich_paper_async(self, paper, force=False):
+        type(self).calls.append(paper.metadata.basic.title)
+        await asyncio.sleep(self.delay)
+        if self.finds:
+            paper.metadata.basic.abstract = "Enriched abstract"
+        return paper
+
+
+class CheckpointedEnrichmentTests(TestCase):
+    """Tests for per-entry checkpoints, the shared cache and resumption"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.tmp, BASE_DIR=Path(self.tmp))
+        override.enable()
+        self.addCleanup(override.disable)
+
+        (Path(self.tmp) / "in.bib").write_text(BIBTEX)
+        # scitex writes runtime state relative to the working directory
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.tmp)
+        _FakeSinglePipeline.calls = []
+        _FakeSinglePipeline.delay = 0
+        _FakeSinglePipeline.finds = True
+        patcher = mock.patch(
+            "scitex.scholar.pipelines.ScholarPipelineMetadataSingle",
+            _FakeSinglePipeline,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _job(self, username="alice"):
+        return BibTeXEnrichmentJob.objects.create(
+            user=User.objects.create_user(username),
+            input_file="in.bib",
+            original_filename="refs.bib",
+            status="processing",
+            num_workers=2,
+        )
+
+    def test_entry_identity_prefers_doi(self):
+        """Test DOIs are normalized and title, year and author are the fallback"""
+        paper = mock.Mock()
+        paper.metadata.id.doi = "https://doi.org/10.1/ABC"
+        self.assertEqual(entry_identity(paper), "doi:10.1/abc")
+        paper.metadata.id.doi = None
+        paper.metadata.basic.title = "Sleep:  Spindles!"
+        paper.metadata.basic.year = 2020
+        paper.metadata.basic.authors = ["Smith, John"]
+        self.assertEqual(entry_identity(paper), "title:sleep spindles|2020|smith")
+        paper.metadata.basic.authors = ["John Smith"]
+        self.assertEqual(entry_identity(paper), "title:sleep spindles|2020|smith")
+        self.assertEqual(normalize_title(" A  B-c "), "a b c")
+
+    def test_title_only_identity_needs_year_and_author(self):
+        """Test generic titles without year or author are not shared"""
+        paper = mock.Mock()
+        paper.metadata.id.doi = None
+        paper.metadata.basic.title = "Editorial"
+        paper.metadata.basic.year = None
+        paper.metadata.basic.authors = ["Smith, John"]
+        self.assertIsNone(entry_identity(paper))
+        paper.metadata.basic.year = 2020
+        paper.metadata.basic.authors = []
+        self.assertIsNone(entry_identity(paper))
+
+    def test_enrichment_fields_keep_only_found_metadata(self):
+        """Test user fields, paths and library data never enter the cache"""
+        before = {
+            "metadata": {
+                "basic": {"title": "Mine", "abstract": None},
+                "path": {"pdfs": []},
+                "url": {"openurl_resolved": []},
+            },
+            "container": {"library_id": "lib-1"},
+        }
+        after = {
+            "metadata": {
+                "basic": {
+                    "title": "Mine",
+                    "abstract": "Found",
+                    "abstract_engines": ["CrossRef"],
+                },
+                "path": {"pdfs": ["/data/users/alice/paper.pdf"]},
+                "url": {"openurl_resolved": ["https://resolver.alice-uni.edu/x"]},
+            },
+            "container": {"library_id": "lib-1"},
+        }
+        self.assertEqual(
+            enrichment_fields(before, after),
+            {
+                "metadata": {
+                    "basic": {"abstract": "Found", "abstract_engines": ["CrossRef"]}
+                }
+            },
+        )
+        self.assertEqual(enrichment_fields(before, before), {})
+
+    def test_apply_enrichment_merges_into_own_entry(self):
+        """Test cached fields are added without replacing the entry's own data"""
+        own = {
+            "metadata": {
+                "basic": {"title": "Bob's title", "abstract": None},
+                "path": {"pdfs": ["/data/users/bob/paper.pdf"]},
+            },
+            "container": {"library_id": "bob-lib"},
+        }
+        cached = {
+            "metadata": {
+                "basic": {"abstract": "Found"},
+                "path": {"pdfs": ["/data/users/alice/paper.pdf"]},
+            }
+        }
+        merged = apply_enrichment(own, cached)
+        self.assertEqual(merged["metadata"]["basic"]["title"], "Bob's title")
+        self.assertEqual(merged["metadata"]["basic"]["abstract"], "Found")
+        self.assertEqual(
+            merged["metadata"]["path"]["pdfs"], ["/data/users/bob/paper.pdf"]
+        )
+        self.assertEqual(merged["container"], {"library_id": "bob-lib"})
+        self.assertIsNone(own["metadata"]["basic"]["abstract"])
+
+    def test_job_checkpoints_every_entry(self):
+        """Test a run stores each entry, the output and the shared cache"""
+        job = self._job()
+        process_bibtex_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "completed", job.processing_log)
+        self.assertEqual(job.processed_papers, 2)
+        self.assertEqual(job.failed_papers, 0)
+        self.assertTrue((Path(self.tmp) / job.output_file.name).exists())
+        self.assertEqual(job.entries.filter(success=True).count(), 2)
+        self.assertEqual(
+            set(EnrichedEntryCache.objects.values_list("identity", flat=True)),
+            {"doi:10.1016/j.x.2020", "title:slow oscillations a review|2019|doe"},
+        )
+        for data in EnrichedEntryCache.objects.values_list("data", flat=True):
+            self.assertEqual(
+                data,
+                {
+                    "format": enrichment.ENRICHMENT_CACHE_FORMAT,
+                    "metadata": {"basic": {"abstract": "Enriched abstract"}},
+                },
+            )
+        self.assertIn("[2/2] ✓", job.processing_log)
+
+    def test_other_users_reuse_the_shared_cache(self):
+        """Test a second library with the same references is not re-enriched"""
+        process_bibtex_job(self._job("alice"))
+        _FakeSinglePipeline.calls = []
+
+        job = self._job("bob")
+        process_bibtex_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(_FakeSinglePipeline.calls, [])
+        self.assertEqual(job.entries.filter(from_cache=True).count(), 2)
+        self.assertEqual(job.enrichment_summary["from_cache"], 2)
+        self.assertEqual(
+            EnrichedEntryCache.objects.get(identity__startswith="doi").hits, 1
+        )
+        for data in job.entries.values_list("data", flat=True):
+            self.assertEqual(data["metadata"]["basic"]["abstract"], "Enriched abstract")
+            self.assertIn(data["metadata"]["basic"]["title"], BIBTEX)
+
+    def test_entries_enrichment_found_nothing_for_are_not_cached(self):
+        """Test unchanged entries do not poison the shared cache"""
+        _FakeSinglePipeline.finds = False
+        job = self._job()
+        process_bibtex_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "completed")
+        self.assertFalse(EnrichedEntryCache.objects.exists())
+
+    def test_cache_rows_in_old_format_are_ignored(self):
+        """Test rows holding whole entries are never copied into a library"""
+        EnrichedEntryCache.objects.create(
+            key=enrichment.entry_cache_key("doi:10.1016/j.x.2020"),
+            identity="doi:10.1016/j.x.2020",
+            data={"metadata": {"path": {"pdfs": ["/data/users/eve/x.pdf"]}}},
+        )
+        process_bibtex_job(self._job())
+
+        self.assertEqual(
+            sorted(_FakeSinglePipeline.calls),
+            ["Sleep Spindles and Memory", "Slow Oscillations: A Review"],
+        )
+
+    def test_resumes_from_checkpoints(self):
+        """Test entries finished by an earlier run are not enriched again"""
+        job = self._job()
+        job.use_cache = False
+        job.save()
+        process_bibtex_job(job)
+        BibTeXEntryResult.objects.filter(job=job, index=1).delete()
+        job.status = "processing"
+        job.save()
+        _FakeSinglePipeline.calls = []
+
+        process_bibtex_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(_FakeSinglePipeline.calls, ["Slow Oscillations: A Review"])
+        self.assertIn("Resuming: 1 entries already enriched", job.processing_log)
+
+    def test_time_slice_requeues_partial_job(self):
+        """Test a job that runs out of time keeps its progress and is re-queued"""
+        job = self._job()
+        job.use_cache = False
+        job.num_workers = 1
+        job.attempts = 2
+        job.save()
+        _FakeSinglePipeline.delay = 0.3
+
+        with (
+            mock.patch.object(enrichment, "ENRICHMENT_TIMEOUT", 0.45),
+            mock.patch.object(enrichment, "STOP_POLL_INTERVAL", 0.05),
+        ):
+            process_bibtex_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "pending")
+        self.assertEqual(job.attempts, 0)
+        self.assertEqual(job.entries.count(), 1)
+        self.assertIn("continuing shortly", job.processing_log)
+
+    def test_cancelled_job_stops_writing(self):
+        """Test a cancelled job is not completed by a running worker"""
+        job = self._job()
+        BibTeXEnrichmentJob.objects.filter(pk=job.pk).update(status="cancelled")
+        process_bibtex_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "cancelled")
+        self.assertFalse(job.entries.exists())
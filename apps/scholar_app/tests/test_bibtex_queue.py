@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for the durable BibTeX enrichment job queue (services.bibtex.queue).
+"""
+
+import threading
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from apps.scholar_app.models import BibTeXEnrichmentJob
+from apps.scholar_app.services.bibtex import (
+    BibTeXWorkerPool,
+    claim_next_job,
+    heartbeat,
+    job_scholar_dir,
+    recover_stale_jobs,
+)
+
+
+class BibTeXJobQueueTests(TestCase):
+    """Tests for claiming, fairness and crash recovery"""
+
+    def setUp(self):
+        self.alice = User.objects.create_user("alice")
+        self.bob = User.objects.create_user("bob")
+
+    def _job(self, user=None, session_key=None, **fields):
+        return BibTeXEnrichmentJob.objects.create(
+            user=user, session_key=session_key, input_file="in.bib", **fields
+        )
+
+    def test_claim_marks_job_processing(self):
+        """Test a claim flips the job to processing for that worker"""
+        job = self._job(self.alice)
+        claimed = claim_next_job("w1")
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.status, "processing")
+        self.assertEqual(claimed.worker_id, "w1")
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNotNone(claimed.heartbeat_at)
+        self.assertIsNone(claim_next_job("w2"))
+
+    def test_global_concurrency_limit(self):
+        """Test no job is claimed while the pool is full"""
+        self._job(self.alice)
+        self._job(self.bob)
+        self.assertIsNotNone(claim_next_job("w1", max_concurrent=1))
+        self.assertIsNone(claim_next_job("w1", max_concurrent=1))
+
+    def test_per_owner_fairness(self):
+        """Test another owner's job runs before the busy owner's backlog"""
+        self._job(self.alice)
+        self._job(self.alice)
+        bob_job = self._job(self.bob)
+        anonymous = self._job(session_key="abc")
+
+        claim_next_job("w1", max_concurrent=5, max_per_owner=2)
+        self.assertEqual(claim_next_job("w1", max_concurrent=5).pk, bob_job.pk)
+        self.assertEqual(claim_next_job("w1", max_concurrent=5).pk, anonymous.pk)
+        # alice already runs one job and the per-owner limit is 1
+        self.assertIsNone(claim_next_job("w1", max_concurrent=5))
+        self.assertEqual(
+            claim_next_job("w1", max_concurrent=5, max_per_owner=2).user, self.alice
+        )
+
+    def test_stale_processing_job_is_requeued(self):
+        """Test a job whose worker stopped heartbeating goes back to pending"""
+        self._job(self.alice)
+        job = claim_next_job("w1")
+        BibTeXEnrichmentJob.objects.filter(pk=job.pk).update(
+            heartbeat_at=timezone.now() - timedelta(minutes=10)
+        )
+
+        self.assertEqual(recover_stale_jobs(stale_after=60), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual(job.status, "pending")
+        self.assertEqual(job.worker_id, "")
+        self.assertIn("re-queued", job.processing_log)
+
+        resumed = claim_next_job("w2")
+        self.assertEqual(resumed.pk, job.pk)
+        self.assertEqual(resumed.attempts, 2)
+
+    def test_live_job_is_not_recovered(self):
+        """Test heartbeats keep a running job with its worker"""
+        self._job(self.alice)
+        job = claim_next_job("w1")
+        BibTeXEnrichmentJob.objects.filter(pk=job.pk).update(
+            heartbeat_at=timezone.now() - timedelta(minutes=10)
+        )
+        self.assertEqual(heartbeat({job.pk}), 1)
+        self.assertEqual(recover_stale_jobs(stale_after=60), (0, 0))
+
+    def test_job_fails_after_max_attempts(self):
+        """Test a job that keeps killing workers is eventually failed"""
+        self._job(
+            self.alice,
+            status="processing",
+            attempts=3,
+            started_at=timezone.now() - timedelta(hours=1),
+        )
+        self.assertEqual(recover_stale_jobs(stale_after=60, max_attempts=3), (0, 1))
+        job = BibTeXEnrichmentJob.objects.get()
+        self.assertEqual(job.status, "failed")
+        self.assertIsNotNone(job.completed_at)
+
+    def test_scholar_dirs_are_per_owner(self):
+        """Test jobs of different owners never share a scholar directory"""
+        dirs = {
+            job_scholar_dir(self._job(self.alice)),
+            job_scholar_dir(self._job(self.bob)),
+            job_scholar_dir(self._job(session_key="abc")),
+        }
+        self.assertEqual(len(dirs), 3)
+
+
+class BibTeXWorkerPoolTests(TransactionTestCase):
+    """Tests for the worker threads"""
+
+    def test_pool_runs_queued_jobs(self):
+        """Test queued jobs are claimed and processed by pool threads"""
+        processed = []
+        done = threading.Event()
+
+        def process(job):
+            processed.append(job.pk)
+            BibTeXEnrichmentJob.objects.filter(pk=job.pk).update(status="completed")
+            if len(processed) == 2:
+                done.set()
+
+        jobs = [
+            BibTeXEnrichmentJob.objects.create(session_key=key, input_file="in.bib")
+            for key in ("a", "b")
+        ]
+        pool = BibTeXWorkerPool(size=2, process=process, poll_interval=0.05)
+        pool.start()
+        try:
+            pool.notify()
+            self.assertTrue(done.wait(30))
+        finally:
+            pool.stop(timeout=5)
+
+        self.assertCountEqual(processed, [job.pk for job in jobs])
+        self.assertFalse(
+            BibTeXEnrichmentJob.objects.exclude(status="completed").exists()
+        )
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for materialized trending/analytics rollups (services.trending).
+"""
+
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.scholar_app.models import (
+    Author,
+    AuthorPaper,
+    Citation,
+    KeywordDailyStat,
+    PaperDailyStat,
+    SearchIndex,
+)
+from apps.scholar_app.services.search import bulk_store_search_results
+from apps.scholar_app.services.trending import (
+    parse_keywords,
+    refresh_rollups,
+    research_analytics,
+    trending_authors,
+    trending_keywords,
+)
+from apps.scholar_app.services.trending.rollups import dirty_days
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TrendingRollupTests(TestCase):
+    """Tests for rollup rebuilds and the trending readers"""
+
+    def setUp(self):
+        cache.clear()
+        self.author = Author.objects.create(first_name="Ada", last_name="Lovelace")
+        self.first = SearchIndex.objects.create(
+            title="Sleep spindles",
+            keywords="Sleep, EEG, ml",
+            citation_count=10,
+            is_open_access=True,
+            publication_date=date(2020, 5, 1),
+        )
+        self.second = SearchIndex.objects.create(
+            title="Spindle density",
+            keywords="sleep, memory",
+            citation_count=4,
+            publication_date=date(2022, 5, 1),
+        )
+        for paper in (self.first, self.second):
+            AuthorPaper.objects.create(author=self.author, paper=paper, author_order=1)
+        Citation.objects.create(citing_paper=self.second, cited_paper=self.first)
+
+    def test_parse_keywords_normalizes(self):
+        """Test keywords are lower-cased, de-duplicated and short ones dropped"""
+        self.assertEqual(parse_keywords(" Sleep, EEG, ml, sleep "), ["sleep", "eeg"])
+        self.assertEqual(parse_keywords(None), [])
+
+    def test_refresh_builds_daily_rollups(self):
+        """Test a refresh materializes today's papers and keywords"""
+        refresh_rollups()
+        stat = PaperDailyStat.objects.get(day=timezone.localdate())
+        self.assertEqual(stat.paper_count, 2)
+        self.assertEqual(stat.open_access_count, 1)
+        self.assertEqual(KeywordDailyStat.objects.get(keyword="sleep").paper_count, 2)
+
+        trending = trending_keywords(days=30)
+        self.assertEqual(trending["keywords"][0], ("sleep", 2))
+        self.assertEqual(trending["analyzed_papers"], 2)
+
+    def test_rebuild_is_idempotent(self):
+        """Test refreshing twice does not double count"""
+        refresh_rollups()
+        refresh_rollups(full=True)
+        self.assertEqual(PaperDailyStat.objects.get().paper_count, 2)
+        self.assertEqual(KeywordDailyStat.objects.filter(keyword="sleep").count(), 1)
+
+    def test_trending_authors_reads_rollups(self):
+        """Test author trends come from the rollups in a few queries"""
+        refresh_rollups()
+        with self.assertNumQueries(3):
+            authors = trending_authors(days=90)
+        self.assertEqual(len(authors), 1)
+        self.assertEqual(authors[0]["author"], self.author)
+        self.assertEqual(authors[0]["recent_papers"], 2)
+        self.assertEqual(authors[0]["avg_citations"], 7)
+        self.assertEqual(authors[0]["total_citations"], 1)
+        self.assertEqual(len(authors[0]["recent_titles"]), 2)
+
+    def test_research_analytics_snapshot(self):
+        """Test corpus statistics are served from the snapshot"""
+        self.assertEqual(research_analytics()["recent_papers"], 0)
+        refresh_rollups()
+        stats = research_analytics()
+        self.assertEqual(stats["total_papers"], 2)
+        self.assertEqual(stats["open_access"], 1)
+        self.assertEqual(stats["recent_papers"], 2)
+        self.assertEqual(stats["publication_years"], [(2020, 1), (2022, 1)])
+        self.assertIsNotNone(stats["computed_at"])
+
+    def test_signals_mark_days_dirty(self):
+        """Test saving a paper marks its ingestion day once committed"""
+        refresh_rollups()
+        self.assertEqual(dirty_days(), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.citation_count = 20
+            self.first.save()
+        self.assertEqual(dirty_days(), [timezone.localdate()])
+
+        refresh_rollups()
+        self.assertEqual(dirty_days(), [])
+
+    def test_refresh_only_rebuilds_dirty_days(self):
+        """Test an old, unmarked day is left alone until a full refresh"""
+        old = timezone.now() - timedelta(days=10)
+        SearchIndex.objects.filter(pk=self.second.pk).update(created_at=old)
+        refresh_rollups()
+        self.assertFalse(
+            PaperDailyStat.objects.filter(day=timezone.localdate(old)).exists()
+        )
+
+        refresh_rollups(full=True)
+        self.assertEqual(
+            PaperDailyStat.objects.get(day=timezone.localdate(old)).paper_count, 1
+        )
+
+    def test_bulk_ingest_marks_today_dirty(self):
+        """Test bulk-stored search results flag their day for refresh"""
+        refresh_rollups()
+        bulk_store_search_results([{"title": "A new paper", "authors": []}])
+        self.assertEqual(dirty_days(), [timezone.localdate()])
+
+    def test_bulk_ingest_survives_dirty_marker_failure(self):
+        """Test a cache failure after commit does not store fallback copies"""
+        before = SearchIndex.objects.count()
+        with mock.patch(
+            "apps.scholar_app.services.search.ingest.mark_dirty",
+            side_effect=ConnectionError("cache down"),
+        ):
+            stored = bulk_store_search_results(
+                [{"title": "Cache outage paper", "authors": ["Jane Doe"]}]
+            )
+        self.assertEqual(SearchIndex.objects.count(), before + 1)
+        self.assertEqual(stored[0].title, "Cache outage paper")
+        self.assertTrue(AuthorPaper.objects.filter(paper=stored[0]).exists())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for the scholar search services.
+
+The test database is SQLite, so the full-text tests exercise the icontains
+fallback of services.search.fulltext; the PostgreSQL tsvector path shares
+the same API.
+"""
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.scholar_app.models import Author, AuthorPaper, Journal, SearchIndex
+from apps.scholar_app.services.search import result_cache
+from apps.scholar_app.services.search import (
+    SearchResultCache,
+    bulk_store_search_results,
+    paginate,
+    ranked_search_queryset,
+    supports_full_text,
+    update_search_vectors,
+)
+from apps.scholar_app.views.search.views import pagination_query
+
+
+class RankedSearchQuerysetTests(TestCase):
+    """Tests for ranked_search_queryset and paginate"""
+
+    def setUp(self):
+        self.title_match = SearchIndex.objects.create(
+            title="Sleep spindles and memory consolidation",
+            relevance_score=0.5,
+        )
+        self.abstract_match = SearchIndex.objects.create(
+            title="Hippocampal replay",
+            abstract="We study spindles during slow-wave sleep.",
+            relevance_score=0.9,
+        )
+        self.unrelated = SearchIndex.objects.create(
+            title="Protein folding with transformers",
+            relevance_score=1.0,
+        )
+
+    def test_matches_title_and_abstract(self):
+        """Test both title and abstract matches are returned"""
+        results = list(ranked_search_queryset("spindles"))
+        self.assertIn(self.title_match, results)
+        self.assertIn(self.abstract_match, results)
+        self.assertNotIn(self.unrelated, results)
+
+    def test_fallback_orders_by_relevance_score(self):
+        """Test fallback ordering uses stored relevance_score"""
+        results = list(ranked_search_queryset("spindles"))
+        self.assertEqual(results[0], self.abstract_match)
+
+    def test_paginate_returns_requested_page(self):
+        """Test paginate slices by page and page_size"""
+        queryset = SearchIndex.objects.order_by("title")
+        self.assertEqual(len(paginate(queryset, page=1, page_size=2)), 2)
+        self.assertEqual(paginate(queryset, page=2, page_size=2), [self.title_match])
+        self.assertEqual(paginate(queryset, page=3, page_size=2), [])
+
+    def test_paginate_clamps_invalid_arguments(self):
+        """Test non-positive page and page_size are clamped"""
+        queryset = SearchIndex.objects.order_by("title")
+        self.assertEqual(
+            paginate(queryset, page=0, page_size=-5), [self.abstract_match]
+        )
+
+    def test_update_search_vectors_noop_without_postgres(self):
+        """Test vector maintenance is skipped on non-PostgreSQL backends"""
+        if supports_full_text():
+            self.skipTest("PostgreSQL backend")
+        self.assertEqual(update_search_vectors([self.title_match.pk]), 0)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class SearchResultCacheTests(TestCase):
+    """Tests for the shared external search result cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.cache = SearchResultCache(prefix="test_search", max_local_entries=2)
+        self.key = self.cache.make_key("Deep  Learning", "arxiv,pubmed", {})
+        self.results = [
+            {"title": "Paper A", "doi": "10.1/a", "source_engines": ["arXiv"]},
+            {"title": "Paper B", "doi": "10.1/b", "source_engines": ["PubMed"]},
+        ]
+
+    def test_key_normalizes_query_and_sources(self):
+        """Test equivalent queries share a cache key"""
+        self.assertEqual(
+            self.key, self.cache.make_key("deep learning", ["pubmed", "arxiv"], {})
+        )
+        self.assertNotEqual(
+            self.key, self.cache.make_key("deep learning", "arxiv,pubmed", {"x": 1})
+        )
+
+    def test_fresh_hit_skips_fetch(self):
+        """Test a cached query is served without calling the engines"""
+        fetch = mock.Mock(return_value=(self.results, ["arXiv", "PubMed"]))
+        self.assertEqual(self.cache.get_or_fetch(self.key, fetch), self.results)
+        self.assertEqual(self.cache.get_or_fetch(self.key, fetch), self.results)
+        self.assertEqual(fetch.call_count, 1)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_engine_without_answer_keeps_previous_results(self):
+        """Test a refresh missing one engine keeps that engine's old entry"""
+        self.cache.set(self.key, self.results, ["arXiv", "PubMed"])
+        refreshed = [{"title": "Paper C", "doi": "10.1/c", "source_engines": ["arXiv"]}]
+        self.cache.set(self.key, refreshed, ["arXiv"])
+
+        cold = SearchResultCache(prefix="test_search")
+        results, state = cold.get(self.key)
+        self.assertEqual(state, "fresh")
+        self.assertEqual([r["title"] for r in results], ["Paper C", "Paper B"])
+
+    def test_failed_fetch_does_not_overwrite(self):
+        """Test an empty fan-out leaves cached results untouched"""
+        self.cache.set(self.key, self.results, ["arXiv", "PubMed"])
+        self.cache.set(self.key, [], [])
+        results, _ = SearchResultCache(prefix="test_search").get(self.key)
+        self.assertEqual(results, self.results)
+
+    def test_stale_hit_returns_old_results_and_revalidates(self):
+        """Test stale entries are served while a refresh runs"""
+        self.cache.fresh_ttl = 0
+        self.cache.set(self.key, self.results, ["arXiv", "PubMed"])
+        fetch = mock.Mock(return_value=(self.results[:1], ["arXiv"]))
+
+        with mock.patch.object(result_cache.threading, "Thread") as thread:
+            thread.side_effect = lambda target, daemon: mock.Mock(start=target)
+            self.assertEqual(self.cache.get_or_fetch(self.key, fetch), self.results)
+
+        fetch.assert_called_once()
+        self.assertEqual(self.cache.stats()["refreshes"], 1)
+
+    def test_local_tier_is_size_bounded(self):
+        """Test the in-process LRU evicts beyond max_local_entries"""
+        for i in range(3):
+            key = self.cache.make_key(f"query {i}")
+            self.cache.set(key, self.results, ["arXiv", "PubMed"])
+        self.assertEqual(self.cache.stats()["local_entries"], 2)
+
+
+class BulkStoreSearchResultsTests(TestCase):
+    """Tests for batched search result ingestion"""
+
+    def setUp(self):
+        self.existing = SearchIndex.objects.create(
+            title="Existing paper on memory",
+            doi="10.1000/existing",
+            citation_count=5,
+            source_engines=["PubMed"],
+        )
+
+    def _result(self, title, **extra):
+        return {
+            "title": title,
+            "authors": "Ada Lovelace, Alan Turing",
+            "year": 2020,
+            "journal": "Journal of Tests",
+            "abstract": f"Abstract of {title}",
+            "source": "scitex_parallel",
+            "source_engines": ["arXiv"],
+            **extra,
+        }
+
+    def test_creates_papers_journals_and_authors(self):
+        """Test new results are stored with journal and ordered authors"""
+        papers = bulk_store_search_results(
+            [self._result("A new paper"), self._result("Another new paper")]
+        )
+        self.assertEqual(len(papers), 2)
+        paper = SearchIndex.objects.get(pk=papers[0].pk)
+        self.assertEqual(paper.journal.name, "Journal of Tests")
+        links = AuthorPaper.objects.filter(paper=paper).order_by("author_order")
+        self.assertEqual(
+            [link.author.last_name for link in links], ["Lovelace", "Turing"]
+        )
+        self.assertEqual(Author.objects.count(), 2)
+        self.assertEqual(Journal.objects.count(), 1)
+
+    def test_matches_existing_paper_by_identifier(self):
+        """Test results with a known DOI update the existing row"""
+        papers = bulk_store_search_results(
+            [self._result("Different title", doi="10.1000/existing", citations=50)]
+        )
+        self.assertEqual(papers[0].pk, self.existing.pk)
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.citation_count, 50)
+        self.assertEqual(sorted(self.existing.source_engines), ["PubMed", "arXiv"])
+        self.assertEqual(AuthorPaper.objects.filter(paper=self.existing).count(), 2)
+
+    def test_deduplicates_within_batch(self):
+        """Test duplicate results in one batch resolve to one paper"""
+        papers = bulk_store_search_results(
+            [
+                self._result("Same paper", doi="10.1000/same"),
+                self._result("SAME PAPER", source_engines=["PubMed"]),
+            ]
+        )
+        self.assertEqual(papers[0].pk, papers[1].pk)
+        self.assertEqual(SearchIndex.objects.filter(doi="10.1000/same").count(), 1)
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        """Test ingestion query count is independent of the number of results"""
+        with CaptureQueriesContext(connection) as small:
+            bulk_store_search_results([self._result(f"Small {i}") for i in range(2)])
+        with CaptureQueriesContext(connection) as large:
+            bulk_store_search_results(
+                [
+                    self._result(
+                        f"Large {i}",
+                        authors=f"Author{i} Name{i}",
+                        journal="Another Journal",
+                    )
+                    for i in range(50)
+                ]
+            )
+        # Backends may split a large bulk INSERT, so allow a little slack
+        self.assertLessEqual(
+            len(large.captured_queries), len(small.captured_queries) + 2
+        )
+
+
+class SearchPaginationTests(SimpleTestCase):
+    """Tests for the search results pager"""
+
+    def test_pagination_query_drops_page(self):
+        request = RequestFactory().get("/scholar/", {"q": "sleep", "page": "3"})
+        self.assertEqual(pagination_query(request), "q=sleep")
+
+    def test_pager_links_keep_the_query(self):
+        html = render_to_string(
+            "scholar_app/index_partials/pagination.html",
+            {
+                "page": 2,
+                "has_previous_page": True,
+                "has_next_page": True,
+                "pagination_query": "q=sleep",
+            },
+        )
+        self.assertIn('href="?q=sleep&amp;page=1"', html)
+        self.assertIn('href="?q=sleep&amp;page=3"', html)
+
+    def test_single_page_renders_no_pager(self):
+        html = render_to_string(
+            "scholar_app/index_partials/pagination.html",
+            {"page": 1, "has_previous_page": False, "has_next_page": False},
+        )
+        self.assertNotIn("page-link", html)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for precomputed paper similarity (services.search.similarity).
+"""
+
+from datetime import date
+
+from django.test import TestCase
+
+from apps.scholar_app.models import (
+    Author,
+    AuthorPaper,
+    Citation,
+    Journal,
+    PaperNeighbor,
+    SearchIndex,
+    Topic,
+)
+from apps.scholar_app.services.search import (
+    rebuild_neighbors,
+    refresh_neighbors,
+    similar_papers,
+    similar_papers_for_many,
+)
+
+
+class PaperSimilarityTests(TestCase):
+    """Tests for the neighbor table and its lookups"""
+
+    def setUp(self):
+        self.journal = Journal.objects.create(name="Journal of Sleep")
+        self.topic = Topic.objects.create(name="Sleep")
+        self.author = Author.objects.create(first_name="Ada", last_name="Lovelace")
+
+        self.source = self._paper("Sleep spindles and memory consolidation")
+        self.same_author = self._paper("Spindle density in older adults")
+        self.same_journal = self._paper("Slow oscillations", journal=self.journal)
+        self.unrelated = self._paper(
+            "Protein folding with transformers", published=date(1995, 1, 1)
+        )
+        self.unrelated.citation_count = 5000
+        self.unrelated.save()
+
+        self.source.journal = self.journal
+        self.source.save()
+        self.source.topics.add(self.topic)
+        self.same_author.topics.add(self.topic)
+        for paper in (self.source, self.same_author):
+            AuthorPaper.objects.create(author=self.author, paper=paper, author_order=1)
+        Citation.objects.create(citing_paper=self.same_author, cited_paper=self.source)
+
+    def _paper(self, title, journal=None, published=date(2020, 1, 1)):
+        return SearchIndex.objects.create(
+            title=title, journal=journal, publication_date=published
+        )
+
+    def test_rebuild_ranks_neighbors_by_shared_signals(self):
+        """Test neighbors are ordered by weighted overlap and explained"""
+        rebuild_neighbors(top_k_neighbors=5)
+        results = similar_papers(self.source)
+
+        self.assertEqual(
+            [paper for paper, _, _ in results], [self.same_author, self.same_journal]
+        )
+        score, reason = results[0][1], results[0][2]
+        self.assertGreater(score, results[1][1])
+        self.assertIn("1 shared topics", reason)
+        self.assertIn("1 shared authors", reason)
+        self.assertIn("Citation relationship", reason)
+        self.assertIn("Same journal: Journal of Sleep", results[1][2])
+
+    def test_scores_are_symmetric(self):
+        """Test a pair gets the same score from both sides"""
+        rebuild_neighbors()
+        forward = PaperNeighbor.objects.get(
+            source=self.source, neighbor=self.same_author
+        )
+        backward = PaperNeighbor.objects.get(
+            source=self.same_author, neighbor=self.source
+        )
+        self.assertAlmostEqual(forward.score, backward.score)
+
+    def test_lookup_is_one_query(self):
+        """Test recommendations cost a single indexed query"""
+        rebuild_neighbors()
+        with self.assertNumQueries(1):
+            results = similar_papers(self.source, exclude_ids=[self.same_journal.pk])
+            [paper.journal for paper, _, _ in results]
+        self.assertEqual(len(results), 1)
+
+    def test_refresh_adds_new_papers_incrementally(self):
+        """Test a new paper gets neighbors and joins existing neighbor lists"""
+        rebuild_neighbors()
+        self.assertEqual(refresh_neighbors(), 0)
+
+        newcomer = self._paper("Spindles again")
+        newcomer.topics.add(self.topic)
+        AuthorPaper.objects.create(author=self.author, paper=newcomer, author_order=1)
+
+        self.assertEqual(refresh_neighbors(), 1)
+        newcomer.refresh_from_db()
+        self.assertIsNotNone(newcomer.neighbors_updated_at)
+        self.assertIn(self.source, [p for p, _, _ in similar_papers(newcomer)])
+        self.assertIn(newcomer, [p for p, _, _ in similar_papers(self.source)])
+
+    def test_refresh_keeps_top_k_bound(self):
+        """Test reverse updates never grow a list beyond top_k"""
+        rebuild_neighbors(top_k_neighbors=1)
+        newcomer = self._paper("Spindles again")
+        newcomer.topics.add(self.topic)
+        refresh_neighbors(top_k_neighbors=1)
+        self.assertEqual(PaperNeighbor.objects.filter(source=self.source).count(), 1)
+
+    def test_similar_papers_for_many_excludes_sources(self):
+        """Test combined recommendations skip the user's own papers"""
+        rebuild_neighbors()
+        results = similar_papers_for_many([self.source.pk, self.same_author.pk])
+        papers = [paper for paper, _, _ in results]
+        self.assertNotIn(self.source, papers)
+        self.assertNotIn(self.same_author, papers)
+        self.assertIn(self.same_journal, papers)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for streaming scholar search (incremental merge and WebSocket consumer).
+"""
+
+import asyncio
+from unittest import mock
+
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.scholar_app import consumers
+from apps.scholar_app.services.search import (
+    IncrementalResultMerger,
+    SearchResultCache,
+)
+
+
+def _result(title, **extra):
+    return {
+        "title": title,
+        "journal": "Unknown Journal",
+        "abstract": "No abstract available.",
+        "citation_count": 0,
+        "source_engines": [],
+        **extra,
+    }
+
+
+class IncrementalResultMergerTests(SimpleTestCase):
+    """Tests for cross-batch de-duplication of streamed results"""
+
+    def test_new_results_get_stable_card_ids(self):
+        """Test each distinct paper becomes one card"""
+        merger = IncrementalResultMerger()
+        new, merged = merger.add("arXiv", [_result("A"), _result("B")])
+        self.assertEqual([r["card_id"] for r in new], ["r0", "r1"])
+        self.assertEqual(merged, [])
+        self.assertEqual(new[0]["source_engines"], ["arXiv"])
+
+    def test_late_duplicate_merges_into_earlier_card(self):
+        """Test a slower engine's duplicate enriches the existing card"""
+        merger = IncrementalResultMerger()
+        merger.add("arXiv", [_result("Sleep spindles", arxiv_id="2401.1")])
+        new, merged = merger.add(
+            "PubMed",
+            [
+                _result(
+                    "Sleep  Spindles",
+                    doi="10.1/x",
+                    journal="Neuron",
+                    citation_count=12,
+                )
+            ],
+        )
+        self.assertEqual(new, [])
+        self.assertEqual(len(merged), 1)
+        self.assertEqual(merged[0]["card_id"], "r0")
+        self.assertEqual(merged[0]["journal"], "Neuron")
+        self.assertEqual(merged[0]["citation_count"], 12)
+        self.assertEqual(merged[0]["source_engines"], ["arXiv", "PubMed"])
+
+        # The DOI learned from the merge now identifies the card too
+        new, merged = merger.add("CrossRef", [_result("Other title", doi="10.1/X")])
+        self.assertEqual(new, [])
+        self.assertEqual(merged[0]["card_id"], "r0")
+
+    def test_results_are_in_first_seen_order(self):
+        """Test merged results keep arrival order without card ids"""
+        merger = IncrementalResultMerger()
+        merger.add("arXiv", [_result("A")])
+        merger.add("PubMed", [_result("B"), _result("a")])
+        results = merger.results()
+        self.assertEqual([r["title"] for r in results], ["A", "B"])
+        self.assertNotIn("card_id", results[0])
+        self.assertEqual(results[0]["source_engines"], ["arXiv", "PubMed"])
+
+
+class _FakePipeline:
+    def __init__(self, delay, papers=None, error=None):
+        self.delay = delay
+        self.papers = papers or []
+        self.error = error
+
+    async def search_async(self, **kwargs):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise RuntimeError(self.error)
+        return {"results": self.papers}
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class ScholarSearchConsumerTests(SimpleTestCase):
+    """Tests for the streaming search WebSocket consumer"""
+
+    def setUp(self):
+        cache.clear()
+        pipelines = {
+            "arXiv": _FakePipeline(0, [{"title": "Shared paper", "doi": ""}]),
+            "PubMed": _FakePipeline(
+                0.2, [{"title": "Shared Paper", "doi": "10.1/s", "citation_count": 3}]
+            ),
+            "CrossRef": _FakePipeline(0.1, error="timeout"),
+        }
+        patchers = [
+            mock.patch.object(
+                consumers, "get_engine_pipelines", return_value=({}, pipelines)
+            ),
+            mock.patch.object(consumers, "schedule_bulk_store"),
+            mock.patch.object(
+                consumers, "search_result_cache", SearchResultCache("test_stream")
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def _search(self, query):
+        communicator = WebsocketCommunicator(
+            consumers.ScholarSearchConsumer.as_asgi(), "/ws/scholar/search/"
+        )
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        await communicator.send_json_to({"type": "search", "query": query})
+        messages = []
+        while not messages or messages[-1]["type"] != "done":
+            messages.append(await communicator.receive_json_from(timeout=5))
+        await communicator.disconnect()
+        return messages
+
+    async def test_streams_each_engine_as_it_completes(self):
+        """Test batches arrive in completion order with late duplicates merged"""
+        messages = await self._search("shared paper")
+        types = [m["type"] for m in messages]
+        self.assertEqual(
+            types, ["search_started", "results", "engine_error", "results", "done"]
+        )
+        self.assertEqual(messages[1]["engine"], "arXiv")
+        self.assertEqual(messages[3]["results"], [])
+        self.assertEqual(messages[3]["merged"][0]["doi"], "10.1/s")
+        self.assertEqual(messages[-1]["total"], 1)
+        self.assertEqual(messages[-1]["engines_used"], ["arXiv", "PubMed"])
+
+    async def test_repeated_search_is_served_from_cache(self):
+        """Test a completed stream populates the shared result cache"""
+        await self._search("shared paper")
+        messages = await self._search("Shared  Paper")
+        self.assertEqual([m["type"] for m in messages], ["results", "done"])
+        self.assertEqual(messages[0]["engine"], "cache")
+        self.assertTrue(messages[-1]["cached"])
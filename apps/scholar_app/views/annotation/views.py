@@ -10,7 +10,7 @@ from django.shortcuts import render, get_object_or_404
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
-from django.db.models import Count
+from django.db.models import Count, prefetch_related_objects
 import json
 import logging
 from uuid import UUID
@@ -20,6 +20,10 @@ from ...models import (
     Annotation,
     CollaborationGroup,
 )
+from ...services.search import (
+    similar_papers as similar_papers_lookup,
+    similar_papers_for_many,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -260,10 +264,13 @@ def paper_recommendations(request, paper_id):
         paper_id = UUID(str(paper_id))
         paper = Paper.objects.get(id=paper_id)
 
-        # Find similar papers based on tags/keywords
-        similar_papers = Paper.objects.filter(
-            keywords__icontains=paper.keywords
-        ).exclude(id=paper_id)[:5]
+        # Precomputed neighbors; keyword match until the paper is indexed
+        similar_papers = [p for p, _, _ in similar_papers_lookup(paper, limit=5)]
+        if not similar_papers:
+            similar_papers = Paper.objects.filter(
+                keywords__icontains=paper.keywords
+            ).exclude(id=paper_id)[:5]
+        prefetch_related_objects(similar_papers, "authors")
 
         return JsonResponse(
             {
@@ -302,14 +309,19 @@ def user_recommendations(request):
             "paper_id", flat=True
         )
 
-        # Find similar papers
-        recommendations = Paper.objects.filter(
-            keywords__icontains=Paper.objects.filter(id__in=user_papers)
-            .first()
-            .keywords
-            if user_papers
-            else ""
-        ).exclude(id__in=user_papers)[:10]
+        # Precomputed neighbors of the library; keyword match as a fallback
+        recommendations = [
+            p for p, _, _ in similar_papers_for_many(list(user_papers), limit=10)
+        ]
+        if not recommendations:
+            recommendations = Paper.objects.filter(
+                keywords__icontains=Paper.objects.filter(id__in=user_papers)
+                .first()
+                .keywords
+                if user_papers
+                else ""
+            ).exclude(id__in=user_papers)[:10]
+        prefetch_related_objects(recommendations, "authors")
 
         return JsonResponse(
             {
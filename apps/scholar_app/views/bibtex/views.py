@@ -28,6 +28,8 @@ from django.core.files.base import ContentFile
 from django.utils import timezone
 from django.conf import settings
 from ...models import BibTeXEnrichmentJob
+from ...services.bibtex import enqueue_job
+from ...services.bibtex.queue import MAX_CONCURRENT_JOBS
 from apps.scholar_app.api_auth import api_key_optional
 
 logger = logging.getLogger(__name__)
@@ -463,12 +465,8 @@ def bibtex_upload(request):
         status="pending",
     )
 
-    # Start processing immediately in a background thread
-    import threading
-
-    thread = threading.Thread(target=_process_bibtex_job, args=(job,))
-    thread.daemon = True
-    thread.start()
+    # Hand the job to the worker pool (durable: the row is the queue entry)
+    enqueue_job(job)
 
     # Return JSON for API and AJAX requests
     if api_authenticated or request.headers.get("X-Requested-With") == "XMLHttpRequest":
@@ -500,12 +498,9 @@ def bibtex_job_detail(request, job_id):
             BibTeXEnrichmentJob, id=job_id, session_key=request.session.session_key
         )
 
-    # If job is pending, start processing
+    # Make sure a worker will pick up a job that is still queued
     if job.status == "pending":
-        # In production, this would be a Celery task
-        # For now, start processing synchronously
-        _process_bibtex_job(job)
-        job.refresh_from_db()
+        enqueue_job(job)
 
     context = {
         "job": job,
@@ -702,327 +697,6 @@ def bibtex_job_papers(request, job_id):
         )
 
 
-def _process_bibtex_job(job):
-    """Process a BibTeX enrichment job using ScholarPipelineMetadataParallel directly.
-
-    In production, this should be a Celery task for async processing.
-    """
-    import logging
-
-    logger = logging.getLogger(__name__)
-
-    # Create a cancellation flag that can be checked
-    cancellation_flag = {"cancelled": False}
-
-    def check_cancellation():
-        """Check if job should be cancelled (either by user or timeout)."""
-        job.refresh_from_db()
-        if job.status == "cancelled":
-            cancellation_flag["cancelled"] = True
-            return True
-        return False
-
-    def progress_callback(current: int, total: int, info: dict):
-        """Callback to capture and store progress messages in real-time.
-
-        Args:
-            current: Number of papers processed (1-indexed)
-            total: Total number of papers
-            info: Dict with 'title', 'success', 'error', 'index'
-        """
-        from asgiref.sync import sync_to_async
-        import asyncio
-
-        async def update_job():
-            try:
-                # Wrap Django ORM operations in sync_to_async
-                await sync_to_async(job.refresh_from_db)()
-
-                # Check if job was cancelled
-                if await sync_to_async(lambda: job.status)() == "cancelled":
-                    return  # Job was cancelled, stop updating
-
-                # Create progress message
-                title = info.get("title", "Unknown")
-                # Truncate with "..." indicator if too long
-                if len(title) > 50:
-                    title = title[:50] + "..."
-                status_icon = "✓" if info.get("success") else "✗"
-                message = f"[{current}/{total}] {status_icon} {title}"
-
-                current_log = await sync_to_async(lambda: job.processing_log)()
-                if current_log:
-                    job.processing_log = current_log + f"\n{message}"
-                else:
-                    job.processing_log = message
-
-                # Update counters
-                job.processed_papers = current
-                await sync_to_async(job.save)(
-                    update_fields=["processing_log", "processed_papers"]
-                )
-            except Exception as e:
-                # Job may have been deleted or cancelled - ignore update errors
-                logger.warning(f"Failed to update job {job.id}: {e}")
-
-        # Run the async update
-        try:
-            asyncio.create_task(update_job())
-        except RuntimeError:
-            # If there's no event loop, run it synchronously
-            asyncio.run(update_job())
-
-    try:
-        # Set user-specific SCITEX_DIR to avoid cache conflicts between users
-        import os
-
-        if job.user:
-            user_scitex_dir = (
-                Path(settings.BASE_DIR)
-                / "data"
-                / "users"
-                / job.user.username
-                / ".scitex"
-            )
-        else:
-            # Anonymous users get session-based directory
-            session_key = job.session_key or "anonymous"
-            user_scitex_dir = (
-                Path(settings.BASE_DIR) / "data" / "anonymous" / session_key / ".scitex"
-            )
-
-        user_scitex_dir.mkdir(parents=True, exist_ok=True)
-        os.environ["SCITEX_DIR"] = str(user_scitex_dir)
-        logger.info(f"Set SCITEX_DIR to {user_scitex_dir} for job {job.id}")
-
-        # Update job status - refresh first to avoid conflicts
-        try:
-            job.refresh_from_db()
-            # Check if job was cancelled before we even started
-            if job.status == "cancelled":
-                logger.info(f"Job {job.id} was cancelled before processing started")
-                return
-        except BibTeXEnrichmentJob.DoesNotExist:
-            logger.warning(f"Job {job.id} was deleted before processing started")
-            return
-
-        job.status = "processing"
-        job.started_at = timezone.now()
-        job.processing_log = "Loading BibTeX file..."
-        job.save(update_fields=["status", "started_at", "processing_log"])
-        logger.info(f"Starting BibTeX job {job.id}")
-
-        # Import scholar components
-        from scitex.scholar.pipelines import ScholarPipelineMetadataParallel
-        from scitex.scholar.storage import BibTeXHandler
-
-        # Get input file path
-        input_path = Path(settings.MEDIA_ROOT) / job.input_file.name
-        logger.info(f"Input file path: {input_path}")
-
-        # Load papers from BibTeX
-        logger.info("Creating BibTeXHandler...")
-        bibtex_handler = BibTeXHandler(project=job.project_name)
-        logger.info("Loading papers from BibTeX...")
-        papers = bibtex_handler.papers_from_bibtex(input_path)
-        logger.info(f"Loaded {len(papers) if papers else 0} papers")
-
-        if not papers:
-            raise ValueError("No papers found in BibTeX file")
-
-        job.total_papers = len(papers)
-        job.processing_log += f"\nFound {len(papers)} papers in BibTeX file"
-        job.save(update_fields=["total_papers", "processing_log"])
-
-        # Create metadata enrichment pipeline
-        pipeline = ScholarPipelineMetadataParallel(
-            num_workers=job.num_workers,
-        )
-
-        # Enrich papers with progress callback and 10-minute timeout
-        async def enrich_with_timeout():
-            return await asyncio.wait_for(
-                pipeline.enrich_papers_async(
-                    papers=papers,
-                    force=not job.use_cache,  # force=True means ignore cache
-                    on_progress=progress_callback,
-                ),
-                timeout=600,  # 10 minutes = 600 seconds
-            )
-
-        try:
-            enriched_papers = asyncio.run(enrich_with_timeout())
-        except asyncio.TimeoutError:
-            # Mark job as failed due to timeout
-            job.status = "failed"
-            job.error_message = "Enrichment process timed out after 10 minutes. Please try with fewer papers or contact support."
-            job.completed_at = timezone.now()
-            job.processing_log += f"\n\n✗ TIMEOUT: Job exceeded 10-minute limit"
-            job.save(
-                update_fields=[
-                    "status",
-                    "error_message",
-                    "completed_at",
-                    "processing_log",
-                ]
-            )
-            logger.error(f"BibTeX job {job.id} timed out after 10 minutes")
-            return  # Exit the function without raising exception
-
-        # Create output path with format: originalname-enriched-by-scitex_timestamp.bib
-        # Use stored original filename (without .bib extension)
-        from datetime import datetime
-
-        original_name = (
-            Path(job.original_filename).stem
-            if job.original_filename
-            else Path(job.input_file.name).stem
-        )
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = f"{original_name}-enriched-by-scitex_{timestamp}.bib"
-
-        user_dir = str(job.user.id) if job.user else "anonymous"
-        output_path = (
-            Path(settings.MEDIA_ROOT) / "bibtex_enriched" / user_dir / output_filename
-        )
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Save enriched BibTeX
-        bibtex_handler.papers_to_bibtex(enriched_papers, output_path)
-
-        # Update job with results
-        job.total_papers = len(papers)
-        job.processed_papers = len(enriched_papers)  # All papers were processed
-        job.failed_papers = 0  # No failures if we got here
-        job.output_file = str(output_path.relative_to(settings.MEDIA_ROOT))
-
-        # Gitea Integration: Auto-commit enriched .bib file to project repository
-        if job.project and job.project.git_clone_path:
-            try:
-                from apps.project_app.services.git_service import auto_commit_file
-                from datetime import datetime
-
-                # Create scitex/scholar/bib_files directory (no __init__.py, no Python conflict)
-                project_bib_dir = (
-                    Path(job.project.git_clone_path)
-                    / "scitex"
-                    / "scholar"
-                    / "bib_files"
-                )
-                project_bib_dir.mkdir(parents=True, exist_ok=True)
-
-                # Generate filenames with original name and timestamp
-                original_name = (
-                    Path(job.original_filename).stem
-                    if job.original_filename
-                    else "references"
-                )
-                timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-                original_filename = f"{original_name}_original-{timestamp}.bib"
-                enriched_filename = f"{original_name}_enriched-{timestamp}.bib"
-
-                # Copy both original and enriched .bib files to project repository
-                input_file_path = Path(settings.MEDIA_ROOT) / job.input_file.name
-
-                project_original_path = project_bib_dir / original_filename
-                shutil.copy(input_file_path, project_original_path)
-                logger.info(f"Copied original .bib to {project_original_path}")
-
-                project_enriched_path = project_bib_dir / enriched_filename
-                shutil.copy(output_path, project_enriched_path)
-                logger.info(f"Copied enriched .bib to {project_enriched_path}")
-
-                # ============================================================
-                # AUTO-MERGE: Regenerate bibliography using shared utility
-                # ============================================================
-                from apps.project_app.services.bibliography_manager import (
-                    ensure_bibliography_structure,
-                    regenerate_bibliography,
-                )
-
-                project_path = Path(job.project.git_clone_path)
-
-                # Ensure structure exists
-                ensure_bibliography_structure(project_path)
-
-                # Regenerate all bibliographies
-                results = regenerate_bibliography(project_path, job.project.name)
-
-                if results["success"]:
-                    logger.info(
-                        f"✓ Bibliography regenerated: "
-                        f"scholar={results['scholar_count']}, "
-                        f"writer={results['writer_count']}, "
-                        f"total={results['total_count']}"
-                    )
-                    job.enrichment_summary["bibliography_merged"] = True
-                    job.enrichment_summary["total_citations"] = results["total_count"]
-                else:
-                    logger.warning(
-                        f"Bibliography regeneration had errors: {results['errors']}"
-                    )
-
-                # Auto-commit both files to Gitea
-                commit_message = f"Scholar: Added bibliography - {job.processed_papers}/{job.total_papers} papers enriched"
-                success, output = auto_commit_file(
-                    project_dir=Path(job.project.git_clone_path),
-                    filepath="scitex/",  # Commit entire scitex directory
-                    message=commit_message,
-                )
-
-                if success:
-                    logger.info(f"✓ Auto-committed enriched .bib to Gitea: {output}")
-                    job.enrichment_summary["gitea_commit"] = True
-                    job.enrichment_summary["gitea_message"] = commit_message
-                else:
-                    logger.warning(f"Failed to auto-commit to Gitea: {output}")
-                    job.enrichment_summary["gitea_commit"] = False
-                    job.enrichment_summary["gitea_error"] = output
-
-            except Exception as gitea_error:
-                logger.error(f"Gitea integration error: {gitea_error}")
-                job.enrichment_summary["gitea_commit"] = False
-                job.enrichment_summary["gitea_error"] = str(gitea_error)
-
-        job.status = "completed"
-        job.completed_at = timezone.now()
-        job.save(
-            update_fields=[
-                "status",
-                "completed_at",
-                "total_papers",
-                "processed_papers",
-                "failed_papers",
-                "output_file",
-                "enrichment_summary",
-            ]
-        )
-
-    except Exception as e:
-        import traceback
-
-        error_details = str(e)
-
-        # Provide user-friendly error messages
-        if "duplicate key" in error_details.lower():
-            job.error_message = "Database constraint error - this may be a temporary issue. Please try uploading the file again."
-        elif "no papers found" in error_details.lower():
-            job.error_message = "No valid BibTeX entries found in the uploaded file. Please check your file format."
-        else:
-            job.error_message = f"Processing failed: {error_details}"
-
-        job.status = "failed"
-        job.completed_at = timezone.now()
-        job.processing_log += f"\n\n✗ ERROR: {job.error_message}"
-        job.save(
-            update_fields=["status", "error_message", "completed_at", "processing_log"]
-        )
-
-        logger.error(
-            f"BibTeX job {job.id} failed: {error_details}\n{traceback.format_exc()}"
-        )
-
-
 def bibtex_get_urls(request, job_id):
     """API endpoint to extract URLs and DOIs from enriched BibTeX file."""
     import bibtexparser
@@ -1243,6 +917,7 @@ def bibtex_resource_status(request):
                 "active_count": active_jobs.count(),  # Total system active jobs
                 "queued_count": queued_jobs.count(),  # Total system queued jobs
                 "completed_last_hour": recent_completed,
+                "max_concurrent": MAX_CONCURRENT_JOBS,  # Worker pool capacity
                 "active": active_jobs_list,  # Only user's active jobs
                 "queued": queued_jobs_list,  # Only user's queued jobs
                 "user_queue_position": user_queue_position,  # User's position in queue (if queued)
@@ -1404,6 +1079,7 @@ def bibtex_save_to_project(request, job_id):
                 project_dir=Path(project.git_clone_path),
                 filepath="scitex/",  # Commit entire scitex directory
                 message=f"Scholar: Added bibliography - {job.processed_papers}/{job.total_papers} papers",
+                wait=True,
             )
             committed = success
 
@@ -20,10 +20,10 @@ from django.db.models import Q
 import json
 import requests
 import hashlib
+import importlib.util
 from scitex import logging
-import asyncio
-from datetime import datetime, timedelta
-from django.db.models import Count, Avg, Max, Min
+from datetime import timedelta
+from django.db.models import Count
 from django.utils import timezone
 from ...models import (
     SearchIndex,
@@ -40,23 +40,48 @@ from ...models import (
     UserPreference,
 )
 from apps.project_app.services import get_current_project
+from ...integrations.scitex_search import (
+    get_parallel_pipeline,
+    run_pipeline_coroutine,
+)
+from ...services.search import (
+    DEFAULT_PAGE_SIZE,
+    bulk_store_search_results,
+    paginate,
+    paper_to_result,
+    pipeline_filters,
+    ranked_search_queryset,
+    schedule_bulk_store,
+    search_result_cache,
+    similar_papers,
+    similar_papers_for_many,
+)
+from ...services.trending import (
+    research_analytics,
+    trending_authors,
+    trending_keywords,
+)
 
 # Set up logger for Scholar module
 logger = logging.getLogger(__name__)
 
-# Import scitex.scholar package for real API functionality
+# Check for scitex.scholar (real API functionality); the search
+# integration imports the pipelines where they are used
 try:
-    from scitex.scholar.pipelines.ScholarPipelineSearchParallel import (
-        ScholarPipelineSearchParallel,
+    SCITEX_SCHOLAR_AVAILABLE = (
+        importlib.util.find_spec(
+            "scitex.scholar.pipelines.ScholarPipelineSearchParallel"
+        )
+        is not None
     )
-
-    SCITEX_SCHOLAR_AVAILABLE = True
-    logger.info("    SciTeX Scholar package imported successfully")
-except ImportError as e:
+except ImportError:
+    # A parent package (scitex itself) is not installed
     SCITEX_SCHOLAR_AVAILABLE = False
-    # Only warn if scitex package itself is not installed
-    logger.debug(f"    SciTeX Scholar features not available: {e}")
-    logger.debug(f"    Using database-only search")
+if SCITEX_SCHOLAR_AVAILABLE:
+    logger.info("    SciTeX Scholar package found")
+else:
+    logger.debug("    SciTeX Scholar features not available")
+    logger.debug("    Using database-only search")
 
 
 def simple_search(request):
@@ -82,6 +107,10 @@ def simple_search_with_tab(
         selected_sources.append("semantic")
     sources = ",".join(selected_sources) if selected_sources else "all"
     sort_by = request.GET.get("sort_by", "relevance")
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
 
     # Check for API key alerts if user is authenticated
     missing_api_keys = []
@@ -92,11 +121,14 @@ def simple_search_with_tab(
     # Extract advanced filters from request
     filters = extract_search_filters(request)
     results = []
+    has_next_page = False
 
     # If there's a query, search for papers
     if query:
         # First check existing papers in our database with filters applied
-        existing_papers = search_database_papers(query, filters)
+        existing_papers = search_database_papers(query, filters, page=page)
+        # A full page of local matches means the next page may have more
+        has_next_page = len(existing_papers) >= DEFAULT_PAGE_SIZE
 
         # Perform web search for additional results with filters
         user_prefs = None
@@ -145,10 +177,9 @@ def simple_search_with_tab(
                 }
             )
 
-        # Add web search results
-        for result in web_results:
-            # Store in database for future searches
-            stored_paper = store_search_result(result)
+        # Add web search results, stored in one batch for future searches
+        stored_papers = bulk_store_search_results(web_results)
+        for result, stored_paper in zip(web_results, stored_papers, strict=True):
             all_results.append(
                 {
                     "id": str(stored_paper.id),
@@ -261,6 +292,10 @@ def simple_search_with_tab(
         "current_project": current_project,  # Add current project for BibTeX save functionality
         "sources": sources,
         "sort_by": sort_by,
+        "page": page,
+        "has_previous_page": page > 1,
+        "has_next_page": has_next_page,
+        "pagination_query": pagination_query(request),
         "results": results,
         "has_results": bool(results),
         "missing_api_keys": missing_api_keys,
@@ -272,6 +307,13 @@ def simple_search_with_tab(
     return render(request, template_name, context)
 
 
+def pagination_query(request):
+    """Current query string without the page number, for pager links."""
+    params = request.GET.copy()
+    params.pop("page", None)
+    return params.urlencode()
+
+
 def extract_search_filters(request):
     """Extract all advanced search filters from request."""
     filters = {}
@@ -349,19 +391,23 @@ def extract_search_filters(request):
     return filters
 
 
-def search_database_papers(query, filters):
-    """Optimized database search with reduced complexity."""
+def search_database_papers(query, filters, page=1, page_size=DEFAULT_PAGE_SIZE):
+    """Relevance-ranked full-text search over the local index, one page at a time."""
     # Cache database results for better performance
     cache_key = (
-        f"db_search_{hashlib.md5(f'{query}_{str(filters)}'.encode()).hexdigest()}"
+        "db_search_"
+        + hashlib.md5(
+            f"{query}_{str(filters)}_{page}_{page_size}".encode()
+        ).hexdigest()
     )
     cached_results = cache.get(cache_key)
     if cached_results is not None:
         return cached_results
 
-    # Start with optimized text search - only essential fields
+    # Ranked full-text match (tsvector on PostgreSQL) - only essential fields
     queryset = (
-        SearchIndex.objects.filter(title__icontains=query, status="active")
+        ranked_search_queryset(query)
+        .filter(status="active")
         .select_related("journal")
         .only(
             "id",
@@ -369,8 +415,15 @@ def search_database_papers(query, filters):
             "abstract",
             "publication_date",
             "citation_count",
+            "citation_source",
             "is_open_access",
             "pdf_url",
+            "external_url",
+            "doi",
+            "pmid",
+            "arxiv_id",
+            "source",
+            "source_engines",
             "journal__name",
             "journal__impact_factor",
         )
@@ -395,8 +448,8 @@ def search_database_papers(query, filters):
     # Skip complex author filtering for performance - can be added back if needed
     # Author search adds significant complexity and JOIN overhead
 
-    # Limit results and cache for 30 minutes
-    results = list(queryset.order_by("-relevance_score", "-citation_count")[:10])
+    # Return the requested page and cache for 30 minutes
+    results = paginate(queryset, page=page, page_size=page_size)
     cache.set(cache_key, results, 1800)
 
     return results
@@ -493,8 +546,7 @@ def search_papers_online(
     query, max_results=200, sources="all", filters=None, user_preferences=None
 ):
     """Search for papers using multiple online sources with user API keys and impact factor integration."""
-    # Disable caching for fresh results and debugging
-    logger.info(f"Scholar search: fresh search (no cache) for query: '{query}'")
+    logger.info(f"Scholar search for query: '{query}'")
 
     results = []
 
@@ -585,10 +637,10 @@ def search_papers_online(
                     "   ⚠️ Semantic Scholar search disabled (not implemented)"
                 )
 
-    # Return fresh results without caching
+    # External results come from the shared search result cache when available
     final_results = results[:max_results]
     logger.info(
-        f"Scholar search completed: {len(final_results)} fresh results from {len(source_list)} sources"
+        f"Scholar search completed: {len(final_results)} results from {len(source_list)} sources"
     )
 
     return final_results
@@ -600,108 +652,70 @@ def search_with_scitex_scholar(
     """
     Use SciTeX-Scholar parallel search pipeline for real external API searches.
     Searches all engines in parallel and returns deduplicated, enriched results.
+
+    Results are served from the shared search result cache when possible;
+    misses (and stale entries, in the background) go to the engines.
     """
     if not SCITEX_SCHOLAR_AVAILABLE:
         return []
 
+    cache_key = search_result_cache.make_key(
+        query, sources, filters, max_results=max_results
+    )
+    return search_result_cache.get_or_fetch(
+        cache_key,
+        lambda: _fetch_with_scitex_scholar(
+            query, sources, max_results=max_results, filters=filters
+        ),
+    )
+
+
+def _fetch_with_scitex_scholar(query, sources, max_results=30, filters=None):
+    """
+    Run the parallel pipeline (uncached).
+
+    Returns (results, engines_used); engines_used is empty when the search
+    failed, so the cache keeps whatever it had before.
+    """
     try:
         logger.info(f"🚀 Using SciTeX-Scholar parallel search pipeline")
         logger.info(f"   Query: '{query}'")
         logger.info(f"   Sources requested: {sources}")
 
-        # Create search pipeline
-        pipeline = ScholarPipelineSearchParallel(
-            max_workers=5, timeout_per_engine=30.0, use_cache=True
-        )
-
-        # Prepare filters for the pipeline
-        search_filters = {}
-        if filters:
-            if filters.get("year_from"):
-                search_filters["year_start"] = filters["year_from"]
-            if filters.get("year_to"):
-                search_filters["year_end"] = filters["year_to"]
-            if filters.get("min_citations"):
-                search_filters["min_citations"] = filters["min_citations"]
-            if filters.get("min_impact_factor"):
-                search_filters["min_impact_factor"] = filters["min_impact_factor"]
-            if filters.get("open_access"):
-                search_filters["open_access"] = filters["open_access"]
-
-        # Run async search in sync context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        try:
-            # Execute parallel search across all engines
-            search_response = loop.run_until_complete(
-                pipeline.search_async(
-                    query=query,
-                    search_fields=["title", "abstract"],
-                    filters=search_filters,
-                    max_results=max_results,
-                )
+        # Shared per-process pipeline
+        pipeline = get_parallel_pipeline()
+        if pipeline is None:
+            return [], []
+
+        # Execute parallel search across all engines on the shared loop
+        search_response = run_pipeline_coroutine(
+            pipeline.search_async(
+                query=query,
+                search_fields=["title", "abstract"],
+                filters=pipeline_filters(filters),
+                max_results=max_results,
             )
+        )
 
-            papers = search_response.get("results", [])
-            metadata = search_response.get("metadata", {})
-
-            logger.info(f"   SciTeX-Scholar found {len(papers)} unique papers")
-            logger.info(f"   Engines used: {metadata.get('engines_used', [])}")
-            logger.info(f"   Search time: {metadata.get('search_time', 0):.2f}s")
-
-            # Convert to Django format with proper author formatting
-            results = []
-            for paper in papers:
-                # Format authors as comma-separated string
-                authors = paper.get("authors", [])
-                authors_str = (
-                    ", ".join(authors) if isinstance(authors, list) else str(authors)
-                )
+        papers = search_response.get("results", [])
+        metadata = search_response.get("metadata", {})
+        engines_used = metadata.get("engines_used", [])
 
-                result = {
-                    "title": paper.get("title", "Unknown Title"),
-                    "authors": authors_str,
-                    "year": paper.get("year", "2024"),
-                    "journal": paper.get("journal", "Unknown Journal"),
-                    "abstract": paper.get("abstract", "No abstract available."),
-                    "full_abstract": paper.get("abstract", ""),
-                    "snippet": (
-                        paper.get("abstract", "No abstract available.")[:200] + "..."
-                    )
-                    if paper.get("abstract")
-                    else "No abstract available.",
-                    "external_url": paper.get("external_url", ""),
-                    "pdf_url": paper.get("pdf_url", ""),
-                    "doi": paper.get("doi", ""),
-                    "pmid": paper.get("pmid", ""),
-                    "arxiv_id": paper.get("arxiv_id", ""),
-                    "citations": paper.get("citation_count", 0),
-                    "citation_count": paper.get("citation_count", 0),
-                    "citation_source": paper.get("source_engines", ["scitex"])[0]
-                    if paper.get("source_engines")
-                    else "scitex",
-                    "is_open_access": paper.get("is_open_access", False),
-                    "source": "scitex_parallel",
-                    "source_engines": paper.get("source_engines", []),
-                    "impact_factor": paper.get("impact_factor"),
-                }
-                results.append(result)
-                logger.debug(
-                    f"   ✓ Converted: {paper.get('title', '')[:50]}... (IF: {paper.get('impact_factor') or 'N/A'})"
-                )
+        logger.info(f"   SciTeX-Scholar found {len(papers)} unique papers")
+        logger.info(f"   Engines used: {engines_used}")
+        logger.info(f"   Search time: {metadata.get('search_time', 0):.2f}s")
 
-            return results
+        # Convert to Django format with proper author formatting
+        results = [paper_to_result(paper) for paper in papers]
 
-        finally:
-            loop.close()
+        return results, engines_used
 
     except Exception as e:
         logger.error(f"SciTeX-Scholar parallel search failed: {e}")
         import traceback
 
         logger.error(f"Traceback:\n{traceback.format_exc()}")
-        return []
+        return [], []
 
 
 def search_arxiv_real(query, max_results=15, filters=None):
@@ -1249,36 +1263,6 @@ def get_pubmed_citations(pmid):
     return 0
 
 
-def validate_citation_count(citation_count, source=None):
-    """
-    Validate and clean citation count data.
-    Returns (validated_count, is_reliable) tuple.
-    """
-    try:
-        count = int(citation_count) if citation_count is not None else 0
-
-        # Basic validation
-        if count < 0:
-            return 0, False
-
-        # Flag potentially unreliable data
-        is_reliable = True
-
-        # Very high citation counts need verification
-        if count > 10000:
-            logger.warning(f"Unusually high citation count: {count} from {source}")
-            is_reliable = False
-
-        # Mark zero citations from certain sources as less reliable
-        if count == 0 and source in ["pubmed", "arxiv"]:
-            is_reliable = False
-
-        return count, is_reliable
-
-    except (ValueError, TypeError):
-        return 0, False
-
-
 def search_pubmed_central(query, max_results=50, filters=None):
     """Search PubMed Central (PMC) for open access papers."""
     try:
@@ -1546,201 +1530,8 @@ def search_semantic_scholar(query, max_results=100, filters=None):
 
 
 def store_search_result(result):
-    """Store search result in database with deduplication."""
-    try:
-        # Check for existing paper using multiple identifiers
-        existing_paper = None
-
-        # Check by DOI first (most reliable)
-        if result.get("doi"):
-            existing_paper = SearchIndex.objects.filter(doi=result["doi"]).first()
-
-        # Check by PMID
-        if not existing_paper and result.get("pmid"):
-            existing_paper = SearchIndex.objects.filter(pmid=result["pmid"]).first()
-
-        # Check by arXiv ID
-        if not existing_paper and result.get("arxiv_id"):
-            existing_paper = SearchIndex.objects.filter(
-                arxiv_id=result["arxiv_id"]
-            ).first()
-
-        # Check by title similarity (exact match or very close)
-        if not existing_paper and result.get("title"):
-            title_lower = result["title"].lower().strip()
-            # Check for exact title match
-            existing_paper = SearchIndex.objects.filter(
-                title__iexact=title_lower
-            ).first()
-
-            # Check for very similar titles (remove common words and check)
-            if not existing_paper:
-                title_clean = " ".join(
-                    [word for word in title_lower.split() if len(word) > 3]
-                )
-                if (
-                    len(title_clean) > 20
-                ):  # Only check similarity for substantial titles
-                    similar_papers = SearchIndex.objects.filter(
-                        title__icontains=title_clean[:30]
-                    )
-                    for similar_paper in similar_papers:
-                        if abs(len(similar_paper.title) - len(result["title"])) < 10:
-                            existing_paper = similar_paper
-                            break
-
-        # If paper exists, update it with new information
-        if existing_paper:
-            logger.info(f"Found existing paper, updating: {existing_paper.title}")
-
-            # Update source_engines list (merge sources)
-            result_sources = result.get("source_engines", [])
-            if isinstance(result_sources, list) and result_sources:
-                existing_sources = (
-                    existing_paper.source_engines
-                    if existing_paper.source_engines
-                    else []
-                )
-                # Merge and deduplicate sources
-                merged_sources = list(set(existing_sources + result_sources))
-                existing_paper.source_engines = merged_sources
-            elif result.get("source"):
-                # Fall back to single source if source_engines not provided
-                existing_sources = (
-                    existing_paper.source_engines
-                    if existing_paper.source_engines
-                    else []
-                )
-                source = result.get("source", "unknown")
-                if source not in existing_sources:
-                    existing_paper.source_engines = existing_sources + [source]
-
-            # Update citation count if new source provides better data
-            new_citation_count, is_reliable = validate_citation_count(
-                result.get("citations", 0), result.get("source", "unknown")
-            )
-            if is_reliable and new_citation_count > existing_paper.citation_count:
-                existing_paper.citation_count = new_citation_count
-                existing_paper.citation_source = result.get("source", "unknown")
-                existing_paper.citation_last_updated = timezone.now()
-
-            # Update missing fields
-            if not existing_paper.abstract and result.get("abstract"):
-                existing_paper.abstract = result["abstract"]
-            if not existing_paper.pdf_url and result.get("pdf_url"):
-                existing_paper.pdf_url = result["pdf_url"]
-            if not existing_paper.doi and result.get("doi"):
-                existing_paper.doi = (
-                    result["doi"] or None
-                )  # Convert empty strings to None
-            if not existing_paper.pmid and result.get("pmid"):
-                existing_paper.pmid = (
-                    result["pmid"] or None
-                )  # Convert empty strings to None
-            if not existing_paper.arxiv_id and result.get("arxiv_id"):
-                existing_paper.arxiv_id = (
-                    result["arxiv_id"] or None
-                )  # Convert empty strings to None
-
-            # Update authors if existing paper has no authors
-            if not existing_paper.authors.exists() and result.get("authors"):
-                _create_paper_authors(
-                    paper=existing_paper, authors_str=result["authors"]
-                )
-
-            existing_paper.save()
-            return existing_paper
-
-        # Create or get journal
-        journal = None
-        if result.get("journal"):
-            journal, created = Journal.objects.get_or_create(
-                name=result["journal"],
-                defaults={"abbreviation": result["journal"][:10]},
-            )
-
-        # Prepare source_engines list
-        source_engines = result.get("source_engines", [])
-        if not source_engines and result.get("source"):
-            source_engines = [result.get("source", "web")]
-
-        # Create new paper
-        paper = SearchIndex.objects.create(
-            title=result["title"],
-            abstract=result.get("abstract", ""),
-            publication_date=datetime(int(result.get("year", 2024)), 1, 1),
-            journal=journal,
-            pdf_url=result.get("pdf_url", ""),
-            doi=result.get("doi") or None,  # Convert empty strings to None
-            pmid=result.get("pmid") or None,  # Convert empty strings to None
-            arxiv_id=result.get("arxiv_id") or None,  # Convert empty strings to None
-            citation_count=validate_citation_count(
-                result.get("citations", 0), result.get("source", "unknown")
-            )[0],
-            citation_source=result.get("source", "unknown"),
-            citation_last_updated=timezone.now()
-            if result.get("citations", 0) > 0
-            else None,
-            is_open_access=result.get("is_open_access", False),
-            source=result.get("source", "web"),
-            source_engines=source_engines,
-            relevance_score=1.0,
-        )
-
-        # Create authors
-        if result.get("authors"):
-            _create_paper_authors(paper=paper, authors_str=result["authors"])
-
-        return paper
-
-    except Exception as e:
-        print(f"Error storing search result: {e}")
-        # Return a minimal paper object if storage fails
-        return SearchIndex.objects.create(
-            title=result.get("title", "Unknown Title"),
-            abstract=result.get("abstract", ""),
-            doi=None,  # Ensure unique constraint compliance
-            pmid=None,  # Ensure unique constraint compliance
-            arxiv_id=None,  # Ensure unique constraint compliance
-            relevance_score=1.0,
-        )
-
-
-def _create_paper_authors(paper, authors_str):
-    """Helper function to create author associations for a paper.
-
-    Args:
-        paper: SearchIndex paper object
-        authors_str: String of comma-separated authors or list of author names
-    """
-    if not authors_str:
-        return
-
-    # Handle both string and list inputs
-    if isinstance(authors_str, str):
-        author_names = authors_str.split(", ")
-    elif isinstance(authors_str, list):
-        author_names = authors_str
-    else:
-        return
-
-    for i, author_name in enumerate(author_names):
-        if author_name and author_name.strip():
-            # Simple name parsing
-            name_parts = author_name.strip().split()
-            first_name = name_parts[0] if name_parts else ""
-            last_name = " ".join(name_parts[1:]) if len(name_parts) > 1 else ""
-
-            author, created = Author.objects.get_or_create(
-                first_name=first_name, last_name=last_name, defaults={"email": ""}
-            )
-
-            # Link author to paper
-            from ..models import AuthorPaper
-
-            AuthorPaper.objects.get_or_create(
-                author=author, paper=paper, defaults={"author_order": i + 1}
-            )
+    """Store a single search result in database with deduplication."""
+    return bulk_store_search_results([result])[0]
 
 
 def get_paper_authors(paper):
@@ -2760,6 +2551,9 @@ def run_saved_search(request, search_id):
                 }
             )
 
+        # Index new web results for future searches once the response is sent
+        schedule_bulk_store([r for r in web_results if not r.get("id")])
+
         # Add web results
         for result in web_results:
             all_results.append(
@@ -2985,17 +2779,15 @@ def get_file_extension(format_type):
 def paper_recommendations(request, paper_id):
     """Get similarity recommendations for a specific paper."""
     try:
-        from .views import _calculate_paper_similarity
-
         # Get the source paper
         paper = SearchIndex.objects.get(id=paper_id, status="active")
 
-        # Get similarity recommendations
-        similar_papers = _calculate_paper_similarity(paper, limit=10)
+        # Precomputed neighbors (refresh_paper_neighbors)
+        similar = similar_papers(paper, limit=10)
 
         # Format recommendations for API response
         recommendations = []
-        for sim_paper, score, reason in similar_papers:
+        for sim_paper, score, reason in similar:
             recommendations.append(
                 {
                     "id": sim_paper.id,
@@ -3045,20 +2837,23 @@ def paper_recommendations(request, paper_id):
 def user_recommendations(request):
     """Get personalized recommendations based on user's recent activity."""
     try:
-        from .views import _get_similar_papers_recommendations
-        from ..models import RecommendationLog
+        from ...models import RecommendationLog
 
         # Get user's recent views for recommendations
-        recent_views = (
+        recent_paper_ids = (
             RecommendationLog.objects.filter(user=request.user, clicked=True)
-            .select_related("source_paper")
-            .order_by("-created_at")[:10]
+            .exclude(source_paper=None)
+            .order_by("-created_at")
+            .values_list("source_paper_id", flat=True)[:10]
         )
 
-        # Generate recommendations
-        recommendations = _get_similar_papers_recommendations(
-            request.user, recent_views
-        )
+        # Precomputed neighbors of those papers, best first
+        recommendations = [
+            {"paper": paper, "score": score, "reason": reason, "type": "similar"}
+            for paper, score, reason in similar_papers_for_many(
+                list(recent_paper_ids), limit=20
+            )
+        ]
 
         # Format for API response
         formatted_recommendations = []
@@ -3455,31 +3250,12 @@ def api_trending_topics(request):
     try:
         # Get time range parameter
         days = int(request.GET.get("days", 30))
-        since = timezone.now() - timedelta(days=days)
 
-        # Analyze trending topics from recent paper keywords
-        recent_papers = SearchIndex.objects.filter(
-            status="active", created_at__gte=since
-        ).exclude(keywords="")
-
-        # Count keyword frequency
-        topic_counts = {}
-        for paper in recent_papers:
-            if paper.keywords:
-                keywords = [
-                    k.strip().lower() for k in paper.keywords.split(",") if k.strip()
-                ]
-                for keyword in keywords:
-                    if len(keyword) > 2:  # Filter out very short keywords
-                        topic_counts[keyword] = topic_counts.get(keyword, 0) + 1
-
-        # Get top trending topics
-        trending_topics = sorted(
-            topic_counts.items(), key=lambda x: x[1], reverse=True
-        )[:15]
+        # Keyword counts from the daily rollups (refresh_scholar_rollups)
+        trending = trending_keywords(days=days, limit=15)
 
         topics_data = []
-        for topic, count in trending_topics:
+        for topic, count in trending["keywords"]:
             # Calculate growth rate (simplified)
             growth_rate = min(count * 10, 100)  # Simplified growth calculation
 
@@ -3501,7 +3277,7 @@ def api_trending_topics(request):
                 "status": "success",
                 "topics": topics_data,
                 "period_days": days,
-                "total_analyzed_papers": recent_papers.count(),
+                "total_analyzed_papers": trending["analyzed_papers"],
             }
         )
 
@@ -3517,34 +3293,10 @@ def api_trending_authors(request):
     try:
         # Get time range parameter
         days = int(request.GET.get("days", 90))  # Default to 90 days for author trends
-        since = timezone.now() - timedelta(days=days)
-
-        # Get authors with recent publications
-        trending_authors = (
-            Author.objects.filter(
-                authorpaper__paper__status="active",
-                authorpaper__paper__created_at__gte=since,
-            )
-            .annotate(
-                recent_papers=Count("authorpaper__paper", distinct=True),
-                total_citations=Count(
-                    "authorpaper__paper__citations_received", distinct=True
-                ),
-                avg_citations=Avg("authorpaper__paper__citation_count"),
-            )
-            .filter(recent_papers__gt=0)
-            .order_by("-recent_papers", "-total_citations")[:15]
-        )
 
         authors_data = []
-        for author in trending_authors:
-            # Get recent papers for this author
-            recent_papers = SearchIndex.objects.filter(
-                status="active", authors=author, created_at__gte=since
-            ).order_by("-publication_date")[:3]
-
-            recent_paper_titles = [paper.title for paper in recent_papers]
-
+        for entry in trending_authors(days=days, limit=15):
+            author = entry["author"]
             authors_data.append(
                 {
                     "id": str(author.id),
@@ -3552,11 +3304,9 @@ def api_trending_authors(request):
                     "affiliation": author.affiliation,
                     "h_index": author.h_index,
                     "total_citations": author.total_citations,
-                    "recent_papers_count": author.recent_papers,
-                    "avg_citations": float(author.avg_citations)
-                    if author.avg_citations
-                    else 0,
-                    "recent_papers": recent_paper_titles,
+                    "recent_papers_count": entry["recent_papers"],
+                    "avg_citations": float(entry["avg_citations"]),
+                    "recent_papers": entry["recent_titles"],
                     "orcid": author.orcid,
                 }
             )
@@ -3580,56 +3330,13 @@ def api_trending_authors(request):
 def api_research_analytics(request):
     """Get comprehensive research analytics and statistics."""
     try:
-        # Time range analysis
         current_date = timezone.now()
-        last_month = current_date - timedelta(days=30)
-        last_year = current_date - timedelta(days=365)
-
-        # Basic statistics
-        total_papers = SearchIndex.objects.filter(status="active").count()
-        recent_papers = SearchIndex.objects.filter(
-            status="active", created_at__gte=last_month
-        ).count()
-
-        # Publication trends by year
-        yearly_stats = (
-            SearchIndex.objects.filter(status="active", publication_date__isnull=False)
-            .extra(select={"year": "EXTRACT(year FROM publication_date)"})
-            .values("year")
-            .annotate(paper_count=Count("id"))
-            .order_by("-year")[:10]
-        )
-
-        # Top journals by paper count
-        top_journals = (
-            Journal.objects.annotate(paper_count=Count("searchindex"))
-            .filter(paper_count__gt=0)
-            .order_by("-paper_count")[:10]
-        )
 
-        # Open access statistics
-        open_access_count = SearchIndex.objects.filter(
-            status="active", is_open_access=True
-        ).count()
-        open_access_percentage = (
-            (open_access_count / total_papers * 100) if total_papers > 0 else 0
-        )
-
-        # Citation statistics
-        citation_stats = SearchIndex.objects.filter(status="active").aggregate(
-            total_citations=Count("citations_received"),
-            avg_citations=Avg("citation_count"),
-            max_citations=Max("citation_count"),
-            min_citations=Min("citation_count"),
-        )
-
-        # Document type distribution
-        doc_type_stats = (
-            SearchIndex.objects.filter(status="active")
-            .values("document_type")
-            .annotate(count=Count("id"))
-            .order_by("-count")
-        )
+        # Precomputed by refresh_scholar_rollups
+        stats = research_analytics(recent_days=30)
+        total_papers = stats.get("total_papers", 0)
+        recent_papers = stats["recent_papers"]
+        open_access_count = stats.get("open_access", 0)
 
         analytics_data = {
             "overview": {
@@ -3638,34 +3345,27 @@ def api_research_analytics(request):
                 "growth_rate": (
                     (recent_papers / total_papers * 100) if total_papers > 0 else 0
                 ),
-                "total_authors": Author.objects.count(),
-                "total_journals": Journal.objects.count(),
-                "active_topics": Topic.objects.filter(paper_count__gt=0).count(),
+                "total_authors": stats.get("total_authors", 0),
+                "total_journals": stats.get("total_journals", 0),
+                "active_topics": stats.get("active_topics", 0),
             },
             "publication_trends": [
-                {"year": int(stat["year"]), "papers": stat["paper_count"]}
-                for stat in yearly_stats
-            ],
-            "top_journals": [
-                {
-                    "name": journal.name,
-                    "paper_count": journal.paper_count,
-                    "impact_factor": float(journal.impact_factor)
-                    if journal.impact_factor
-                    else None,
-                }
-                for journal in top_journals
+                {"year": year, "papers": count}
+                for year, count in stats["publication_years"]
             ],
+            "top_journals": stats.get("top_journals", []),
             "open_access": {
                 "total_open_access": open_access_count,
-                "percentage": round(open_access_percentage, 1),
+                "percentage": round(
+                    (open_access_count / total_papers * 100) if total_papers else 0, 1
+                ),
                 "total_papers": total_papers,
             },
             "citations": {
-                "total_citations": citation_stats["total_citations"] or 0,
-                "average_citations": round(citation_stats["avg_citations"] or 0, 1),
-                "highest_cited": citation_stats["max_citations"] or 0,
-                "lowest_cited": citation_stats["min_citations"] or 0,
+                "total_citations": stats.get("total_citations") or 0,
+                "average_citations": round(stats.get("avg_citations") or 0, 1),
+                "highest_cited": stats.get("max_citations") or 0,
+                "lowest_cited": stats.get("min_citations") or 0,
             },
             "document_types": [
                 {
@@ -3675,7 +3375,7 @@ def api_research_analytics(request):
                     if total_papers > 0
                     else 0,
                 }
-                for stat in doc_type_stats
+                for stat in stats.get("document_types", [])
             ],
         }
 
@@ -3684,6 +3384,9 @@ def api_research_analytics(request):
                 "status": "success",
                 "analytics": analytics_data,
                 "generated_at": current_date.isoformat(),
+                "computed_at": stats["computed_at"].isoformat()
+                if stats["computed_at"]
+                else None,
             }
         )
 
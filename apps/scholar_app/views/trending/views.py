@@ -10,18 +10,17 @@ from django.shortcuts import render
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
-from django.db.models import Count, Avg
+from django.db.models import Count
 from django.utils import timezone
 from datetime import timedelta
 import logging
 
 from ...models import (
     SearchIndex as Paper,
-    Author,
-    Journal,
     UserLibrary,
     Topic,
 )
+from ...services.trending import research_analytics, trending_authors
 
 logger = logging.getLogger(__name__)
 
@@ -110,26 +109,15 @@ def api_trending_authors(request):
         days = int(request.GET.get("days", 30))
         limit = int(request.GET.get("limit", 10))
 
-        cutoff_date = timezone.now() - timedelta(days=days)
-
-        trending_authors = (
-            Author.objects.filter(papers__created_at__gte=cutoff_date)
-            .annotate(
-                paper_count=Count("papers", distinct=True),
-                avg_citations=Avg("papers__citation_count"),
-            )
-            .order_by("-paper_count")[:limit]
-        )
-
         authors_data = [
             {
-                "id": str(a.id),
-                "name": f"{a.first_name} {a.last_name}",
-                "paper_count": a.paper_count,
-                "avg_citations": round(a.avg_citations or 0, 2),
-                "affiliation": a.affiliation,
+                "id": str(entry["author"].id),
+                "name": f"{entry['author'].first_name} {entry['author'].last_name}",
+                "paper_count": entry["recent_papers"],
+                "avg_citations": round(entry["avg_citations"], 2),
+                "affiliation": entry["author"].affiliation,
             }
-            for a in trending_authors
+            for entry in trending_authors(days=days, limit=limit)
         ]
 
         return JsonResponse(
@@ -145,40 +133,23 @@ def api_trending_authors(request):
 def api_research_analytics(request):
     """API endpoint for research analytics and statistics"""
     try:
-        # Overall statistics
-        total_papers = Paper.objects.count()
-        total_authors = Author.objects.count()
-        total_journals = Journal.objects.count()
+        # Corpus statistics are precomputed by refresh_scholar_rollups
+        stats = research_analytics(years=10)
 
         # User-specific statistics
         user_papers = UserLibrary.objects.filter(user=request.user).count()
 
-        # Average metrics
-        avg_citations = Paper.objects.aggregate(avg=Avg("citation_count"))["avg"] or 0
-
-        avg_impact_factor = (
-            Journal.objects.aggregate(avg=Avg("impact_factor"))["avg"] or 0
-        )
-
-        # Papers per year (last 10 years)
-        from django.db.models import Count
-
-        papers_per_year = (
-            Paper.objects.filter(publication_date__year__gte=timezone.now().year - 10)
-            .extra(select={"year": "YEAR(publication_date)"})
-            .values("year")
-            .annotate(count=Count("id"))
-            .order_by("year")
-        )
-
         analytics = {
-            "total_papers": total_papers,
-            "total_authors": total_authors,
-            "total_journals": total_journals,
+            "total_papers": stats.get("total_papers", 0),
+            "total_authors": stats.get("total_authors", 0),
+            "total_journals": stats.get("total_journals", 0),
             "user_papers": user_papers,
-            "avg_citations": round(avg_citations, 2),
-            "avg_impact_factor": round(avg_impact_factor, 2),
-            "papers_per_year": list(papers_per_year),
+            "avg_citations": round(stats.get("avg_citations") or 0, 2),
+            "avg_impact_factor": round(stats.get("avg_impact_factor") or 0, 2),
+            "papers_per_year": [
+                {"year": year, "count": count}
+                for year, count in stats["publication_years"]
+            ],
         }
 
         return JsonResponse({"success": True, "analytics": analytics})
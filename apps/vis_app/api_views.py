@@ -12,7 +12,8 @@ from django.shortcuts import get_object_or_404
 from django.core.files.base import ContentFile
 import base64
 
-from .plot_renderer import render_plot_from_spec
+from .plot_data import convert_to_parquet
+from .render_service import render_plot_svg
 
 from .models import (
     JournalPreset,
@@ -476,14 +477,16 @@ def render_plot(request):
                 'error': 'Missing required field: either plot or panels is required'
             }, status=400)
 
-        # Render plot using matplotlib backend
-        svg_buffer = render_plot_from_spec(spec)
+        # Render plot using matplotlib backend (cached by spec and data)
+        svg, digest = render_plot_svg(spec)
+        etag = f'"{digest}"'
 
-        # Return SVG
-        return HttpResponse(
-            svg_buffer.getvalue(),
-            content_type='image/svg+xml'
-        )
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponse(status=304)
+        else:
+            response = HttpResponse(svg, content_type='image/svg+xml')
+        response['ETag'] = etag
+        return response
 
     except json.JSONDecodeError:
         return JsonResponse({
@@ -551,6 +554,10 @@ def upload_plot_data(request):
             for chunk in uploaded_file.chunks():
                 destination.write(chunk)
 
+        # Columnar copy so re-renders skip CSV parsing (needs pyarrow)
+        if file_ext == '.csv':
+            convert_to_parquet(str(file_path))
+
         return JsonResponse({
             'success': True,
             'file_path': str(file_path),
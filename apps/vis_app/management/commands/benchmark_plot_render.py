@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Django management command to benchmark multi-panel plot rendering.
+
+Renders the same multi-panel figure in two modes and reports panels/sec:
+
+- inline: render_plot_from_spec in the calling process, panels drawn one
+          after another on a single figure (the path used before the
+          render worker pool)
+- pool:   RenderPool, panels rendered in parallel on warmed-up worker
+          processes and composited
+
+The render cache is bypassed, so every sample is a real render. Each panel
+plots its own synthetic line series written to a temporary CSV.
+
+Usage:
+    python manage.py benchmark_plot_render
+    python manage.py benchmark_plot_render --panels 8 --points 200000 --workers 4
+"""
+
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.vis_app.plot_renderer import render_plot_from_spec
+from apps.vis_app.render_pool import RENDER_WORKERS, RenderPool
+
+
+def build_spec(csv_paths, columns=2):
+    """Grid of 40 x 30 mm line panels, one per CSV."""
+    rows = (len(csv_paths) + columns - 1) // columns
+    panels = []
+    for index, csv_path in enumerate(csv_paths):
+        row, column = divmod(index, columns)
+        panels.append(
+            {
+                "id": chr(ord("A") + index % 26),
+                "x_mm": 10 + column * 45,
+                "y_mm": 8 + (rows - 1 - row) * 38,
+                "width_mm": 35,
+                "height_mm": 28,
+                "plot": {
+                    "kind": "line",
+                    "csv_path": str(csv_path),
+                    "xlabel": "Time (s)",
+                    "ylabel": "Amplitude",
+                },
+            }
+        )
+    return {
+        "figure": {"width_mm": 10 + columns * 45, "height_mm": 10 + rows * 38, "dpi": 300},
+        "style": {"tick_length_mm": 0.8},
+        "panels": panels,
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark inline vs worker-pool multi-panel plot rendering"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--panels", type=int, default=6, help="Panels per figure (default: 6)"
+        )
+        parser.add_argument(
+            "--points", type=int, default=100_000, help="Samples per panel (default: 100000)"
+        )
+        parser.add_argument(
+            "--runs", type=int, default=5, help="Timed renders per mode (default: 5)"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=RENDER_WORKERS,
+            help=f"Render worker processes (default: {RENDER_WORKERS})",
+        )
+
+    def handle(self, *args, **options):
+        panels = options["panels"]
+        runs = max(options["runs"], 1)
+        if panels < 2:
+            raise CommandError("--panels must be at least 2")
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1")
+
+        with tempfile.TemporaryDirectory(prefix="vis-render-bench-") as tmp:
+            csv_paths = []
+            x = np.linspace(0, 10, options["points"])
+            for index in range(panels):
+                path = Path(tmp) / f"panel_{index}.csv"
+                y = np.sin(x * (index + 1)) + np.random.normal(0, 0.1, len(x))
+                pd.DataFrame({"x": x, "y": y}).to_csv(path, index=False)
+                csv_paths.append(path)
+            spec = build_spec(csv_paths)
+
+            pool = RenderPool(workers=options["workers"])
+            modes = {
+                "inline": lambda: render_plot_from_spec(spec).getvalue(),
+                "pool": lambda: pool.render(spec),
+            }
+
+            self.stdout.write(
+                f"{panels} panels x {options['points']:,} points, "
+                f"{options['workers']} workers, {runs} runs per mode\n"
+            )
+            self.stdout.write(f"{'mode':<8} {'p50':>10} {'panels/s':>10}")
+
+            rates = {}
+            try:
+                for mode, render in modes.items():
+                    # Warm-up: starts workers and fills per-process data caches
+                    render()
+                    samples = []
+                    for _ in range(runs):
+                        started = time.perf_counter()
+                        render()
+                        samples.append(time.perf_counter() - started)
+                    median = statistics.median(samples)
+                    rates[mode] = panels / median
+                    self.stdout.write(
+                        f"{mode:<8} {median * 1000:>8.0f}ms {rates[mode]:>10.1f}"
+                    )
+            finally:
+                pool.shutdown()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ pool: {rates['pool'] / rates['inline']:.1f}x panels/sec of inline"
+            )
+        )
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Plot Data Loading and Decimation
+Caches parsed DataFrames and reduces large series to what the figure can show.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+try:
+    import pyarrow  # noqa: F401
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+logger = logging.getLogger(__name__)
+
+PLOT_DATA_CACHE_SIZE = getattr(settings, "SCITEX_VIS_DATA_CACHE_SIZE", 8)
+
+# Series shorter than this many points per horizontal pixel are drawn as-is
+DECIMATION_POINTS_PER_PIXEL = 2
+
+_frames = OrderedDict()
+_frames_lock = threading.Lock()
+
+
+def file_identity(path):
+    """(realpath, mtime_ns, size) of a data file; changes whenever it is rewritten."""
+    stat = os.stat(path)
+    return os.path.realpath(path), stat.st_mtime_ns, stat.st_size
+
+
+def parquet_path(csv_path):
+    return f"{csv_path}.parquet"
+
+
+def convert_to_parquet(csv_path):
+    """
+    Write a Parquet copy next to an uploaded CSV so later loads skip parsing.
+
+    Returns:
+        Path of the Parquet file, or None if it could not be written
+    """
+    if not HAS_PYARROW:
+        return None
+    path = parquet_path(csv_path)
+    try:
+        pd.read_csv(csv_path).to_parquet(path, index=False)
+    except Exception as e:
+        # The CSV is still usable; it is just parsed on first render
+        logger.warning(f"Could not convert {csv_path} to Parquet: {e}")
+        if os.path.exists(path):
+            os.unlink(path)
+        return None
+    return path
+
+
+def _read(path):
+    parquet = parquet_path(path)
+    if HAS_PYARROW and os.path.exists(parquet):
+        if os.stat(parquet).st_mtime_ns >= os.stat(path).st_mtime_ns:
+            return pd.read_parquet(parquet)
+    if path.lower().endswith((".xlsx", ".xls")):
+        return pd.read_excel(path)
+    return pd.read_csv(path)
+
+
+def load_dataframe(path):
+    """
+    Parsed data file, cached by path and modification time.
+
+    The returned DataFrame is shared between renders and must not be
+    modified in place.
+    """
+    key = file_identity(path)
+    with _frames_lock:
+        df = _frames.get(key)
+        if df is not None:
+            _frames.move_to_end(key)
+            return df
+
+    df = _read(path)
+
+    with _frames_lock:
+        # Older versions of the same file can never be hit again
+        for stale in [k for k in _frames if k[0] == key[0]]:
+            del _frames[stale]
+        _frames[key] = df
+        while len(_frames) > PLOT_DATA_CACHE_SIZE:
+            _frames.popitem(last=False)
+    return df
+
+
+def clear_dataframe_cache():
+    with _frames_lock:
+        _frames.clear()
+
+
+def axes_width_px(ax):
+    """Width of an axes in device pixels at the figure's dpi."""
+    fig = ax.figure
+    return max(1, int(ax.get_position().width * fig.get_figwidth() * fig.dpi))
+
+
+def _is_sorted(x):
+    return bool(np.all(x[1:] >= x[:-1]))
+
+
+def min_max_decimate(x, y, n_buckets):
+    """
+    Keep the minimum and maximum of each bucket of consecutive points.
+
+    Line plots drawn from the result are visually identical at one bucket per
+    pixel column, since every peak and trough survives.
+    """
+    n = len(y)
+    size = int(np.ceil(n / n_buckets))
+    full = (n // size) * size
+    blocks = y[:full].reshape(-1, size)
+    offsets = np.arange(0, full, size)
+    keep = [
+        offsets + blocks.argmin(axis=1),
+        offsets + blocks.argmax(axis=1),
+    ]
+    if full < n:
+        tail = y[full:]
+        keep.append(np.array([full + tail.argmin(), full + tail.argmax()]))
+    keep.append(np.array([0, n - 1]))
+    idx = np.unique(np.concatenate(keep))
+    return x[idx], y[idx]
+
+
+def lttb_decimate(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling to n_out points."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return x, y
+    x = x.astype(float)
+    y = y.astype(float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    idx = np.empty(n_out, dtype=int)
+    idx[0], idx[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        area = np.abs(
+            (x[previous] - avg_x) * (bucket_y - y[previous])
+            - (x[previous] - bucket_x) * (avg_y - y[previous])
+        )
+        previous = start + int(area.argmax())
+        idx[i + 1] = previous
+    return x[idx], y[idx]
+
+
+def decimate_series(x, y, width_px, method="minmax"):
+    """
+    Reduce an (x, y) series to roughly what width_px pixel columns can show.
+
+    Series with unsorted x or missing values are returned unchanged, since
+    bucketing consecutive points would then change the drawn shape.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(y) <= DECIMATION_POINTS_PER_PIXEL * width_px:
+        return x, y
+    if not (np.issubdtype(x.dtype, np.number) and np.issubdtype(y.dtype, np.number)):
+        return x, y
+    if np.isnan(y).any() or np.isnan(x).any() or not _is_sorted(x):
+        return x, y
+    if method == "lttb":
+        return lttb_decimate(x, y, DECIMATION_POINTS_PER_PIXEL * width_px)
+    return min_max_decimate(x, y, width_px)
+
+
+def decimate_events(times, width_px, t_min, t_max):
+    """Keep one event per pixel column; the rest would draw on the same line."""
+    times = np.asarray(times)
+    if len(times) <= width_px or t_max <= t_min:
+        return times
+    columns = ((times - t_min) / (t_max - t_min) * width_px).astype(int)
+    _, first = np.unique(columns, return_index=True)
+    return times[np.sort(first)]
+
+
+def decimate_band(x, lower, upper, width_px):
+    """Envelope of a shaded band: per-bucket minimum of lower and maximum of upper."""
+    x = np.asarray(x)
+    lower = np.asarray(lower, dtype=float)
+    upper = np.asarray(upper, dtype=float)
+    n = len(x)
+    if n <= DECIMATION_POINTS_PER_PIXEL * width_px or not np.issubdtype(x.dtype, np.number):
+        return x, lower, upper
+    if np.isnan(lower).any() or np.isnan(upper).any() or not _is_sorted(x):
+        return x, lower, upper
+    starts = np.linspace(0, n, width_px, endpoint=False).astype(int)
+    band_x = np.append(x[starts], x[-1])
+    band_lower = np.append(np.minimum.reduceat(lower, starts), lower[-1])
+    band_upper = np.append(np.maximum.reduceat(upper, starts), upper[-1])
+    return band_x, band_lower, band_upper
@@ -7,12 +7,22 @@ Uses matplotlib/scitex.plt to render scientific plots from JSON specifications.
 
 import io
 import os
+import re
 import pandas as pd
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend
-import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from pathlib import Path
 
+from .plot_data import (
+    axes_width_px,
+    decimate_band,
+    decimate_events,
+    decimate_series,
+    load_dataframe,
+)
+
 # Unit conversion constants
 MM_PER_INCH = 25.4
 PT_PER_INCH = 72
@@ -33,13 +43,14 @@ def pt_to_mm(pt: float) -> float:
     return pt * MM_PER_INCH / PT_PER_INCH
 
 
-def apply_nature_style(fig, ax, style):
+def nature_style_rc(style):
     """
-    Apply Nature journal style specifications with scientific plotting defaults.
+    rcParams for Nature journal style specifications.
+
+    Renderers apply these with matplotlib.rc_context() around a single
+    figure, so one request's style never leaks into another's.
 
     Args:
-        fig: Matplotlib figure
-        ax: Matplotlib axis
         style: Style dictionary with parameters in mm/pt
     """
     # Convert mm to pt
@@ -53,8 +64,7 @@ def apply_nature_style(fig, ax, style):
     tick_font_size = style.get('tick_font_size_pt', 7)
     title_font_size = style.get('title_font_size_pt', 8)
 
-    # Apply to rcParams
-    plt.rcParams.update({
+    return {
         'font.family': 'Arial',
         'font.size': tick_font_size,
         'axes.linewidth': axis_width_pt,
@@ -70,8 +80,18 @@ def apply_nature_style(fig, ax, style):
         'savefig.transparent': True,  # Transparent background by default
         'figure.facecolor': 'none',   # No figure background
         'axes.facecolor': 'none',     # No axes background
-    })
+    }
+
+
+def apply_nature_style(fig, ax, style):
+    """
+    Apply Nature journal style to an axis created under nature_style_rc().
 
+    Args:
+        fig: Matplotlib figure
+        ax: Matplotlib axis
+        style: Style dictionary with parameters in mm/pt
+    """
     # Hide top and right spines (scientific plot style)
     ax.spines['top'].set_visible(False)
     ax.spines['right'].set_visible(False)
@@ -79,6 +99,13 @@ def apply_nature_style(fig, ax, style):
     return fig, ax
 
 
+def new_figure(width_mm, height_mm, dpi):
+    """Figure that is not registered with pyplot (no global figure manager)."""
+    fig = Figure(figsize=(mm_to_inch(width_mm), mm_to_inch(height_mm)), dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig
+
+
 def render_line_plot(ax, df, plot_spec, style):
     """Render a line plot."""
     x_col = plot_spec.get('x_column', 'x')
@@ -88,6 +115,12 @@ def render_line_plot(ax, df, plot_spec, style):
     x = df[x_col] if x_col in df.columns else range(len(df))
     y = df[y_col] if y_col in df.columns else df.iloc[:, 0]
 
+    # Drop samples that would fall on the same pixel column
+    if plot_spec.get('decimate', True):
+        x, y = decimate_series(
+            x, y, axes_width_px(ax), plot_spec.get('decimation_method', 'minmax')
+        )
+
     # Convert line width from mm to pt
     linewidth = mm_to_pt(style.get('trace_thickness_mm', 0.12))
 
@@ -211,14 +244,20 @@ def render_fill_between_plot(ax, df, plot_spec, style):
     x = df[x_col] if x_col in df.columns else range(len(df))
     y = df[y_col] if y_col in df.columns else df.iloc[:, 0]
 
+    decimate = plot_spec.get('decimate', True)
+    width_px = axes_width_px(ax)
+
     # Draw center line
     linewidth = mm_to_pt(style.get('trace_thickness_mm', 0.12))
-    ax.plot(x, y, color=color, linewidth=linewidth)
+    line_x, line_y = decimate_series(x, y, width_px) if decimate else (x, y)
+    ax.plot(line_x, line_y, color=color, linewidth=linewidth)
 
     # Fill confidence interval if available
     if y_lower_col in df.columns and y_upper_col in df.columns:
         y_lower = df[y_lower_col]
         y_upper = df[y_upper_col]
+        if decimate:
+            x, y_lower, y_upper = decimate_band(x, y_lower, y_upper, width_px)
         ax.fill_between(x, y_lower, y_upper, color=color, alpha=0.2)
 
     if plot_spec.get('xlabel'):
@@ -311,18 +350,26 @@ def render_raster_plot(ax, df, plot_spec, style):
     trial_col = plot_spec.get('trial_column', 'trial')
     color = plot_spec.get('color', 'black')
 
+    decimate = plot_spec.get('decimate', True)
+    width_px = axes_width_px(ax)
+
     if time_col in df.columns and trial_col in df.columns:
+        t_min, t_max = df[time_col].min(), df[time_col].max()
+
         # Group by trial
-        trials = df[trial_col].unique()
         positions = []
-        for trial in sorted(trials):
-            trial_times = df[df[trial_col] == trial][time_col].values
+        for _, trial_df in df.groupby(trial_col):
+            trial_times = trial_df[time_col].values
+            if decimate:
+                trial_times = decimate_events(trial_times, width_px, t_min, t_max)
             positions.append(trial_times)
 
         ax.eventplot(positions, colors=color, linewidths=0.5)
     else:
         # Fall back to simple eventplot
         times = df[time_col] if time_col in df.columns else df.iloc[:, 0]
+        if decimate:
+            times = decimate_events(times.values, width_px, times.min(), times.max())
         ax.eventplot([times], colors=color)
 
     if plot_spec.get('xlabel'):
@@ -396,7 +443,7 @@ def render_single_plot(fig, panel_spec, style_spec):
         # Supports [[x1, y1], [x2, y2], ...] format
         df = pd.DataFrame(inline_data, columns=['x', 'y'])
     elif csv_path and os.path.exists(csv_path):
-        df = pd.read_csv(csv_path)
+        df = load_dataframe(csv_path)
     else:
         raise ValueError(f"No data provided. Specify either 'data' (inline array) or 'csv_path' (file path)")
 
@@ -468,47 +515,113 @@ def render_multipanel_from_spec(spec):
     height_mm = figure_spec.get('height_mm', 60)
     dpi = figure_spec.get('dpi', 300)
 
-    # Convert to inches for matplotlib
-    width_inch = mm_to_inch(width_mm)
-    height_inch = mm_to_inch(height_mm)
+    buf = io.BytesIO()
+    with matplotlib.rc_context(nature_style_rc(style_spec)):
+        fig = new_figure(width_mm, height_mm, dpi)
 
-    # Create empty figure
-    fig = plt.figure(figsize=(width_inch, height_inch), dpi=dpi)
+        # Render each panel
+        for panel_spec in panels_spec:
+            render_single_plot(fig, panel_spec, style_spec)
 
-    # Apply global style to rcParams
-    tick_length_pt = mm_to_pt(style_spec.get('tick_length_mm', 0.8))
-    tick_width_pt = mm_to_pt(style_spec.get('tick_thickness_mm', 0.2))
-    axis_width_pt = mm_to_pt(style_spec.get('axis_thickness_mm', 0.2))
-    trace_width_pt = mm_to_pt(style_spec.get('trace_thickness_mm', 0.12))
-    axis_font_size = style_spec.get('axis_font_size_pt', 8)
-    tick_font_size = style_spec.get('tick_font_size_pt', 7)
-    title_font_size = style_spec.get('title_font_size_pt', 8)
+        # Save to buffer as SVG with transparent background
+        fig.savefig(buf, format='svg', bbox_inches='tight', dpi=dpi, transparent=True)
 
-    plt.rcParams.update({
-        'font.family': 'Arial',
-        'font.size': tick_font_size,
-        'axes.linewidth': axis_width_pt,
-        'axes.labelsize': axis_font_size,
-        'axes.titlesize': title_font_size,
-        'xtick.major.size': tick_length_pt,
-        'ytick.major.size': tick_length_pt,
-        'xtick.major.width': tick_width_pt,
-        'ytick.major.width': tick_width_pt,
-        'xtick.labelsize': tick_font_size,
-        'ytick.labelsize': tick_font_size,
-        'lines.linewidth': trace_width_pt,
-    })
+    buf.seek(0)
+    return buf
 
-    # Render each panel
-    for panel_spec in panels_spec:
-        render_single_plot(fig, panel_spec, style_spec)
 
-    # Save to buffer as SVG with transparent background
+def render_panel(spec, panel_index):
+    """
+    Render one panel of a multi-panel spec on a full-size, transparent figure.
+
+    Panels rendered this way share the figure's coordinate system, so
+    composite_panels() can overlay them without re-laying them out.
+
+    Returns:
+        (SVG bytes, tight bounding box in inches as (x0, y0, x1, y1))
+    """
+    figure_spec = spec.get('figure', {})
+    style_spec = spec.get('style', {})
+    panel_spec = spec['panels'][panel_index]
+    dpi = figure_spec.get('dpi', 300)
+
     buf = io.BytesIO()
-    fig.savefig(buf, format='svg', bbox_inches='tight', dpi=dpi, transparent=True)
-    plt.close(fig)
+    with matplotlib.rc_context(nature_style_rc(style_spec)):
+        fig = new_figure(
+            figure_spec.get('width_mm', 89), figure_spec.get('height_mm', 60), dpi
+        )
+        render_single_plot(fig, panel_spec, style_spec)
+        bbox = fig.get_tightbbox(fig.canvas.get_renderer())
+        fig.savefig(buf, format='svg', dpi=dpi, transparent=True)
 
-    buf.seek(0)
+    return buf.getvalue(), (bbox.x0, bbox.y0, bbox.x1, bbox.y1)
+
+
+SVG_OPEN_TAG = re.compile(rb'<svg\b[^>]*>')
+SVG_ID = re.compile(rb'id="([^"]+)"')
+SVG_METADATA = re.compile(rb'<metadata>.*?</metadata>', re.S)
+
+
+def _prefix_svg_ids(body, prefix):
+    """Prefix element ids and their references so panels cannot collide."""
+    ids = set(SVG_ID.findall(body))
+    if not ids:
+        return body
+    names = b'|'.join(re.escape(i) for i in sorted(ids, key=len, reverse=True))
+    reference = re.compile(rb'(id="|#)(' + names + rb')(?=["\)])')
+    return reference.sub(lambda m: m.group(1) + prefix + m.group(2), body)
+
+
+def composite_panels(spec, rendered, pad_inches=0.1):
+    """
+    Overlay separately rendered panels into one SVG.
+
+    Args:
+        spec: Multi-panel spec the panels were rendered from
+        rendered: [(svg bytes, bbox), ...] from render_panel(), in panel order
+        pad_inches: Padding around the union of the panels' tight boxes,
+            as savefig(bbox_inches='tight') adds
+
+    Returns:
+        BytesIO buffer containing SVG data
+    """
+    figure_spec = spec.get('figure', {})
+    fig_height_pt = mm_to_inch(figure_spec.get('height_mm', 60)) * PT_PER_INCH
+
+    x0 = min(bbox[0] for _, bbox in rendered) - pad_inches
+    y0 = min(bbox[1] for _, bbox in rendered) - pad_inches
+    x1 = max(bbox[2] for _, bbox in rendered) + pad_inches
+    y1 = max(bbox[3] for _, bbox in rendered) + pad_inches
+    width_pt = (x1 - x0) * PT_PER_INCH
+    height_pt = (y1 - y0) * PT_PER_INCH
+    # SVG y runs downwards from the top of the figure
+    view_box = (
+        f'{x0 * PT_PER_INCH:.2f} {fig_height_pt - y1 * PT_PER_INCH:.2f} '
+        f'{width_pt:.2f} {height_pt:.2f}'
+    )
+
+    first_svg = rendered[0][0]
+    open_tag = SVG_OPEN_TAG.search(first_svg)
+    header = first_svg[:open_tag.start()]
+    tag = open_tag.group(0)
+    tag = re.sub(rb'width="[^"]*"', f'width="{width_pt:.2f}pt"'.encode(), tag)
+    tag = re.sub(rb'height="[^"]*"', f'height="{height_pt:.2f}pt"'.encode(), tag)
+    tag = re.sub(rb'viewBox="[^"]*"', f'viewBox="{view_box}"'.encode(), tag)
+
+    parts = [header, tag, b'\n']
+    for index, (svg, _) in enumerate(rendered):
+        open_tag = SVG_OPEN_TAG.search(svg)
+        body = svg[open_tag.end():svg.rindex(b'</svg>')]
+        body = SVG_METADATA.sub(b'', body)
+        prefix = f'panel{index}-'.encode()
+        parts += [
+            f'<g id="panel_{index}">'.encode(),
+            _prefix_svg_ids(body, prefix),
+            b'</g>\n',
+        ]
+    parts.append(b'</svg>\n')
+
+    buf = io.BytesIO(b''.join(parts))
     return buf
 
 
@@ -546,12 +659,16 @@ def render_plot_from_spec(spec):
     height_mm = figure_spec.get('height_mm', 24.5)
     dpi = figure_spec.get('dpi', 300)
 
-    # Convert to inches for matplotlib
-    width_inch = mm_to_inch(width_mm)
-    height_inch = mm_to_inch(height_mm)
+    # Style applies to this figure only
+    with matplotlib.rc_context(nature_style_rc(style_spec)):
+        return _render_single_figure(width_mm, height_mm, dpi, style_spec, plot_spec)
+
 
+def _render_single_figure(width_mm, height_mm, dpi, style_spec, plot_spec):
+    """Render a single plot; called under nature_style_rc()."""
     # Create figure
-    fig, ax = plt.subplots(figsize=(width_inch, height_inch), dpi=dpi)
+    fig = new_figure(width_mm, height_mm, dpi)
+    ax = fig.subplots()
 
     # Apply Nature style
     fig, ax = apply_nature_style(fig, ax, style_spec)
@@ -565,7 +682,7 @@ def render_plot_from_spec(spec):
         # Supports [[x1, y1], [x2, y2], ...] format
         df = pd.DataFrame(inline_data, columns=['x', 'y'])
     elif csv_path and os.path.exists(csv_path):
-        df = pd.read_csv(csv_path)
+        df = load_dataframe(csv_path)
     else:
         raise ValueError(f"No data provided. Specify either 'data' (inline array) or 'csv_path' (file path)")
 
@@ -602,7 +719,6 @@ def render_plot_from_spec(spec):
     # Save to buffer as SVG with transparent background
     buf = io.BytesIO()
     fig.savefig(buf, format='svg', bbox_inches='tight', dpi=dpi, transparent=True)
-    plt.close(fig)
 
     buf.seek(0)
     return buf
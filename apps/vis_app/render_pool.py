@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Plot Render Worker Pool
+Renders plots in dedicated processes with matplotlib imported and warmed up.
+
+matplotlib style state (rcParams) is process-global, so rendering inside
+threaded or ASGI web workers lets concurrent requests change each other's
+style. Worker processes render one figure at a time, and the panels of a
+multi-panel figure are rendered on separate workers in parallel and then
+composited.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RENDER_WORKERS = getattr(
+    settings, "SCITEX_VIS_RENDER_WORKERS", min(4, os.cpu_count() or 1)
+)
+RENDER_TIMEOUT = getattr(settings, "SCITEX_VIS_RENDER_TIMEOUT", 60)
+
+WARMUP_SPEC = {
+    "figure": {"width_mm": 35, "height_mm": 24.5, "dpi": 300},
+    "style": {},
+    "plot": {
+        "kind": "line",
+        "data": [[0, 0], [1, 1]],
+        "xlabel": "x",
+        "ylabel": "y",
+        "title": "warm-up",
+    },
+}
+
+
+def _init_worker():
+    """Import matplotlib and load fonts before the first request arrives."""
+    from .plot_renderer import render_plot_from_spec
+
+    try:
+        render_plot_from_spec(WARMUP_SPEC)
+    except Exception as e:
+        logger.warning(f"[RenderPool] Warm-up render failed: {e}")
+
+
+def _render_svg(spec):
+    from .plot_renderer import render_plot_from_spec
+
+    return render_plot_from_spec(spec).getvalue()
+
+
+def _render_panel(spec, panel_index):
+    from .plot_renderer import render_panel
+
+    return render_panel(spec, panel_index)
+
+
+class RenderPool:
+    """Process pool rendering plot specs to SVG bytes."""
+
+    def __init__(self, workers=RENDER_WORKERS, timeout=RENDER_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def render(self, spec):
+        """
+        Render a plot spec to SVG bytes.
+
+        Raises:
+            ValueError: Invalid spec (raised by the renderer)
+            concurrent.futures.TimeoutError: Render exceeded the timeout
+        """
+        if self.workers <= 0:
+            return _render_svg(spec)
+        try:
+            return self._render(spec)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge dataset); start a fresh pool
+            logger.error("[RenderPool] Worker died, restarting pool")
+            self.shutdown()
+            return self._render(spec)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # spawn: never fork a web worker's threads and sockets
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _render(self, spec):
+        executor = self._get_executor()
+        panels = spec.get("panels") or []
+        if len(panels) > 1:
+            from .plot_renderer import composite_panels
+
+            futures = [
+                executor.submit(_render_panel, spec, index)
+                for index in range(len(panels))
+            ]
+            rendered = [future.result(timeout=self.timeout) for future in futures]
+            return composite_panels(spec, rendered).getvalue()
+        return executor.submit(_render_svg, spec).result(timeout=self.timeout)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool():
+    """Process-wide render pool (workers start on first render)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RenderPool()
+        return _pool
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Plot Render Service
+Caches rendered plots by a canonical hash of their specification and data.
+"""
+
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .plot_data import file_identity
+from .render_pool import get_render_pool
+
+RENDER_CACHE_TTL = getattr(settings, "SCITEX_VIS_RENDER_CACHE_TTL", 3600)
+
+# Bump when renderer output changes so stale SVGs are not served
+RENDERER_VERSION = 1
+
+
+def _canonical(value):
+    """Normalize values that serialize differently but render the same."""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _plot_specs(spec):
+    if "panels" in spec:
+        return [panel.get("plot", {}) for panel in spec.get("panels", [])]
+    return [spec.get("plot", {})]
+
+
+def spec_hash(spec):
+    """
+    Content hash of a plot specification and the data files it reads.
+
+    Data files are identified by path, modification time and size, so
+    editing a CSV invalidates every plot drawn from it.
+    """
+    data = []
+    for plot_spec in _plot_specs(spec):
+        csv_path = plot_spec.get("csv_path")
+        if csv_path and not plot_spec.get("data") and os.path.exists(csv_path):
+            data.append(file_identity(csv_path))
+    payload = json.dumps(
+        {"version": RENDERER_VERSION, "spec": _canonical(spec), "data": data},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def render_plot_svg(spec):
+    """
+    Render a plot specification to SVG, reusing a cached render if possible.
+
+    Returns:
+        (svg bytes, spec hash)
+    """
+    digest = spec_hash(spec)
+    cache_key = f"vis_plot:{digest}"
+    svg = cache.get(cache_key)
+    if svg is None:
+        svg = get_render_pool().render(spec)
+        cache.set(cache_key, svg, RENDER_CACHE_TTL)
+    return svg, digest
@@ -1,6 +1,14 @@
-from django.test import TestCase
+import os
+import tempfile
+from unittest import mock
+
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
 from django.contrib.auth.models import User
 from .models import ScientificFigure, JournalPreset, FigurePanel, Annotation
+from . import plot_data, plot_renderer, render_service
+from .render_pool import RenderPool
 
 
 class JournalPresetTestCase(TestCase):
@@ -55,3 +63,127 @@ class FigurePanelTestCase(TestCase):
         self.assertEqual(self.panel.position, "A")
         self.assertTrue(self.panel.locked)
         self.assertEqual(str(self.panel), "Panel A - Test Figure")
+
+
+class PlotDataTestCase(SimpleTestCase):
+    def setUp(self):
+        plot_data.clear_dataframe_cache()
+        fd, self.csv_path = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+        self.addCleanup(os.unlink, self.csv_path)
+
+    def test_min_max_decimation_keeps_extremes(self):
+        x = np.arange(100_000)
+        y = np.sin(x / 50.0)
+        y[12_345] = 10.0
+        y[67_890] = -10.0
+
+        dx, dy = plot_data.decimate_series(x, y, width_px=200)
+
+        self.assertLessEqual(len(dx), 2 * 200 + 2)
+        self.assertIn(12_345, dx)
+        self.assertIn(67_890, dx)
+        self.assertEqual((dx[0], dx[-1]), (0, 99_999))
+
+    def test_small_or_unsorted_series_unchanged(self):
+        x = np.arange(100)
+        self.assertEqual(len(plot_data.decimate_series(x, x, width_px=200)[0]), 100)
+
+        shuffled = np.random.permutation(10_000)
+        dx, _ = plot_data.decimate_series(shuffled, shuffled, width_px=10)
+        self.assertEqual(len(dx), 10_000)
+
+    def test_lttb_returns_requested_points(self):
+        x = np.arange(10_000)
+        dx, dy = plot_data.decimate_series(x, np.cos(x), width_px=50, method="lttb")
+        self.assertEqual(len(dx), 100)
+
+    def test_dataframe_cached_until_file_changes(self):
+        with open(self.csv_path, "w") as f:
+            f.write("x,y\n1,2\n")
+        first = plot_data.load_dataframe(self.csv_path)
+        self.assertIs(plot_data.load_dataframe(self.csv_path), first)
+
+        with open(self.csv_path, "w") as f:
+            f.write("x,y\n1,2\n3,4\n")
+        os.utime(self.csv_path, ns=(0, os.stat(self.csv_path).st_mtime_ns + 1))
+
+        self.assertEqual(len(plot_data.load_dataframe(self.csv_path)), 2)
+
+
+class RenderServiceTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.spec = {
+            "figure": {"width_mm": 35, "height_mm": 24.5, "dpi": 300},
+            "style": {"tick_length_mm": 0.8},
+            "plot": {"kind": "line", "data": [[0, 1], [1, 2]]},
+        }
+
+    def test_spec_hash_is_canonical(self):
+        reordered = {
+            "plot": self.spec["plot"],
+            "style": self.spec["style"],
+            "figure": {"dpi": 300.0, "height_mm": 24.5, "width_mm": 35},
+        }
+        self.assertEqual(
+            render_service.spec_hash(self.spec), render_service.spec_hash(reordered)
+        )
+
+        changed = dict(self.spec, style={"tick_length_mm": 1.0})
+        self.assertNotEqual(
+            render_service.spec_hash(self.spec), render_service.spec_hash(changed)
+        )
+
+    def test_render_reused_for_same_spec(self):
+        with mock.patch.object(render_service, "get_render_pool") as pool:
+            pool.return_value.render.return_value = b"<svg/>"
+            first = render_service.render_plot_svg(self.spec)
+            second = render_service.render_plot_svg(self.spec)
+
+        self.assertEqual(first, second)
+        self.assertEqual(pool.return_value.render.call_count, 1)
+
+
+
+class RenderPoolTestCase(SimpleTestCase):
+    def setUp(self):
+        self.spec = {
+            "figure": {"width_mm": 89, "height_mm": 40, "dpi": 100},
+            "style": {"tick_length_mm": 1.5},
+            "panels": [
+                {
+                    "id": panel_id,
+                    "x_mm": x_mm,
+                    "y_mm": 8,
+                    "width_mm": 30,
+                    "height_mm": 25,
+                    "plot": {"kind": "line", "data": [[0, 0], [1, 1], [2, 4]]},
+                }
+                for panel_id, x_mm in (("A", 10), ("B", 55))
+            ],
+        }
+
+    def test_render_leaves_global_style_untouched(self):
+        import matplotlib
+
+        before = dict(matplotlib.rcParams)
+        plot_renderer.render_plot_from_spec(self.spec)
+        self.assertEqual(dict(matplotlib.rcParams), before)
+
+    def test_composited_panels_have_unique_ids(self):
+        from xml.etree import ElementTree
+
+        rendered = [plot_renderer.render_panel(self.spec, i) for i in range(2)]
+        svg = plot_renderer.composite_panels(self.spec, rendered).getvalue()
+
+        root = ElementTree.fromstring(svg)
+        ids = [el.get("id") for el in root.iter() if el.get("id")]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertIn("panel_0", ids)
+        self.assertIn("panel_1", ids)
+
+    def test_in_process_pool_renders_svg(self):
+        svg = RenderPool(workers=0).render(self.spec)
+        self.assertIn(b"<svg", svg)
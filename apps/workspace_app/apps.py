@@ -11,4 +11,8 @@ class WorkspaceAppConfig(AppConfig):
     name = 'apps.workspace_app'
     verbose_name = 'Workspace Management'
 
+    def ready(self):
+        """Import signals when app is ready"""
+        import apps.workspace_app.signals  # noqa
+
 # EOF
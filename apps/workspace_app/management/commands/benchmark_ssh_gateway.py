@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Django management command to benchmark SSH gateway session forwarding.
+
+Relays traffic between a client socket and an echoing "container" socket
+in two modes and reports throughput and round-trip latency:
+
+- threads: two threads per session copying 1 KB recv()/sendall() chunks
+           (the forwarding loop used before the asyncio gateway)
+- asyncio: forward_session from the asyncio gateway, all sessions on one
+           event loop with 64 KB reads and drain() backpressure
+
+Only the forwarding layer is measured: SSH encryption and Docker are left
+out, since both modes pay the same cost for them. Throughput streams
+--megabytes through each of --sessions concurrent sessions and back;
+latency is the median and p99 of small request/response round trips on
+one session, as produced by interactive typing.
+
+Usage:
+    python manage.py benchmark_ssh_gateway
+    python manage.py benchmark_ssh_gateway --sessions 50 --megabytes 16
+"""
+
+import asyncio
+import socket
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.workspace_app.services.ssh_gateway import FORWARD_BUFFER_SIZE, forward_session
+
+LEGACY_CHUNK_SIZE = 1024
+PING_SIZE = 64
+
+
+def legacy_relay(client_sock, container_sock):
+    """The pre-asyncio forward_io loop, on plain sockets."""
+
+    def copy(src, dst):
+        try:
+            while True:
+                data = src.recv(LEGACY_CHUNK_SIZE)
+                if not data:
+                    break
+                dst.sendall(data)
+            dst.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+    threads = [
+        threading.Thread(target=copy, args=(client_sock, container_sock), daemon=True),
+        threading.Thread(target=copy, args=(container_sock, client_sock), daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+class AsyncioRelay:
+    """Event loop thread running forward_session for every relayed pair."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        # The loop only keeps weak references to tasks
+        self._tasks = set()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def relay(self, client_sock, container_sock):
+        return asyncio.run_coroutine_threadsafe(
+            self._relay(client_sock, container_sock), self.loop
+        )
+
+    async def _relay(self, client_sock, container_sock):
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        client_reader, client_writer = await asyncio.open_connection(
+            sock=client_sock, limit=FORWARD_BUFFER_SIZE
+        )
+        container_reader, container_writer = await asyncio.open_connection(
+            sock=container_sock, limit=FORWARD_BUFFER_SIZE
+        )
+        try:
+            await forward_session(
+                client_reader, client_writer, container_reader, container_writer
+            )
+        finally:
+            client_writer.close()
+            container_writer.close()
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+def echo(sock):
+    """Container side: send back everything received."""
+    try:
+        while True:
+            data = sock.recv(FORWARD_BUFFER_SIZE)
+            if not data:
+                break
+            sock.sendall(data)
+        sock.shutdown(socket.SHUT_WR)
+    except OSError:
+        pass
+
+
+def open_session(relay):
+    """Client socket connected through the relay to an echoing container."""
+    client, relay_client = socket.socketpair()
+    relay_container, container = socket.socketpair()
+    threading.Thread(target=echo, args=(container,), daemon=True).start()
+    relay(relay_client, relay_container)
+    return client
+
+
+def stream(client, total_bytes, results, index):
+    """Send total_bytes through a session and read them back."""
+    payload = b"x" * FORWARD_BUFFER_SIZE
+
+    def send():
+        remaining = total_bytes
+        while remaining > 0:
+            chunk = payload[: min(remaining, len(payload))]
+            client.sendall(chunk)
+            remaining -= len(chunk)
+        client.shutdown(socket.SHUT_WR)
+
+    sender = threading.Thread(target=send, daemon=True)
+    sender.start()
+    received = 0
+    while True:
+        data = client.recv(FORWARD_BUFFER_SIZE)
+        if not data:
+            break
+        received += len(data)
+    sender.join()
+    results[index] = received
+
+
+def recv_exactly(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Session closed during round trip")
+        data += chunk
+    return data
+
+
+class Command(BaseCommand):
+    help = "Benchmark threaded vs asyncio SSH gateway forwarding"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sessions", type=int, default=20, help="Concurrent sessions (default: 20)"
+        )
+        parser.add_argument(
+            "--megabytes",
+            type=int,
+            default=8,
+            help="Data sent through each session (default: 8)",
+        )
+        parser.add_argument(
+            "--round-trips",
+            type=int,
+            default=2000,
+            help="Latency round trips (default: 2000)",
+        )
+
+    def handle(self, *args, **options):
+        sessions = options["sessions"]
+        total_bytes = options["megabytes"] * 1024 * 1024
+        round_trips = options["round_trips"]
+        if sessions < 1 or total_bytes < 1 or round_trips < 1:
+            raise CommandError("--sessions, --megabytes and --round-trips must be positive")
+
+        asyncio_relay = AsyncioRelay()
+        modes = {
+            "threads": (legacy_relay, 2 * sessions),
+            "asyncio": (asyncio_relay.relay, 1),
+        }
+
+        self.stdout.write(
+            f"{sessions} sessions x {options['megabytes']} MB, "
+            f"{round_trips} round trips of {PING_SIZE} bytes\n"
+        )
+        self.stdout.write(
+            f"{'mode':<8} {'MB/s':>10} {'p50':>10} {'p99':>10} {'relay threads':>14}"
+        )
+
+        results = {}
+        try:
+            for mode, (relay, relay_threads) in modes.items():
+                throughput = self._throughput(relay, sessions, total_bytes)
+                p50, p99 = self._latency(relay, round_trips)
+                results[mode] = throughput
+                self.stdout.write(
+                    f"{mode:<8} {throughput:>10.1f} {p50 * 1e6:>8.0f}us "
+                    f"{p99 * 1e6:>8.0f}us {relay_threads:>14}"
+                )
+        finally:
+            asyncio_relay.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ asyncio: {results['asyncio'] / results['threads']:.1f}x throughput of threads"
+            )
+        )
+
+    def _throughput(self, relay, sessions, total_bytes):
+        clients = [open_session(relay) for _ in range(sessions)]
+        received = [0] * sessions
+        workers = [
+            threading.Thread(target=stream, args=(client, total_bytes, received, index))
+            for index, client in enumerate(clients)
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        for client in clients:
+            client.close()
+        if sum(received) != sessions * total_bytes:
+            raise CommandError("Relay lost data")
+        # Every byte crosses the relay twice (to the container and back)
+        return 2 * sum(received) / elapsed / (1024 * 1024)
+
+    def _latency(self, relay, round_trips):
+        client = open_session(relay)
+        ping = b"p" * PING_SIZE
+        samples = []
+        try:
+            for _ in range(round_trips):
+                started = time.perf_counter()
+                client.sendall(ping)
+                recv_exactly(client, PING_SIZE)
+                samples.append(time.perf_counter() - started)
+        finally:
+            client.close()
+        samples.sort()
+        return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
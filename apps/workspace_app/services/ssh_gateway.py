@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File: ./apps/workspace_app/services/ssh_gateway.py
+"""
+Asyncio SSH gateway for user workspaces.
+
+One event loop serves every connection: sessions are coroutines, not
+threads, and terminal data is forwarded between the SSH channel and the
+container's exec socket in 64 KB reads, with drain() applying backpressure
+in both directions. Blocking work (Django ORM, Docker API) runs in worker
+threads via asyncio.to_thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import logging
+import threading
+from collections import Counter
+from typing import Optional
+
+import asyncssh
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
+from django.utils import timezone
+
+from apps.accounts_app.utils.ssh_key_validator import SSHKeyValidator
+
+from .container_manager import UserContainerManager
+from .ssh_key_cache import SSHKeyCache
+
+logger = logging.getLogger(__name__)
+
+FORWARD_BUFFER_SIZE = 64 * 1024
+SSH_MAX_CONNECTIONS = getattr(settings, "SCITEX_SSH_MAX_CONNECTIONS", 500)
+SSH_MAX_SESSIONS_PER_USER = getattr(settings, "SCITEX_SSH_MAX_SESSIONS_PER_USER", 5)
+SSH_LOGIN_TIMEOUT = 20
+SSH_KEEPALIVE_INTERVAL = 30
+
+
+async def pump(reader, writer, buffer_size: int = FORWARD_BUFFER_SIZE, on_resize=None):
+    """
+    Copy a stream until EOF.
+
+    Works with asyncio and asyncssh streams alike. Each chunk is awaited with
+    drain(), so a slow receiver stops further reads instead of buffering
+    without bound.
+
+    Args:
+        on_resize: Coroutine called with (width, height) when the SSH client
+            resizes its terminal
+    """
+    while True:
+        try:
+            data = await reader.read(buffer_size)
+        except asyncssh.TerminalSizeChanged as change:
+            if on_resize:
+                await on_resize(change.width, change.height)
+            continue
+        if not data:
+            break
+        writer.write(data)
+        await writer.drain()
+    if writer.can_write_eof():
+        writer.write_eof()
+
+
+async def forward_session(
+    client_reader, client_writer, container_reader, container_writer, on_resize=None
+):
+    """
+    Forward a shell session until the container side closes.
+
+    The client may close its input (EOF) while output is still pending, so
+    the session ends with the container stream, not the client's.
+    """
+    to_container = asyncio.create_task(
+        pump(client_reader, container_writer, on_resize=on_resize)
+    )
+    try:
+        await pump(container_reader, client_writer)
+    finally:
+        to_container.cancel()
+        try:
+            await to_container
+        except (asyncio.CancelledError, Exception):
+            pass
+
+
+def key_fingerprint(key: asyncssh.SSHKey) -> str:
+    """SHA256 fingerprint in the format stored on WorkspaceSSHKey."""
+    public_key = key.export_public_key("openssh").decode()
+    return SSHKeyValidator.calculate_fingerprint(" ".join(public_key.split()[:2]))
+
+
+class SessionLimiter:
+    """Counts open shell sessions per user."""
+
+    def __init__(self, max_per_user: int = SSH_MAX_SESSIONS_PER_USER):
+        self.max_per_user = max_per_user
+        self._sessions = Counter()
+        self._lock = threading.Lock()
+
+    def acquire(self, user_id: int) -> bool:
+        with self._lock:
+            if self._sessions[user_id] >= self.max_per_user:
+                return False
+            self._sessions[user_id] += 1
+            return True
+
+    def release(self, user_id: int) -> None:
+        with self._lock:
+            self._sessions[user_id] -= 1
+            if self._sessions[user_id] <= 0:
+                del self._sessions[user_id]
+
+    def count(self, user_id: int) -> int:
+        with self._lock:
+            return self._sessions[user_id]
+
+
+class GatewayConnection(asyncssh.SSHServer):
+    """Authentication for one SSH connection."""
+
+    def __init__(self, gateway: "SSHGateway"):
+        self.gateway = gateway
+        self.conn = None
+        self.user_id: Optional[int] = None
+        self.username: Optional[str] = None
+
+    def connection_made(self, conn):
+        self.conn = conn
+        peer = conn.get_extra_info("peername")
+        if not self.gateway.open_connection(self):
+            logger.warning(f"Connection limit reached, rejecting {peer}")
+            conn.close()
+            return
+        logger.info(f"New connection from {peer}")
+
+    def connection_lost(self, exc):
+        self.gateway.close_connection(self)
+
+    def begin_auth(self, username: str) -> bool:
+        return True
+
+    def password_auth_supported(self) -> bool:
+        return True
+
+    async def validate_password(self, username: str, password: str) -> bool:
+        logger.info(f"Password authentication attempt for user: {username}")
+        try:
+            user = await asyncio.to_thread(
+                authenticate, username=username, password=password
+            )
+        except Exception as e:
+            logger.error(f"Password authentication error for user {username}: {e}")
+            return False
+        if user and user.is_active:
+            self.user_id, self.username = user.pk, username
+            logger.info(f"Password authentication successful for user: {username}")
+            return True
+        logger.warning(f"Password authentication failed for user: {username}")
+        return False
+
+    def public_key_auth_supported(self) -> bool:
+        return True
+
+    async def validate_public_key(self, username: str, key: asyncssh.SSHKey) -> bool:
+        try:
+            fingerprint = key_fingerprint(key)
+            match = await asyncio.to_thread(
+                self.gateway.keys.authenticate, username, fingerprint
+            )
+        except Exception as e:
+            logger.error(f"Public key authentication error for user {username}: {e}")
+            return False
+        if match is None:
+            logger.warning(
+                f"Public key authentication failed for user: {username} (no matching key found)"
+            )
+            return False
+
+        self.user_id, key_id = match
+        self.username = username
+        self.gateway.record_key_use(key_id)
+        logger.info(f"Public key authentication successful for user: {username}")
+        return True
+
+
+class SSHGateway:
+    """SSH server forwarding shell sessions into user workspace containers."""
+
+    def __init__(
+        self,
+        host_key: asyncssh.SSHKey,
+        max_connections: int = SSH_MAX_CONNECTIONS,
+        max_sessions_per_user: int = SSH_MAX_SESSIONS_PER_USER,
+    ):
+        self.host_key = host_key
+        self.max_connections = max_connections
+        self.keys = SSHKeyCache()
+        self.sessions = SessionLimiter(max_sessions_per_user)
+        self._container_manager = None
+        self._connections = set()
+
+    @property
+    def container_manager(self) -> UserContainerManager:
+        # Created on first session, so the gateway starts without Docker
+        if self._container_manager is None:
+            self._container_manager = UserContainerManager()
+        return self._container_manager
+
+    @staticmethod
+    def import_host_key(paramiko_key) -> asyncssh.SSHKey:
+        """Reuse the existing paramiko host key so client known_hosts stay valid."""
+        pem = io.StringIO()
+        paramiko_key.write_private_key(pem)
+        return asyncssh.import_private_key(pem.getvalue())
+
+    async def start(self, host: str, port: int):
+        return await asyncssh.create_server(
+            lambda: GatewayConnection(self),
+            host,
+            port,
+            server_host_keys=[self.host_key],
+            process_factory=self.handle_session,
+            encoding=None,
+            login_timeout=SSH_LOGIN_TIMEOUT,
+            keepalive_interval=SSH_KEEPALIVE_INTERVAL,
+            line_editor=False,
+            backlog=100,
+        )
+
+    def open_connection(self, connection: GatewayConnection) -> bool:
+        if len(self._connections) >= self.max_connections:
+            return False
+        self._connections.add(connection)
+        return True
+
+    def close_connection(self, connection: GatewayConnection) -> None:
+        self._connections.discard(connection)
+
+    def record_key_use(self, key_id: int) -> None:
+        """Update last_used_at without delaying the login."""
+
+        def update():
+            from apps.accounts_app.models import WorkspaceSSHKey
+
+            # update() skips post_save, which would invalidate our own cache
+            WorkspaceSSHKey.objects.filter(pk=key_id).update(last_used_at=timezone.now())
+
+        def report(future):
+            if not future.cancelled() and future.exception():
+                logger.warning(f"Failed to record SSH key use: {future.exception()}")
+
+        asyncio.get_running_loop().run_in_executor(None, update).add_done_callback(report)
+
+    async def handle_session(self, process: asyncssh.SSHServerProcess):
+        connection = process.get_extra_info("connection").get_owner()
+        user_id, username = connection.user_id, connection.username
+
+        if not self.sessions.acquire(user_id):
+            process.stdout.write(
+                f"Error: too many open sessions (limit {self.sessions.max_per_user})\r\n".encode()
+            )
+            process.exit(1)
+            return
+
+        try:
+            logger.info(f"Shell session starting for user: {username}")
+            await self._run_shell(process, user_id, username)
+            logger.info(f"Session ended for user: {username}")
+        except Exception as e:
+            logger.error(f"Error in session for {username}: {e}", exc_info=True)
+        finally:
+            self.sessions.release(user_id)
+            process.exit(0)
+
+    async def _run_shell(self, process, user_id: int, username: str):
+        user = await asyncio.to_thread(get_user_model().objects.get, pk=user_id)
+        container = await asyncio.to_thread(
+            self.container_manager.get_or_create_container, user
+        )
+        if not container:
+            process.stdout.write(b"Error: Failed to create workspace container\r\n")
+            return
+
+        process.stdout.write(
+            (
+                f"\r\n"
+                f"Welcome to SciTeX Cloud Workspace, {username}!\r\n"
+                f"Container: {container.name}\r\n"
+                f"\r\n"
+            ).encode()
+        )
+
+        api = container.client.api
+        width, height, _, _ = process.term_size
+        exec_id, sock = await asyncio.to_thread(self._start_shell, container, width, height)
+
+        async def resize(width, height):
+            await asyncio.to_thread(api.exec_resize, exec_id, height=height, width=width)
+
+        reader, writer = await asyncio.open_connection(
+            sock=sock, limit=FORWARD_BUFFER_SIZE
+        )
+        try:
+            await forward_session(
+                process.stdin, process.stdout, reader, writer, on_resize=resize
+            )
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _start_shell(container, width: int, height: int):
+        """Start bash in the container; returns (exec id, raw socket)."""
+        api = container.client.api
+        exec_id = api.exec_create(
+            container.id,
+            ["/bin/bash"],
+            stdin=True,
+            stdout=True,
+            stderr=True,
+            tty=True,
+        )["Id"]
+        socket_io = api.exec_start(exec_id, tty=True, socket=True)
+        if width and height:
+            api.exec_resize(exec_id, height=height, width=width)
+        return exec_id, getattr(socket_io, "_sock", socket_io)
+
+
+# EOF
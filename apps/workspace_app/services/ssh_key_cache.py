@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File: ./apps/workspace_app/services/ssh_key_cache.py
+"""
+In-memory cache of workspace SSH keys for the SSH gateway.
+
+The gateway authenticates every login against WorkspaceSSHKey. Instead of
+querying the database each time, it keeps username -> {fingerprint: key id}
+in memory. The web process changes keys, so invalidation goes through a
+per-user version counter in the shared Django cache: signals bump it when a
+key or the user changes, and the gateway reloads an entry whose version no
+longer matches (or that is older than the TTL).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+SSH_KEY_CACHE_TTL = getattr(settings, "SCITEX_SSH_KEY_CACHE_TTL", 300)
+
+
+def _version_key(user_id: int) -> str:
+    return f"workspace_ssh_keys_version:{user_id}"
+
+
+def get_key_version(user_id: int) -> int:
+    return cache.get(_version_key(user_id), 0)
+
+
+def bump_key_version(user_id: int) -> None:
+    """Mark a user's cached keys stale in every gateway process."""
+    key = _version_key(user_id)
+    if cache.add(key, 1, timeout=None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+@dataclass
+class _Entry:
+    user_id: int
+    version: int
+    fingerprints: Dict[str, int] = field(default_factory=dict)
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+class SSHKeyCache:
+    """username -> authorized key fingerprints, validated against the key version."""
+
+    def __init__(self, ttl: float = SSH_KEY_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def authenticate(self, username: str, fingerprint: str) -> Optional[Tuple[int, int]]:
+        """
+        Match a key fingerprint against a user's workspace keys.
+
+        Blocking (cache and database access); call from a worker thread.
+
+        Returns:
+            (user id, WorkspaceSSHKey id) or None if the key is not authorized
+        """
+        entry = self._lookup(username)
+        if entry is None:
+            return None
+        key_id = entry.fingerprints.get(fingerprint)
+        if key_id is None:
+            return None
+        return entry.user_id, key_id
+
+    def invalidate(self, username: Optional[str] = None) -> None:
+        with self._lock:
+            if username is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(username, None)
+
+    def _lookup(self, username: str) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(username)
+        if (
+            entry is not None
+            and time.monotonic() - entry.loaded_at < self.ttl
+            and get_key_version(entry.user_id) == entry.version
+        ):
+            return entry
+
+        entry = self._load(username)
+        with self._lock:
+            if entry is None:
+                self._entries.pop(username, None)
+            else:
+                self._entries[username] = entry
+        return entry
+
+    def _load(self, username: str) -> Optional[_Entry]:
+        from django.contrib.auth import get_user_model
+
+        from apps.accounts_app.models import WorkspaceSSHKey
+
+        User = get_user_model()
+        try:
+            user = User.objects.only("id").get(username=username, is_active=True)
+        except User.DoesNotExist:
+            return None
+
+        # Read the version first: a change made during the query bumps it
+        # again, so the entry is reloaded on the next login
+        version = get_key_version(user.pk)
+        fingerprints = dict(
+            WorkspaceSSHKey.objects.filter(user=user).values_list("fingerprint", "id")
+        )
+        logger.debug(f"Loaded {len(fingerprints)} SSH key(s) for {username}")
+        return _Entry(user_id=user.pk, version=version, fingerprints=fingerprints)
+
+
+# EOF
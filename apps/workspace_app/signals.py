@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# File: ./apps/workspace_app/signals.py
+"""
+Invalidate the SSH gateway's key cache when keys or their owner change.
+"""
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.accounts_app.models import WorkspaceSSHKey
+
+from .services.ssh_key_cache import bump_key_version
+
+
+@receiver(post_save, sender=WorkspaceSSHKey)
+@receiver(post_delete, sender=WorkspaceSSHKey)
+def invalidate_ssh_keys_on_key_change(sender, instance, **kwargs):
+    """A key was added, edited or removed"""
+    bump_key_version(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_ssh_keys_on_user_change(sender, instance, created, **kwargs):
+    """Renamed or deactivated users must not keep their cached keys"""
+    if not created:
+        bump_key_version(instance.pk)
+
+
+# EOF
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for workspace_app
+
+This module contains unit tests for the SSH gateway, covering:
+- Key cache invalidation when keys or their owner change
+- Per-user session limits
+- Forwarding between the SSH channel and the container (EOF, backpressure)
+"""
+
+import asyncio
+import socket
+
+import asyncssh
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from apps.accounts_app.models import WorkspaceSSHKey
+
+from .services.ssh_gateway import SessionLimiter, forward_session, pump
+from .services.ssh_key_cache import SSHKeyCache
+
+
+class SSHKeyCacheTests(TestCase):
+    """Tests for the gateway's in-memory key cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("alice")
+        self.key = WorkspaceSSHKey.objects.create(
+            user=self.user,
+            title="Laptop",
+            public_key="ssh-ed25519 AAAA alice@laptop",
+            fingerprint="SHA256:laptop",
+            key_type="ed25519",
+        )
+        self.keys = SSHKeyCache()
+
+    def test_authenticate_matches_fingerprint(self):
+        """Test a known key authenticates and an unknown one does not"""
+        self.assertEqual(
+            self.keys.authenticate("alice", "SHA256:laptop"),
+            (self.user.pk, self.key.pk),
+        )
+        self.assertIsNone(self.keys.authenticate("alice", "SHA256:other"))
+        self.assertIsNone(self.keys.authenticate("bob", "SHA256:laptop"))
+
+    def test_repeated_logins_are_served_from_memory(self):
+        """Test only the first login queries the database"""
+        self.keys.authenticate("alice", "SHA256:laptop")
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(self.keys.authenticate("alice", "SHA256:laptop"))
+
+    def test_deleted_key_is_rejected(self):
+        """Test a key removed in the web app stops working immediately"""
+        self.assertIsNotNone(self.keys.authenticate("alice", "SHA256:laptop"))
+        self.key.delete()
+        self.assertIsNone(self.keys.authenticate("alice", "SHA256:laptop"))
+
+    def test_added_key_is_accepted(self):
+        """Test a key added after the entry was cached is picked up"""
+        self.keys.authenticate("alice", "SHA256:laptop")
+        desktop = WorkspaceSSHKey.objects.create(
+            user=self.user,
+            title="Desktop",
+            public_key="ssh-ed25519 BBBB alice@desktop",
+            fingerprint="SHA256:desktop",
+            key_type="ed25519",
+        )
+        self.assertEqual(
+            self.keys.authenticate("alice", "SHA256:desktop"),
+            (self.user.pk, desktop.pk),
+        )
+
+    def test_deactivated_user_is_rejected(self):
+        """Test deactivating a user revokes their cached keys"""
+        self.assertIsNotNone(self.keys.authenticate("alice", "SHA256:laptop"))
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.keys.authenticate("alice", "SHA256:laptop"))
+
+    def test_expired_entries_are_reloaded(self):
+        """Test entries older than the TTL are reloaded from the database"""
+        keys = SSHKeyCache(ttl=0)
+        keys.authenticate("alice", "SHA256:laptop")
+        # update() skips the signals, so only the TTL can notice it
+        WorkspaceSSHKey.objects.filter(pk=self.key.pk).update(
+            fingerprint="SHA256:rotated"
+        )
+        self.assertIsNone(keys.authenticate("alice", "SHA256:laptop"))
+
+
+class SessionLimiterTests(SimpleTestCase):
+    """Tests for the per-user session limit"""
+
+    def test_limit_is_per_user(self):
+        """Test a user is refused past the limit while others are not"""
+        sessions = SessionLimiter(max_per_user=2)
+        self.assertTrue(sessions.acquire(1))
+        self.assertTrue(sessions.acquire(1))
+        self.assertFalse(sessions.acquire(1))
+        self.assertTrue(sessions.acquire(2))
+        self.assertEqual(sessions.count(1), 2)
+        self.assertEqual(sessions.count(2), 1)
+
+    def test_release_frees_a_slot(self):
+        """Test a closed session lets the user open another one"""
+        sessions = SessionLimiter(max_per_user=1)
+        self.assertTrue(sessions.acquire(1))
+        self.assertFalse(sessions.acquire(1))
+        sessions.release(1)
+        self.assertEqual(sessions.count(1), 0)
+        self.assertTrue(sessions.acquire(1))
+
+
+class _Reader:
+    """
+    Stream reader returning queued chunks, then EOF (or nothing, if open).
+
+    A float in the queue pauses for that many seconds; an exception is raised.
+    """
+
+    def __init__(self, chunks=(), stays_open=False):
+        self.chunks = list(chunks)
+        self.stays_open = stays_open
+        self.reads = []
+
+    async def read(self, n):
+        self.reads.append(n)
+        if self.chunks:
+            chunk = self.chunks.pop(0)
+            if isinstance(chunk, Exception):
+                raise chunk
+            if isinstance(chunk, float):
+                await asyncio.sleep(chunk)
+                return await self.read(n)
+            return chunk
+        if self.stays_open:
+            await asyncio.Event().wait()
+        return b""
+
+
+class _Writer:
+    """Stream writer whose drain() blocks until released."""
+
+    def __init__(self, blocked=False):
+        self.data = b""
+        self.eof = False
+        self.released = asyncio.Event()
+        if not blocked:
+            self.released.set()
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        await self.released.wait()
+
+    def can_write_eof(self):
+        return True
+
+    def write_eof(self):
+        self.eof = True
+
+
+class ForwardingTests(SimpleTestCase):
+    """Tests for pump() and forward_session()"""
+
+    def test_pump_copies_until_eof(self):
+        """Test every chunk is forwarded and EOF is passed on"""
+
+        async def run():
+            reader, writer = _Reader([b"ls\n", b"exit\n"]), _Writer()
+            await pump(reader, writer, buffer_size=1024)
+            return reader, writer
+
+        reader, writer = asyncio.run(run())
+        self.assertEqual(writer.data, b"ls\nexit\n")
+        self.assertTrue(writer.eof)
+        self.assertEqual(set(reader.reads), {1024})
+
+    def test_slow_receiver_stops_reading(self):
+        """Test no further data is read while the receiver is not draining"""
+
+        async def run():
+            reader, writer = _Reader([b"a", b"b", b"c"]), _Writer(blocked=True)
+            task = asyncio.create_task(pump(reader, writer))
+            for _ in range(5):
+                await asyncio.sleep(0)
+            reads_while_blocked = len(reader.reads)
+            writer.released.set()
+            await asyncio.wait_for(task, 1)
+            return reads_while_blocked, writer
+
+        reads_while_blocked, writer = asyncio.run(run())
+        self.assertEqual(reads_while_blocked, 1)
+        self.assertEqual(writer.data, b"abc")
+
+    def test_pump_reports_terminal_resize(self):
+        """Test a resized SSH terminal is passed to on_resize"""
+        sizes = []
+
+        async def resize(width, height):
+            sizes.append((width, height))
+
+        async def run():
+            reader = _Reader([asyncssh.TerminalSizeChanged(120, 40, 0, 0), b"x"])
+            writer = _Writer()
+            await pump(reader, writer, on_resize=resize)
+            return writer
+
+        writer = asyncio.run(run())
+        self.assertEqual(sizes, [(120, 40)])
+        self.assertEqual(writer.data, b"x")
+
+    def test_session_ends_when_container_closes(self):
+        """Test an idle client does not keep a finished session open"""
+
+        async def run():
+            client_reader = _Reader(stays_open=True)
+            client_writer, container_writer = _Writer(), _Writer()
+            container_reader = _Reader([b"logout\r\n"])
+            await asyncio.wait_for(
+                forward_session(
+                    client_reader, client_writer, container_reader, container_writer
+                ),
+                1,
+            )
+            return client_writer, container_writer
+
+        client_writer, container_writer = asyncio.run(run())
+        self.assertEqual(client_writer.data, b"logout\r\n")
+        self.assertTrue(client_writer.eof)
+        self.assertFalse(container_writer.eof)
+
+    def test_client_eof_keeps_pending_output(self):
+        """Test output produced after the client closes its input still arrives"""
+
+        async def run():
+            client_reader = _Reader([b"make\n"])
+            client_writer, container_writer = _Writer(), _Writer()
+            container_reader = _Reader([0.05, b"build done\r\n"])
+            await asyncio.wait_for(
+                forward_session(
+                    client_reader, client_writer, container_reader, container_writer
+                ),
+                1,
+            )
+            return client_writer, container_writer
+
+        client_writer, container_writer = asyncio.run(run())
+        self.assertEqual(container_writer.data, b"make\n")
+        self.assertTrue(container_writer.eof)
+        self.assertEqual(client_writer.data, b"build done\r\n")
+        self.assertTrue(client_writer.eof)
+
+    def test_forwards_over_sockets(self):
+        """Test forwarding between real asyncio socket streams"""
+
+        async def run():
+            container_end, gateway_end = socket.socketpair()
+            reader, writer = await asyncio.open_connection(sock=gateway_end)
+            c_reader, c_writer = await asyncio.open_connection(sock=container_end)
+            client_writer = _Writer()
+            session = asyncio.create_task(
+                forward_session(_Reader([b"echo hi\n"]), client_writer, reader, writer)
+            )
+            received = await asyncio.wait_for(c_reader.readuntil(b"\n"), 1)
+            c_writer.write(b"hi\r\n")
+            await c_writer.drain()
+            c_writer.close()
+            await asyncio.wait_for(session, 1)
+            writer.close()
+            return received, client_writer
+
+        received, client_writer = asyncio.run(run())
+        self.assertEqual(received, b"echo hi\n")
+        self.assertEqual(client_writer.data, b"hi\r\n")
+        self.assertTrue(client_writer.eof)
+
+
+# EOF
@@ -3,14 +3,29 @@ WebSocket consumers for SciTeX Writer real-time collaboration.
 Uses Django 5.2 async ORM for optimal performance.
 """
 
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+import asyncio
 import json
 from datetime import datetime
-from .models import Manuscript
+from .models import CollaborativeSession, Manuscript
+from .services.operational_transform_service import TextOperation
+from .services.ot_coordinator import (
+    CollaborativeUndoRedoCoordinator,
+    OTCoordinator,
+)
 from scitex import logging
 
 logger = logging.getLogger(__name__)
 
+# Keystrokes a client sends within this window (seconds) on the same base
+# version are composed and submitted, broadcast and logged as one operation
+OT_BATCH_WINDOW = getattr(settings, "SCITEX_WRITER_OT_BATCH_WINDOW", 0.05)
+OT_BATCH_MAX_OPS = getattr(settings, "SCITEX_WRITER_OT_BATCH_MAX_OPS", 50)
+
 
 class WriterConsumer(AsyncWebsocketConsumer):
     """
@@ -50,11 +65,15 @@ class WriterConsumer(AsyncWebsocketConsumer):
             return
 
         # Initialize OT coordinator and undo/redo coordinator for this manuscript
-        self.ot_coordinator = OTCoordinator(self.manuscript_id)
-        self.undo_redo_coordinator = CollaborativeUndoRedoCoordinator(
+        self.ot_coordinator = OTCoordinator.get_coordinator(self.manuscript_id)
+        self.undo_redo_coordinator = CollaborativeUndoRedoCoordinator.get_coordinator(
             self.manuscript_id
         )
 
+        # section_id -> burst of text changes waiting to be submitted
+        self._pending_ops = {}
+        self._submit_lock = asyncio.Lock()
+
         # Join room group
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
 
@@ -84,6 +103,10 @@ class WriterConsumer(AsyncWebsocketConsumer):
 
     async def disconnect(self, close_code):
         """Handle WebSocket disconnect."""
+        # Submit keystrokes still waiting in a batch
+        for section_id in list(getattr(self, "_pending_ops", {})):
+            await self._flush_text_changes(section_id)
+
         # End session
         if hasattr(self, "session"):
             await self.end_session()
@@ -120,6 +143,10 @@ class WriterConsumer(AsyncWebsocketConsumer):
                 await self.handle_operation_ack(data)
             elif message_type == "queue_status":
                 await self.handle_queue_status(data)
+            elif message_type == "get_operations":
+                await self.handle_get_operations(data)
+            elif message_type == "join_section":
+                await self.handle_join_section(data)
             elif message_type == "undo":
                 await self.handle_undo(data)
             elif message_type == "redo":
@@ -178,8 +205,10 @@ class WriterConsumer(AsyncWebsocketConsumer):
                 text_data=json.dumps(
                     {
                         "type": "text_change",
-                        "section": event["section"],
+                        "section_id": event["section_id"],
                         "operation": event["operation"],
+                        "operation_id": event["operation_id"],
+                        "version": event["version"],
                         "user_id": event["user_id"],
                         "username": event["username"],
                         "timestamp": event["timestamp"],
@@ -233,11 +262,73 @@ class WriterConsumer(AsyncWebsocketConsumer):
     # Action handlers
 
     async def handle_text_change(self, data):
-        """Handle text change from client using OT coordinator."""
+        """
+        Handle text change from client using OT coordinator.
+
+        Changes typed in quick succession on the same version are composed
+        into one operation and submitted when the batch window closes.
+        """
         section_id = data.get("section_id")
-        operation = data.get("operation")
+        operation = data.get("operation") or {}
         version = data.get("version", 0)
 
+        try:
+            text_op = TextOperation.from_dict(operation.get("ops", []))
+        except Exception:
+            # Let the coordinator report the invalid operation
+            await self._flush_text_changes(section_id)
+            await self._submit_text_change(section_id, operation, version, 1)
+            return
+
+        pending = self._pending_ops.get(section_id)
+        if (
+            pending is not None
+            and pending["version"] == version
+            and pending["operation"].target_length == text_op.base_length
+        ):
+            pending["operation"] = pending["operation"].compose(text_op)
+            pending["count"] += 1
+            if pending["count"] >= OT_BATCH_MAX_OPS:
+                await self._flush_text_changes(section_id)
+            return
+
+        await self._flush_text_changes(section_id)
+        if OT_BATCH_WINDOW <= 0:
+            await self._submit_text_change(
+                section_id, {"ops": text_op.to_dict()}, version, 1
+            )
+            return
+        self._pending_ops[section_id] = {
+            "version": version,
+            "operation": text_op,
+            "count": 1,
+            "timer": asyncio.create_task(self._flush_after_window(section_id)),
+        }
+
+    async def _flush_after_window(self, section_id):
+        await asyncio.sleep(OT_BATCH_WINDOW)
+        try:
+            await self._flush_text_changes(section_id)
+        except Exception as e:
+            logger.error(f"Failed to submit text changes for {section_id}: {e}")
+
+    async def _flush_text_changes(self, section_id):
+        """Submit the pending batch of a section, if any."""
+        pending = self._pending_ops.pop(section_id, None)
+        if pending is None:
+            return
+        if pending["timer"] is not asyncio.current_task():
+            pending["timer"].cancel()
+        # Batches are submitted in the order they were closed
+        async with self._submit_lock:
+            await self._submit_text_change(
+                section_id,
+                {"ops": pending["operation"].to_dict()},
+                pending["version"],
+                pending["count"],
+            )
+
+    async def _submit_text_change(self, section_id, operation, version, op_count):
         # Submit operation to OT coordinator
         result = await self.ot_coordinator.submit_operation(
             user_id=self.user.id,
@@ -257,11 +348,14 @@ class WriterConsumer(AsyncWebsocketConsumer):
                     "status": result.get("status"),
                     "queue_length": result.get("queue_length", 0),
                     "current_version": result.get("current_version", version),
+                    "batched_operations": op_count,
+                    "document": result.get("document"),
                 }
             )
         )
 
-        # Broadcast processed operations to all users
+        # Broadcast processed operations to all users. Other clients apply the
+        # operation as committed (transformed), not as the sender wrote it.
         if result.get("processed"):
             for processed_op in result["processed"]:
                 await self.channel_layer.group_send(
@@ -269,14 +363,16 @@ class WriterConsumer(AsyncWebsocketConsumer):
                     {
                         "type": "text_change",
                         "section_id": section_id,
-                        "operation": operation,
+                        "operation": result["operation"],
                         "operation_id": processed_op["operation_id"],
                         "user_id": processed_op["user_id"],
+                        "username": self.user.username,
                         "version": processed_op["version"],
                         "timestamp": datetime.now().isoformat(),
                         "sender_channel": self.channel_name,
                     },
                 )
+            await self.log_change(result["operation"], op_count)
 
         # Handle errors
         if result.get("errors"):
@@ -383,10 +479,38 @@ class WriterConsumer(AsyncWebsocketConsumer):
 
         await self.send(text_data=json.dumps({"type": "queue_status", **status}))
 
+    async def handle_get_operations(self, data):
+        """Send the operations a reconnecting client missed."""
+        section_id = data.get("section_id")
+        since_version = data.get("version", 0)
+
+        result = await self.ot_coordinator.get_operations(section_id, since_version)
+
+        await self.send(text_data=json.dumps({"type": "operations", **result}))
+
+    async def handle_join_section(self, data):
+        """Send the shared text of a section the client opened."""
+        section_id = data.get("section_id")
+
+        document = await self.ot_coordinator.open_section(
+            section_id, data.get("content", "")
+        )
+
+        await self.send(
+            text_data=json.dumps(
+                {
+                    "type": "section_state",
+                    "section_id": section_id,
+                    **(document or {"version": None, "text": None}),
+                }
+            )
+        )
+
     async def handle_undo(self, data):
         """Handle undo request from client."""
         section_id = data.get("section_id")
         current_version = data.get("version", 0)
+        await self._flush_text_changes(section_id)
 
         # Get undo/redo manager for this user and section
         manager = self.undo_redo_coordinator.get_manager(self.user.id, section_id)
@@ -442,6 +566,7 @@ class WriterConsumer(AsyncWebsocketConsumer):
         """Handle redo request from client."""
         section_id = data.get("section_id")
         current_version = data.get("version", 0)
+        await self._flush_text_changes(section_id)
 
         # Get undo/redo manager for this user and section
         manager = self.undo_redo_coordinator.get_manager(self.user.id, section_id)
@@ -562,7 +687,11 @@ class WriterConsumer(AsyncWebsocketConsumer):
         """End collaborative session."""
         if hasattr(self, "session"):
             self.session.is_active = False
-            await self.session.asave()
+            self.session.ended_at = timezone.now()
+            # Only these fields: the statistics are updated in the database
+            await self.session.asave(
+                update_fields=["is_active", "ended_at", "last_activity"]
+            )
 
     async def get_active_collaborators(self):
         """Get list of currently active collaborators."""
@@ -580,24 +709,20 @@ class WriterConsumer(AsyncWebsocketConsumer):
                 )
         return collaborators
 
-    async def log_change(self, section, operation):
-        """Log document change to database."""
-        from .models import ManuscriptSection
-
-        try:
-            section_obj = await ManuscriptSection.objects.aget(
-                manuscript=self.manuscript, section_type=section
-            )
-            await DocumentChange.objects.acreate(
-                manuscript=self.manuscript,
-                section=section_obj,
-                user=self.user,
-                session=self.session,
-                change_type=operation.get("type", "insert"),
-                operation_data=operation,
-            )
-        except ManuscriptSection.DoesNotExist:
-            pass
+    async def log_change(self, operation, op_count=1):
+        """Add a submitted batch of changes to the session statistics."""
+        if not hasattr(self, "session"):
+            return
+        inserted = sum(
+            len(op.get("chars") or "")
+            for op in operation.get("ops", [])
+            if op.get("type") == "insert"
+        )
+        await CollaborativeSession.objects.filter(pk=self.session.pk).aupdate(
+            operations_count=F("operations_count") + op_count,
+            characters_typed=F("characters_typed") + inserted,
+            last_activity=timezone.now(),
+        )
 
     async def update_cursor_position(self, section, position):
         """Update cursor position in session."""
@@ -628,3 +753,99 @@ class WriterConsumer(AsyncWebsocketConsumer):
         if hasattr(self, "session") and section in self.session.locked_sections:
             self.session.locked_sections.remove(section)
             await self.session.asave(update_fields=["locked_sections"])
+
+
+class CompilationConsumer(AsyncWebsocketConsumer):
+    """
+    WebSocket consumer streaming a project's compilation jobs.
+
+    Server messages (one per job event, see services.compilation.scheduler):
+    - {"type": "compilation", "job": {"job_id", "status", "progress", "step",
+       "log_append", "log_html_append", ...}} while a job runs
+    - the full job state (with "result") when it finishes or is superseded
+
+    Client messages:
+    - {"type": "status", "job_id": ...}: current state of a job, including
+      the log so far (used right after connecting)
+    """
+
+    async def connect(self):
+        """Join the project's compilation group if the user may access it."""
+        from .services.compilation.scheduler import group_name
+
+        self.project_id = int(self.scope["url_route"]["kwargs"]["project_id"])
+        if not await self.check_access():
+            await self.close()
+            return
+
+        self.group_name = group_name(self.project_id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        """Leave the compilation group."""
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive(self, text_data):
+        """Handle incoming WebSocket messages."""
+        try:
+            data = json.loads(text_data)
+        except json.JSONDecodeError:
+            await self.send(
+                text_data=json.dumps({"type": "error", "message": "Invalid JSON"})
+            )
+            return
+
+        if data.get("type") == "status":
+            job = await self.get_job_state(data.get("job_id"))
+            if job is None:
+                await self.send(
+                    text_data=json.dumps({"type": "error", "message": "Job not found"})
+                )
+            else:
+                await self.send(
+                    text_data=json.dumps({"type": "compilation", "job": job})
+                )
+        else:
+            await self.send(
+                text_data=json.dumps(
+                    {
+                        "type": "error",
+                        "message": f"Unknown message type: {data.get('type')}",
+                    }
+                )
+            )
+
+    async def compilation_update(self, event):
+        """Forward a scheduler broadcast to the client."""
+        await self.send(
+            text_data=json.dumps({"type": "compilation", "job": event["job"]})
+        )
+
+    async def check_access(self):
+        """Same rules as api_login_optional: members, or the visitor's project."""
+        from apps.project_app.models import Project
+
+        user = self.scope.get("user")
+        if user is not None and user.is_authenticated:
+            return await Project.objects.filter(
+                Q(owner=user) | Q(team_members=user), id=self.project_id
+            ).aexists()
+
+        session = self.scope.get("session") or {}
+        visitor_project_id = session.get("visitor_project_id")
+        return bool(visitor_project_id) and int(visitor_project_id) == self.project_id
+
+    @database_sync_to_async
+    def get_job_state(self, job_id):
+        from django.core.exceptions import ValidationError
+
+        from .models import CompilationJob
+        from .services.compilation import serialize_job
+
+        try:
+            job = CompilationJob.objects.get(job_id=job_id, project_id=self.project_id)
+        except (CompilationJob.DoesNotExist, ValidationError):
+            return None
+        return serialize_job(job)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Django management command to benchmark the writer OT transform path.
+
+Measures, on a synthetic section:
+
+- transform:       pairwise transforms of concurrent keystrokes
+- rebase:          a stale client operation transformed over a history of
+                   scattered keystrokes, one at a time (submit_operation)
+- rebase composed: the same against the composed history, to show why the
+                   coordinator does not compose before transforming
+- burst compose:   folding a typed word into one operation (the consumer's
+                   batching)
+- submit:          keystrokes through OTCoordinator (memory backend), one
+                   submit per keystroke versus one per composed burst
+
+Usage:
+    python manage.py benchmark_writer_ot
+    python manage.py benchmark_writer_ot --length 20000 --history 1000
+"""
+
+import asyncio
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.writer_app.services.operational_transform_service import (
+    TextOperation,
+    compose_multiple,
+    transform,
+)
+from apps.writer_app.services.ot_backends import InMemoryOTBackend
+from apps.writer_app.services.ot_coordinator import OTCoordinator
+
+
+def keystroke(length, rng):
+    """A single-character insert or delete anywhere in a text of ``length``."""
+    op = TextOperation()
+    if length and rng.random() < 0.3:
+        position = rng.randrange(length)
+        return op.retain(position).delete(1).retain(length - position - 1)
+    position = rng.randint(0, length)
+    return (
+        op.retain(position)
+        .insert(rng.choice(string.ascii_letters))
+        .retain(length - position)
+    )
+
+
+def scattered_history(length, count, rng):
+    """``count`` sequential keystrokes at random positions."""
+    history = []
+    for _ in range(count):
+        op = keystroke(length, rng)
+        history.append(op)
+        length = op.target_length
+    return history
+
+
+def typed_word(length, position, size):
+    """The keystrokes of typing ``size`` characters at ``position``."""
+    return [
+        TextOperation()
+        .retain(position + i)
+        .insert(string.ascii_lowercase[i % 26])
+        .retain(length - position)
+        for i in range(size)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Benchmark OT transform, compose and submit throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--length", type=int, default=5000, help="Section length in characters"
+        )
+        parser.add_argument(
+            "--history",
+            type=int,
+            default=200,
+            help="Operations a stale client is behind (default: 200)",
+        )
+        parser.add_argument(
+            "--burst", type=int, default=8, help="Keystrokes per typed burst"
+        )
+        parser.add_argument(
+            "--seconds", type=float, default=1.0, help="Time per measurement"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if min(options["length"], options["history"], options["burst"]) < 1:
+            raise CommandError("--length, --history and --burst must be at least 1")
+        rng = random.Random(options["seed"])
+        length = options["length"]
+        burst = options["burst"]
+        history = scattered_history(length, options["history"], rng)
+        pairs = [(keystroke(length, rng), keystroke(length, rng)) for _ in range(256)]
+        client_op = keystroke(length, rng)
+        word = typed_word(length, length // 2, burst)
+
+        def run_transform(i):
+            a, b = pairs[i % len(pairs)]
+            transform(a, b, "left")
+
+        def run_rebase(i):
+            op = client_op
+            for server_op in history:
+                op, _ = transform(op, server_op, "left")
+            return op
+
+        def run_rebase_composed(i):
+            op, _ = transform(client_op, compose_multiple(history), "left")
+            return op
+
+        def run_burst(i):
+            compose_multiple(word)
+
+        text = "".join(rng.choice(string.ascii_lowercase) for _ in range(length))
+        server_text = text
+        for op in history:
+            server_text = op.apply(server_text)
+        if run_rebase(0).apply(server_text) != run_rebase_composed(0).apply(
+            server_text
+        ):
+            raise CommandError("Sequential and composed rebase disagree")
+
+        self.stdout.write(
+            f"Section: {length:,} chars, history: {len(history)} keystrokes, "
+            f"burst: {burst} keystrokes\n"
+        )
+        self.stdout.write(f"{'measurement':<18} {'ops/s':>14} {'per call':>12}")
+        # (name, function, operations handled per call)
+        for name, fn, per_call in (
+            ("transform", run_transform, 1),
+            ("rebase", run_rebase, len(history)),
+            ("rebase composed", run_rebase_composed, len(history)),
+            ("burst compose", run_burst, burst),
+        ):
+            calls, elapsed = self._measure(fn, options["seconds"])
+            self._report(name, calls * per_call / elapsed, elapsed / calls)
+
+        single = self._submit_rate(length, word, burst=1, seconds=options["seconds"])
+        batched = self._submit_rate(
+            length, word, burst=burst, seconds=options["seconds"]
+        )
+        self._report("submit", single, 1 / single)
+        self._report("submit batched", batched, burst / batched)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ batching {burst}-keystroke bursts: {batched / single:.1f}x "
+                "keystrokes/s through the coordinator"
+            )
+        )
+
+    def _report(self, name, rate, seconds_per_call):
+        self.stdout.write(
+            f"{name:<18} {rate:>12,.0f}/s {seconds_per_call * 1e6:>10,.1f}us"
+        )
+
+    def _submit_rate(self, length, word, burst, seconds):
+        """Keystrokes per second submitted in composed groups of ``burst``."""
+        coordinator = OTCoordinator("benchmark", backend=InMemoryOTBackend())
+
+        async def run():
+            version, keystrokes = 0, 0
+            text_length = length
+            deadline = time.perf_counter() + seconds
+            started = time.perf_counter()
+            while time.perf_counter() < deadline:
+                ops = typed_word(text_length, text_length // 2, len(word))
+                for start in range(0, len(ops), burst):
+                    op = compose_multiple(ops[start : start + burst])
+                    result = await coordinator.submit_operation(
+                        user_id=1,
+                        username="bench",
+                        session_id="bench",
+                        section_id="intro",
+                        operation={"ops": op.to_dict()},
+                        version=version,
+                    )
+                    version = result["current_version"]
+                    await coordinator.acknowledge_operation(
+                        result["operation_id"], "intro"
+                    )
+                keystrokes += len(ops)
+                text_length += len(ops)
+            return keystrokes / (time.perf_counter() - started)
+
+        return asyncio.run(run())
+
+    @staticmethod
+    def _measure(fn, seconds):
+        calls = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+        while True:
+            fn(calls)
+            calls += 1
+            now = time.perf_counter()
+            if now >= deadline:
+                return calls, now - started
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Django management command to benchmark writer section preview compilation.
+
+Times PreviewCompiler on the same document in three modes:
+
+- cold:   no auxiliary files and no precompiled format (every run starts
+          from scratch, as previews did before the preview cache)
+- warm:   auxiliary files kept from the previous run, preamble re-parsed
+- format: auxiliary files kept and the preamble loaded from a
+          precompiled mylatexformat format
+
+Every run edits the body, so the content-addressed PDF cache never
+answers and each sample is a real latexmk run. The default document is the
+editor's section preview wrapper (LatexWrapper.createMinimalDocument) around
+a sample section; pass --tex to benchmark a project's own document and
+--writer-dir to use its bibliography. Work happens in a temporary
+directory, projects are not modified.
+
+Requires latexmk/pdflatex (and mylatexformat for the format mode).
+
+Usage:
+    python manage.py benchmark_writer_preview
+    python manage.py benchmark_writer_preview --runs 10
+    python manage.py benchmark_writer_preview --tex path/to/preview.tex \\
+        --writer-dir data/users/alice/proj/scitex/writer
+"""
+
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.writer_app.services.compilation.preview import (
+    PreviewCompiler,
+    mylatexformat_available,
+)
+
+PREVIEW_PREAMBLE = r"""\documentclass[11pt]{article}
+\usepackage{geometry}
+\usepackage[utf8]{inputenc}
+\geometry{margin=1in}
+\usepackage{xcolor}
+\definecolor{linkgreen}{RGB}{0,153,0}
+\usepackage{amsmath}
+\usepackage{amssymb}
+\usepackage{graphicx}
+\usepackage{booktabs}
+\usepackage{siunitx}
+\usepackage{tikz}
+\usepackage[colorlinks=true,linkcolor=linkgreen,citecolor=linkgreen,urlcolor=linkgreen]{hyperref}
+"""
+
+SAMPLE_SECTION = r"""\section{Introduction}
+Sleep spindles are transient oscillations of 11--16\,Hz that group
+hippocampal ripples and cortical slow oscillations
+\cite{smith2020}. Their density correlates with overnight memory
+retention, as summarized in Equation~\ref{eq:density}.
+\begin{equation}
+  \rho = \frac{N_\mathrm{spindles}}{T_\mathrm{NREM}}
+  \label{eq:density}
+\end{equation}
+\begin{table}[h]
+  \centering
+  \begin{tabular}{lS}
+    \toprule
+    Stage & {Density (\si{\per\minute})} \\
+    \midrule
+    N2 & 4.2 \\
+    N3 & 1.3 \\
+    \bottomrule
+  \end{tabular}
+\end{table}
+"""
+
+SAMPLE_BIBLIOGRAPHY = """@article{smith2020,
+  title = {Sleep Spindles and Memory},
+  author = {Smith, John},
+  journal = {Neuron},
+  year = {2020}
+}
+"""
+
+
+def default_document() -> str:
+    return (
+        PREVIEW_PREAMBLE
+        + "\\begin{document}\n\n"
+        + SAMPLE_SECTION
+        + "\n\\bibliographystyle{plain}\n\\bibliography{bibliography}\n"
+        + "\n\\end{document}\n"
+    )
+
+
+class Command(BaseCommand):
+    help = "Benchmark cold, warm-aux and precompiled-format preview compiles"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--runs", type=int, default=5, help="Timed runs per mode (default: 5)"
+        )
+        parser.add_argument(
+            "--tex", help="LaTeX document to compile (default: sample section)"
+        )
+        parser.add_argument(
+            "--writer-dir",
+            help="Project writer directory whose bibliography should be used",
+        )
+        parser.add_argument(
+            "--timeout", type=int, default=120, help="Per-compile timeout (s)"
+        )
+
+    def handle(self, *args, **options):
+        if not shutil.which("latexmk"):
+            raise CommandError("latexmk is not installed")
+        runs = max(options["runs"], 1)
+
+        if options["tex"]:
+            try:
+                document = Path(options["tex"]).read_text(encoding="utf-8")
+            except OSError as e:
+                raise CommandError(f"Cannot read {options['tex']}: {e}") from e
+        else:
+            document = default_document()
+        if "\\begin{document}" not in document:
+            raise CommandError("Document has no \\begin{document}")
+
+        with tempfile.TemporaryDirectory(prefix="writer-preview-bench-") as tmp:
+            writer_dir = Path(tmp)
+            bib = writer_dir / "00_shared" / "bib_files" / "bibliography.bib"
+            bib.parent.mkdir(parents=True)
+            source_bib = (
+                Path(options["writer_dir"]) / "00_shared/bib_files/bibliography.bib"
+                if options["writer_dir"]
+                else None
+            )
+            if source_bib and source_bib.exists():
+                shutil.copy2(source_bib, bib)
+            else:
+                bib.write_text(SAMPLE_BIBLIOGRAPHY)
+
+            self.stdout.write(
+                f"Document: {len(document):,} chars, {runs} runs per mode\n"
+            )
+            self.stdout.write(f"{'mode':<8} {'p50':>10} {'min':>10} {'max':>10}")
+
+            timings = {}
+            for mode in ("cold", "warm", "format"):
+                if mode == "format" and not mylatexformat_available():
+                    self.stdout.write(
+                        self.style.WARNING("format   skipped (mylatexformat missing)")
+                    )
+                    continue
+                samples = self._run_mode(
+                    mode, writer_dir, document, runs, options["timeout"]
+                )
+                if not samples:
+                    continue
+                timings[mode] = statistics.median(samples)
+                self.stdout.write(
+                    f"{mode:<8} {timings[mode]:>8.0f}ms {min(samples):>8.0f}ms "
+                    f"{max(samples):>8.0f}ms"
+                )
+
+        if "cold" in timings:
+            for mode in ("warm", "format"):
+                if mode in timings:
+                    self.stdout.write(
+                        self.style.SUCCESS(
+                            f"✓ {mode}: {timings['cold'] / timings[mode]:.1f}x "
+                            "faster than cold"
+                        )
+                    )
+
+    def _run_mode(self, mode, writer_dir, document, runs, timeout):
+        compiler = PreviewCompiler(writer_dir, use_formats=(mode == "format"))
+        section = f"bench-{mode}"
+        temp_tex = compiler.preview_dir / f"preview-{section}-light-temp.tex"
+
+        def compile_once(run):
+            # A per-run comment after \begin{document} defeats the PDF cache
+            # without touching the preamble
+            content = document.replace(
+                "\\begin{document}", f"\\begin{{document}}\n% {mode} run {run}", 1
+            )
+            started = time.perf_counter()
+            result = compiler.compile(
+                content, color_mode="light", section_name=section, timeout=timeout
+            )
+            elapsed = (time.perf_counter() - started) * 1000
+            if not result["success"]:
+                raise CommandError(f"{mode} compile failed:\n{result['log'][-2000:]}")
+            return elapsed
+
+        if mode == "format":
+            compiler.preview_dir.mkdir(parents=True, exist_ok=True)
+            compiler._link_bibliography()
+            if not compiler.ensure_format(document, "light", wait=True):
+                self.stdout.write(
+                    self.style.WARNING("format   skipped (preamble cannot be dumped)")
+                )
+                return []
+        if mode != "cold":
+            compile_once("warm-up")
+
+        samples = []
+        for run in range(runs):
+            if mode == "cold":
+                compiler._reset_workspace(temp_tex)
+            samples.append(compile_once(run))
+        return samples
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Django management command to load-test the writer OT coordinator.
+
+Simulates collaborators typing into one section. Clients are spread over
+worker processes (like WebSocket consumers on several Daphne/Uvicorn
+workers); each edits its copy of the text, submits at its version, then
+catches up by applying the operations committed since. At the end it
+checks that:
+
+- versions are gapless (every committed operation got exactly one version)
+- every client converged to the same text, which equals replaying the
+  whole history from the empty document
+
+and reports throughput and submit latency percentiles.
+
+The memory backend is process-local, so it runs a single process; use
+--backend redis (SCITEX_WRITER_OT_REDIS_URL or the channel layer's Redis)
+for the multi-process test.
+
+Usage:
+    python manage.py loadtest_writer_ot --backend memory --clients 20
+    python manage.py loadtest_writer_ot --backend redis --processes 4 \\
+        --clients 10 --ops 200
+"""
+
+import asyncio
+import multiprocessing
+import random
+import statistics
+import string
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.writer_app.services.operational_transform_service import TextOperation
+from apps.writer_app.services.ot_backends import InMemoryOTBackend, RedisOTBackend
+from apps.writer_app.services.ot_coordinator import OTCoordinator
+
+SECTION_ID = "loadtest"
+
+
+def make_backend(name, redis_url=None):
+    # Keep the whole run so the history can be verified afterwards
+    if name == "redis":
+        return RedisOTBackend(url=redis_url, max_history=10**7, ttl=3600)
+    return InMemoryOTBackend(max_history=10**7)
+
+
+def random_edit(text, rng):
+    """A single-character insert or delete anywhere in ``text``."""
+    op = TextOperation()
+    if text and rng.random() < 0.3:
+        position = rng.randrange(len(text))
+        return op.retain(position).delete(1).retain(len(text) - position - 1)
+    position = rng.randint(0, len(text))
+    return (
+        op.retain(position)
+        .insert(rng.choice(string.ascii_lowercase))
+        .retain(len(text) - position)
+    )
+
+
+async def catch_up(coordinator, client):
+    """Apply the operations committed since the client's version."""
+    result = await coordinator.get_operations(SECTION_ID, client["version"])
+    if result["operations"] is None:
+        raise RuntimeError("History no longer reaches the client's version")
+    for entry in result["operations"]:
+        op = TextOperation.from_dict(entry["operation"]["ops"])
+        client["text"] = op.apply(client["text"])
+        client["version"] = entry["version"]
+
+
+async def run_client(coordinator, client_id, ops, rng, latencies):
+    client = {"text": "", "version": 0}
+    for _ in range(ops):
+        op = random_edit(client["text"], rng)
+        # Let other clients commit first so submits arrive out of date
+        await asyncio.sleep(0)
+        started = time.perf_counter()
+        result = await coordinator.submit_operation(
+            user_id=client_id,
+            username=f"client-{client_id}",
+            session_id=f"session-{client_id}",
+            section_id=SECTION_ID,
+            operation={"ops": op.to_dict()},
+            version=client["version"],
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+        if result["status"] not in ("processed", "transformed"):
+            raise RuntimeError(f"Submit failed: {result}")
+        await coordinator.acknowledge_operation(result["operation_id"], SECTION_ID)
+        await catch_up(coordinator, client)
+    return client
+
+
+async def run_process(coordinator, process_index, clients, ops, seed):
+    latencies = []
+    tasks = [
+        run_client(
+            coordinator,
+            process_index * clients + i,
+            ops,
+            random.Random(seed + process_index * clients + i),
+            latencies,
+        )
+        for i in range(clients)
+    ]
+    states = await asyncio.gather(*tasks)
+    return states, latencies
+
+
+async def final_state(coordinator, states, expected_version):
+    """Bring every client up to ``expected_version``."""
+    for client in states:
+        await catch_up(coordinator, client)
+        while client["version"] < expected_version:
+            # Other processes are still submitting
+            await asyncio.sleep(0.01)
+            await catch_up(coordinator, client)
+    return [client["text"] for client in states]
+
+
+def worker(args, start, results):
+    backend_name, redis_url, manuscript_id, index, clients, ops, seed, total = args
+    coordinator = OTCoordinator(
+        manuscript_id, backend=make_backend(backend_name, redis_url)
+    )
+
+    async def main():
+        start.wait()
+        states, latencies = await run_process(coordinator, index, clients, ops, seed)
+        texts = await final_state(coordinator, states, total)
+        return texts, latencies
+
+    try:
+        results.put(("ok", index, asyncio.run(main())))
+    except Exception as e:
+        results.put(("error", index, repr(e)))
+
+
+class Command(BaseCommand):
+    help = "Load-test the writer OT coordinator and check convergence"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backend",
+            choices=["memory", "redis"],
+            default="memory",
+            help="OT state backend (default: memory)",
+        )
+        parser.add_argument(
+            "--processes", type=int, default=1, help="Worker processes (redis only)"
+        )
+        parser.add_argument(
+            "--clients", type=int, default=10, help="Clients per process"
+        )
+        parser.add_argument(
+            "--ops", type=int, default=100, help="Operations per client"
+        )
+        parser.add_argument("--redis-url", help="Redis URL for --backend redis")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        backend_name = options["backend"]
+        processes = options["processes"]
+        clients = options["clients"]
+        ops = options["ops"]
+        if min(processes, clients, ops) < 1:
+            raise CommandError("--processes, --clients and --ops must be at least 1")
+        if backend_name == "memory" and processes > 1:
+            raise CommandError(
+                "The memory backend is process-local; use --backend redis "
+                "for more than one process"
+            )
+
+        manuscript_id = f"loadtest-{uuid.uuid4().hex[:12]}"
+        total = processes * clients * ops
+        self.stdout.write(
+            f"{processes} process(es) x {clients} clients x {ops} ops "
+            f"= {total:,} operations ({backend_name} backend)"
+        )
+
+        started = time.perf_counter()
+        if processes == 1:
+            backend = make_backend(backend_name, options["redis_url"])
+            coordinator = OTCoordinator(manuscript_id, backend=backend)
+
+            async def main():
+                states, latencies = await run_process(
+                    coordinator, 0, clients, ops, options["seed"]
+                )
+                return await final_state(coordinator, states, total), latencies
+
+            texts, latencies = asyncio.run(main())
+        else:
+            texts, latencies = self._run_processes(
+                backend_name, manuscript_id, processes, clients, ops, total, options
+            )
+            backend = make_backend(backend_name, options["redis_url"])
+            coordinator = OTCoordinator(manuscript_id, backend=backend)
+        elapsed = time.perf_counter() - started
+
+        history = asyncio.run(coordinator.get_operations(SECTION_ID, 0))
+        self._verify(history, texts, total)
+
+        latencies.sort()
+        self.stdout.write(
+            f"Throughput: {total / elapsed:,.0f} ops/s ({elapsed:.2f}s)\n"
+            f"Submit latency: p50 {statistics.median(latencies):.2f}ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f}ms, "
+            f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.2f}ms"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ {len(texts)} clients converged on {len(texts[0]):,} chars "
+                f"at version {total}"
+            )
+        )
+
+    def _run_processes(
+        self, backend_name, manuscript_id, processes, clients, ops, total, options
+    ):
+        context = multiprocessing.get_context("fork")
+        start = context.Event()
+        results = context.Queue()
+        workers = [
+            context.Process(
+                target=worker,
+                args=(
+                    (
+                        backend_name,
+                        options["redis_url"],
+                        manuscript_id,
+                        index,
+                        clients,
+                        ops,
+                        options["seed"],
+                        total,
+                    ),
+                    start,
+                    results,
+                ),
+            )
+            for index in range(processes)
+        ]
+        for process in workers:
+            process.start()
+        start.set()
+
+        texts, latencies = [], []
+        for _ in workers:
+            status, index, payload = results.get()
+            if status != "ok":
+                raise CommandError(f"Process {index} failed: {payload}")
+            texts.extend(payload[0])
+            latencies.extend(payload[1])
+        for process in workers:
+            process.join()
+        return texts, latencies
+
+    def _verify(self, history, texts, total):
+        if history["current_version"] != total:
+            raise CommandError(
+                f"Expected version {total}, server is at {history['current_version']}"
+            )
+        operations = history["operations"]
+        if operations is None:
+            raise CommandError(
+                "History is shorter than the run; cannot verify (raise "
+                "SCITEX_WRITER_OT_MAX_HISTORY)"
+            )
+        versions = [entry["version"] for entry in operations]
+        if versions != list(range(1, total + 1)):
+            raise CommandError("Committed versions are not gapless")
+
+        replayed = ""
+        for entry in operations:
+            replayed = TextOperation.from_dict(entry["operation"]["ops"]).apply(
+                replayed
+            )
+        diverged = sum(1 for text in texts if text != replayed)
+        if diverged:
+            raise CommandError(f"{diverged} of {len(texts)} clients diverged")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Django management command to run writer compilation workers.
+
+Claims queued CompilationJob rows (section previews first, then full
+builds) and compiles them until stopped. On start (and periodically)
+compilations left running by a dead worker are re-queued. Run this as a
+long-lived service (e.g., systemd) and set
+SCITEX_WRITER_INPROCESS_COMPILE_WORKERS = False so web processes only
+enqueue.
+
+Usage:
+    python manage.py run_compile_workers
+    python manage.py run_compile_workers --workers 4
+"""
+
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.writer_app.services.compilation import CompilationWorkerPool
+
+
+class Command(BaseCommand):
+    help = "Run the writer compilation worker pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of compilations run concurrently "
+            "(default: SCITEX_WRITER_MAX_CONCURRENT_COMPILES)",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] is not None and options["workers"] < 1:
+            raise CommandError("--workers must be at least 1")
+
+        stopping = threading.Event()
+
+        def request_stop(signum, frame):
+            stopping.set()
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+
+        pool = CompilationWorkerPool(size=options["workers"])
+        pool.start()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Compile worker pool {pool.worker_id} running {pool.size} workers"
+            )
+        )
+
+        stopping.wait()
+        self.stdout.write("Stopping; waiting for running compilations to finish...")
+        pool.stop()
+        self.stdout.write(self.style.SUCCESS("✓ Compile workers stopped"))
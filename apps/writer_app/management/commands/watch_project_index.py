@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Django management command to keep figure/table indexes current from
+filesystem events.
+
+Watches the indexable directories of the given projects (scitex/writer,
+data, scripts) with inotifywait and re-indexes just the files that were
+written, moved or deleted, batched over a short debounce window, instead
+of rescanning whole projects. Files changed by scripts or git pulls show
+up in the figure and table pickers without a manual refresh.
+
+Requires inotifywait (inotify-tools).
+
+Usage:
+    python manage.py watch_project_index 12 34
+    python manage.py watch_project_index --all --debounce 5
+"""
+
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.project_app.models import Project
+from apps.writer_app.tasks.indexer import (
+    CELERY_AVAILABLE,
+    INDEX_ROOTS,
+    get_project_path,
+    classify_path,
+    index_project_paths,
+)
+
+
+class Command(BaseCommand):
+    help = "Re-index project figures and tables as files change"
+
+    def add_arguments(self, parser):
+        parser.add_argument("project_ids", nargs="*", type=int)
+        parser.add_argument(
+            "--all", action="store_true", help="Watch every project on disk"
+        )
+        parser.add_argument(
+            "--debounce",
+            type=float,
+            default=2.0,
+            help="Seconds to collect events before indexing (default: 2)",
+        )
+
+    def handle(self, *args, **options):
+        if not shutil.which("inotifywait"):
+            raise CommandError("inotifywait is not installed (inotify-tools)")
+        if options["all"]:
+            projects = Project.objects.all()
+        elif options["project_ids"]:
+            projects = Project.objects.filter(id__in=options["project_ids"])
+        else:
+            raise CommandError("Give project IDs or --all")
+
+        # Watched directory -> (project id, project root)
+        roots = {}
+        for project in projects:
+            project_path = get_project_path(project, "[IndexWatcher]")
+            if not project_path:
+                continue
+            for root in INDEX_ROOTS:
+                if (project_path / root).is_dir():
+                    roots[str(project_path / root)] = (project.id, project_path)
+        if not roots:
+            raise CommandError("No indexable project directories found")
+
+        process = subprocess.Popen(
+            [
+                "inotifywait",
+                "-m",
+                "-r",
+                "-q",
+                "--format",
+                "%w%f",
+                "-e",
+                "close_write",
+                "-e",
+                "moved_to",
+                "-e",
+                "moved_from",
+                "-e",
+                "delete",
+                *roots,
+            ],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        events = queue.Queue()
+        threading.Thread(
+            target=self._read_events, args=(process, events), daemon=True
+        ).start()
+        self.stdout.write(self.style.SUCCESS(f"✓ Watching {len(roots)} directories"))
+
+        try:
+            self._dispatch(events, roots, options["debounce"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            process.terminate()
+
+    @staticmethod
+    def _read_events(process, events):
+        for line in process.stdout:
+            events.put(line.rstrip("\n"))
+        events.put(None)
+
+    def _dispatch(self, events, roots, debounce):
+        pending = defaultdict(set)
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.time(), 0)
+            try:
+                path = events.get(timeout=timeout)
+            except queue.Empty:
+                path = ""
+            if path is None:
+                raise CommandError("inotifywait exited")
+
+            if path:
+                match = self._project_for(path, roots)
+                if match:
+                    project_id, relative_path = match
+                    pending[project_id].add(relative_path)
+                    deadline = deadline or time.time() + debounce
+            if deadline is None or time.time() < deadline:
+                continue
+
+            for project_id, paths in pending.items():
+                self.stdout.write(f"Project {project_id}: {len(paths)} changed file(s)")
+                try:
+                    if CELERY_AVAILABLE:
+                        index_project_paths.delay(project_id, sorted(paths))
+                    else:
+                        index_project_paths(project_id, sorted(paths))
+                except Exception as e:
+                    self.stderr.write(f"Indexing project {project_id} failed: {e}")
+            pending.clear()
+            deadline = None
+
+    @staticmethod
+    def _project_for(path, roots):
+        """(project id, path relative to the project) for an indexable file."""
+        for root, (project_id, project_path) in roots.items():
+            if path.startswith(root + os.sep):
+                relative_path = str(Path(path).relative_to(project_path))
+                if classify_path(relative_path):
+                    return project_id, relative_path
+        return None
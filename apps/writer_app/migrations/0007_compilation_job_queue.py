@@ -0,0 +1,140 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("project_app", "0021_alter_project_unique_together"),
+        ("writer_app", "0006_collaborationinvitation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="compilationjob",
+            name="attempts",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="compilationjob",
+            name="doc_type",
+            field=models.CharField(default="manuscript", max_length=20),
+        ),
+        migrations.AddField(
+            model_name="compilationjob",
+            name="heartbeat_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="compilationjob",
+            name="options",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="compilationjob",
+            name="priority",
+            field=models.SmallIntegerField(default=10),
+        ),
+        migrations.AddField(
+            model_name="compilationjob",
+            name="progress",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="compilationjob",
+            name="project",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="writer_compilation_jobs",
+                to="project_app.project",
+            ),
+        ),
+        migrations.AddField(
+            model_name="compilationjob",
+            name="result",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="compilationjob",
+            name="section_name",
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AddField(
+            model_name="compilationjob",
+            name="step",
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AddField(
+            model_name="compilationjob",
+            name="superseded_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="writer_app.compilationjob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="compilationjob",
+            name="worker_id",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name="compilationjob",
+            name="compilation_type",
+            field=models.CharField(
+                choices=[
+                    ("full", "Full Compilation"),
+                    ("draft", "Draft Mode"),
+                    ("quick", "Quick Preview"),
+                    ("preview", "Section Preview"),
+                ],
+                default="full",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="compilationjob",
+            name="manuscript",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="compilation_jobs",
+                to="writer_app.manuscript",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="compilationjob",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("queued", "Queued"),
+                    ("running", "Running"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                    ("superseded", "Superseded"),
+                ],
+                default="queued",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="compilationjob",
+            index=models.Index(
+                fields=["status", "priority", "created_at"],
+                name="writer_app__status_369fa6_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="compilationjob",
+            index=models.Index(
+                fields=["project", "status"], name="writer_app__project_2b284d_idx"
+            ),
+        ),
+    ]
@@ -6,23 +6,42 @@ import uuid
 
 
 class CompilationJob(models.Model):
-    """Track LaTeX compilation jobs."""
+    """Track LaTeX compilation jobs.
+
+    Rows double as the compilation queue (services.compilation.scheduler):
+    jobs are created ``queued``, claimed by a worker as ``running`` and end
+    ``completed``, ``failed`` or ``superseded`` (replaced by a newer request
+    before they started).
+    """
 
     JOB_STATUS = [
         ("queued", "Queued"),
         ("running", "Running"),
         ("completed", "Completed"),
         ("failed", "Failed"),
+        ("superseded", "Superseded"),
     ]
 
     COMPILATION_TYPES = [
         ("full", "Full Compilation"),
         ("draft", "Draft Mode"),
         ("quick", "Quick Preview"),
+        ("preview", "Section Preview"),
     ]
 
     manuscript = models.ForeignKey(
-        "Manuscript", on_delete=models.CASCADE, related_name="compilation_jobs"
+        "Manuscript",
+        on_delete=models.CASCADE,
+        related_name="compilation_jobs",
+        null=True,
+        blank=True,
+    )
+    project = models.ForeignKey(
+        "project_app.Project",
+        on_delete=models.CASCADE,
+        related_name="writer_compilation_jobs",
+        null=True,
+        blank=True,
     )
     job_id = models.UUIDField(default=uuid.uuid4, unique=True)
     initiated_by = models.ForeignKey(
@@ -33,6 +52,10 @@ class CompilationJob(models.Model):
     compilation_type = models.CharField(
         max_length=20, choices=COMPILATION_TYPES, default="full"
     )
+    doc_type = models.CharField(max_length=20, default="manuscript")
+    section_name = models.CharField(max_length=200, blank=True)
+    options = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=10)  # Lower runs first
 
     # Status and results
     status = models.CharField(max_length=20, choices=JOB_STATUS, default="queued")
@@ -43,6 +66,17 @@ class CompilationJob(models.Model):
     log_file = models.TextField(blank=True)
     error_message = models.TextField(blank=True)
     error_log = models.TextField(blank=True)  # Detailed error logs
+    progress = models.IntegerField(default=0)
+    step = models.CharField(max_length=200, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    superseded_by = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+
+    # Worker bookkeeping
+    worker_id = models.CharField(max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.IntegerField(default=0)
 
     # Metrics
     compilation_time = models.FloatField(null=True, blank=True)  # in seconds
@@ -55,6 +89,10 @@ class CompilationJob(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "priority", "created_at"]),
+            models.Index(fields=["project", "status"]),
+        ]
 
     def __str__(self):
         return f"Compilation {self.job_id} - {self.status}"
@@ -10,4 +10,8 @@ websocket_urlpatterns = [
         r"ws/writer/manuscript/(?P<manuscript_id>\d+)/$",
         consumers.WriterConsumer.as_asgi(),
     ),
+    re_path(
+        r"ws/writer/project/(?P<project_id>\d+)/compilation/$",
+        consumers.CompilationConsumer.as_asgi(),
+    ),
 ]
@@ -3,7 +3,19 @@ Compilation Services - LaTeX Compilation and AI Assistance
 """
 
 from .compiler_service import CompilerService
+from .preview import PreviewCompiler
+from .scheduler import (
+    CompilationWorkerPool,
+    serialize_job,
+    submit_job,
+    wait_for_job,
+)
 
 __all__ = [
+    "CompilationWorkerPool",
     "CompilerService",
+    "PreviewCompiler",
+    "serialize_job",
+    "submit_job",
+    "wait_for_job",
 ]
@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Section preview compilation for the editor.
+
+Four layers keep keystroke-triggered previews fast:
+
+1. Content-addressed PDF cache: compiled PDFs are stored under
+   ``.preview/cache/<sha256>.pdf``, keyed on the LaTeX source, the color
+   mode and the bibliography's content. Re-previewing a buffer that was
+   compiled before (undo, theme toggles, switching sections back and
+   forth) only publishes the cached file.
+2. Incremental workspace: each (section, color mode) keeps its latexmk
+   auxiliary files (.aux, .bbl, .fdb_latexmk, ...) between runs, so latexmk
+   re-runs only the passes the change requires and skips BibTeX unless
+   citations changed.
+3. Coalescing: while a section compiles, newer requests for it queue up
+   and only the latest buffer is compiled; requests it superseded get that
+   result instead of compiling their own stale content.
+4. Precompiled preambles: the preamble (everything before
+   ``\\begin{document}``, including the color-mode commands) is dumped
+   once into a TeX format file with ``mylatexformat`` and later runs load
+   it with ``pdflatex -fmt`` instead of re-reading every package. Formats
+   are cached under ``.preview/formats/`` per preamble hash and color mode
+   and built in the background after the first compile of a preamble.
+   Preambles that cannot be dumped, and formats a run cannot compile
+   against (say, after a TeX Live update), fall back to plain compilation.
+"""
+
+import fcntl
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from scitex import logging
+
+logger = logging.getLogger(__name__)
+
+# Cached PDFs kept per project (least recently used are evicted)
+CACHE_SIZE = getattr(settings, "SCITEX_WRITER_PREVIEW_CACHE_SIZE", 64)
+# Precompiled preamble formats (several MB each) kept per project
+FORMAT_CACHE_SIZE = getattr(settings, "SCITEX_WRITER_PREVIEW_FORMAT_CACHE_SIZE", 8)
+USE_FORMATS = getattr(settings, "SCITEX_WRITER_PREVIEW_FORMATS", True)
+FORMAT_BUILD_TIMEOUT = 120
+
+_BEGIN_DOCUMENT = "\\begin{document}"
+
+
+_bib_digests = {}
+
+
+def _bib_digest(bib_path: Path) -> str:
+    """Content hash of the bibliography ("" if there is none).
+
+    Memoized on (mtime, size) so large bibliographies are not re-read on
+    every keystroke.
+    """
+    try:
+        stat = bib_path.stat()
+    except OSError:
+        return ""
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    memo = _bib_digests.get(bib_path)
+    if memo and memo[0] == stamp:
+        return memo[1]
+    try:
+        digest = hashlib.sha256(bib_path.read_bytes()).hexdigest()
+    except OSError:
+        return ""
+    _bib_digests[bib_path] = (stamp, digest)
+    return digest
+
+
+def preview_key(latex_content: str, color_mode: str, bib_digest: str) -> str:
+    """Cache key of a preview PDF."""
+    digest = hashlib.sha256()
+    for part in (color_mode, bib_digest, latex_content):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def split_preamble(latex_content: str):
+    """(preamble, rest) of a document, or (None, content) without one."""
+    position = latex_content.find(_BEGIN_DOCUMENT)
+    if position < 0:
+        return None, latex_content
+    return latex_content[:position], latex_content[position:]
+
+
+def format_name(preamble: str, color_mode: str) -> str:
+    """Format file name (without .fmt) of a preamble."""
+    digest = hashlib.sha256(preamble.encode("utf-8")).hexdigest()[:16]
+    return f"preamble-{color_mode}-{digest}"
+
+
+_mylatexformat = None
+
+
+def mylatexformat_available() -> bool:
+    """Whether the TeX installation can dump preambles."""
+    global _mylatexformat
+    if _mylatexformat is None:
+        try:
+            found = subprocess.run(
+                ["kpsewhich", "mylatexformat.ltx"],
+                capture_output=True,
+                text=True,
+                timeout=10,
+            )
+            _mylatexformat = found.returncode == 0 and bool(found.stdout.strip())
+        except (OSError, subprocess.SubprocessError):
+            _mylatexformat = False
+        if not _mylatexformat:
+            logger.info("[CompilePreview] mylatexformat not found; formats disabled")
+    return _mylatexformat
+
+
+_format_builds = set()
+_format_builds_lock = threading.Lock()
+
+
+def _publish(source: Path, target: Path) -> None:
+    """Atomically make ``target`` a copy of ``source``."""
+    staging = target.with_name(
+        f".{target.name}.{os.getpid()}-{threading.get_ident()}.tmp"
+    )
+    try:
+        os.link(source, staging)
+    except OSError:
+        shutil.copy2(source, staging)
+    os.replace(staging, target)
+
+
+class _SectionQueue:
+    """Coalescing state of one (project, section, color) preview."""
+
+    def __init__(self):
+        self.compile_lock = threading.Lock()
+        self.state_lock = threading.Lock()
+        self.seq = 0
+        self.latest = None  # (seq, latex_content)
+        self.done_seq = 0
+        self.result = None
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def _queue_for(key) -> _SectionQueue:
+    with _queues_lock:
+        queue = _queues.get(key)
+        if queue is None:
+            queue = _queues[key] = _SectionQueue()
+        return queue
+
+
+class PreviewCompiler:
+    """Compiles section previews into ``<writer_dir>/.preview``."""
+
+    def __init__(self, writer_dir: Path, use_formats: bool = None):
+        self.writer_dir = Path(writer_dir)
+        self.preview_dir = self.writer_dir / ".preview"
+        self.cache_dir = self.preview_dir / "cache"
+        self.formats_dir = self.preview_dir / "formats"
+        self.use_formats = USE_FORMATS if use_formats is None else use_formats
+        self.bib_source = (
+            self.writer_dir / "00_shared" / "bib_files" / "bibliography.bib"
+        )
+
+    def output_pdf(self, section_name: str, color_mode: str) -> Path:
+        """Path the editor loads the preview from."""
+        return self.preview_dir / f"preview-{section_name}-{color_mode}.pdf"
+
+    def compile(
+        self,
+        latex_content: str,
+        color_mode: str = "light",
+        section_name: str = "preview",
+        timeout: int = 60,
+    ) -> dict:
+        """Publish a preview of ``latex_content`` (color mode already applied).
+
+        Returns the same result dict as ``WriterService.compile_preview``,
+        plus ``cached`` (served without compiling).
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._link_bibliography()
+        output_pdf = self.output_pdf(section_name, color_mode)
+
+        key = preview_key(latex_content, color_mode, _bib_digest(self.bib_source))
+        if self._serve_cached(key, output_pdf):
+            return self._result(output_pdf, "Served from preview cache", cached=True)
+
+        queue = _queue_for((str(self.preview_dir), section_name, color_mode))
+        with queue.state_lock:
+            queue.seq += 1
+            seq = queue.seq
+            queue.latest = (seq, latex_content)
+
+        with queue.compile_lock:
+            with queue.state_lock:
+                if queue.done_seq >= seq:
+                    # A newer buffer for this section compiled while we waited
+                    return dict(queue.result)
+                latest_seq, latest_content = queue.latest
+
+            if latest_seq != seq:
+                key = preview_key(
+                    latest_content, color_mode, _bib_digest(self.bib_source)
+                )
+                logger.info(
+                    f"[CompilePreview] Coalesced {latest_seq - seq + 1} requests "
+                    f"for {section_name} ({color_mode})"
+                )
+            result = self._compile_locked(
+                latest_content, key, color_mode, section_name, timeout
+            )
+            with queue.state_lock:
+                queue.done_seq = latest_seq
+                queue.result = result
+            return dict(result)
+
+    def _result(self, output_pdf: Path, log: str, cached: bool = False) -> dict:
+        return {
+            "success": True,
+            "output_pdf": str(output_pdf),
+            "log": log,
+            "error": None,
+            "cached": cached,
+        }
+
+    def _link_bibliography(self) -> None:
+        # Citations in previews resolve against the shared bibliography
+        bib_link = self.preview_dir / "bibliography.bib"
+        if self.bib_source.exists() and not bib_link.exists():
+            try:
+                bib_link.symlink_to(self.bib_source)
+                logger.info(
+                    "[CompilePreview] Created bibliography symlink for citations"
+                )
+            except Exception as e:
+                logger.warning(
+                    f"[CompilePreview] Could not create bibliography symlink: {e}"
+                )
+
+    def _serve_cached(self, key: str, output_pdf: Path) -> bool:
+        cached_pdf = self.cache_dir / f"{key}.pdf"
+        try:
+            _publish(cached_pdf, output_pdf)
+            os.utime(cached_pdf)  # Recently used
+        except FileNotFoundError:
+            return False
+        logger.info(f"[CompilePreview] Cache hit for {output_pdf.name}")
+        return True
+
+    def _compile_locked(self, latex_content, key, color_mode, section_name, timeout):
+        output_pdf = self.output_pdf(section_name, color_mode)
+        lock_path = self.preview_dir / f".preview-{section_name}-{color_mode}.lock"
+        with open(lock_path, "w") as lock_file:
+            # Other server processes share the workspace files
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if self._serve_cached(key, output_pdf):
+                    return self._result(output_pdf, "Served from preview cache", True)
+                return self._run_latexmk(
+                    latex_content, key, color_mode, section_name, timeout
+                )
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _run_latexmk(self, latex_content, key, color_mode, section_name, timeout):
+        # Stable per-section job name: latexmk finds its .aux/.bbl/.fdb_latexmk
+        # from the previous run and only re-runs the passes that changed
+        temp_tex = self.preview_dir / f"preview-{section_name}-{color_mode}-temp.tex"
+        temp_pdf = temp_tex.with_suffix(".pdf")
+        temp_tex.write_text(latex_content, encoding="utf-8")
+        # A failed run must not leave the previous PDF looking like a success
+        temp_pdf.unlink(missing_ok=True)
+
+        fmt = self.ensure_format(latex_content, color_mode)
+        logger.info(
+            f"[CompilePreview] Compiling {color_mode} preview of {section_name} "
+            f"with latexmk ({len(latex_content)} chars, "
+            f"{'format ' + fmt if fmt else 'no format'}) timeout={timeout}s"
+        )
+        deadline = time.monotonic() + timeout
+        try:
+            result = self._latexmk(temp_tex, fmt, timeout)
+            if fmt and not temp_pdf.exists():
+                # A stale format (TeX Live update) or a preamble mylatexformat
+                # splits wrongly fails every run; compare with a plain one
+                logger.warning(
+                    f"[CompilePreview] No PDF with format {fmt}; retrying without it"
+                )
+                self._reset_workspace(temp_tex)
+                result = self._latexmk(
+                    temp_tex, None, max(1, int(deadline - time.monotonic()))
+                )
+                if temp_pdf.exists():
+                    self._discard_format(fmt)
+        except subprocess.TimeoutExpired:
+            logger.error(f"WriterService: Preview compilation timeout after {timeout}s")
+            # An interrupted run can leave aux files that break the next one
+            self._reset_workspace(temp_tex)
+            return {
+                "success": False,
+                "output_pdf": None,
+                "log": f"Compilation timeout after {timeout} seconds",
+                "error": "Compilation timeout",
+                "cached": False,
+            }
+
+        log_content = result.stdout + result.stderr
+        # latexmk's return code may be non-zero on recoverable errors with
+        # -interaction=nonstopmode, so the PDF decides success
+        if not temp_pdf.exists():
+            logger.error(
+                f"WriterService: Preview compilation failed - PDF not found at {temp_pdf}"
+            )
+            logger.error(f"latexmk return code: {result.returncode}")
+            logger.error(f"latexmk output:\n{log_content}")
+            self._reset_workspace(temp_tex)
+            return {
+                "success": False,
+                "output_pdf": None,
+                "log": log_content,
+                "error": "PDF compilation failed - no output PDF generated",
+                "cached": False,
+            }
+
+        cached_pdf = self.cache_dir / f"{key}.pdf"
+        _publish(temp_pdf, cached_pdf)
+        _publish(cached_pdf, self.output_pdf(section_name, color_mode))
+        self._prune_cache()
+        logger.info(
+            f"WriterService: Preview compilation succeeded for {section_name} ({color_mode})"
+        )
+        return self._result(self.output_pdf(section_name, color_mode), log_content)
+
+    def _latexmk(self, temp_tex: Path, fmt, timeout: int):
+        """Run latexmk on ``temp_tex``, loading format ``fmt`` if given."""
+        command = [
+            "latexmk",
+            "-pdf",
+            "-interaction=nonstopmode",
+            f"-output-directory={self.preview_dir}",
+            "-silent",
+        ]
+        env = None
+        if fmt:
+            # The format already holds the preamble; mylatexformat makes
+            # pdflatex skip it in the document
+            command.append(f"-pdflatex=pdflatex -fmt={fmt} %O %S")
+            env = {
+                **os.environ,
+                "TEXFORMATS": f"{self.formats_dir}{os.pathsep}"
+                + os.environ.get("TEXFORMATS", ""),
+            }
+            os.utime(self.formats_dir / f"{fmt}.fmt")  # Recently used
+        command.append(str(temp_tex))
+        return subprocess.run(
+            command,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            cwd=str(self.preview_dir),
+            env=env,
+        )
+
+    def ensure_format(self, latex_content: str, color_mode: str, wait=False):
+        """Name of the precompiled format for ``latex_content``'s preamble.
+
+        Returns None while the format does not exist yet; it is then built
+        in a background thread, or right away with ``wait=True``.
+        """
+        if not self.use_formats or not mylatexformat_available():
+            return None
+        preamble, _ = split_preamble(latex_content)
+        if not preamble:
+            return None
+        name = format_name(preamble, color_mode)
+        if (self.formats_dir / f"{name}.fmt").exists():
+            return name
+        if (self.formats_dir / f"{name}.failed").exists():
+            return None
+
+        build_id = str(self.formats_dir / name)
+        with _format_builds_lock:
+            if build_id in _format_builds:
+                return None
+            _format_builds.add(build_id)
+
+        def build():
+            try:
+                self.build_format(preamble, name)
+            finally:
+                with _format_builds_lock:
+                    _format_builds.discard(build_id)
+
+        if wait:
+            build()
+            return name if (self.formats_dir / f"{name}.fmt").exists() else None
+        threading.Thread(target=build, name=f"fmt-{name}", daemon=True).start()
+        return None
+
+    def build_format(self, preamble: str, name: str) -> bool:
+        """Dump ``preamble`` into ``formats/<name>.fmt`` with mylatexformat."""
+        self.formats_dir.mkdir(parents=True, exist_ok=True)
+        staging = f"{name}-{os.getpid()}-{threading.get_ident()}"
+        source = self.formats_dir / f"{staging}.tex"
+        source.write_text(
+            f"{preamble}{_BEGIN_DOCUMENT}\\end{{document}}\n", encoding="utf-8"
+        )
+        try:
+            # Run from .preview so relative \input paths match preview runs
+            subprocess.run(
+                [
+                    "pdflatex",
+                    "-ini",
+                    "-interaction=nonstopmode",
+                    f"-jobname={staging}",
+                    f"-output-directory={self.formats_dir}",
+                    "&pdflatex",
+                    "mylatexformat.ltx",
+                    str(source),
+                ],
+                capture_output=True,
+                text=True,
+                timeout=FORMAT_BUILD_TIMEOUT,
+                cwd=str(self.preview_dir),
+            )
+            built = self.formats_dir / f"{staging}.fmt"
+            if built.exists():
+                os.replace(built, self.formats_dir / f"{name}.fmt")
+                logger.info(f"[CompilePreview] Precompiled preamble format {name}")
+                self._prune_formats()
+                return True
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"[CompilePreview] Format build for {name} failed: {e}")
+        finally:
+            for leftover in self.formats_dir.glob(f"{staging}.*"):
+                leftover.unlink(missing_ok=True)
+
+        # Not every preamble can be dumped; remember and compile normally
+        logger.warning(
+            f"[CompilePreview] Preamble {name} cannot be precompiled; "
+            "previews will parse it on every run"
+        )
+        (self.formats_dir / f"{name}.failed").touch()
+        return False
+
+    def _discard_format(self, name: str) -> None:
+        """Stop using a format that compiles nothing the plain run can."""
+        logger.warning(
+            f"[CompilePreview] Format {name} is unusable; "
+            "previews will parse the preamble on every run"
+        )
+        (self.formats_dir / f"{name}.failed").touch()
+        (self.formats_dir / f"{name}.fmt").unlink(missing_ok=True)
+
+    def _prune_formats(self) -> None:
+        try:
+            formats = sorted(
+                self.formats_dir.glob("*.fmt"),
+                key=lambda path: path.stat().st_mtime,
+                reverse=True,
+            )
+            for stale in formats[FORMAT_CACHE_SIZE:]:
+                stale.unlink(missing_ok=True)
+        except OSError as e:
+            logger.debug(f"[CompilePreview] Could not prune formats: {e}")
+
+    def _reset_workspace(self, temp_tex: Path) -> None:
+        """Drop a section's aux state so the next run starts clean."""
+        for ext in (".aux", ".bbl", ".blg", ".fdb_latexmk", ".fls", ".out", ".toc"):
+            temp_tex.with_suffix(ext).unlink(missing_ok=True)
+
+    def _prune_cache(self) -> None:
+        try:
+            entries = sorted(
+                self.cache_dir.glob("*.pdf"),
+                key=lambda path: path.stat().st_mtime,
+                reverse=True,
+            )
+            for stale in entries[CACHE_SIZE:]:
+                stale.unlink(missing_ok=True)
+        except OSError as e:
+            logger.debug(f"[CompilePreview] Could not prune preview cache: {e}")
+
+
+__all__ = [
+    "PreviewCompiler",
+    "format_name",
+    "mylatexformat_available",
+    "preview_key",
+    "split_preamble",
+]
+
+# EOF
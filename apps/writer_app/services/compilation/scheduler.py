@@ -0,0 +1,540 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compilation scheduler: durable queue and bounded worker pool.
+
+CompilationJob rows are the queue. A request creates a ``queued`` row and a
+worker claims it by atomically flipping it to ``running``; progress, step
+and the log are written back to the row as the compile runs, so any web
+process can answer status requests and nothing is lost on restart.
+
+Scheduling:
+- At most SCITEX_WRITER_MAX_CONCURRENT_COMPILES compiles run at once.
+  SCITEX_WRITER_PREVIEW_RESERVED_SLOTS of them are kept free for section
+  previews, which also sort before full builds (lower ``priority``).
+- A project never runs two full builds of the same document at once (they
+  share an output directory).
+- A new request supersedes the project's queued request for the same
+  target (document, or section and color mode for previews): the old row
+  becomes ``superseded`` and points at the new one.
+
+Progress is broadcast to the Channels group of the project
+(``writer_compilation_<project_id>``, see CompilationConsumer) in batches
+of at most one message per LOG_FLUSH_INTERVAL. Heartbeats, recovery of
+jobs whose worker died and the worker threads come from
+apps.common.utils.job_queue.
+
+Workers run in-process (started on first request) unless
+SCITEX_WRITER_INPROCESS_COMPILE_WORKERS is False, in which case the
+``run_compile_workers`` command provides them.
+"""
+
+import json
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+from scitex import logging
+
+from apps.common.utils.job_queue import InProcessPool, JobQueue, WorkerPool
+
+from ...models.compilation import CompilationJob
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_COMPILES = getattr(settings, "SCITEX_WRITER_MAX_CONCURRENT_COMPILES", 2)
+PREVIEW_RESERVED_SLOTS = getattr(settings, "SCITEX_WRITER_PREVIEW_RESERVED_SLOTS", 1)
+STALE_AFTER = getattr(settings, "SCITEX_WRITER_COMPILE_STALE_AFTER", 120)
+MAX_ATTEMPTS = getattr(settings, "SCITEX_WRITER_COMPILE_MAX_ATTEMPTS", 2)
+# Finished preview rows are only needed by the request waiting for them
+PREVIEW_RETENTION = 3600
+HEARTBEAT_INTERVAL = 30
+POLL_INTERVAL = 2
+LOG_FLUSH_INTERVAL = 0.5
+CLAIM_WINDOW = 100
+
+PREVIEW_PRIORITY = 0
+FULL_PRIORITY = 10
+FINISHED_STATUSES = ("completed", "failed", "superseded")
+FULL_COMPILE_OPTIONS = (
+    "no_figs",
+    "ppt2tif",
+    "crop_tif",
+    "quiet",
+    "verbose",
+    "force",
+    "track_changes",
+)
+
+JOBS = JobQueue(
+    CompilationJob, queued="queued", running="running", label="compilations"
+)
+
+# Wakes in-process wait_for_job() callers as soon as a job finishes
+_job_finished = threading.Condition()
+_claim_lock = threading.Lock()
+
+
+def group_name(project_id) -> str:
+    """Channels group receiving a project's compilation updates."""
+    return f"writer_compilation_{project_id}"
+
+
+def _broadcast(project_id, payload: dict):
+    channel_layer = get_channel_layer()
+    if channel_layer is None or project_id is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(
+            group_name(project_id), {"type": "compilation_update", "job": payload}
+        )
+    except Exception as e:
+        # Clients fall back to polling the status endpoint
+        logger.debug(f"Could not broadcast compilation update: {e}")
+
+
+def _pdf_url(project_id, output_pdf) -> str:
+    return f"/writer/api/project/{project_id}/pdf/{Path(output_pdf).name}"
+
+
+def serialize_job(job: CompilationJob, include_log: bool = True) -> dict:
+    """Status payload shared by the status endpoint and the WebSocket."""
+    from ...utils.ansi_to_html import ansi_to_html
+
+    payload = {
+        "job_id": str(job.job_id),
+        "compilation_type": job.compilation_type,
+        "doc_type": job.doc_type,
+        "section_name": job.section_name,
+        "status": job.status,
+        "progress": job.progress,
+        "step": job.step,
+        "result": job.result,
+        "superseded_by": None,
+    }
+    if job.superseded_by_id:
+        payload["superseded_by"] = str(
+            CompilationJob.objects.values_list("job_id", flat=True).get(
+                pk=job.superseded_by_id
+            )
+        )
+    if include_log:
+        log = job.log_file.rstrip("\n")
+        payload["log"] = log
+        payload["log_html"] = ansi_to_html(log)
+    return payload
+
+
+def submit_job(
+    project_id: int,
+    user_id: int,
+    compilation_type: str = "full",
+    doc_type: str = "manuscript",
+    section_name: str = "",
+    options: dict = None,
+) -> CompilationJob:
+    """Queue a compilation, superseding the queued one for the same target.
+
+    ``compilation_type`` is ``preview`` for section previews (``options``
+    carries content, color_mode and timeout) and ``full`` for workspace
+    builds (``options`` carries timeout and the FULL_COMPILE_OPTIONS flags).
+    """
+    options = options or {}
+    preview = compilation_type == "preview"
+    with transaction.atomic():
+        job = CompilationJob.objects.create(
+            project_id=project_id,
+            initiated_by_id=user_id,
+            compilation_type=compilation_type,
+            doc_type=doc_type,
+            section_name=section_name,
+            options=options,
+            priority=PREVIEW_PRIORITY if preview else FULL_PRIORITY,
+            step="Queued",
+        )
+        older = CompilationJob.objects.filter(
+            project_id=project_id,
+            compilation_type=compilation_type,
+            doc_type=doc_type,
+            status="queued",
+        ).exclude(pk=job.pk)
+        if preview:
+            older = older.filter(
+                section_name=section_name,
+                options__color_mode=options.get("color_mode", "light"),
+            )
+        superseded = list(older.values_list("job_id", flat=True))
+        if superseded:
+            older.update(
+                status="superseded",
+                superseded_by=job,
+                step="Superseded by a newer request",
+                completed_at=timezone.now(),
+            )
+
+    for old_job_id in superseded:
+        _broadcast(
+            project_id,
+            {
+                "job_id": str(old_job_id),
+                "status": "superseded",
+                "superseded_by": str(job.job_id),
+            },
+        )
+    if superseded:
+        with _job_finished:
+            _job_finished.notify_all()
+    _enqueue()
+    return job
+
+
+def claim_next_job(
+    worker_id: str,
+    max_concurrent: int = None,
+    preview_reserved: int = None,
+) -> Optional[CompilationJob]:
+    """Claim the next queued job for ``worker_id``, or None.
+
+    The claim is a conditional UPDATE (``queued`` -> ``running``), so two
+    workers never get the same job. Claims of one process are serialized,
+    so an in-process pool never exceeds the limits; across processes they
+    can be exceeded by the number of workers claiming at the same instant.
+    """
+    max_concurrent = max_concurrent or MAX_CONCURRENT_COMPILES
+    if preview_reserved is None:
+        preview_reserved = PREVIEW_RESERVED_SLOTS
+
+    with _claim_lock:
+        running = list(
+            CompilationJob.objects.filter(status="running").values_list(
+                "compilation_type", "project_id", "doc_type"
+            )
+        )
+        if len(running) >= max_concurrent:
+            return None
+        full_limit = max(max_concurrent - preview_reserved, 1)
+        full_running = [(p, d) for kind, p, d in running if kind != "preview"]
+
+        candidates = (
+            CompilationJob.objects.filter(status="queued")
+            .order_by("priority", "created_at")
+            .values_list("pk", "compilation_type", "project_id", "doc_type")[
+                :CLAIM_WINDOW
+            ]
+        )
+        for pk, kind, project_id, doc_type in candidates:
+            if kind != "preview" and (
+                len(full_running) >= full_limit
+                or (project_id, doc_type) in full_running
+            ):
+                continue
+            now = timezone.now()
+            claimed = CompilationJob.objects.filter(pk=pk, status="queued").update(
+                status="running",
+                worker_id=worker_id,
+                started_at=now,
+                heartbeat_at=now,
+                step="Starting...",
+                attempts=F("attempts") + 1,
+            )
+            if claimed:
+                return CompilationJob.objects.get(pk=pk)
+        return None
+
+
+def heartbeat(job_ids) -> int:
+    """Mark running jobs as alive."""
+    return JOBS.heartbeat(job_ids)
+
+
+def recover_stale_jobs(stale_after: int = None, max_attempts: int = None):
+    """Re-queue ``running`` jobs whose worker stopped sending heartbeats.
+
+    Returns ``(requeued, failed)`` counts. Jobs that already used
+    ``max_attempts`` claims are failed instead of retried forever.
+    """
+    error = "Compilation was interrupted too many times"
+    return JOBS.recover_stale(
+        stale_after or STALE_AFTER,
+        max_attempts or MAX_ATTEMPTS,
+        requeue=lambda job: {
+            "step": "Queued",
+            "log_file": Concat(
+                "log_file",
+                Value("↻ Worker stopped unexpectedly; compilation re-queued\n"),
+            ),
+        },
+        fail=lambda job: {
+            "step": "Failed",
+            "error_message": error,
+            "result": {"success": False, "error": error},
+            "log_file": Concat(
+                "log_file", Value("✗ Worker stopped unexpectedly; giving up\n")
+            ),
+        },
+    )
+
+
+def prune_finished_previews(older_than: int = PREVIEW_RETENTION) -> int:
+    """Delete finished preview rows (one is created per preview request)."""
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+    deleted, _ = CompilationJob.objects.filter(
+        compilation_type="preview",
+        status__in=FINISHED_STATUSES,
+        created_at__lt=cutoff,
+    ).delete()
+    return deleted
+
+
+def _update_running(job_pk, fields: dict, retries: int = 3) -> int:
+    """UPDATE a running job, retrying briefly on lock errors (SQLite)."""
+    for attempt in range(retries):
+        try:
+            return CompilationJob.objects.filter(pk=job_pk, status="running").update(
+                **fields
+            )
+        except OperationalError:
+            if attempt == retries - 1:
+                raise
+            time.sleep(0.1 * (attempt + 1))
+
+
+class _JobReporter:
+    """Buffers log lines and progress of a running job.
+
+    Each flush is a single UPDATE appending the new lines to ``log_file``
+    (and refreshing the heartbeat) plus one Channels message. Compile
+    callbacks may arrive from other threads.
+    """
+
+    def __init__(self, job: CompilationJob):
+        self.job = job
+        self._lines = []
+        self._progress = None
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._worker_thread = threading.current_thread()
+
+    def log(self, message):
+        with self._lock:
+            self._lines.append(str(message))
+        self._flush_if_due()
+
+    def progress(self, percent, step):
+        with self._lock:
+            self._progress = (int(percent), str(step)[:200])
+        self._flush_if_due()
+
+    def _flush_if_due(self):
+        if time.monotonic() - self._last_flush >= LOG_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        from ...utils.ansi_to_html import ansi_to_html
+
+        with self._lock:
+            lines, progress = self._lines, self._progress
+            self._lines, self._progress = [], None
+            self._last_flush = time.monotonic()
+        if not lines and progress is None:
+            return
+
+        fields = {"heartbeat_at": timezone.now()}
+        payload = {"job_id": str(self.job.job_id), "status": "running"}
+        if lines:
+            chunk = "\n".join(lines)
+            fields["log_file"] = Concat("log_file", Value(chunk + "\n"))
+            payload["log_append"] = chunk
+            payload["log_html_append"] = ansi_to_html(chunk)
+        if progress is not None:
+            fields["progress"], fields["step"] = progress
+            payload["progress"], payload["step"] = progress
+        try:
+            _update_running(self.job.pk, fields)
+        finally:
+            # Callback threads would otherwise keep their connection open
+            if threading.current_thread() is not self._worker_thread:
+                close_old_connections()
+        _broadcast(self.job.project_id, payload)
+
+
+def _run_compile(job: CompilationJob, reporter: _JobReporter) -> dict:
+    from ..writer_service import WriterService
+
+    service = WriterService(job.project_id, job.initiated_by_id)
+    options = job.options or {}
+    preview = job.compilation_type == "preview"
+    timeout = int(options.get("timeout") or (60 if preview else 300))
+
+    if preview:
+        return service.compile_preview(
+            latex_content=options.get("content", ""),
+            timeout=timeout,
+            color_mode=options.get("color_mode", "light"),
+            section_name=job.section_name or "preview",
+            doc_type=job.doc_type,
+        )
+
+    flags = {name: bool(options.get(name, False)) for name in FULL_COMPILE_OPTIONS}
+    callbacks = {
+        "timeout": timeout,
+        "log_callback": reporter.log,
+        "progress_callback": reporter.progress,
+    }
+    if job.doc_type == "manuscript":
+        flags.pop("track_changes")
+        return service.compile_manuscript(**callbacks, **flags)
+    if job.doc_type == "supplementary":
+        return service.compile_supplementary(
+            **callbacks,
+            **{k: flags[k] for k in ("no_figs", "ppt2tif", "crop_tif", "quiet")},
+        )
+    if job.doc_type == "revision":
+        return service.compile_revision(
+            **callbacks, track_changes=flags["track_changes"]
+        )
+    raise ValueError(f"Invalid doc_type: {job.doc_type}")
+
+
+def run_compilation_job(job: CompilationJob):
+    """Compile a claimed job and record its result on the row."""
+    reporter = _JobReporter(job)
+    started = time.monotonic()
+    try:
+        result = _run_compile(job, reporter)
+    except Exception as e:
+        logger.error(f"[Compilation {job.job_id}] Error: {e}", exc_info=True)
+        reporter.log(f"[ERROR] {e}")
+        result = {"success": False, "error": str(e), "log": str(e)}
+    try:
+        reporter.flush()
+    except OperationalError as e:
+        # The result below still needs recording
+        logger.warning(f"[Compilation {job.job_id}] Could not save log: {e}")
+
+    # Paths and other non-JSON values become strings
+    result = json.loads(json.dumps(result or {}, default=str))
+    success = bool(result.get("success"))
+    output_path = ""
+    if success and result.get("output_pdf"):
+        output_path = result["output_pdf"]
+        result["output_pdf"] = result["pdf_path"] = _pdf_url(
+            job.project_id, output_path
+        )
+
+    fields = {
+        "status": "completed" if success else "failed",
+        "progress": 100,
+        "step": "Complete!" if success else "Failed",
+        "result": result,
+        "output_path": output_path,
+        "error_message": "" if success else str(result.get("error") or ""),
+        "compilation_time": time.monotonic() - started,
+        "completed_at": timezone.now(),
+        "worker_id": "",
+    }
+    if job.compilation_type == "preview" and result.get("log"):
+        # Previews report their log at the end instead of streaming it
+        fields["log_file"] = Concat("log_file", Value(result["log"].rstrip() + "\n"))
+    _update_running(job.pk, fields)
+    logger.info(
+        f"[Compilation {job.job_id}] {job.compilation_type}/{job.doc_type} "
+        f"{fields['status']} in {fields['compilation_time']:.1f}s"
+    )
+
+    try:
+        job.refresh_from_db()
+        _broadcast(job.project_id, serialize_job(job))
+    finally:
+        with _job_finished:
+            _job_finished.notify_all()
+
+
+def wait_for_job(job_id, timeout: float, poll_interval: float = 0.25):
+    """Block until the job (or the job that superseded it) finishes.
+
+    Returns the finished CompilationJob, the still unfinished one when
+    ``timeout`` runs out, or None if the job does not exist. In-process
+    completions wake the caller immediately; jobs run by other processes
+    are noticed within ``poll_interval``.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        job = CompilationJob.objects.filter(job_id=job_id).first()
+        if job is None:
+            return None
+        if job.status == "superseded" and job.superseded_by_id:
+            job_id = CompilationJob.objects.values_list("job_id", flat=True).get(
+                pk=job.superseded_by_id
+            )
+            continue
+        remaining = deadline - time.monotonic()
+        if job.status in FINISHED_STATUSES or remaining <= 0:
+            return job
+        with _job_finished:
+            _job_finished.wait(min(poll_interval, remaining))
+
+
+class CompilationWorkerPool(WorkerPool):
+    """Worker threads for queued compilations (see WorkerPool).
+
+    The heartbeat thread also prunes old preview rows.
+    """
+
+    def __init__(
+        self,
+        size: int = None,
+        process: Callable = None,
+        poll_interval: float = POLL_INTERVAL,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+    ):
+        super().__init__(
+            "compile",
+            size=size or MAX_CONCURRENT_COMPILES,
+            claim=claim_next_job,
+            process=process or run_compilation_job,
+            heartbeat=heartbeat,
+            recover=recover_stale_jobs,
+            maintain=prune_finished_previews,
+            poll_interval=poll_interval,
+            heartbeat_interval=heartbeat_interval,
+        )
+
+
+_pool = InProcessPool(CompilationWorkerPool, "SCITEX_WRITER_INPROCESS_COMPILE_WORKERS")
+
+
+def get_worker_pool() -> CompilationWorkerPool:
+    """The process-wide worker pool (not started)."""
+    return _pool.get()
+
+
+def _enqueue():
+    # Without in-process workers, run_compile_workers polls the queue
+    _pool.wake()
+
+
+__all__ = [
+    "CompilationWorkerPool",
+    "claim_next_job",
+    "get_worker_pool",
+    "group_name",
+    "heartbeat",
+    "prune_finished_previews",
+    "recover_stale_jobs",
+    "run_compilation_job",
+    "serialize_job",
+    "submit_job",
+    "wait_for_job",
+]
+
+# EOF
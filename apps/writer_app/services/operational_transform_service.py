@@ -57,21 +57,47 @@ class TextOperation:
     def retain(self, n: int) -> "TextOperation":
         """Retain n characters from the base string."""
         if n > 0:
-            self.ops.append(Operation(OpType.RETAIN, count=n))
+            last = self.ops[-1] if self.ops else None
+            if last and last.type == OpType.RETAIN:
+                self.ops[-1] = Operation(OpType.RETAIN, count=last.count + n)
+            else:
+                self.ops.append(Operation(OpType.RETAIN, count=n))
         return self
 
     def insert(self, text: str) -> "TextOperation":
         """Insert text at current position."""
         if text:
-            self.ops.append(Operation(OpType.INSERT, chars=text))
+            last = self.ops[-1] if self.ops else None
+            if last and last.type == OpType.INSERT:
+                self.ops[-1] = Operation(OpType.INSERT, chars=last.chars + text)
+            else:
+                self.ops.append(Operation(OpType.INSERT, chars=text))
         return self
 
     def delete(self, n: int) -> "TextOperation":
         """Delete n characters at current position."""
         if n > 0:
-            self.ops.append(Operation(OpType.DELETE, count=n))
+            last = self.ops[-1] if self.ops else None
+            if last and last.type == OpType.DELETE:
+                self.ops[-1] = Operation(OpType.DELETE, count=last.count + n)
+            else:
+                self.ops.append(Operation(OpType.DELETE, count=n))
         return self
 
+    @property
+    def base_length(self) -> int:
+        """Length of the text this operation applies to."""
+        return sum(op.count for op in self.ops if op.type != OpType.INSERT)
+
+    @property
+    def target_length(self) -> int:
+        """Length of the text this operation produces."""
+        return sum(
+            op.count if op.type == OpType.RETAIN else len(op.chars)
+            for op in self.ops
+            if op.type != OpType.DELETE
+        )
+
     def apply(self, text: str) -> str:
         """Apply this operation to a text string."""
         result = []
@@ -92,14 +118,49 @@ class TextOperation:
         """
         Compose two operations: (a compose b) = apply b after a.
         Used for combining sequential operations from same user.
+
+        ``other`` must apply to the text this operation produces; the result
+        applies to this operation's base text in one step.
         """
-        # Simplified composition - production would be more complex
+        if self.target_length != other.base_length:
+            raise ValueError("Cannot compose operations: lengths do not match")
+
         composed = TextOperation()
+        ops1 = iter(self.ops)
+        ops2 = iter(other.ops)
+        o1 = next(ops1, None)
+        o2 = next(ops2, None)
+
+        while o1 is not None or o2 is not None:
+            # Deletes of the first and inserts of the second pass straight through
+            if o1 is not None and o1.type == OpType.DELETE:
+                composed.delete(o1.count)
+                o1 = next(ops1, None)
+                continue
+            if o2 is not None and o2.type == OpType.INSERT:
+                composed.insert(o2.chars)
+                o2 = next(ops2, None)
+                continue
+
+            # o1 produces characters (retain/insert), o2 consumes them
+            n = min(_length(o1), o2.count)
+            if o1.type == OpType.RETAIN and o2.type == OpType.RETAIN:
+                composed.retain(n)
+            elif o1.type == OpType.INSERT and o2.type == OpType.RETAIN:
+                composed.insert(o1.chars[:n])
+            elif o1.type == OpType.RETAIN and o2.type == OpType.DELETE:
+                composed.delete(n)
+            # Text inserted by the first and deleted by the second cancels out
+
+            o1 = _consume(o1, n) or next(ops1, None)
+            o2 = _consume(o2, n) or next(ops2, None)
 
-        # For now, convert to intermediate text and create new operation
-        # TODO: Implement proper OT composition algorithm
         return composed
 
+    def is_noop(self) -> bool:
+        """Whether applying this operation leaves any text unchanged."""
+        return all(op.type == OpType.RETAIN for op in self.ops)
+
     def to_dict(self) -> List[Dict]:
         """Convert to JSON-serializable format."""
         return [
@@ -110,15 +171,18 @@ class TextOperation:
     @classmethod
     def from_dict(cls, data: List[Dict]) -> "TextOperation":
         """Create operation from JSON data."""
-        ops = []
+        op = cls()
         for item in data:
             op_type = OpType(item["type"])
-            ops.append(
-                Operation(
-                    type=op_type, chars=item.get("chars"), count=item.get("count")
-                )
-            )
-        return cls(ops)
+            if op_type == OpType.INSERT:
+                op.insert(item["chars"])
+            else:
+                # Deletes may be sent as the deleted text
+                count = item.get("count")
+                if count is None:
+                    count = len(item.get("chars") or "")
+                getattr(op, op_type.value)(int(count))
+        return op
 
     @classmethod
     def from_text_diff(cls, old_text: str, new_text: str) -> "TextOperation":
@@ -172,94 +236,72 @@ def transform(
     op1_prime = TextOperation()
     op2_prime = TextOperation()
 
-    ops1 = list(op1.ops)
-    ops2 = list(op2.ops)
-
-    i1 = i2 = 0
-
-    while i1 < len(ops1) or i2 < len(ops2):
-        # Get current operations
-        o1 = ops1[i1] if i1 < len(ops1) else None
-        o2 = ops2[i2] if i2 < len(ops2) else None
-
-        # Both operations finished
-        if o1 is None and o2 is None:
-            break
-
-        # Handle different operation combinations
-        if o1 and o1.type == OpType.INSERT:
-            # INSERT has priority - include in op1_prime
+    ops1 = iter(op1.ops)
+    ops2 = iter(op2.ops)
+    o1 = next(ops1, None)
+    o2 = next(ops2, None)
+
+    while o1 is not None or o2 is not None:
+        # Inserts go first; on a tie, ``side`` decides whose text comes first
+        if (
+            o1 is not None
+            and o1.type == OpType.INSERT
+            and (o2 is None or o2.type != OpType.INSERT or side == "left")
+        ):
             op1_prime.insert(o1.chars)
             op2_prime.retain(len(o1.chars))
-            i1 += 1
-
-        elif o2 and o2.type == OpType.INSERT:
-            # INSERT from op2 - adjust op1_prime
+            o1 = next(ops1, None)
+            continue
+        if o2 is not None and o2.type == OpType.INSERT:
             op1_prime.retain(len(o2.chars))
             op2_prime.insert(o2.chars)
-            i2 += 1
-
-        elif o1 and o2 and o1.type == OpType.DELETE and o2.type == OpType.DELETE:
-            # Both delete - take minimum
-            if o1.count == o2.count:
-                i1 += 1
-                i2 += 1
-            elif o1.count < o2.count:
-                ops2[i2] = Operation(OpType.DELETE, count=o2.count - o1.count)
-                i1 += 1
-            else:
-                ops1[i1] = Operation(OpType.DELETE, count=o1.count - o2.count)
-                i2 += 1
+            o2 = next(ops2, None)
+            continue
+
+        if o1 is None or o2 is None:
+            raise ValueError("Cannot transform operations of different base lengths")
+
+        # Both consume characters of the base text
+        n = min(o1.count, o2.count)
+        if o1.type == OpType.RETAIN and o2.type == OpType.RETAIN:
+            op1_prime.retain(n)
+            op2_prime.retain(n)
+        elif o1.type == OpType.DELETE and o2.type == OpType.RETAIN:
+            op1_prime.delete(n)
+        elif o1.type == OpType.RETAIN and o2.type == OpType.DELETE:
+            op2_prime.delete(n)
+        # Both deleted the same characters: nothing left to do
+
+        o1 = _consume(o1, n) or next(ops1, None)
+        o2 = _consume(o2, n) or next(ops2, None)
 
-        elif o1 and o2 and o1.type == OpType.RETAIN and o2.type == OpType.RETAIN:
-            # Both retain - advance minimum
-            min_count = min(o1.count, o2.count)
-            op1_prime.retain(min_count)
-            op2_prime.retain(min_count)
+    return op1_prime, op2_prime
 
-            if o1.count == min_count:
-                i1 += 1
-            else:
-                ops1[i1] = Operation(OpType.RETAIN, count=o1.count - min_count)
 
-            if o2.count == min_count:
-                i2 += 1
-            else:
-                ops2[i2] = Operation(OpType.RETAIN, count=o2.count - min_count)
-
-        # Handle other combinations (RETAIN/DELETE, etc.)
-        elif o1 and o2:
-            if o1.type == OpType.RETAIN and o2.type == OpType.DELETE:
-                op2_prime.delete(o2.count)
-                if o1.count <= o2.count:
-                    ops2[i2] = (
-                        Operation(OpType.DELETE, count=o2.count - o1.count)
-                        if o2.count > o1.count
-                        else None
-                    )
-                    i1 += 1
-                    if ops2[i2] is None:
-                        i2 += 1
-                else:
-                    ops1[i1] = Operation(OpType.RETAIN, count=o1.count - o2.count)
-                    i2 += 1
-
-            elif o1.type == OpType.DELETE and o2.type == OpType.RETAIN:
-                op1_prime.delete(o1.count)
-                if o2.count <= o1.count:
-                    ops1[i1] = (
-                        Operation(OpType.DELETE, count=o1.count - o2.count)
-                        if o1.count > o2.count
-                        else None
-                    )
-                    i2 += 1
-                    if ops1[i1] is None:
-                        i1 += 1
-                else:
-                    ops2[i2] = Operation(OpType.RETAIN, count=o2.count - o1.count)
-                    i1 += 1
+def _length(op: Operation) -> int:
+    return len(op.chars) if op.type == OpType.INSERT else op.count
 
-    return op1_prime, op2_prime
+
+def _consume(op: Operation, n: int) -> Optional[Operation]:
+    """What remains of an operation component after ``n`` characters."""
+    if op.type == OpType.INSERT:
+        return Operation(op.type, chars=op.chars[n:]) if len(op.chars) > n else None
+    if op.count > n:
+        return Operation(op.type, count=op.count - n)
+    return None
+
+
+def compose_multiple(ops: List[TextOperation]) -> TextOperation:
+    """
+    Compose a sequence of operations into one.
+
+    Cheap for bursts of nearby edits (typing a word stays one insert); the
+    result grows by a component for every scattered edit.
+    """
+    composed = None
+    for op in ops:
+        composed = op if composed is None else composed.compose(op)
+    return composed if composed is not None else TextOperation()
 
 
 def transform_multiple(
@@ -304,5 +346,11 @@ if __name__ == "__main__":
 
     assert result1 == result2, f"Transform failed: '{result1}' != '{result2}'"
 
+    # Test 3: Compose sequential operations
+    op3 = TextOperation().retain(5).insert(",").retain(6)  # "Hello, world"
+    op4 = TextOperation().retain(12).insert("!")  # "Hello, world!"
+    composed = op3.compose(op4)
+    assert composed.apply(text) == op4.apply(op3.apply(text)), "Compose failed"
+
     print("✓ All OT tests passed!")
     print(f"  Concurrent insert result: '{result1}'")
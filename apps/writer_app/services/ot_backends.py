@@ -0,0 +1,324 @@
+"""
+Shared state backends for the writer OT coordinator.
+
+A section's OT state is a version counter, the most recent operations and
+a periodic snapshot of the text. It has to be shared by every process
+serving WebSockets, otherwise two collaborators on different
+Daphne/Uvicorn workers get independent version counters and diverge. Backends store it so that appending an operation is
+an atomic compare-and-set on the version:
+
+- RedisOTBackend: Redis (the channel layer's server), for any number of
+  worker processes
+- InMemoryOTBackend: process-local, for tests and single-process setups
+
+Selected by SCITEX_WRITER_OT_BACKEND ("redis" or "memory"); by default
+Redis is used whenever the channel layer is Redis, since that is the only
+setup in which consumers of one manuscript can live in different processes.
+"""
+
+import asyncio
+import json
+import threading
+import weakref
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from scitex import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_HISTORY = getattr(settings, "SCITEX_WRITER_OT_MAX_HISTORY", 1000)
+# Idle sections expire from Redis (clients then resync from the files)
+STATE_TTL = getattr(settings, "SCITEX_WRITER_OT_STATE_TTL", 7 * 24 * 3600)
+KEY_PREFIX = "scitex:writer:ot"
+
+
+class OTBackend:
+    """Storage for per-section OT state.
+
+    ``key`` identifies a section of a manuscript. Entries are dicts with at
+    least ``version`` (1-based, gapless) and ``operation``.
+    """
+
+    async def get_operations(
+        self, key: str, since_version: int
+    ) -> Tuple[int, Optional[List[Dict[str, Any]]]]:
+        """Current version and the entries after ``since_version``.
+
+        The entry list is None when ``since_version`` is older than the
+        retained history (the client has to resync).
+        """
+        raise NotImplementedError
+
+    async def append_operation(
+        self, key: str, expected_version: int, entry: Dict[str, Any]
+    ) -> bool:
+        """Append ``entry`` as version ``expected_version + 1``.
+
+        Returns False, storing nothing, if the section is no longer at
+        ``expected_version`` (another process appended first).
+        """
+        raise NotImplementedError
+
+    async def add_pending_ack(self, key: str, operation_id: str, entry: dict):
+        raise NotImplementedError
+
+    async def remove_pending_ack(self, key: str, operation_id: str) -> bool:
+        raise NotImplementedError
+
+    async def get_status(self, key: str) -> Dict[str, int]:
+        """``version``, ``pending`` acks and ``history`` size of a section."""
+        raise NotImplementedError
+
+    async def get_snapshot(self, key: str) -> Optional[Dict[str, Any]]:
+        """Latest section snapshot (``version`` and ``text``), if any."""
+        raise NotImplementedError
+
+    async def save_snapshot(self, key: str, snapshot: Dict[str, Any]) -> bool:
+        """Store ``snapshot`` unless one at the same or a later version exists."""
+        raise NotImplementedError
+
+
+class InMemoryOTBackend(OTBackend):
+    """Process-local OT state (tests, single-process deployments)."""
+
+    def __init__(self, max_history: int = None):
+        self.max_history = max_history or MAX_HISTORY
+        self._lock = threading.Lock()
+        self._sections: Dict[str, Dict[str, Any]] = {}
+
+    def _section(self, key):
+        if key not in self._sections:
+            self._sections[key] = {
+                "version": 0,
+                "operations": deque(maxlen=self.max_history),
+                "pending_acks": {},
+                "snapshot": None,
+            }
+        return self._sections[key]
+
+    async def get_operations(self, key, since_version):
+        with self._lock:
+            section = self._section(key)
+            version = section["version"]
+            missing = version - max(since_version, 0)
+            if missing <= 0:
+                return version, []
+            if missing > len(section["operations"]):
+                return version, None
+            return version, list(section["operations"])[-missing:]
+
+    async def append_operation(self, key, expected_version, entry):
+        with self._lock:
+            section = self._section(key)
+            if section["version"] != expected_version:
+                return False
+            section["version"] += 1
+            section["operations"].append(entry)
+            return True
+
+    async def add_pending_ack(self, key, operation_id, entry):
+        with self._lock:
+            self._section(key)["pending_acks"][operation_id] = entry
+
+    async def remove_pending_ack(self, key, operation_id):
+        with self._lock:
+            return (
+                self._section(key)["pending_acks"].pop(operation_id, None) is not None
+            )
+
+    async def get_status(self, key):
+        with self._lock:
+            section = self._section(key)
+            return {
+                "version": section["version"],
+                "pending": len(section["pending_acks"]),
+                "history": len(section["operations"]),
+            }
+
+    async def get_snapshot(self, key):
+        with self._lock:
+            return self._section(key)["snapshot"]
+
+    async def save_snapshot(self, key, snapshot):
+        with self._lock:
+            section = self._section(key)
+            current = section["snapshot"]
+            if current is not None and current["version"] >= snapshot["version"]:
+                return False
+            section["snapshot"] = snapshot
+            return True
+
+
+# KEYS: version, operations; ARGV: expected version, entry, max history, ttl
+_APPEND_SCRIPT = """
+local version = tonumber(redis.call('GET', KEYS[1]) or '0')
+if version ~= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('SET', KEYS[1], version + 1, 'EX', ARGV[4])
+redis.call('RPUSH', KEYS[2], ARGV[2])
+redis.call('LTRIM', KEYS[2], -tonumber(ARGV[3]), -1)
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+return 1
+"""
+
+# KEYS: version, operations; ARGV: since version.
+# Returns {version, complete, entries after since version}.
+_LOAD_SCRIPT = """
+local version = tonumber(redis.call('GET', KEYS[1]) or '0')
+local missing = version - tonumber(ARGV[1])
+if missing <= 0 then
+    return {version, 1, {}}
+end
+if missing > redis.call('LLEN', KEYS[2]) then
+    return {version, 0, {}}
+end
+return {version, 1, redis.call('LRANGE', KEYS[2], -missing, -1)}
+"""
+
+# KEYS: snapshot; ARGV: snapshot, snapshot version, ttl
+_SAVE_SNAPSHOT_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current and cjson.decode(current)['version'] >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+return 1
+"""
+
+
+class RedisOTBackend(OTBackend):
+    """OT state in Redis, shared by all worker processes.
+
+    The version is a counter key and the history a capped list; the
+    compare-and-append runs as one Lua script, so it is atomic across
+    processes.
+    """
+
+    def __init__(self, url: str = None, max_history: int = None, ttl: int = None):
+        self.url = url or _default_redis_url()
+        self.max_history = max_history or MAX_HISTORY
+        self.ttl = ttl or STATE_TTL
+        # redis.asyncio connections belong to the event loop that made them
+        self._clients = weakref.WeakKeyDictionary()
+
+    def _client(self):
+        import redis.asyncio as aioredis
+
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = aioredis.from_url(self.url)
+            self._clients[loop] = client
+        return client
+
+    @staticmethod
+    def _keys(key):
+        base = f"{KEY_PREFIX}:{key}"
+        return f"{base}:version", f"{base}:ops", f"{base}:pending"
+
+    async def get_operations(self, key, since_version):
+        version_key, ops_key, _ = self._keys(key)
+        version, complete, raw = await self._client().eval(
+            _LOAD_SCRIPT, 2, version_key, ops_key, max(since_version, 0)
+        )
+        if not complete:
+            return int(version), None
+        return int(version), [json.loads(item) for item in raw]
+
+    async def append_operation(self, key, expected_version, entry):
+        version_key, ops_key, _ = self._keys(key)
+        appended = await self._client().eval(
+            _APPEND_SCRIPT,
+            2,
+            version_key,
+            ops_key,
+            expected_version,
+            json.dumps(entry),
+            self.max_history,
+            self.ttl,
+        )
+        return bool(appended)
+
+    async def add_pending_ack(self, key, operation_id, entry):
+        _, _, pending_key = self._keys(key)
+        async with self._client().pipeline(transaction=True) as pipe:
+            pipe.hset(pending_key, operation_id, json.dumps(entry))
+            pipe.expire(pending_key, self.ttl)
+            await pipe.execute()
+
+    async def remove_pending_ack(self, key, operation_id):
+        _, _, pending_key = self._keys(key)
+        return bool(await self._client().hdel(pending_key, operation_id))
+
+    async def get_status(self, key):
+        version_key, ops_key, pending_key = self._keys(key)
+        async with self._client().pipeline(transaction=True) as pipe:
+            pipe.get(version_key)
+            pipe.hlen(pending_key)
+            pipe.llen(ops_key)
+            version, pending, history = await pipe.execute()
+        return {"version": int(version or 0), "pending": pending, "history": history}
+
+    async def get_snapshot(self, key):
+        raw = await self._client().get(f"{KEY_PREFIX}:{key}:snapshot")
+        return json.loads(raw) if raw else None
+
+    async def save_snapshot(self, key, snapshot):
+        saved = await self._client().eval(
+            _SAVE_SNAPSHOT_SCRIPT,
+            1,
+            f"{KEY_PREFIX}:{key}:snapshot",
+            json.dumps(snapshot),
+            snapshot["version"],
+            self.ttl,
+        )
+        return bool(saved)
+
+
+def _default_redis_url() -> str:
+    url = getattr(settings, "SCITEX_WRITER_OT_REDIS_URL", None)
+    if url:
+        return url
+    hosts = settings.CHANNEL_LAYERS["default"].get("CONFIG", {}).get("hosts") or []
+    if hosts and isinstance(hosts[0], str):
+        return hosts[0]
+    return getattr(settings, "REDIS_URL", "redis://127.0.0.1:6379/2")
+
+
+def _configured_backend_name() -> str:
+    name = getattr(settings, "SCITEX_WRITER_OT_BACKEND", None)
+    if name:
+        return name
+    layer = settings.CHANNEL_LAYERS.get("default", {}).get("BACKEND", "")
+    return "redis" if "Redis" in layer else "memory"
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_ot_backend() -> OTBackend:
+    """The process-wide OT backend chosen by the settings."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = _configured_backend_name()
+            if name == "redis":
+                _backend = RedisOTBackend()
+            elif name == "memory":
+                _backend = InMemoryOTBackend()
+            else:
+                raise ValueError(f"Unknown SCITEX_WRITER_OT_BACKEND: {name}")
+            logger.info(f"Writer OT backend: {type(_backend).__name__}")
+        return _backend
+
+
+__all__ = [
+    "InMemoryOTBackend",
+    "OTBackend",
+    "RedisOTBackend",
+    "get_ot_backend",
+]
@@ -1,16 +1,29 @@
 """
 Operational Transform Coordinator for real-time collaborative editing.
 
-Manages operation queues, transformations, and undo/redo stacks for concurrent editing.
+Manages operation sequencing, transformations, and undo/redo stacks for
+concurrent editing. Section state (version counter and recent operations)
+lives in a shared backend (see ot_backends), so collaborators connected to
+different worker processes edit against the same history.
 """
 
-import asyncio
 import uuid
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-from collections import defaultdict, deque
+from collections import defaultdict
+
+from django.conf import settings
 
 from .operational_transform_service import TextOperation, transform
+from .ot_backends import OTBackend, get_ot_backend
+
+# Attempts to append an operation before giving up; each lost race means
+# another process appended first and costs one extra transform
+MAX_SUBMIT_ATTEMPTS = 50
+
+# Versions between section snapshots. Joining and resyncing clients start
+# from the latest snapshot instead of replaying the whole history.
+SNAPSHOT_INTERVAL = getattr(settings, "SCITEX_WRITER_OT_SNAPSHOT_INTERVAL", 100)
 
 
 class OTCoordinator:
@@ -18,28 +31,18 @@ class OTCoordinator:
     Coordinates operational transforms for a manuscript.
 
     Manages:
-    - Operation queuing and sequencing
+    - Operation sequencing (atomic version compare-and-append in the backend)
     - Version tracking per section
     - Operation transformation for concurrent edits
     - Acknowledgment tracking
     """
 
-    # Class-level storage for all coordinators (in-memory for now)
+    # Per-process handles; the state itself lives in the backend
     _coordinators: Dict[int, 'OTCoordinator'] = {}
 
-    def __init__(self, manuscript_id: int):
+    def __init__(self, manuscript_id: int, backend: Optional[OTBackend] = None):
         self.manuscript_id = manuscript_id
-
-        # Per-section state
-        self.sections: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
-            'version': 0,
-            'operations': deque(maxlen=1000),  # Recent operations
-            'pending_acks': {},  # operation_id -> operation_data
-            'lock': asyncio.Lock(),
-        })
-
-        # Store in class-level dict for persistence across requests
-        self._coordinators[manuscript_id] = self
+        self.backend = backend or get_ot_backend()
 
     @classmethod
     def get_coordinator(cls, manuscript_id: int) -> 'OTCoordinator':
@@ -48,6 +51,9 @@ class OTCoordinator:
             cls._coordinators[manuscript_id] = OTCoordinator(manuscript_id)
         return cls._coordinators[manuscript_id]
 
+    def _key(self, section_id: str) -> str:
+        return f'{self.manuscript_id}:{section_id}'
+
     async def submit_operation(
         self,
         user_id: int,
@@ -60,6 +66,11 @@ class OTCoordinator:
         """
         Submit an operation for processing.
 
+        The operation is transformed against everything committed since the
+        client's version and appended only if no other process committed in
+        the meantime; otherwise it is transformed against the newcomers and
+        retried.
+
         Args:
             user_id: ID of user submitting operation
             username: Username for display
@@ -71,50 +82,75 @@ class OTCoordinator:
         Returns:
             Dict with:
                 - operation_id: Unique ID for this operation
-                - status: 'queued' | 'processed' | 'transformed'
-                - queue_length: Current queue size
+                - status: 'processed' | 'transformed' | 'resync' | 'error'
+                - queue_length: Operations awaiting acknowledgment
                 - current_version: Server's current version
+                - operation: The operation as committed (after transforms)
                 - processed: List of processed operations (if any)
                 - errors: List of errors (if any)
         """
-        section = self.sections[section_id]
-
-        async with section['lock']:
-            operation_id = str(uuid.uuid4())
-            current_version = section['version']
+        key = self._key(section_id)
+        operation_id = str(uuid.uuid4())
+
+        # Convert dict to TextOperation
+        try:
+            text_op = TextOperation.from_dict(operation.get('ops', []))
+        except Exception as e:
+            status = await self.backend.get_status(key)
+            return {
+                'operation_id': operation_id,
+                'status': 'error',
+                'current_version': status['version'],
+                'queue_length': status['pending'],
+                'errors': [{
+                    'operation_id': operation_id,
+                    'error': f'Invalid operation format: {str(e)}'
+                }]
+            }
 
-            # Convert dict to TextOperation
-            try:
-                text_op = TextOperation.from_dict(operation.get('ops', []))
-            except Exception as e:
+        transformed_op = text_op
+        base_version = version
+        for _ in range(MAX_SUBMIT_ATTEMPTS):
+            current_version, server_ops = await self.backend.get_operations(
+                key, base_version
+            )
+            if server_ops is None or version > current_version:
+                # Client is older than the retained history (or ahead of a
+                # server that lost its state): it has to reload the section
                 return {
                     'operation_id': operation_id,
-                    'status': 'error',
+                    'status': 'resync',
                     'current_version': current_version,
                     'queue_length': 0,
+                    'document': await self.get_document(section_id),
                     'errors': [{
                         'operation_id': operation_id,
-                        'error': f'Invalid operation format: {str(e)}'
+                        'error': 'Client version is no longer in the '
+                                 'operation history',
                     }]
                 }
 
-            # Transform operation if client is behind
-            transformed_op = text_op
-            if version < current_version:
-                # Need to transform against operations since client's version
-                server_ops = [
-                    op['operation'] for op in section['operations']
-                    if op['version'] > version
-                ]
-
+            # Transform against operations committed since the client's version.
+            # One keystroke at a time: composing scattered keystrokes first
+            # yields an operation with a component per edit, which is slower
+            # to build than the transforms it saves (see benchmark_writer_ot).
+            try:
                 for server_op_data in server_ops:
-                    server_op = TextOperation.from_dict(server_op_data.get('ops', []))
+                    server_op = TextOperation.from_dict(
+                        server_op_data['operation'].get('ops', [])
+                    )
                     transformed_op, _ = transform(transformed_op, server_op, 'left')
+            except ValueError as e:
+                return {
+                    'operation_id': operation_id,
+                    'status': 'error',
+                    'current_version': current_version,
+                    'queue_length': 0,
+                    'errors': [{'operation_id': operation_id, 'error': str(e)}]
+                }
+            base_version = current_version
 
-            # Increment version and store operation
-            section['version'] += 1
-            new_version = section['version']
-
+            new_version = current_version + 1
             operation_data = {
                 'operation_id': operation_id,
                 'user_id': user_id,
@@ -122,25 +158,110 @@ class OTCoordinator:
                 'session_id': session_id,
                 'version': new_version,
                 'client_version': version,
-                'operation': transformed_op.to_dict(),
+                'operation': {'ops': transformed_op.to_dict()},
                 'timestamp': datetime.now().isoformat(),
             }
-
-            section['operations'].append(operation_data)
-            section['pending_acks'][operation_id] = operation_data
-
+            if await self.backend.append_operation(
+                key, current_version, operation_data
+            ):
+                break
+        else:
             return {
                 'operation_id': operation_id,
-                'status': 'processed',
-                'current_version': new_version,
-                'queue_length': len(section['pending_acks']),
-                'processed': [{
+                'status': 'error',
+                'current_version': base_version,
+                'queue_length': 0,
+                'errors': [{
                     'operation_id': operation_id,
-                    'user_id': user_id,
-                    'version': new_version,
-                }],
+                    'error': 'Too much contention, operation not applied',
+                }]
             }
 
+        await self.backend.add_pending_ack(key, operation_id, operation_data)
+        if new_version % SNAPSHOT_INTERVAL == 0:
+            await self._save_snapshot(section_id)
+        status = await self.backend.get_status(key)
+
+        return {
+            'operation_id': operation_id,
+            'status': 'transformed' if version < new_version - 1 else 'processed',
+            'current_version': new_version,
+            'queue_length': status['pending'],
+            'operation': operation_data['operation'],
+            'processed': [{
+                'operation_id': operation_id,
+                'user_id': user_id,
+                'version': new_version,
+            }],
+        }
+
+    async def get_operations(
+        self, section_id: str, since_version: int
+    ) -> Dict[str, Any]:
+        """
+        Operations committed after ``since_version``, for clients catching up.
+
+        Returns:
+            Dict with current_version and operations. If the history no
+            longer reaches back, operations is None and document holds the
+            text to resync from.
+        """
+        current_version, operations = await self.backend.get_operations(
+            self._key(section_id), since_version
+        )
+        result = {
+            'section_id': section_id,
+            'current_version': current_version,
+            'operations': operations,
+        }
+        if operations is None:
+            result['document'] = await self.get_document(section_id)
+        return result
+
+    async def open_section(self, section_id: str, text: str) -> Dict[str, Any]:
+        """
+        Register a client opening a section and return the current document.
+
+        ``text`` is the content the client loaded. It becomes the section's
+        base (version 0) if nobody has edited the section yet; otherwise the
+        shared document is returned and the client should replace its copy.
+
+        Returns:
+            Dict with version and text (None if the section has history but
+            no snapshot to rebuild it from)
+        """
+        key = self._key(section_id)
+        status = await self.backend.get_status(key)
+        if status['version'] == 0:
+            await self.backend.save_snapshot(key, {'version': 0, 'text': text})
+        return await self.get_document(section_id)
+
+    async def get_document(self, section_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Current text of a section: the latest snapshot plus the operations
+        committed after it.
+
+        Returns:
+            Dict with version and text, or None without a snapshot
+        """
+        key = self._key(section_id)
+        snapshot = await self.backend.get_snapshot(key)
+        if snapshot is None:
+            return None
+        _, operations = await self.backend.get_operations(key, snapshot['version'])
+        if operations is None:
+            return None
+        text = snapshot['text']
+        for entry in operations:
+            text = TextOperation.from_dict(entry['operation'].get('ops', [])).apply(text)
+        version = operations[-1]['version'] if operations else snapshot['version']
+        return {'version': version, 'text': text}
+
+    async def _save_snapshot(self, section_id: str):
+        document = await self.get_document(section_id)
+        if document is not None:
+            await self.backend.save_snapshot(self._key(section_id), document)
+
     async def acknowledge_operation(
         self,
         operation_id: str,
@@ -156,21 +277,17 @@ class OTCoordinator:
         Returns:
             Dict with acknowledgment status
         """
-        section = self.sections[section_id]
-
-        async with section['lock']:
-            if operation_id in section['pending_acks']:
-                del section['pending_acks'][operation_id]
-                return {
-                    'acknowledged': True,
-                    'operation_id': operation_id,
-                }
-            else:
-                return {
-                    'acknowledged': False,
-                    'operation_id': operation_id,
-                    'error': 'Operation not found',
-                }
+        if await self.backend.remove_pending_ack(self._key(section_id), operation_id):
+            return {
+                'acknowledged': True,
+                'operation_id': operation_id,
+            }
+        else:
+            return {
+                'acknowledged': False,
+                'operation_id': operation_id,
+                'error': 'Operation not found',
+            }
 
     async def get_queue_status(self, section_id: str) -> Dict[str, Any]:
         """
@@ -182,13 +299,13 @@ class OTCoordinator:
         Returns:
             Dict with queue information
         """
-        section = self.sections[section_id]
+        status = await self.backend.get_status(self._key(section_id))
 
         return {
             'section_id': section_id,
-            'current_version': section['version'],
-            'pending_operations': len(section['pending_acks']),
-            'operation_history_size': len(section['operations']),
+            'current_version': status['version'],
+            'pending_operations': status['pending'],
+            'operation_history_size': status['history'],
         }
 
 
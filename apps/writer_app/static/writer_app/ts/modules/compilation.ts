@@ -289,12 +289,9 @@ export class CompilationManager {
       console.log("[CompilationFull] API Response:", result);
 
       if (result?.job_id) {
-        // Job started, begin polling for status
-        console.log(
-          "[CompilationFull] Job started, polling status:",
-          result.job_id,
-        );
-        this.pollCompilationStatus(result.job_id, options.projectId);
+        // Job queued, follow its progress
+        console.log("[CompilationFull] Job queued:", result.job_id);
+        this.followCompilation(result.job_id, options.projectId);
         return { id: result.job_id, status: "processing", progress: 0 };
       } else if (result?.success === true) {
         // Old-style immediate response (backward compat)
@@ -400,7 +397,63 @@ export class CompilationManager {
   }
 
   /**
-   * Poll compilation status for real-time updates
+   * Follow a queued full compilation: stream its updates over the project's
+   * compilation WebSocket, falling back to polling if the socket fails
+   */
+  private followCompilation(jobId: string, projectId: number): void {
+    (this as any).lastLogLength = 0;
+    if (typeof WebSocket === "undefined") {
+      this.pollCompilationStatus(jobId, projectId);
+      return;
+    }
+
+    let currentJobId = jobId;
+    let finished = false;
+    // Increments before the first full status are already part of it
+    let synced = false;
+    const protocol = window.location.protocol === "https:" ? "wss:" : "ws:";
+    const socket = new WebSocket(
+      `${protocol}//${window.location.host}/ws/writer/project/${projectId}/compilation/`,
+    );
+
+    socket.onopen = () => {
+      // Catch up on anything logged before the socket joined the group
+      socket.send(JSON.stringify({ type: "status", job_id: currentJobId }));
+    };
+    socket.onmessage = (event: MessageEvent) => {
+      const message = JSON.parse(event.data);
+      const job = message.job;
+      if (message.type !== "compilation" || !job || job.job_id !== currentJobId) {
+        return;
+      }
+      if (job.status === "superseded" && job.superseded_by) {
+        // A newer request replaced this one before it started
+        currentJobId = job.superseded_by;
+        (this as any).lastLogLength = 0;
+        synced = false;
+        socket.send(JSON.stringify({ type: "status", job_id: currentJobId }));
+        return;
+      }
+      if (job.log_html !== undefined) {
+        synced = true;
+      } else if (!synced) {
+        return;
+      }
+      if (this.applyJobUpdate(job)) {
+        finished = true;
+        socket.close();
+      }
+    };
+    socket.onclose = () => {
+      if (!finished) {
+        console.warn("[CompilationFull] WebSocket closed, polling status");
+        this.pollCompilationStatus(currentJobId, projectId);
+      }
+    };
+  }
+
+  /**
+   * Poll compilation status (fallback when the WebSocket is unavailable)
    */
   private pollCompilationStatus(
     jobId: string,
@@ -434,105 +487,10 @@ export class CompilationManager {
           data.progress + "%",
         );
 
-        // Update progress
-        const updateProgress = (window as any).updateCompilationProgress;
-        if (updateProgress && data.progress !== undefined) {
-          updateProgress(data.progress, data.step || "Processing...");
-        }
-
-        // Append new logs (use HTML version if available for color support)
-        const logDiv = document.getElementById("compilation-log-inline");
-        if (logDiv && data.log_html) {
-          // Use innerHTML to render ANSI colors as HTML
-          const existingLogLength = (this as any).lastLogLength || 0;
-          const newLogsHtml = data.log_html.substring(existingLogLength);
-
-          if (newLogsHtml.trim()) {
-            // Append HTML directly (ANSI codes converted to colored spans)
-            const newContent = document.createElement("span");
-            newContent.innerHTML = newLogsHtml;
-            logDiv.appendChild(newContent);
-            logDiv.appendChild(document.createTextNode("\n"));
-
-            // Auto-scroll
-            logDiv.scrollTop = logDiv.scrollHeight;
-          }
-
-          (this as any).lastLogLength = data.log_html.length;
-        } else if (data.log) {
-          // Fallback to plain text
-          const appendLog = (window as any).appendCompilationLog;
-          if (appendLog) {
-            const existingLogLength = (this as any).lastLogLength || 0;
-            const newLogs = data.log.substring(existingLogLength);
-
-            if (newLogs.trim()) {
-              newLogs
-                .trim()
-                .split("\n")
-                .forEach((line) => {
-                  appendLog(line);
-                });
-            }
-
-            (this as any).lastLogLength = data.log.length;
-          }
-        }
-
-        // Check status
-        if (data.status === "completed") {
-          this.isCompiling = false;
-          console.log("[CompilationFull] Completed!");
-          statusLamp.fullCompilationSuccess();
-
-          const result = data.result || {};
-          const pdfPath = result.output_pdf || result.pdf_path;
-
-          // Update spinner line to success
-          const updateLog = (window as any).updateCompilationLog;
-          if (updateLog) {
-            updateLog(
-              "compilation-start-line",
-              `[${new Date().toLocaleTimeString()}] ✓ Compilation completed successfully!`,
-              "success",
-            );
-          }
-
-          if (pdfPath) {
-            const showSuccess = (window as any).showCompilationSuccess;
-            if (showSuccess) {
-              showSuccess(pdfPath);
-            }
-
-            if (this.onCompleteCallback) {
-              this.onCompleteCallback("full", pdfPath);
-            }
-          }
-        } else if (data.status === "failed") {
-          this.isCompiling = false;
-          console.error("[CompilationFull] Failed");
-          statusLamp.fullCompilationError();
-
-          // Update spinner line to error
-          const updateLog = (window as any).updateCompilationLog;
-          if (updateLog) {
-            updateLog(
-              "compilation-start-line",
-              `[${new Date().toLocaleTimeString()}] ✗ Compilation failed`,
-              "error",
-            );
-          }
-
-          const showError = (window as any).showCompilationError;
-          if (showError) {
-            const errorMsg = data.result?.error || "Compilation failed";
-            const errorLog = data.log || "";
-            showError(errorMsg, errorLog);
-          }
-        } else if (
-          data.status === "processing" ||
-          data.status === "pending"
-        ) {
+        if (data.status === "superseded" && data.superseded_by) {
+          (this as any).lastLogLength = 0;
+          this.pollCompilationStatus(data.superseded_by, projectId, attempts + 1);
+        } else if (!this.applyJobUpdate(data)) {
           // Continue polling
           setTimeout(
             () => this.pollCompilationStatus(jobId, projectId, attempts + 1),
@@ -550,6 +508,102 @@ export class CompilationManager {
       });
   }
 
+  /**
+   * Render a job update (status payload or streamed increment).
+   * Returns true once the job has finished.
+   */
+  private applyJobUpdate(data: any): boolean {
+    // Update progress
+    const updateProgress = (window as any).updateCompilationProgress;
+    if (updateProgress && data.progress !== undefined) {
+      updateProgress(data.progress, data.step || "Processing...");
+    }
+
+    // Append new logs (use HTML version if available for color support)
+    const logDiv = document.getElementById("compilation-log-inline");
+    const existingLogLength = (this as any).lastLogLength || 0;
+    let newLogsHtml = "";
+    if (data.log_html_append !== undefined) {
+      // Streamed increment
+      newLogsHtml = data.log_html_append;
+      (this as any).lastLogLength = existingLogLength + newLogsHtml.length + 1;
+    } else if (data.log_html !== undefined) {
+      // Full log so far
+      newLogsHtml = data.log_html.substring(existingLogLength);
+      (this as any).lastLogLength = data.log_html.length;
+    }
+
+    if (logDiv && newLogsHtml.trim()) {
+      // Append HTML directly (ANSI codes converted to colored spans)
+      const newContent = document.createElement("span");
+      newContent.innerHTML = newLogsHtml;
+      logDiv.appendChild(newContent);
+      logDiv.appendChild(document.createTextNode("\n"));
+
+      // Auto-scroll
+      logDiv.scrollTop = logDiv.scrollHeight;
+    }
+
+    // Check status
+    if (data.status === "completed") {
+      this.isCompiling = false;
+      console.log("[CompilationFull] Completed!");
+      statusLamp.fullCompilationSuccess();
+
+      const result = data.result || {};
+      const pdfPath = result.output_pdf || result.pdf_path;
+
+      // Update spinner line to success
+      const updateLog = (window as any).updateCompilationLog;
+      if (updateLog) {
+        updateLog(
+          "compilation-start-line",
+          `[${new Date().toLocaleTimeString()}] ✓ Compilation completed successfully!`,
+          "success",
+        );
+      }
+
+      if (pdfPath) {
+        const showSuccess = (window as any).showCompilationSuccess;
+        if (showSuccess) {
+          showSuccess(pdfPath);
+        }
+
+        if (this.onCompleteCallback) {
+          this.onCompleteCallback("full", pdfPath);
+        }
+      }
+      return true;
+    }
+
+    if (data.status === "failed") {
+      this.isCompiling = false;
+      console.error("[CompilationFull] Failed");
+      statusLamp.fullCompilationError();
+
+      // Update spinner line to error
+      const updateLog = (window as any).updateCompilationLog;
+      if (updateLog) {
+        updateLog(
+          "compilation-start-line",
+          `[${new Date().toLocaleTimeString()}] ✗ Compilation failed`,
+          "error",
+        );
+      }
+
+      const showError = (window as any).showCompilationError;
+      if (showError) {
+        const errorMsg = data.result?.error || "Compilation failed";
+        const errorLog = data.log || "";
+        showError(errorMsg, errorLog);
+      }
+      return true;
+    }
+
+    // queued / running
+    return false;
+  }
+
   /**
    * Get current job status
    */
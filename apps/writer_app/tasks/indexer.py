@@ -18,7 +18,9 @@ except ImportError:
         return func
 
 import hashlib
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import logging
@@ -30,230 +32,367 @@ SUPPORTED_FIGURE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.pdf', '.tiff', '.tif',
 SUPPORTED_TABLE_EXTENSIONS = {'.csv', '.xlsx', '.xls', '.tsv', '.ods'}
 
 
+# Directories (relative to the project root) that hold indexable files
+INDEX_ROOTS = ('scitex/writer', 'data', 'scripts')
+
+# Parallel hashing of changed files (hashlib releases the GIL while hashing)
+HASH_WORKERS = 4
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Extensions found anywhere below data/ (without a figures/tables folder)
+DATA_FIGURE_EXTENSIONS = {'.png', '.jpg', '.pdf'}
+DATA_TABLE_EXTENSIONS = {'.csv', '.xlsx', '.xls', '.tsv'}
+SCRIPT_TABLE_EXTENSIONS = {'.csv', '.xlsx'}
+
+# LaTeX commands whose targets are tracked as references
+TEX_TARGET_PATTERN = re.compile(
+    r'\\(includegraphics|input|include|(?:auto|c|C|eq|page)?ref)\*?'
+    r'\s*(?:\[[^\]]*\])?\s*\{([^}]*)\}'
+)
+TEX_COMMENT_PATTERN = re.compile(r'(?<!\\)%.*')
+
+
 @shared_task
 def index_project_figures(project_id):
     """
     Index all figures in project to local SQLite DB.
 
-    This task scans the project directory for figure files and stores
+    This task walks the project directory once for figure files and stores
     their metadata in the project's SQLite database for fast querying.
+    Files whose size, mtime and inode match the database are skipped
+    without being read; changed files are hashed once, in parallel.
 
     Args:
         project_id: Project ID
     """
-    from apps.project_app.models import Project
-    from ..utils.project_db import get_project_db
-    from ..services import WriterService
+    _run_index(project_id, 'figure', '[Indexer]')
 
-    try:
-        project = Project.objects.get(id=project_id)
 
-        # Get project path
-        if hasattr(project, 'git_clone_path') and project.git_clone_path:
-            project_path = Path(project.git_clone_path)
-        else:
-            # Handle visitor projects
-            from apps.project_app.services.project_filesystem import get_project_filesystem_manager
-            if not hasattr(project, 'owner') or not project.owner:
-                logger.error(f"[Indexer] Cannot determine user for project {project_id}")
-                return
-            manager = get_project_filesystem_manager(project.owner)
-            project_path = manager.get_project_root_path(project)
-            if not project_path:
-                logger.error(f"[Indexer] Project path not found for project {project_id}")
-                return
+@shared_task
+def index_project_tables(project_id):
+    """
+    Index all table files (CSV, Excel) in project to local SQLite DB.
 
-        db = get_project_db(project)
+    Tables are discovered in:
+    - scitex/writer/**/tables/**/* (manuscript tables)
+    - scitex/writer/00_shared/tables_pool/* (shared pool)
+    - data/**/tables/**/* (data tables)
+    - data/**/*.{csv,xlsx,xls,tsv} (data files)
+    - scripts/**/*_out/**/*.{csv,xlsx} (script outputs)
 
-        logger.info(f"[Indexer] Starting indexing for project {project_id} at {project_path}")
-
-        # Search patterns for figures
-        search_patterns = [
-            'scitex/writer/**/figures/**/*',
-            'scitex/writer/**/tables/**/*',
-            'scitex/writer/00_shared/figures_pool/*',
-            'scitex/writer/00_shared/tables_pool/*',
-            'scitex/writer/uploads/figures/*',  # User uploads
-            'data/**/figures/**/*',
-            'data/**/plots/**/*',
-            'data/**/*.png',
-            'data/**/*.jpg',
-            'data/**/*.pdf',
-            'scripts/**/*_out/**/*',
-            'scripts/**/figures/**/*',
-        ]
-
-        indexed_count = 0
-        skipped_count = 0
-
-        for pattern in search_patterns:
-            for file_path in project_path.glob(pattern):
-                if not file_path.is_file():
-                    continue
+    Args:
+        project_id: Project ID
+    """
+    _run_index(project_id, 'table', '[TableIndexer]')
 
-                if file_path.suffix.lower() in SUPPORTED_FIGURE_EXTENSIONS:
-                    try:
-                        # Check if already indexed with same hash
-                        relative_path = str(file_path.relative_to(project_path))
-                        file_hash = compute_file_hash(file_path)
-
-                        if db.check_if_indexed(relative_path, file_hash):
-                            skipped_count += 1
-                            continue  # Skip unchanged files
-
-                        # Check for duplicate content (same hash, different path)
-                        existing = db.check_hash_exists(file_hash, table_type='figure')
-                        if existing:
-                            # Compare filenames - prefer longer, more descriptive names
-                            current_name = file_path.name
-                            existing_name = existing['file_name']
-
-                            if len(current_name) <= len(existing_name):
-                                # Current file has shorter/same length name - skip it as duplicate
-                                logger.debug(f"[Indexer] Skipping duplicate: {current_name} (keeping {existing_name})")
-                                skipped_count += 1
-                                continue
-                            else:
-                                # Current file has longer name - remove old entry and index new one
-                                logger.info(f"[Indexer] Replacing duplicate: {existing_name} -> {current_name}")
-                                db.delete_figure(existing['file_path'])
-
-                        # Extract metadata
-                        metadata = extract_figure_metadata(file_path, project_path)
-                        db.upsert_figure(metadata)
-                        indexed_count += 1
-
-                        # Generate thumbnail asynchronously
-                        if CELERY_AVAILABLE:
-                            generate_thumbnail.delay(project_id, relative_path)
-                        else:
-                            generate_thumbnail(project_id, relative_path)
-
-                    except Exception as e:
-                        logger.error(f"[Indexer] Error indexing {file_path}: {e}")
-                        continue
 
-        logger.info(f"[Indexer] Completed for project {project_id}: {indexed_count} indexed, {skipped_count} skipped")
+@shared_task
+def index_project_paths(project_id, paths):
+    """
+    Re-index specific files after they were created, changed or deleted.
 
-        # Update LaTeX references
+    Used for filesystem change events (uploads, edits, the
+    watch_project_index command) instead of a full rescan.
+
+    Args:
+        project_id: Project ID
+        paths: File paths relative to the project root
+    """
+    from apps.project_app.models import Project
+    from ..utils.project_db import get_project_db
+
+    project = Project.objects.get(id=project_id)
+    project_path = get_project_path(project, '[Indexer]')
+    if not project_path:
+        return
+    db = get_project_db(project)
+
+    by_kind = {'figure': {}, 'table': {}}
+    for relative_path in dict.fromkeys(paths):
+        relative_path = str(Path(relative_path))
+        kind = classify_path(relative_path)
+        if kind is None:
+            continue
+        try:
+            stat = os.stat(project_path / relative_path)
+        except FileNotFoundError:
+            stat = None  # Deleted
+        by_kind[kind][relative_path] = stat
+
+    for kind, files in by_kind.items():
+        if files:
+            stats = index_files(db, project_path, kind, files, project_id=project_id)
+            logger.info(f"[Indexer] Updated {len(files)} {kind} path(s) for project {project_id}: {stats}")
+
+    if by_kind['figure']:
         if CELERY_AVAILABLE:
             update_latex_references.delay(project_id)
         else:
             update_latex_references(project_id)
 
+
+def _run_index(project_id, kind, log_prefix):
+    from apps.project_app.models import Project
+    from ..utils.project_db import get_project_db
+
+    try:
+        project = Project.objects.get(id=project_id)
+        project_path = get_project_path(project, log_prefix)
+        if not project_path:
+            return
+
+        db = get_project_db(project)
+
+        logger.info(f"{log_prefix} Starting indexing for project {project_id} at {project_path}")
+        files = {
+            relative_path: stat
+            for relative_path, file_kind, stat in walk_project_files(project_path)
+            if file_kind == kind
+        }
+        stats = index_files(
+            db, project_path, kind, files, project_id=project_id, prune=True
+        )
+        logger.info(
+            f"{log_prefix} Completed for project {project_id}: {stats['indexed']} indexed, "
+            f"{stats['skipped']} skipped, {stats['removed']} removed, "
+            f"{stats['hashed']} hashed"
+        )
+
+        # Update LaTeX references
+        if kind == 'figure':
+            if CELERY_AVAILABLE:
+                update_latex_references.delay(project_id)
+            else:
+                update_latex_references(project_id)
+
     except Exception as e:
-        logger.error(f"[Indexer] Error indexing project {project_id}: {e}")
+        logger.error(f"{log_prefix} Error indexing project {project_id}: {e}")
         raise
 
 
-@shared_task
-def index_project_tables(project_id):
+def get_project_path(project, log_prefix):
+    """Project root on disk, or None (logged) if it cannot be determined."""
+    if hasattr(project, 'git_clone_path') and project.git_clone_path:
+        return Path(project.git_clone_path)
+
+    # Handle visitor projects
+    from apps.project_app.services.project_filesystem import get_project_filesystem_manager
+    if not hasattr(project, 'owner') or not project.owner:
+        logger.error(f"{log_prefix} Cannot determine user for project {project.id}")
+        return None
+    manager = get_project_filesystem_manager(project.owner)
+    project_path = manager.get_project_root_path(project)
+    if not project_path:
+        logger.error(f"{log_prefix} Project path not found for project {project.id}")
+        return None
+    return Path(project_path)
+
+
+def classify_path(relative_path: str):
     """
-    Index all table files (CSV, Excel) in project to local SQLite DB.
+    Decide whether a project file is indexed, and as what.
 
-    Tables are discovered in:
-    - scitex/writer/**/tables/**/* (manuscript tables)
-    - scitex/writer/00_shared/tables_pool/* (shared pool)
-    - data/**/tables/**/* (data tables)
-    - data/**/*.{csv,xlsx,xls,tsv} (data files)
-    - scripts/**/*_out/**/* (script outputs)
+    Mirrors the discovery locations of the figure and table indexes:
+    figures/tables folders and the shared pools under scitex/writer,
+    figures/plots/tables folders and data files under data/, and script
+    outputs (*_out folders) under scripts/.
 
     Args:
-        project_id: Project ID
+        relative_path: Path relative to the project root
+
+    Returns:
+        'figure', 'table' or None
     """
-    try:
-        from apps.project_app.models import Project
-        from ..utils.project_db import get_project_db
+    parts = Path(relative_path).parts
+    suffix = Path(relative_path).suffix.lower()
+    is_figure = suffix in SUPPORTED_FIGURE_EXTENSIONS
+    is_table = suffix in SUPPORTED_TABLE_EXTENSIONS
+    if not (is_figure or is_table):
+        return None
+
+    if parts[:2] == ('scitex', 'writer'):
+        dirs = parts[2:-1]
+        in_pool = dirs in (('00_shared', 'figures_pool'), ('00_shared', 'tables_pool'))
+        if is_figure and ('figures' in dirs or 'tables' in dirs or in_pool):
+            return 'figure'
+        if is_table and ('tables' in dirs or dirs == ('00_shared', 'tables_pool')):
+            return 'table'
+    elif parts[0] == 'data':
+        dirs = parts[1:-1]
+        if is_figure and ('figures' in dirs or 'plots' in dirs or suffix in DATA_FIGURE_EXTENSIONS):
+            return 'figure'
+        if is_table and ('tables' in dirs or suffix in DATA_TABLE_EXTENSIONS):
+            return 'table'
+    elif parts[0] == 'scripts':
+        dirs = parts[1:-1]
+        script_output = any(d.endswith('_out') for d in dirs)
+        if is_figure and (script_output or 'figures' in dirs):
+            return 'figure'
+        if script_output and suffix in SCRIPT_TABLE_EXTENSIONS:
+            return 'table'
+    return None
+
+
+def walk_project_files(project_path: Path):
+    """
+    Walk the indexable directories once.
 
-        project = Project.objects.get(id=project_id)
+    Yields:
+        (relative_path, kind, stat) for every file classify_path accepts
+    """
+    project_path = Path(project_path)
+    stack = [project_path / root for root in INDEX_ROOTS]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                    continue
+                if not entry.is_file():
+                    continue
+                relative_path = os.path.relpath(entry.path, project_path)
+                kind = classify_path(relative_path)
+                if kind is not None:
+                    yield relative_path, kind, entry.stat()
+            except OSError as e:
+                logger.debug(f"[Indexer] Cannot stat {entry.path}: {e}")
 
-        # Get project path
-        if hasattr(project, 'git_clone_path') and project.git_clone_path:
-            project_path = Path(project.git_clone_path)
-        else:
-            from apps.project_app.services.project_filesystem import get_project_filesystem_manager
-            if not hasattr(project, 'owner') or not project.owner:
-                logger.error(f"[TableIndexer] Cannot determine user for project {project_id}")
-                return
-            manager = get_project_filesystem_manager(project.owner)
-            project_path = manager.get_project_root_path(project)
-            if not project_path:
-                logger.error(f"[TableIndexer] Project path not found for project {project_id}")
-                return
 
-        db = get_project_db(project)
+def index_files(db, project_path, kind, files, project_id=None, prune=False):
+    """
+    Bring the index of one kind up to date for the given files.
 
-        logger.info(f"[TableIndexer] Starting table indexing for project {project_id} at {project_path}")
-
-        # Search patterns for tables
-        search_patterns = [
-            'scitex/writer/**/tables/**/*',
-            'scitex/writer/00_shared/tables_pool/*',
-            'scitex/writer/uploads/tables/*',  # User uploads
-            'data/**/tables/**/*',
-            'data/**/*.csv',
-            'data/**/*.xlsx',
-            'data/**/*.xls',
-            'data/**/*.tsv',
-            'scripts/**/*_out/**/*.csv',
-            'scripts/**/*_out/**/*.xlsx',
-        ]
-
-        indexed_count = 0
-        skipped_count = 0
-
-        for pattern in search_patterns:
-            for file_path in project_path.glob(pattern):
-                if not file_path.is_file():
+    Args:
+        db: ProjectDatabase
+        project_path: Project root
+        kind: 'figure' or 'table'
+        files: Dictionary of relative path -> os.stat_result (None if the
+            file was deleted)
+        project_id: Project ID, for thumbnail generation (None skips it)
+        prune: Remove indexed files missing from ``files`` (full walk)
+
+    Returns:
+        Dictionary with indexed, skipped, removed and hashed counts
+    """
+    project_path = Path(project_path)
+    delete = db.delete_table if kind == 'table' else db.delete_figure
+    known = db.get_index_state(table_type=kind)
+    stats = {'indexed': 0, 'skipped': 0, 'removed': 0, 'hashed': 0}
+
+    removed = [path for path, stat in files.items() if stat is None and path in known]
+    if prune:
+        removed += [path for path in known if path not in files]
+
+    changed = []
+    for relative_path, stat in files.items():
+        if stat is None:
+            continue
+        row = known.get(relative_path)
+        if row and (row['file_size'], row['mtime_ns'], row['inode']) == (
+            stat.st_size, stat.st_mtime_ns, stat.st_ino
+        ):
+            stats['skipped'] += 1
+        else:
+            changed.append(relative_path)
+
+    hashes = hash_files([project_path / relative_path for relative_path in changed])
+    stats['hashed'] = len(hashes)
+
+    # All index writes in one transaction; thumbnails after it commits
+    thumbnails = []
+    with db.connection():
+        for relative_path in removed:
+            delete(relative_path)
+            known.pop(relative_path, None)
+            stats['removed'] += 1
+
+        for relative_path in changed:
+            file_path = project_path / relative_path
+            stat = files[relative_path]
+            try:
+                file_hash = hashes.get(file_path)
+                if file_hash is None:
+                    continue
+
+                row = known.get(relative_path)
+                if row and row['file_hash'] == file_hash:
+                    # Touched or copied over with identical content
+                    db.update_file_identity(
+                        relative_path, stat.st_size, stat.st_mtime_ns, stat.st_ino,
+                        table_type=kind,
+                    )
+                    stats['skipped'] += 1
                     continue
 
-                if file_path.suffix.lower() in SUPPORTED_TABLE_EXTENSIONS:
-                    try:
-                        # Check if already indexed with same hash
-                        relative_path = str(file_path.relative_to(project_path))
-                        file_hash = compute_file_hash(file_path)
-
-                        if db.check_if_indexed(relative_path, file_hash, table_type='table'):
-                            skipped_count += 1
-                            continue  # Skip unchanged files
-
-                        # Check for duplicate content (same hash, different path)
-                        existing = db.check_hash_exists(file_hash, table_type='table')
-                        if existing:
-                            # Compare filenames - prefer longer, more descriptive names
-                            current_name = file_path.name
-                            existing_name = existing['file_name']
-
-                            if len(current_name) <= len(existing_name):
-                                # Current file has shorter/same length name - skip it as duplicate
-                                logger.debug(f"[TableIndexer] Skipping duplicate: {current_name} (keeping {existing_name})")
-                                skipped_count += 1
-                                continue
-                            else:
-                                # Current file has longer name - remove old entry and index new one
-                                logger.info(f"[TableIndexer] Replacing duplicate: {existing_name} -> {current_name}")
-                                db.delete_table(existing['file_path'])
-
-                        # Extract metadata
-                        metadata = extract_table_metadata(file_path, project_path)
-                        db.upsert_table(metadata)
-                        indexed_count += 1
-
-                        # Generate thumbnail asynchronously
-                        if CELERY_AVAILABLE:
-                            generate_table_thumbnail.delay(project_id, relative_path)
-                        else:
-                            generate_table_thumbnail(project_id, relative_path)
-
-                    except Exception as e:
-                        logger.error(f"[TableIndexer] Error indexing {file_path}: {e}")
+                # Check for duplicate content (same hash, different path)
+                existing = db.check_hash_exists(file_hash, table_type=kind)
+                if existing and existing['file_path'] != relative_path:
+                    # Compare filenames - prefer longer, more descriptive names
+                    current_name = file_path.name
+                    existing_name = existing['file_name']
+
+                    if len(current_name) <= len(existing_name):
+                        # Current file has shorter/same length name - skip it as duplicate
+                        logger.debug(f"[Indexer] Skipping duplicate: {current_name} (keeping {existing_name})")
+                        stats['skipped'] += 1
                         continue
+                    else:
+                        # Current file has longer name - remove old entry and index new one
+                        logger.info(f"[Indexer] Replacing duplicate: {existing_name} -> {current_name}")
+                        delete(existing['file_path'])
+
+                # Extract metadata
+                if kind == 'table':
+                    metadata = extract_table_metadata(file_path, project_path, file_hash, stat)
+                    db.upsert_table(metadata)
+                else:
+                    metadata = extract_figure_metadata(file_path, project_path, file_hash, stat)
+                    db.upsert_figure(metadata)
+                stats['indexed'] += 1
+                thumbnails.append((relative_path, file_hash))
 
-        logger.info(f"[TableIndexer] Completed for project {project_id}: {indexed_count} indexed, {skipped_count} skipped")
+            except Exception as e:
+                logger.error(f"[Indexer] Error indexing {file_path}: {e}")
+                continue
 
-    except Exception as e:
-        logger.error(f"[TableIndexer] Error indexing project {project_id}: {e}")
-        raise
+    # Generate thumbnails asynchronously
+    if project_id is not None:
+        thumbnail_task = generate_table_thumbnail if kind == 'table' else generate_thumbnail
+        for relative_path, file_hash in thumbnails:
+            if CELERY_AVAILABLE and hasattr(thumbnail_task, 'delay'):
+                thumbnail_task.delay(project_id, relative_path, file_hash)
+            else:
+                thumbnail_task(project_id, relative_path, file_hash)
+
+    return stats
+
+
+def hash_files(paths) -> dict:
+    """
+    SHA256 of several files, read in parallel.
+
+    Args:
+        paths: File paths
+
+    Returns:
+        Dictionary of path -> hex digest (unreadable files are left out)
+    """
+    hashes = {}
+    if not paths:
+        return hashes
+    with ThreadPoolExecutor(max_workers=min(HASH_WORKERS, len(paths))) as pool:
+        futures = {pool.submit(compute_file_hash, path): path for path in paths}
+        for future in futures:
+            try:
+                hashes[futures[future]] = future.result()
+            except OSError as e:
+                logger.error(f"[Indexer] Cannot read {futures[future]}: {e}")
+    return hashes
 
 
 def compute_file_hash(file_path: Path) -> str:
@@ -268,50 +407,56 @@ def compute_file_hash(file_path: Path) -> str:
     """
     sha256 = hashlib.sha256()
     with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(8192), b''):
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
             sha256.update(chunk)
     return sha256.hexdigest()
 
 
-def extract_figure_metadata(file_path: Path, project_path: Path) -> dict:
+def extract_figure_metadata(file_path: Path, project_path: Path, file_hash: str = None, stat=None) -> dict:
     """
     Extract metadata from figure file.
 
     Args:
         file_path: Absolute path to figure
         project_path: Project root path
+        file_hash: SHA256 of the file, if already computed
+        stat: os.stat_result of the file, if already known
 
     Returns:
         Dictionary with figure metadata
     """
-    stat = file_path.stat()
+    stat = stat or file_path.stat()
     relative_path = str(file_path.relative_to(project_path))
 
     return {
         'file_path': relative_path,
         'file_name': file_path.name,
-        'file_hash': compute_file_hash(file_path),
+        'file_hash': file_hash or compute_file_hash(file_path),
         'file_size': stat.st_size,
         'file_type': file_path.suffix[1:].lower(),
         'last_modified': stat.st_mtime,
+        'mtime_ns': stat.st_mtime_ns,
+        'inode': stat.st_ino,
         'source': detect_source(relative_path),
         'location': str(file_path.parent.relative_to(project_path)),
         'tags': extract_tags(file_path, relative_path),
     }
 
 
-def extract_table_metadata(file_path: Path, project_path: Path) -> dict:
+def extract_table_metadata(file_path: Path, project_path: Path, file_hash: str = None, stat=None) -> dict:
     """
     Extract metadata from table file (CSV, Excel).
 
     Args:
         file_path: Absolute path to table
         project_path: Project root path
+        file_hash: SHA256 of the file, if already computed
+        stat: os.stat_result of the file, if already known
 
     Returns:
         Dictionary with table metadata
     """
-    stat = file_path.stat()
+    stat = stat or file_path.stat()
     relative_path = str(file_path.relative_to(project_path))
 
     # Try to extract caption from filename or parent directory
@@ -320,9 +465,12 @@ def extract_table_metadata(file_path: Path, project_path: Path) -> dict:
     return {
         'file_path': relative_path,
         'file_name': file_path.name,
-        'file_hash': compute_file_hash(file_path),
+        'file_hash': file_hash or compute_file_hash(file_path),
         'caption': caption,
         'last_modified': stat.st_mtime,
+        'file_size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'inode': stat.st_ino,
         'source': detect_source(relative_path),
         'location': str(file_path.parent.relative_to(project_path)),
         'tags': extract_tags(file_path, relative_path),
@@ -412,8 +560,9 @@ def update_latex_references(project_id):
     """
     Check which figures are referenced in LaTeX files.
 
-    Scans all .tex files for \\includegraphics{} commands and updates
-    the database with reference information.
+    Parses each changed .tex file once for \\includegraphics, \\input and
+    \\ref targets, joins all targets against the figures in memory and
+    writes the reference information in one transaction.
 
     Args:
         project_id: Project ID
@@ -423,92 +572,142 @@ def update_latex_references(project_id):
 
     try:
         project = Project.objects.get(id=project_id)
-
-        # Get project path
-        if hasattr(project, 'git_clone_path') and project.git_clone_path:
-            project_path = Path(project.git_clone_path)
-        else:
-            from apps.project_app.services.project_filesystem import get_project_filesystem_manager
-            if not hasattr(project, 'owner') or not project.owner:
-                logger.error(f"[RefTracker] Cannot determine user for project {project_id}")
-                return
-            manager = get_project_filesystem_manager(project.owner)
-            project_path = manager.get_project_root_path(project)
-            if not project_path:
-                logger.error(f"[RefTracker] Project path not found for project {project_id}")
-                return
+        project_path = get_project_path(project, '[RefTracker]')
+        if not project_path:
+            return
 
         db = get_project_db(project)
 
         logger.info(f"[RefTracker] Starting reference tracking for project {project_id}")
+        stats = update_reference_index(db, project_path)
+        logger.info(
+            f"[RefTracker] Completed for project {project_id}: "
+            f"{stats['referenced']} figures referenced, "
+            f"{stats['parsed']} of {stats['tex_files']} tex files parsed"
+        )
 
-        # Get all figures from DB
-        figures = db.get_all_figures()
-
-        # Scan all .tex files
-        tex_files = list(project_path.glob('scitex/writer/**/*.tex'))
+    except Exception as e:
+        logger.error(f"[RefTracker] Error tracking references for project {project_id}: {e}")
 
-        references_updated = 0
 
-        for figure in figures:
-            file_name = figure['file_name']
-            file_stem = Path(file_name).stem
+def update_reference_index(db, project_path: Path) -> dict:
+    """
+    Bring the parsed .tex targets and figure references up to date.
 
-            ref_count = 0
-            references = []
+    Args:
+        db: ProjectDatabase
+        project_path: Project root
 
-            # Search in .tex files
-            for tex_file in tex_files:
-                try:
-                    content = tex_file.read_text()
+    Returns:
+        Dictionary with tex_files, parsed and referenced counts
+    """
+    project_path = Path(project_path)
+    known = db.get_tex_index_state()
+    current = {}
+    for tex_path in (project_path / 'scitex/writer').rglob('*.tex'):
+        try:
+            current[str(tex_path.relative_to(project_path))] = tex_path.stat()
+        except OSError as e:
+            logger.debug(f"[RefTracker] Cannot stat {tex_path}: {e}")
+
+    parsed = {}
+    for tex_file, stat in current.items():
+        row = known.get(tex_file)
+        if row and (row['file_size'], row['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+            continue
+        try:
+            data = (project_path / tex_file).read_bytes()
+        except OSError as e:
+            logger.debug(f"[RefTracker] Error reading {tex_file}: {e}")
+            continue
+        file_hash = hashlib.sha256(data).hexdigest()
+        unchanged = row is not None and row['file_hash'] == file_hash
+        parsed[tex_file] = {
+            'file_hash': file_hash,
+            'file_size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'targets': None if unchanged else extract_tex_targets(
+                data.decode('utf-8', errors='replace')
+            ),
+        }
+    removed = [tex_file for tex_file in known if tex_file not in current]
+    if parsed or removed:
+        db.update_tex_index(parsed, removed)
+
+    references = match_figure_references(db.get_all_figures(), db.get_tex_targets())
+    db.replace_latex_references(references)
 
-                    # Pattern 1: \includegraphics{...filename...}
-                    pattern1 = rf'\\includegraphics[^{{]*\{{[^}}]*{re.escape(file_name)}[^}}]*\}}'
-                    matches1 = re.findall(pattern1, content, re.IGNORECASE)
+    return {
+        'tex_files': len(current),
+        'parsed': sum(1 for info in parsed.values() if info['targets'] is not None),
+        'referenced': len(references),
+    }
 
-                    # Pattern 2: \includegraphics{...stem...} (without extension)
-                    pattern2 = rf'\\includegraphics[^{{]*\{{[^}}]*{re.escape(file_stem)}[^}}]*\}}'
-                    matches2 = re.findall(pattern2, content, re.IGNORECASE)
 
-                    matches = matches1 + matches2
+def extract_tex_targets(content: str) -> list:
+    """
+    Extract \\includegraphics, \\input/\\include and \\ref-family targets.
 
-                    if matches:
-                        ref_count += len(matches)
-                        references.append({
-                            'tex_file': str(tex_file.relative_to(project_path)),
-                            'count': len(matches),
-                        })
-                except Exception as e:
-                    logger.debug(f"[RefTracker] Error reading {tex_file}: {e}")
-                    continue
+    Comments are ignored; comma-separated targets (\\cref{fig:a,fig:b})
+    are returned separately.
 
-            # Update database
-            db.update_references(
-                figure['id'],
-                is_referenced=(ref_count > 0),
-                reference_count=ref_count
-            )
+    Args:
+        content: LaTeX source
 
-            # Clear and add new references
-            db.clear_latex_references(figure['id'])
-            for ref in references:
-                db.add_latex_reference(
-                    figure['id'],
-                    ref['tex_file'],
-                    context=f"Referenced {ref['count']} times"
-                )
+    Returns:
+        List of (command, target, line_number)
+    """
+    targets = []
+    for line_number, line in enumerate(content.splitlines(), start=1):
+        line = TEX_COMMENT_PATTERN.sub('', line)
+        if '\\' not in line:
+            continue
+        for match in TEX_TARGET_PATTERN.finditer(line):
+            for target in match.group(2).split(','):
+                target = target.strip()
+                if target:
+                    targets.append((match.group(1), target, line_number))
+    return targets
+
+
+def match_figure_references(figures: list, targets: list) -> dict:
+    """
+    Join parsed .tex targets against figures.
 
-            if ref_count > 0:
-                references_updated += 1
+    A target references a figure when it contains the figure's file stem
+    (e.g. figures/jpg/Figure_ID_01_workflow.jpg or fig:01_workflow for
+    01_workflow.png). The longest matching stem wins.
 
-        logger.info(f"[RefTracker] Completed for project {project_id}: {references_updated} figures referenced")
+    Args:
+        figures: Figure rows (id, file_name)
+        targets: Target rows (tex_file, command, target, line_number)
 
-    except Exception as e:
-        logger.error(f"[RefTracker] Error tracking references for project {project_id}: {e}")
+    Returns:
+        Dictionary of figure_id -> list of {tex_file, line_number, context}
+    """
+    figure_ids = {}
+    for figure in figures:
+        figure_ids.setdefault(Path(figure['file_name']).stem.lower(), []).append(figure['id'])
+    references = {}
+    if not figure_ids:
+        return references
+
+    stems = sorted(figure_ids, key=len, reverse=True)
+    pattern = re.compile('|'.join(re.escape(stem) for stem in stems), re.IGNORECASE)
+    for target in targets:
+        matched = {m.group(0).lower() for m in pattern.finditer(target['target'])}
+        for stem in matched:
+            for figure_id in figure_ids[stem]:
+                references.setdefault(figure_id, []).append({
+                    'tex_file': target['tex_file'],
+                    'line_number': target['line_number'],
+                    'context': f"\\{target['command']}{{{target['target']}}}",
+                })
+    return references
 
 
 @shared_task
-def generate_thumbnail(project_id, file_path):
+def generate_thumbnail(project_id, file_path, file_hash=None):
     """
     Generate thumbnail for figure.
 
@@ -518,6 +717,7 @@ def generate_thumbnail(project_id, file_path):
     Args:
         project_id: Project ID
         file_path: Relative path to figure
+        file_hash: SHA256 of the figure, if the indexer already computed it
     """
     from apps.project_app.models import Project
     from ..utils.project_db import get_project_db
@@ -549,7 +749,7 @@ def generate_thumbnail(project_id, file_path):
             return
 
         # Generate thumbnail filename
-        file_hash = compute_file_hash(full_path)
+        file_hash = file_hash or compute_file_hash(full_path)
         thumb_name = f"{file_hash[:16]}_thumb.jpg"
         thumb_path = db.thumbnails_dir / thumb_name
 
@@ -595,7 +795,7 @@ def generate_thumbnail(project_id, file_path):
         logger.error(f"[Thumbnail] Error generating for {file_path}: {e}")
 
 
-def generate_table_thumbnail(project_id, file_path):
+def generate_table_thumbnail(project_id, file_path, file_hash=None):
     """
     Generate thumbnail preview for table files (CSV, Excel).
 
@@ -604,6 +804,7 @@ def generate_table_thumbnail(project_id, file_path):
     Args:
         project_id: Project ID
         file_path: Relative path to table file
+        file_hash: SHA256 of the table, if the indexer already computed it
     """
     from apps.project_app.models import Project
     from ..utils.project_db import get_project_db
@@ -639,7 +840,7 @@ def generate_table_thumbnail(project_id, file_path):
             return
 
         # Generate thumbnail filename
-        file_hash = compute_file_hash(full_path)
+        file_hash = file_hash or compute_file_hash(full_path)
         thumb_name = f"{file_hash[:16]}_thumb.jpg"
         thumb_path = db.thumbnails_dir / thumb_name
 
@@ -5,10 +5,996 @@ DEPRECATED: Old model tests removed.
 New API tests to be added in Phase 3.
 """
 
-from django.test import TestCase
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.utils import timezone
+
+from apps.project_app.models import Project
+from apps.writer_app.consumers import WriterConsumer
+from apps.writer_app.models import CollaborativeSession, CompilationJob, Manuscript
+from apps.writer_app.services.compilation import preview, scheduler
+from apps.writer_app.services.compilation.preview import PreviewCompiler
+from apps.writer_app.services.compilation.scheduler import (
+    CompilationWorkerPool,
+    claim_next_job,
+    recover_stale_jobs,
+    submit_job,
+    wait_for_job,
+)
+from apps.writer_app.services.operational_transform_service import (
+    TextOperation,
+    compose_multiple,
+    transform,
+)
+from apps.writer_app.services.ot_backends import InMemoryOTBackend, RedisOTBackend
+from apps.writer_app.services.ot_coordinator import OTCoordinator
+from apps.writer_app.tasks import indexer
+from apps.writer_app.utils import project_db
+from apps.writer_app.utils.project_db import ProjectDatabase
 
 
 class WriterAPITestCase(TestCase):
     """Placeholder for new API tests."""
 
     pass
+
+
+class _FakeLatexmk:
+    """Stands in for latexmk: writes the PDF and aux state of a job."""
+
+    def __init__(self, fail=False):
+        self.compiled = []
+        self.commands = []
+        self.fail = fail
+        self.dump_fails = False
+        self.format_fails = False
+        self.gate = None
+
+    def __call__(self, command, **kwargs):
+        self.commands.append((command, kwargs))
+        if "-ini" in command:
+            return self._dump_format(command)
+        tex = Path(command[-1])
+        content = tex.read_text()
+        self.compiled.append(content)
+        if self.gate is not None:
+            self.gate.wait(5)
+        tex.with_suffix(".aux").write_text("\\relax")
+        uses_format = any(arg.startswith("-pdflatex=") for arg in command)
+        if not self.fail and not (uses_format and self.format_fails):
+            tex.with_suffix(".pdf").write_text(f"PDF:{content}")
+        return mock.Mock(stdout="", stderr="", returncode=0)
+
+    def _dump_format(self, command):
+        options = dict(arg[1:].split("=", 1) for arg in command if "=" in arg)
+        if not self.dump_fails:
+            fmt = Path(options["output-directory"]) / f"{options['jobname']}.fmt"
+            fmt.write_text("format")
+        return mock.Mock(stdout="", stderr="", returncode=0)
+
+
+class PreviewCompilerTests(SimpleTestCase):
+    """Tests for cached, incremental and coalesced section previews"""
+
+    def setUp(self):
+        self.writer_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.writer_dir, ignore_errors=True)
+        self.bib = self.writer_dir / "00_shared" / "bib_files" / "bibliography.bib"
+        self.bib.parent.mkdir(parents=True)
+        self.bib.write_text("@article{a, title={A}}")
+        self.latexmk = _FakeLatexmk()
+        patcher = mock.patch.object(preview.subprocess, "run", self.latexmk)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.compiler = PreviewCompiler(self.writer_dir)
+
+    def _compile(self, content, color_mode="light", section="intro"):
+        # Formats are covered by PreambleFormatTests
+        self.compiler.use_formats = False
+        return self.compiler.compile(
+            content, color_mode=color_mode, section_name=section
+        )
+
+    def test_repeat_preview_served_from_cache(self):
+        """Test identical content is published without running latexmk"""
+        first = self._compile("A")
+        self._compile("B")
+        again = self._compile("A")
+
+        self.assertTrue(first["success"])
+        self.assertFalse(first["cached"])
+        self.assertTrue(again["cached"])
+        self.assertEqual(self.latexmk.compiled, ["A", "B"])
+        self.assertEqual(Path(again["output_pdf"]).read_text(), "PDF:A")
+        self.assertEqual(Path(again["output_pdf"]).name, "preview-intro-light.pdf")
+
+    def test_key_covers_color_mode_and_bibliography(self):
+        """Test color mode and bibliography changes miss the cache"""
+        self._compile("A")
+        self._compile("A", color_mode="dark")
+        self.bib.write_text("@article{b, title={Bee}}")
+        self._compile("A")
+        self.assertEqual(len(self.latexmk.compiled), 3)
+
+    def test_aux_state_kept_between_runs(self):
+        """Test latexmk's auxiliary files survive a successful preview"""
+        self._compile("A")
+        aux = self.writer_dir / ".preview" / "preview-intro-light-temp.aux"
+        self.assertTrue(aux.exists())
+
+    def test_failed_compile_is_not_reported_as_success(self):
+        """Test a run without PDF fails even if an older PDF existed"""
+        self._compile("A")
+        self.latexmk.fail = True
+        result = self._compile("broken")
+        self.assertFalse(result["success"])
+        self.assertFalse(
+            (self.writer_dir / ".preview" / "preview-intro-light-temp.aux").exists()
+        )
+
+    def test_cache_is_bounded(self):
+        """Test least recently used PDFs are evicted"""
+        with mock.patch.object(preview, "CACHE_SIZE", 2):
+            for content in ("A", "B", "C"):
+                self._compile(content)
+                time.sleep(0.01)
+        cached = list((self.writer_dir / ".preview" / "cache").glob("*.pdf"))
+        self.assertEqual(len(cached), 2)
+
+    def test_rapid_requests_compile_only_latest(self):
+        """Test requests queued behind a running compile coalesce to the newest"""
+        self.latexmk.gate = threading.Event()
+        results = {}
+
+        def request(content):
+            results[content] = self._compile(content)
+
+        first = threading.Thread(target=request, args=("A",))
+        first.start()
+        while not self.latexmk.compiled:
+            time.sleep(0.01)
+
+        queued = []
+        for content in ("B", "C", "D"):
+            thread = threading.Thread(target=request, args=(content,))
+            thread.start()
+            queued.append(thread)
+            time.sleep(0.05)
+        self.latexmk.gate.set()
+        for thread in [first, *queued]:
+            thread.join(10)
+
+        self.assertEqual(self.latexmk.compiled, ["A", "D"])
+        self.assertTrue(all(result["success"] for result in results.values()))
+        self.assertEqual(
+            Path(results["B"]["output_pdf"]).read_text(),
+            "PDF:D",
+        )
+
+
+class PreambleFormatTests(SimpleTestCase):
+    """Tests for precompiled preamble formats"""
+
+    PREAMBLE = "\\documentclass{article}\n\\usepackage{amsmath}\n"
+
+    def setUp(self):
+        self.writer_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.writer_dir, ignore_errors=True)
+        self.latexmk = _FakeLatexmk()
+        for patcher in (
+            mock.patch.object(preview.subprocess, "run", self.latexmk),
+            mock.patch.object(preview, "mylatexformat_available", return_value=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.compiler = PreviewCompiler(self.writer_dir, use_formats=True)
+        self.compiler.preview_dir.mkdir(parents=True)
+
+    def _document(self, body, preamble=None):
+        return (
+            f"{preamble or self.PREAMBLE}\\begin{{document}}\n{body}\n\\end{{document}}"
+        )
+
+    def _latexmk_commands(self):
+        return [c for c in self.latexmk.commands if c[0][0] == "latexmk"]
+
+    def test_format_keyed_on_preamble_and_color(self):
+        """Test bodies share a format while preamble or color changes do not"""
+        name = self.compiler.ensure_format(self._document("A"), "light", wait=True)
+        self.assertTrue((self.compiler.formats_dir / f"{name}.fmt").exists())
+        self.assertEqual(
+            self.compiler.ensure_format(self._document("B"), "light", wait=True), name
+        )
+        self.assertNotEqual(
+            self.compiler.ensure_format(self._document("A"), "dark", wait=True), name
+        )
+        other = self._document("A", preamble="\\documentclass{report}\n")
+        self.assertNotEqual(
+            self.compiler.ensure_format(other, "light", wait=True), name
+        )
+        dumps = [c for c in self.latexmk.commands if "-ini" in c[0]]
+        self.assertEqual(len(dumps), 3)
+
+    def test_preview_compiles_against_format(self):
+        """Test latexmk loads the precompiled format once it exists"""
+        name = self.compiler.ensure_format(self._document("A"), "light", wait=True)
+        result = self.compiler.compile(self._document("body"), section_name="intro")
+
+        self.assertTrue(result["success"])
+        command, kwargs = self._latexmk_commands()[-1]
+        self.assertIn(f"-pdflatex=pdflatex -fmt={name} %O %S", command)
+        self.assertTrue(
+            kwargs["env"]["TEXFORMATS"].startswith(str(self.compiler.formats_dir))
+        )
+
+    def test_missing_format_built_in_background(self):
+        """Test the first compile of a preamble runs plainly and queues a build"""
+        self.compiler.compile(self._document("A"), section_name="intro")
+        command, _ = self._latexmk_commands()[0]
+        self.assertFalse(any(arg.startswith("-pdflatex=") for arg in command))
+
+        deadline = time.monotonic() + 5
+        while not list(self.compiler.formats_dir.glob("*.fmt")):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_undumpable_preamble_falls_back(self):
+        """Test a preamble that fails to dump is not retried and compiles plainly"""
+        self.latexmk.dump_fails = True
+        self.assertIsNone(
+            self.compiler.ensure_format(self._document("A"), "light", wait=True)
+        )
+        self.assertTrue(list(self.compiler.formats_dir.glob("*.failed")))
+        self.assertIsNone(
+            self.compiler.ensure_format(self._document("B"), "light", wait=True)
+        )
+        dumps = [c for c in self.latexmk.commands if "-ini" in c[0]]
+        self.assertEqual(len(dumps), 1)
+
+    def test_unusable_format_falls_back(self):
+        """Test a format that yields no PDF is retried plainly and retired"""
+        name = self.compiler.ensure_format(self._document("A"), "light", wait=True)
+        self.latexmk.format_fails = True
+        result = self.compiler.compile(self._document("body"), section_name="intro")
+
+        self.assertTrue(result["success"])
+        with_format, plain = self._latexmk_commands()[-2:]
+        self.assertIn(f"-pdflatex=pdflatex -fmt={name} %O %S", with_format[0])
+        self.assertFalse(any(arg.startswith("-pdflatex=") for arg in plain[0]))
+        self.assertTrue((self.compiler.formats_dir / f"{name}.failed").exists())
+        self.assertFalse((self.compiler.formats_dir / f"{name}.fmt").exists())
+        self.assertIsNone(
+            self.compiler.ensure_format(self._document("B"), "light", wait=True)
+        )
+
+    def test_broken_document_keeps_format(self):
+        """Test a document that fails either way does not retire its format"""
+        name = self.compiler.ensure_format(self._document("A"), "light", wait=True)
+        self.latexmk.fail = True
+        result = self.compiler.compile(self._document("oops"), section_name="intro")
+
+        self.assertFalse(result["success"])
+        self.assertEqual(len(self._latexmk_commands()), 2)
+        self.assertTrue((self.compiler.formats_dir / f"{name}.fmt").exists())
+        self.assertFalse((self.compiler.formats_dir / f"{name}.failed").exists())
+
+
+@override_settings(SCITEX_WRITER_INPROCESS_COMPILE_WORKERS=False)
+class CompilationSchedulerTests(TestCase):
+    """Tests for the persistent compilation queue"""
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.project = Project.objects.create(name="Paper", owner=self.user)
+
+    def _full(self, doc_type="manuscript"):
+        return submit_job(self.project.id, self.user.id, doc_type=doc_type)
+
+    def _preview(self, section="intro", color_mode="light"):
+        return submit_job(
+            self.project.id,
+            self.user.id,
+            compilation_type="preview",
+            section_name=section,
+            options={"content": section, "color_mode": color_mode},
+        )
+
+    def test_new_request_supersedes_queued_one(self):
+        """Test only the newest queued build of a document is kept"""
+        first = self._full()
+        other_doc = self._full("supplementary")
+        second = self._full()
+
+        first.refresh_from_db()
+        self.assertEqual(first.status, "superseded")
+        self.assertEqual(first.superseded_by_id, second.pk)
+        other_doc.refresh_from_db()
+        self.assertEqual(other_doc.status, "queued")
+
+    def test_running_build_is_not_superseded(self):
+        """Test a started build runs to completion"""
+        running = self._full()
+        claim_next_job("w1")
+        self._full()
+        running.refresh_from_db()
+        self.assertEqual(running.status, "running")
+
+    def test_previews_superseded_per_section_and_color(self):
+        """Test previews only replace the same section in the same color mode"""
+        intro = self._preview()
+        dark = self._preview(color_mode="dark")
+        self._preview(section="methods")
+        self._preview()
+
+        intro.refresh_from_db()
+        dark.refresh_from_db()
+        self.assertEqual(intro.status, "superseded")
+        self.assertEqual(dark.status, "queued")
+
+    def test_previews_claimed_before_full_builds(self):
+        """Test a later preview overtakes a queued full build"""
+        self._full()
+        preview_job = self._preview()
+        self.assertEqual(claim_next_job("w1").pk, preview_job.pk)
+
+    def test_full_builds_leave_a_slot_for_previews(self):
+        """Test full builds cannot take the reserved preview slot"""
+        self._full()
+        self._full("supplementary")
+        self.assertIsNotNone(claim_next_job("w1", max_concurrent=2))
+        self.assertIsNone(claim_next_job("w1", max_concurrent=2))
+
+        self._preview()
+        claimed = claim_next_job("w1", max_concurrent=2)
+        self.assertEqual(claimed.compilation_type, "preview")
+        self.assertIsNone(claim_next_job("w1", max_concurrent=2))
+
+    def test_document_not_built_twice_at_once(self):
+        """Test a queued build waits for the running build of its document"""
+        self._full()
+        claim_next_job("w1", max_concurrent=4, preview_reserved=0)
+        self._full()
+        self.assertIsNone(claim_next_job("w1", max_concurrent=4, preview_reserved=0))
+
+    def test_stale_running_job_is_requeued(self):
+        """Test a job whose worker stopped heartbeating is queued again"""
+        self._full()
+        job = claim_next_job("w1")
+        CompilationJob.objects.filter(pk=job.pk).update(
+            heartbeat_at=timezone.now() - timedelta(minutes=10)
+        )
+
+        self.assertEqual(recover_stale_jobs(stale_after=60), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual(job.status, "queued")
+        self.assertIn("re-queued", job.log_file)
+
+    def test_status_endpoint_reads_database(self):
+        """Test any web process can report a job's persisted state"""
+        job = self._full()
+        CompilationJob.objects.filter(pk=job.pk).update(
+            status="running", progress=40, step="Compiling", log_file="line 1\n"
+        )
+        self.client.force_login(self.user)
+
+        response = self.client.get(
+            f"/writer/api/project/{self.project.id}/compilation/status/{job.job_id}/"
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            (data["status"], data["progress"], data["log"]),
+            ("running", 40, "line 1"),
+        )
+
+        missing = self.client.get(
+            f"/writer/api/project/{self.project.id}/compilation/status/not-a-uuid/"
+        )
+        self.assertEqual(missing.status_code, 404)
+
+
+@override_settings(SCITEX_WRITER_INPROCESS_COMPILE_WORKERS=False)
+class CompilationWorkerPoolTests(TransactionTestCase):
+    """Tests for running queued compilations on the bounded pool"""
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice")
+        self.project = Project.objects.create(name="Paper", owner=self.user)
+        self.running = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def _fake_compile(self, job, reporter):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        reporter.log(f"compiling {job.section_name}")
+        reporter.progress(50, "Compiling")
+        time.sleep(0.1)
+        with self.lock:
+            self.running -= 1
+        return {"success": True, "output_pdf": f"/tmp/{job.section_name}.pdf"}
+
+    def _preview(self, section):
+        return submit_job(
+            self.project.id,
+            self.user.id,
+            compilation_type="preview",
+            section_name=section,
+            options={"content": section, "color_mode": "light"},
+        )
+
+    def _run_pool(self, size):
+        pool = CompilationWorkerPool(size=size, poll_interval=0.05)
+        pool.start()
+        self.addCleanup(pool.stop, 5)
+        return pool
+
+    def test_concurrency_bounded_and_state_persisted(self):
+        """Test the pool never exceeds the limit and records results"""
+        jobs = [self._preview(f"s{i}") for i in range(5)]
+        with (
+            mock.patch.object(scheduler, "_run_compile", self._fake_compile),
+            mock.patch.object(scheduler, "MAX_CONCURRENT_COMPILES", 2),
+        ):
+            self._run_pool(size=4)
+            finished = [wait_for_job(job.job_id, timeout=10) for job in jobs]
+
+        self.assertLessEqual(self.peak, 2)
+        for job in finished:
+            self.assertEqual(job.status, "completed")
+            self.assertEqual(
+                job.result["output_pdf"],
+                f"/writer/api/project/{self.project.id}/pdf/{job.section_name}.pdf",
+            )
+            self.assertIn(f"compiling {job.section_name}", job.log_file)
+            self.assertEqual(job.output_path, f"/tmp/{job.section_name}.pdf")
+
+    def test_waiting_on_superseded_preview_returns_newest(self):
+        """Test a request whose preview was replaced gets the newer result"""
+        old = self._preview("intro")
+        new = self._preview("intro")
+        with mock.patch.object(scheduler, "_run_compile", self._fake_compile):
+            self._run_pool(size=1)
+            finished = wait_for_job(old.job_id, timeout=10)
+
+        self.assertEqual(finished.pk, new.pk)
+        self.assertEqual(finished.status, "completed")
+
+    def test_compile_error_fails_job(self):
+        """Test an exception in the compiler is recorded as a failure"""
+        job = self._preview("intro")
+        with mock.patch.object(
+            scheduler, "_run_compile", side_effect=RuntimeError("no latexmk")
+        ):
+            self._run_pool(size=1)
+            finished = wait_for_job(job.job_id, timeout=10)
+
+        self.assertEqual(finished.status, "failed")
+        self.assertEqual(finished.result["error"], "no latexmk")
+        self.assertIn("[ERROR] no latexmk", finished.log_file)
+
+
+class OperationalTransformTests(SimpleTestCase):
+    """Tests for TextOperation transform"""
+
+    def _random_op(self, text, rng):
+        op = TextOperation()
+        position = rng.randint(0, len(text))
+        op.retain(position)
+        if position < len(text) and rng.random() < 0.5:
+            deleted = rng.randint(1, len(text) - position)
+            op.delete(deleted)
+            position += deleted
+        else:
+            op.insert("xyz"[: rng.randint(1, 3)])
+        return op.retain(len(text) - position)
+
+    def test_concurrent_operations_converge(self):
+        """Test both application orders of transformed operations agree"""
+        rng = random.Random(7)
+        for _ in range(500):
+            text = "".join(rng.choice("abcdef") for _ in range(rng.randint(0, 12)))
+            a, b = self._random_op(text, rng), self._random_op(text, rng)
+            a_prime, b_prime = transform(a, b, "left")
+            self.assertEqual(b_prime.apply(a.apply(text)), a_prime.apply(b.apply(text)))
+
+    def test_tie_insert_order_follows_side(self):
+        """Test inserts at the same position are ordered by side"""
+        a = TextOperation().insert("A").retain(3)
+        b = TextOperation().insert("B").retain(3)
+        a_prime, _ = transform(a, b, "left")
+        self.assertEqual(a_prime.apply(b.apply("xyz")), "ABxyz")
+        a_prime, _ = transform(a, b, "right")
+        self.assertEqual(a_prime.apply(b.apply("xyz")), "BAxyz")
+
+    def test_different_base_lengths_rejected(self):
+        """Test operations on different documents cannot be transformed"""
+        with self.assertRaises(ValueError):
+            transform(TextOperation().retain(3), TextOperation().retain(4))
+
+    def test_compose_equals_sequential_application(self):
+        """Test a composed operation does what its parts do in order"""
+        rng = random.Random(11)
+        for _ in range(500):
+            text = "".join(rng.choice("abcdef") for _ in range(rng.randint(0, 12)))
+            a = self._random_op(text, rng)
+            b = self._random_op(a.apply(text), rng)
+            self.assertEqual(a.compose(b).apply(text), b.apply(a.apply(text)))
+
+    def test_typed_burst_composes_to_single_insert(self):
+        """Test consecutive keystrokes merge into one insert"""
+        ops = [
+            TextOperation().retain(2 + i).insert(c).retain(3)
+            for i, c in enumerate("word")
+        ]
+        composed = compose_multiple(ops)
+        self.assertEqual(composed.apply("ab123"), "abword123")
+        self.assertEqual(len(composed.ops), 3)
+
+    def test_compose_rejects_mismatched_lengths(self):
+        """Test composing operations that do not chain is an error"""
+        with self.assertRaises(ValueError):
+            TextOperation().retain(3).compose(TextOperation().retain(4))
+
+
+class _YieldingBackend(InMemoryOTBackend):
+    """Memory backend that yields between reading and appending, like a
+    network round trip, so concurrent submits race"""
+
+    async def get_operations(self, key, since_version):
+        result = await super().get_operations(key, since_version)
+        await asyncio.sleep(0)
+        return result
+
+
+class OTCoordinatorTests(SimpleTestCase):
+    """Tests for the backend-backed OT coordinator"""
+
+    def setUp(self):
+        self.coordinator = OTCoordinator(1, backend=_YieldingBackend())
+
+    def _insert(self, text, position, chars):
+        op = TextOperation().retain(position).insert(chars)
+        return {"ops": op.retain(len(text) - position).to_dict()}
+
+    async def _submit(self, operation, version, user_id=1):
+        return await self.coordinator.submit_operation(
+            user_id=user_id,
+            username=f"user{user_id}",
+            session_id=f"s{user_id}",
+            section_id="intro",
+            operation=operation,
+            version=version,
+        )
+
+    def test_concurrent_submits_get_gapless_versions(self):
+        """Test racing submits are serialized, transformed and all applied"""
+
+        async def scenario():
+            results = await asyncio.gather(
+                *(
+                    self._submit(self._insert("", 0, str(i)), 0, user_id=i)
+                    for i in range(10)
+                )
+            )
+            history = await self.coordinator.get_operations("intro", 0)
+            return results, history
+
+        results, history = asyncio.run(scenario())
+
+        self.assertEqual(
+            sorted(r["current_version"] for r in results), list(range(1, 11))
+        )
+        self.assertEqual(
+            [e["version"] for e in history["operations"]], list(range(1, 11))
+        )
+        text = ""
+        for entry in history["operations"]:
+            text = TextOperation.from_dict(entry["operation"]["ops"]).apply(text)
+        self.assertEqual(sorted(text), sorted("0123456789"))
+
+    def test_stale_submit_is_transformed(self):
+        """Test an operation at an old version is rebased onto newer ones"""
+
+        async def scenario():
+            await self._submit(self._insert("abc", 0, "X"), 0)
+            return await self._submit(self._insert("abc", 3, "Y"), 0, user_id=2)
+
+        result = asyncio.run(scenario())
+
+        self.assertEqual(result["status"], "transformed")
+        committed = TextOperation.from_dict(result["operation"]["ops"])
+        self.assertEqual(committed.apply("Xabc"), "XabcY")
+
+    def test_client_behind_history_must_resync(self):
+        """Test a client older than the retained history is told to resync"""
+        self.coordinator = OTCoordinator(1, backend=InMemoryOTBackend(max_history=2))
+
+        async def scenario():
+            text = ""
+            for version in range(3):
+                await self._submit(self._insert(text, 0, "a"), version)
+                text += "a"
+            return await self._submit(self._insert("", 0, "b"), 0)
+
+        self.assertEqual(asyncio.run(scenario())["status"], "resync")
+
+    def test_open_section_seeds_and_returns_shared_text(self):
+        """Test the first opener sets the text and later joiners get edits"""
+
+        async def scenario():
+            first = await self.coordinator.open_section("intro", "abc")
+            await self._submit(self._insert("abc", 3, "d"), 0)
+            late = await self.coordinator.open_section("intro", "stale file")
+            return first, late
+
+        first, late = asyncio.run(scenario())
+
+        self.assertEqual(first, {"version": 0, "text": "abc"})
+        self.assertEqual(late, {"version": 1, "text": "abcd"})
+
+    def test_resync_rebuilds_from_snapshot(self):
+        """Test far-behind clients get the text from the latest snapshot"""
+        self.coordinator = OTCoordinator(1, backend=InMemoryOTBackend(max_history=5))
+
+        async def scenario():
+            await self.coordinator.open_section("intro", "")
+            text = ""
+            for version in range(12):
+                await self._submit(self._insert(text, len(text), "x"), version)
+                text += "x"
+            snapshot = await self.coordinator.backend.get_snapshot("1:intro")
+            result = await self.coordinator.get_operations("intro", 0)
+            return snapshot, result
+
+        with mock.patch("apps.writer_app.services.ot_coordinator.SNAPSHOT_INTERVAL", 4):
+            snapshot, result = asyncio.run(scenario())
+
+        self.assertEqual(snapshot, {"version": 12, "text": "x" * 12})
+        self.assertIsNone(result["operations"])
+        self.assertEqual(result["document"], {"version": 12, "text": "x" * 12})
+
+    def test_acknowledgment_clears_pending(self):
+        """Test acknowledged operations leave the pending set"""
+
+        async def scenario():
+            result = await self._submit(self._insert("", 0, "a"), 0)
+            acked = await self.coordinator.acknowledge_operation(
+                result["operation_id"], "intro"
+            )
+            return acked, await self.coordinator.get_queue_status("intro")
+
+        acked, status = asyncio.run(scenario())
+
+        self.assertTrue(acked["acknowledged"])
+        self.assertEqual(status["pending_operations"], 0)
+        self.assertEqual(status["current_version"], 1)
+
+
+def _redis_available():
+    try:
+        import redis
+
+        redis.Redis.from_url(RedisOTBackend().url, socket_timeout=0.5).ping()
+        return True
+    except Exception:
+        return False
+
+
+@skipUnless(_redis_available(), "Redis is not reachable")
+class RedisOTBackendTests(SimpleTestCase):
+    """Tests for the Redis OT backend"""
+
+    def test_conditional_append(self):
+        """Test appending at a stale version is rejected"""
+        backend = RedisOTBackend(ttl=60)
+        key = f"test:{uuid.uuid4().hex}"
+
+        async def scenario():
+            first = await backend.append_operation(key, 0, {"version": 1})
+            stale = await backend.append_operation(key, 0, {"version": 1})
+            return first, stale, await backend.get_operations(key, 0)
+
+        first, stale, (version, entries) = asyncio.run(scenario())
+
+        self.assertTrue(first)
+        self.assertFalse(stale)
+        self.assertEqual(version, 1)
+        self.assertEqual(entries, [{"version": 1}])
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+)
+class WriterConsumerBatchingTests(TransactionTestCase):
+    """Tests for keystroke batching in the writer WebSocket consumer"""
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.manuscript = Manuscript.objects.create(owner=self.user)
+        backend = InMemoryOTBackend()
+        for patcher in (
+            mock.patch.object(OTCoordinator, "_coordinators", {}),
+            mock.patch(
+                "apps.writer_app.services.ot_coordinator.get_ot_backend",
+                return_value=backend,
+            ),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def _receive(self, communicator, message_type):
+        while True:
+            message = await communicator.receive_json_from(timeout=5)
+            if message["type"] == message_type:
+                return message
+
+    async def test_keystroke_burst_submitted_as_one_operation(self):
+        """Test quick keystrokes on one version become a single commit"""
+        communicator = WebsocketCommunicator(
+            WriterConsumer.as_asgi(), f"/ws/writer/manuscript/{self.manuscript.id}/"
+        )
+        communicator.scope["user"] = self.user
+        communicator.scope["url_route"] = {
+            "kwargs": {"manuscript_id": self.manuscript.id}
+        }
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        for i, char in enumerate("abc"):
+            op = TextOperation().retain(i).insert(char)
+            await communicator.send_json_to(
+                {
+                    "type": "text_change",
+                    "section_id": "intro",
+                    "operation": {"ops": op.to_dict()},
+                    "version": 0,
+                }
+            )
+        ack = await self._receive(communicator, "operation_submitted")
+        await communicator.disconnect()
+
+        self.assertEqual(ack["batched_operations"], 3)
+        self.assertEqual(ack["current_version"], 1)
+        session = await CollaborativeSession.objects.aget(manuscript=self.manuscript)
+        self.assertEqual(session.operations_count, 3)
+        self.assertEqual(session.characters_typed, 3)
+
+
+class IncrementalIndexerTests(SimpleTestCase):
+    """Tests for the single-walk, mtime-first figure/table indexer"""
+
+    def setUp(self):
+        self.project_path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.project_path, ignore_errors=True)
+        self.figure = self._write(
+            "scitex/writer/01_manuscript/contents/figures/fig1.png", b"png"
+        )
+        self._write("data/mnist/results.csv", b"a,b\n1,2\n")
+        self._write("data/mnist/notes.txt", b"ignored")
+        self.db = ProjectDatabase(self.project_path)
+        hasher = mock.patch.object(
+            indexer, "compute_file_hash", wraps=indexer.compute_file_hash
+        )
+        self.hasher = hasher.start()
+        self.addCleanup(hasher.stop)
+
+    def _write(self, relative_path, content):
+        path = self.project_path / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        return path
+
+    def _index(self, kind="figure"):
+        files = {
+            relative_path: stat
+            for relative_path, file_kind, stat in indexer.walk_project_files(
+                self.project_path
+            )
+            if file_kind == kind
+        }
+        return indexer.index_files(self.db, self.project_path, kind, files, prune=True)
+
+    def test_walk_classifies_each_file_once(self):
+        """Test one walk finds figures and tables without duplicates"""
+        found = [
+            (relative_path, kind)
+            for relative_path, kind, _ in indexer.walk_project_files(self.project_path)
+        ]
+        self.assertCountEqual(
+            found,
+            [
+                ("scitex/writer/01_manuscript/contents/figures/fig1.png", "figure"),
+                ("data/mnist/results.csv", "table"),
+            ],
+        )
+
+    def test_unchanged_files_are_not_hashed(self):
+        """Test a re-index with identical stats reads nothing"""
+        first = self._index()
+        second = self._index()
+
+        self.assertEqual(first["indexed"], 1)
+        self.assertEqual(second, {"indexed": 0, "skipped": 1, "removed": 0, "hashed": 0})
+        self.assertEqual(self.hasher.call_count, 1)
+
+    def test_touched_file_hashed_once_without_reindex(self):
+        """Test a new mtime with the same content only refreshes the stat"""
+        self._index()
+        stat = self.figure.stat()
+        os.utime(self.figure, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        stats = self._index()
+        state = self.db.get_index_state()
+
+        self.assertEqual(stats["hashed"], 1)
+        self.assertEqual(stats["indexed"], 0)
+        self.assertEqual(
+            state["scitex/writer/01_manuscript/contents/figures/fig1.png"]["mtime_ns"],
+            stat.st_mtime_ns + 10**9,
+        )
+        self.assertEqual(self._index()["hashed"], 0)
+
+    def test_deleted_files_are_pruned(self):
+        """Test files gone from disk are removed from the index"""
+        self._index()
+        self.figure.unlink()
+
+        self.assertEqual(self._index()["removed"], 1)
+        self.assertEqual(self.db.get_index_state(), {})
+
+
+class LatexReferenceIndexTests(SimpleTestCase):
+    """Tests for single-pass LaTeX reference extraction"""
+
+    def setUp(self):
+        self.project_path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.project_path, ignore_errors=True)
+        self.db = ProjectDatabase(self.project_path)
+        for name in ("01_workflow.png", "fig1.png"):
+            path = self.project_path / "scitex/writer/00_shared/figures_pool" / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(name.encode())
+        files = {
+            relative_path: stat
+            for relative_path, kind, stat in indexer.walk_project_files(
+                self.project_path
+            )
+            if kind == "figure"
+        }
+        indexer.index_files(self.db, self.project_path, "figure", files)
+        self.tex = self.project_path / "scitex/writer/01_manuscript/results.tex"
+        self.tex.parent.mkdir(parents=True)
+        self.tex.write_text(
+            "See \\cref{fig:01_workflow,fig:other}.\n"
+            "% \\includegraphics{fig1}\n"
+            "\\includegraphics[width=\\textwidth]{jpg/Figure_ID_01_workflow.jpg}\n"
+        )
+
+    def _references(self):
+        return {
+            figure["file_name"]: figure["reference_count"]
+            for figure in self.db.get_all_figures()
+        }
+
+    def test_extract_targets_with_line_numbers(self):
+        """Test targets are split, comments skipped and lines kept"""
+        self.assertEqual(
+            indexer.extract_tex_targets(self.tex.read_text()),
+            [
+                ("cref", "fig:01_workflow", 1),
+                ("cref", "fig:other", 1),
+                ("includegraphics", "jpg/Figure_ID_01_workflow.jpg", 3),
+            ],
+        )
+
+    def test_references_joined_against_figures(self):
+        """Test each figure gets the references containing its stem"""
+        stats = indexer.update_reference_index(self.db, self.project_path)
+
+        self.assertEqual(stats, {"tex_files": 1, "parsed": 1, "referenced": 1})
+        self.assertEqual(self._references(), {"01_workflow.png": 2, "fig1.png": 0})
+
+    def test_unchanged_tex_files_not_reparsed(self):
+        """Test only tex files whose content changed are parsed again"""
+        indexer.update_reference_index(self.db, self.project_path)
+        with mock.patch.object(
+            indexer, "extract_tex_targets", wraps=indexer.extract_tex_targets
+        ) as extract:
+            indexer.update_reference_index(self.db, self.project_path)
+            stat = self.tex.stat()
+            os.utime(self.tex, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            indexer.update_reference_index(self.db, self.project_path)
+            self.assertEqual(extract.call_count, 0)
+
+            self.tex.write_text("\\includegraphics{fig1.png}\n")
+            indexer.update_reference_index(self.db, self.project_path)
+            self.assertEqual(extract.call_count, 1)
+        self.assertEqual(self._references(), {"01_workflow.png": 0, "fig1.png": 1})
+
+
+class ProjectDatabaseCacheTests(SimpleTestCase):
+    """Tests for cached project databases with pooled WAL connections"""
+
+    def setUp(self):
+        self.project_path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.project_path, ignore_errors=True)
+        self.addCleanup(project_db.clear_db_cache)
+        project_db.clear_db_cache()
+
+    def _figure(self, name):
+        return {
+            "file_path": f"data/{name}",
+            "file_name": name,
+            "file_hash": name,
+            "file_size": 1,
+            "file_type": "png",
+            "last_modified": 0,
+            "source": "data",
+            "location": "data",
+        }
+
+    def test_handle_initialized_once_per_project(self):
+        """Test repeated lookups reuse one database and its schema setup"""
+        with mock.patch.object(
+            ProjectDatabase, "_initialize_db", autospec=True,
+            side_effect=ProjectDatabase._initialize_db,
+        ) as initialize:
+            first = project_db.get_cached_db(self.project_path)
+            second = project_db.get_cached_db(self.project_path)
+
+        self.assertIs(first, second)
+        self.assertEqual(initialize.call_count, 1)
+
+    def test_connections_reused_in_wal_mode(self):
+        """Test queries share a pooled WAL connection"""
+        db = project_db.get_cached_db(self.project_path)
+        with db.connection() as first:
+            mode = first.execute("PRAGMA journal_mode").fetchone()[0]
+        with db.connection() as second:
+            pass
+
+        self.assertEqual(mode, "wal")
+        self.assertIs(first, second)
+
+    def test_bulk_upsert_rolls_back_as_one_transaction(self):
+        """Test nested writes join the outer transaction"""
+        db = project_db.get_cached_db(self.project_path)
+        db.upsert_figures([self._figure("a.png"), self._figure("b.png")])
+        self.assertEqual(len(db.get_all_figures()), 2)
+
+        with self.assertRaises(KeyError):
+            db.upsert_figures([self._figure("c.png"), {"file_path": "broken"}])
+        self.assertEqual(len(db.get_all_figures()), 2)
+
+    def test_least_recently_used_handles_evicted(self):
+        """Test the cache is bounded and closes evicted handles"""
+        other_path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, other_path, ignore_errors=True)
+        with mock.patch.object(project_db, "DB_CACHE_SIZE", 1):
+            first = project_db.get_cached_db(self.project_path)
+            with mock.patch.object(first, "close") as close:
+                project_db.get_cached_db(other_path)
+            again = project_db.get_cached_db(self.project_path)
+
+        close.assert_called_once()
+        self.assertIsNot(first, again)
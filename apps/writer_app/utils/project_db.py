@@ -5,11 +5,18 @@ Project-specific SQLite database for figures/tables metadata.
 
 This module provides fast, portable indexing of media files in SciTeX projects.
 The database is stored in scitex/metadata.db within each project directory.
+
+Handles are cached per project (get_project_db), so the schema is set up
+once per process and connections are reused in WAL mode instead of being
+opened for every query.
 """
 
+import os
 import sqlite3
 import json
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 from contextlib import contextmanager
 from typing import List, Dict, Optional
@@ -17,6 +24,21 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Project handles kept open per process, and seconds an unused one survives
+DB_CACHE_SIZE = 32
+DB_IDLE_TIMEOUT = 600
+
+# Open connections kept per database for reuse
+MAX_IDLE_CONNECTIONS = 4
+
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',     # Readers do not block the indexer's writes
+    'PRAGMA synchronous=NORMAL',   # Safe with WAL, no fsync per commit
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-8000',     # 8 MB page cache per connection
+)
+
 
 class ProjectDatabase:
     """
@@ -40,6 +62,14 @@ class ProjectDatabase:
         self.db_path = self.scitex_dir / 'metadata.db'
         self.thumbnails_dir = self.scitex_dir / 'thumbnails'
 
+        # Connection pool (see connection())
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._idle = []
+        self._in_use = 0
+        self._pid = os.getpid()
+        self.last_used = time.monotonic()
+
         # Ensure directories exist
         self.scitex_dir.mkdir(exist_ok=True)
         self.thumbnails_dir.mkdir(exist_ok=True)
@@ -103,6 +133,27 @@ class ProjectDatabase:
 
                 CREATE INDEX IF NOT EXISTS idx_latex_ref_figure ON latex_references(figure_id);
 
+                -- Parsed .tex files (re-parsed only when their content changes)
+                CREATE TABLE IF NOT EXISTS tex_files (
+                    tex_file TEXT PRIMARY KEY,
+                    file_hash TEXT NOT NULL,
+                    file_size INTEGER,
+                    mtime_ns INTEGER,
+                    parsed_at REAL NOT NULL
+                );
+
+                -- \\includegraphics / \\input / \\ref targets of each .tex file
+                CREATE TABLE IF NOT EXISTS tex_targets (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    tex_file TEXT NOT NULL,
+                    command TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    line_number INTEGER NOT NULL,
+                    FOREIGN KEY (tex_file) REFERENCES tex_files(tex_file) ON DELETE CASCADE
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_tex_targets_file ON tex_targets(tex_file);
+
                 -- Full-text search (FTS5)
                 CREATE VIRTUAL TABLE IF NOT EXISTS figures_fts USING fts5(
                     file_name,
@@ -169,16 +220,41 @@ class ProjectDatabase:
                 conn.execute('ALTER TABLE tables ADD COLUMN thumbnail_path TEXT')
                 logger.info("[ProjectDB] Migration: Added thumbnail_path column to tables")
 
+            # Migration: File identity for incremental indexing
+            # (size, mtime_ns, inode unchanged -> file is not re-hashed)
+            for table_name in ('figures', 'tables'):
+                columns = {
+                    row['name']
+                    for row in conn.execute(f'PRAGMA table_info({table_name})')
+                }
+                for column in ('file_size', 'mtime_ns', 'inode'):
+                    if column not in columns:
+                        conn.execute(
+                            f'ALTER TABLE {table_name} ADD COLUMN {column} INTEGER'
+                        )
+                        logger.info(
+                            f"[ProjectDB] Migration: Added {column} column to {table_name}"
+                        )
+
     @contextmanager
     def connection(self):
         """
-        Context manager for database connection.
+        Context manager for a pooled database connection.
+
+        The block runs in one transaction. Nested calls in the same thread
+        reuse the outer connection and join its transaction, so wrapping
+        several writes in ``with db.connection():`` commits them together.
 
         Yields:
             sqlite3.Connection with row_factory set to Row
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Return rows as dicts
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
         try:
             yield conn
             conn.commit()
@@ -187,8 +263,54 @@ class ProjectDatabase:
             logger.error(f"[ProjectDB] Database error: {e}")
             raise e
         finally:
+            self._local.conn = None
+            self._release(conn)
+
+    @property
+    def in_use(self) -> bool:
+        """Whether any thread currently holds a connection."""
+        return self._in_use > 0
+
+    def close(self):
+        """Close pooled connections (connections in use close on release)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
             conn.close()
 
+    def _acquire(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: never share the parent's connections
+                self._idle, self._pid = [], os.getpid()
+            conn = self._idle.pop() if self._idle else None
+            self._in_use += 1
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._lock:
+                    self._in_use -= 1
+                raise
+        return conn
+
+    def _release(self, conn: sqlite3.Connection):
+        with self._lock:
+            self._in_use -= 1
+            self.last_used = time.monotonic()
+            if self._pid == os.getpid() and len(self._idle) < MAX_IDLE_CONNECTIONS:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Pooled connections move between threads, never used by two at once
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Return rows as dicts
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
     def upsert_figure(self, metadata: dict):
         """
         Insert or update figure metadata.
@@ -201,6 +323,7 @@ class ProjectDatabase:
                 - file_size: Size in bytes
                 - file_type: Extension (png, pdf, etc.)
                 - last_modified: Unix timestamp
+                - mtime_ns, inode: File identity for incremental indexing (optional)
                 - thumbnail_path: Relative path to thumbnail (optional)
                 - tags: List of tags (optional)
                 - is_referenced: Boolean (optional, default False)
@@ -212,15 +335,17 @@ class ProjectDatabase:
             conn.execute('''
                 INSERT INTO figures (
                     file_path, file_name, file_hash, file_size, file_type,
-                    last_modified, thumbnail_path, tags,
+                    last_modified, mtime_ns, inode, thumbnail_path, tags,
                     is_referenced, reference_count,
                     source, location, indexed_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(file_path) DO UPDATE SET
                     file_name = excluded.file_name,
                     file_hash = excluded.file_hash,
                     file_size = excluded.file_size,
                     last_modified = excluded.last_modified,
+                    mtime_ns = excluded.mtime_ns,
+                    inode = excluded.inode,
                     thumbnail_path = excluded.thumbnail_path,
                     tags = excluded.tags,
                     is_referenced = excluded.is_referenced,
@@ -233,6 +358,8 @@ class ProjectDatabase:
                 metadata['file_size'],
                 metadata['file_type'],
                 metadata['last_modified'],
+                metadata.get('mtime_ns'),
+                metadata.get('inode'),
                 metadata.get('thumbnail_path'),
                 json.dumps(metadata.get('tags', [])),
                 metadata.get('is_referenced', 0),
@@ -244,6 +371,17 @@ class ProjectDatabase:
 
             logger.debug(f"[ProjectDB] Upserted figure: {metadata['file_name']}")
 
+    def upsert_figures(self, figures: List[Dict]):
+        """
+        Insert or update several figures in one transaction.
+
+        Args:
+            figures: List of metadata dictionaries (see upsert_figure)
+        """
+        with self.connection():
+            for metadata in figures:
+                self.upsert_figure(metadata)
+
     def get_all_figures(self, filters: Optional[Dict] = None) -> List[Dict]:
         """
         Get all figures with optional filters.
@@ -328,6 +466,8 @@ class ProjectDatabase:
                 - file_hash: SHA256 hash for change detection
                 - caption: Table caption (optional)
                 - last_modified: Unix timestamp
+                - file_size, mtime_ns, inode: File identity for incremental
+                  indexing (optional)
                 - tags: List of tags (optional)
                 - is_referenced: Boolean (optional, default False)
                 - reference_count: Integer (optional, default 0)
@@ -338,15 +478,18 @@ class ProjectDatabase:
             conn.execute('''
                 INSERT INTO tables (
                     file_path, file_name, file_hash, caption,
-                    last_modified, thumbnail_path, tags,
+                    last_modified, file_size, mtime_ns, inode, thumbnail_path, tags,
                     is_referenced, reference_count,
                     source, location, indexed_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(file_path) DO UPDATE SET
                     file_name = excluded.file_name,
                     file_hash = excluded.file_hash,
                     caption = excluded.caption,
                     last_modified = excluded.last_modified,
+                    file_size = excluded.file_size,
+                    mtime_ns = excluded.mtime_ns,
+                    inode = excluded.inode,
                     thumbnail_path = excluded.thumbnail_path,
                     tags = excluded.tags,
                     is_referenced = excluded.is_referenced,
@@ -358,6 +501,9 @@ class ProjectDatabase:
                 metadata['file_hash'],
                 metadata.get('caption'),
                 metadata['last_modified'],
+                metadata.get('file_size'),
+                metadata.get('mtime_ns'),
+                metadata.get('inode'),
                 metadata.get('thumbnail_path'),
                 json.dumps(metadata.get('tags', [])),
                 metadata.get('is_referenced', 0),
@@ -367,6 +513,17 @@ class ProjectDatabase:
                 time.time()
             ))
 
+    def upsert_tables(self, tables: List[Dict]):
+        """
+        Insert or update several tables in one transaction.
+
+        Args:
+            tables: List of metadata dictionaries (see upsert_table)
+        """
+        with self.connection():
+            for metadata in tables:
+                self.upsert_table(metadata)
+
     def get_all_tables(self, filters: Optional[Dict] = None) -> List[Dict]:
         """
         Get all tables with optional filters.
@@ -457,6 +614,43 @@ class ProjectDatabase:
             row = cursor.fetchone()
             return row is not None and row['file_hash'] == file_hash
 
+    def get_index_state(self, table_type: str = 'figure') -> Dict[str, Dict]:
+        """
+        Identity of every indexed file, in one query.
+
+        Args:
+            table_type: 'figure' or 'table' (default: 'figure')
+
+        Returns:
+            Dictionary of file_path -> {file_hash, file_size, mtime_ns, inode}
+        """
+        table_name = 'tables' if table_type == 'table' else 'figures'
+        with self.connection() as conn:
+            cursor = conn.execute(
+                f'SELECT file_path, file_hash, file_size, mtime_ns, inode FROM {table_name}'
+            )
+            return {row['file_path']: dict(row) for row in cursor.fetchall()}
+
+    def update_file_identity(
+        self, file_path: str, file_size: int, mtime_ns: int, inode: int,
+        table_type: str = 'figure'
+    ):
+        """
+        Record a new stat for a file whose content did not change.
+
+        Args:
+            file_path: Relative file path
+            file_size, mtime_ns, inode: Current stat of the file
+            table_type: 'figure' or 'table' (default: 'figure')
+        """
+        table_name = 'tables' if table_type == 'table' else 'figures'
+        with self.connection() as conn:
+            conn.execute(f'''
+                UPDATE {table_name}
+                SET file_size = ?, mtime_ns = ?, inode = ?, indexed_at = ?
+                WHERE file_path = ?
+            ''', (file_size, mtime_ns, inode, time.time(), file_path))
+
     def check_hash_exists(self, file_hash: str, table_type: str = 'figure') -> dict | None:
         """
         Check if a file hash already exists in the database (for duplicate detection).
@@ -541,6 +735,103 @@ class ProjectDatabase:
         with self.connection() as conn:
             conn.execute('DELETE FROM latex_references WHERE figure_id = ?', (figure_id,))
 
+    def get_tex_index_state(self) -> Dict[str, Dict]:
+        """
+        Identity of every parsed .tex file, in one query.
+
+        Returns:
+            Dictionary of tex_file -> {file_hash, file_size, mtime_ns}
+        """
+        with self.connection() as conn:
+            cursor = conn.execute(
+                'SELECT tex_file, file_hash, file_size, mtime_ns FROM tex_files'
+            )
+            return {row['tex_file']: dict(row) for row in cursor.fetchall()}
+
+    def get_tex_targets(self) -> List[Dict]:
+        """
+        All parsed .tex targets.
+
+        Returns:
+            List of {tex_file, command, target, line_number}
+        """
+        with self.connection() as conn:
+            cursor = conn.execute('''
+                SELECT tex_file, command, target, line_number
+                FROM tex_targets
+                ORDER BY tex_file, line_number
+            ''')
+            return [dict(row) for row in cursor.fetchall()]
+
+    def update_tex_index(self, parsed: Dict[str, Dict], removed: List[str] = ()):
+        """
+        Store re-parsed .tex files and drop deleted ones, in one transaction.
+
+        Args:
+            parsed: Dictionary of tex_file -> dict with:
+                - file_hash, file_size, mtime_ns: Identity of the parsed file
+                - targets: List of (command, target, line_number), or None
+                  if only the stat changed and the parsed targets still hold
+            removed: tex_file paths that no longer exist
+        """
+        now = time.time()
+        with self.connection() as conn:
+            for tex_file in list(removed) + [
+                tex_file for tex_file, info in parsed.items()
+                if info.get('targets') is not None
+            ]:
+                conn.execute('DELETE FROM tex_targets WHERE tex_file = ?', (tex_file,))
+            conn.executemany(
+                'DELETE FROM tex_files WHERE tex_file = ?',
+                [(tex_file,) for tex_file in removed],
+            )
+            conn.executemany('''
+                INSERT INTO tex_files (tex_file, file_hash, file_size, mtime_ns, parsed_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(tex_file) DO UPDATE SET
+                    file_hash = excluded.file_hash,
+                    file_size = excluded.file_size,
+                    mtime_ns = excluded.mtime_ns,
+                    parsed_at = excluded.parsed_at
+            ''', [
+                (tex_file, info['file_hash'], info['file_size'], info['mtime_ns'], now)
+                for tex_file, info in parsed.items()
+            ])
+            conn.executemany('''
+                INSERT INTO tex_targets (tex_file, command, target, line_number)
+                VALUES (?, ?, ?, ?)
+            ''', [
+                (tex_file, command, target, line_number)
+                for tex_file, info in parsed.items()
+                for command, target, line_number in (info.get('targets') or ())
+            ])
+
+    def replace_latex_references(self, references: Dict[int, List[Dict]]):
+        """
+        Replace reference status of all figures, in one transaction.
+
+        Args:
+            references: Dictionary of figure_id -> list of
+                {tex_file, line_number, context}; figures left out are
+                marked as unreferenced
+        """
+        with self.connection() as conn:
+            conn.execute('DELETE FROM latex_references')
+            conn.execute('UPDATE figures SET is_referenced = 0, reference_count = 0')
+            conn.executemany('''
+                UPDATE figures
+                SET is_referenced = 1, reference_count = ?
+                WHERE id = ?
+            ''', [(len(refs), figure_id) for figure_id, refs in references.items() if refs])
+            conn.executemany('''
+                INSERT INTO latex_references (figure_id, tex_file, line_number, context)
+                VALUES (?, ?, ?, ?)
+            ''', [
+                (figure_id, ref['tex_file'], ref.get('line_number'), ref.get('context'))
+                for figure_id, refs in references.items()
+                for ref in refs
+            ])
+
 
 def get_project_db(project) -> ProjectDatabase:
     """
@@ -578,7 +869,58 @@ def get_project_db(project) -> ProjectDatabase:
             logger.error(f"[ProjectDB] Could not determine project path: {e}", exc_info=True)
             raise ValueError(f"Cannot determine project path for project {project.id}: {e}")
 
-    return ProjectDatabase(project_path)
+    return get_cached_db(project_path)
+
+
+_db_cache = OrderedDict()
+_db_cache_lock = threading.Lock()
+
+
+def get_cached_db(project_path) -> ProjectDatabase:
+    """
+    Cached ProjectDatabase for a project directory.
+
+    Keeps at most DB_CACHE_SIZE handles (least recently used go first) and
+    closes handles unused for DB_IDLE_TIMEOUT seconds.
+
+    Args:
+        project_path: Root path of the project
+
+    Returns:
+        ProjectDatabase instance
+    """
+    key = str(Path(project_path).resolve())
+    now = time.monotonic()
+    evicted = []
+    with _db_cache_lock:
+        db = _db_cache.pop(key, None)
+        if db is not None and not db.db_path.exists():
+            # Project directory was removed or re-created
+            evicted.append(db)
+            db = None
+        if db is None:
+            db = ProjectDatabase(key)
+        db.last_used = now
+        _db_cache[key] = db
+
+        for cached_key, cached in list(_db_cache.items()):
+            over_size = len(_db_cache) > DB_CACHE_SIZE
+            expired = now - cached.last_used > DB_IDLE_TIMEOUT
+            if cached is not db and not cached.in_use and (over_size or expired):
+                evicted.append(_db_cache.pop(cached_key))
+
+    for stale in evicted:
+        stale.close()
+    return db
+
+
+def clear_db_cache():
+    """Close and forget all cached project databases."""
+    with _db_cache_lock:
+        cached = list(_db_cache.values())
+        _db_cache.clear()
+    for db in cached:
+        db.close()
 
 
 # EOF
@@ -19,14 +19,11 @@ from ...services import CompilerService
 from .auth_utils import api_login_optional, get_user_for_request
 import json
 import logging
-import uuid
-import threading
 
 logger = logging.getLogger(__name__)
 
-# In-memory compilation job storage
-# Format: {job_id: {'status': str, 'progress': int, 'step': str, 'log': list, 'result': dict}}
-COMPILATION_JOBS = {}
+# Seconds a preview request waits for its (queued) compile
+PREVIEW_WAIT_TIMEOUT = 90
 
 
 @api_login_optional
@@ -223,9 +220,13 @@ def compile_api(request, project_id):
             "color_mode": "light" (optional: light, dark, sepia, paper),
             "section_name": <section_name> (optional, for naming)
         }
+
+    Previews are queued ahead of full builds on the compilation scheduler;
+    a newer preview of the same section supersedes a queued one, in which
+    case this request returns the newer preview's result.
     """
     try:
-        from ...services import WriterService
+        from ...services.compilation import submit_job, wait_for_job
         from apps.project_app.models import Project
 
         data = json.loads(request.body)
@@ -238,7 +239,7 @@ def compile_api(request, project_id):
             f"[CompileAPI] project_id={project_id}, section={section_name}, color_mode={color_mode}"
         )
 
-        # Get project and service
+        # Get project
         project = Project.objects.get(id=project_id)
 
         # Get effective user (authenticated or visitor)
@@ -248,37 +249,31 @@ def compile_api(request, project_id):
                 {"success": False, "error": "Invalid session"}, status=403
             )
 
-        writer_service = WriterService(project_id, user.id)
-
-        # Compile preview
-        result = writer_service.compile_preview(
-            latex_content=content,
-            timeout=60,
-            color_mode=color_mode,
-            section_name=section_name,
+        job = submit_job(
+            project.id,
+            user.id,
+            compilation_type="preview",
             doc_type=doc_type,
+            section_name=section_name,
+            options={"content": content, "color_mode": color_mode, "timeout": 60},
         )
+        job = wait_for_job(job.job_id, timeout=PREVIEW_WAIT_TIMEOUT)
 
-        logger.info(f"[CompileAPI] Compilation result: success={result.get('success')}")
-
-        # Convert absolute filesystem path to servable URL
-        if result.get("success") and result.get("output_pdf"):
-            from pathlib import Path
-
-            pdf_path = Path(result["output_pdf"])
-            # Convert: /app/data/users/USER/PROJECT/scitex/writer/.preview/preview-abstract-light.pdf
-            # To URL: /writer/api/project/101/pdf/preview-abstract-light.pdf
-            pdf_filename = pdf_path.name
-            result["output_pdf"] = (
-                f"/writer/api/project/{project_id}/pdf/{pdf_filename}"
-            )
-            logger.info(
-                f"[CompileAPI] Converted PDF path to URL: {result['output_pdf']}"
-            )
-            logger.info(
-                f"[CompileAPI] Note: Alternate theme will be compiled in background for instant switching"
+        if job is None or job.status not in ("completed", "failed"):
+            return JsonResponse(
+                {
+                    "success": False,
+                    "error": "Preview compilation is still queued, please retry",
+                    "job_id": str(job.job_id) if job else None,
+                },
+                status=503,
             )
 
+        # Result paths are already servable URLs, e.g.
+        # /writer/api/project/101/pdf/preview-abstract-light.pdf
+        result = dict(job.result or {})
+        result["job_id"] = str(job.job_id)
+        logger.info(f"[CompileAPI] Compilation result: success={result.get('success')}")
         return JsonResponse(result)
 
     except Project.DoesNotExist:
@@ -925,8 +920,13 @@ def compile_full_view(request, project_id):
             # Revision options:
             "track_changes": false
         }
+
+    The build is queued on the compilation scheduler and the job ID is
+    returned immediately; a newer request for the same document supersedes
+    a build that has not started yet.
     """
     try:
+        from ...services.compilation import submit_job
         from apps.project_app.models import Project
 
         data = json.loads(request.body)
@@ -956,31 +956,23 @@ def compile_full_view(request, project_id):
                 {"success": False, "error": "Invalid session"}, status=403
             )
 
-        # Create job ID for tracking
-        job_id = str(uuid.uuid4())
-
-        # Initialize job
-        COMPILATION_JOBS[job_id] = {
-            "status": "pending",
-            "progress": 0,
-            "step": "Initializing...",
-            "log": [],
-            "result": None,
-            "project_id": project_id,
-            "doc_type": doc_type,
-        }
-
-        # Start compilation in background thread
-        thread = threading.Thread(
-            target=run_compilation_async,
-            args=(job_id, project_id, doc_type, timeout, user.id, comp_options),
-            daemon=True,
+        job = submit_job(
+            project.id,
+            user.id,
+            compilation_type="full",
+            doc_type=doc_type,
+            options={"timeout": timeout, **comp_options},
         )
-        thread.start()
 
-        # Return job ID immediately for polling
+        # Progress streams over ws/writer/project/<id>/compilation/;
+        # the status endpoint serves clients without WebSocket
         return JsonResponse(
-            {"success": True, "job_id": job_id, "message": "Compilation started"}
+            {
+                "success": True,
+                "job_id": str(job.job_id),
+                "status": job.status,
+                "message": "Compilation queued",
+            }
         )
 
     except Project.DoesNotExist:
@@ -992,137 +984,20 @@ def compile_full_view(request, project_id):
         return JsonResponse({"success": False, "error": str(e)}, status=500)
 
 
-def run_compilation_async(
-    job_id, project_id, doc_type, timeout, user_id, comp_options=None
-):
-    """Run compilation in background thread with job tracking"""
-    try:
-        from ...services import WriterService
-
-        writer_service = WriterService(project_id, user_id)
-        comp_options = comp_options or {}
-
-        # Define callbacks to update job state
-        def on_log(message):
-            """Callback to collect logs in real-time"""
-            if job_id in COMPILATION_JOBS:
-                COMPILATION_JOBS[job_id]["log"].append(message)
-            logger.debug(f"[Compilation {job_id}] {message}")
-
-        def on_progress(percent, step):
-            """Callback to track progress in real-time"""
-            if job_id in COMPILATION_JOBS:
-                COMPILATION_JOBS[job_id]["progress"] = percent
-                COMPILATION_JOBS[job_id]["step"] = step
-                COMPILATION_JOBS[job_id]["status"] = "running"
-            logger.info(f"[Compilation {job_id}] {percent}% - {step}")
-
-        # Call appropriate compilation method based on doc_type
-        if doc_type == "manuscript":
-            result = writer_service.compile_manuscript(
-                timeout=timeout,
-                log_callback=on_log,
-                progress_callback=on_progress,
-                no_figs=comp_options.get("no_figs", False),
-                ppt2tif=comp_options.get("ppt2tif", False),
-                crop_tif=comp_options.get("crop_tif", False),
-                quiet=comp_options.get("quiet", False),
-                verbose=comp_options.get("verbose", False),
-                force=comp_options.get("force", False),
-            )
-        elif doc_type == "supplementary":
-            result = writer_service.compile_supplementary(
-                timeout=timeout,
-                log_callback=on_log,
-                progress_callback=on_progress,
-                no_figs=comp_options.get("no_figs", False),
-                ppt2tif=comp_options.get("ppt2tif", False),
-                crop_tif=comp_options.get("crop_tif", False),
-                quiet=comp_options.get("quiet", False),
-            )
-        elif doc_type == "revision":
-            result = writer_service.compile_revision(
-                timeout=timeout,
-                log_callback=on_log,
-                progress_callback=on_progress,
-                track_changes=comp_options.get("track_changes", False),
-            )
-        else:
-            raise ValueError(f"Invalid doc_type: {doc_type}")
-
-        logger.info(
-            f"[CompileFullAPI {job_id}] Result: success={result.get('success')}"
-        )
-
-        # Convert absolute filesystem path to servable URL
-        if result.get("success") and result.get("output_pdf"):
-            from pathlib import Path
-
-            pdf_path = Path(result["output_pdf"])
-            pdf_filename = pdf_path.name
-            pdf_url = f"/writer/api/project/{project_id}/pdf/{pdf_filename}"
-            result["output_pdf"] = pdf_url
-            result["pdf_path"] = pdf_url
-            logger.info(f"[CompileFullAPI {job_id}] PDF URL: {pdf_url}")
-
-        # Update job with result
-        if job_id in COMPILATION_JOBS:
-            COMPILATION_JOBS[job_id]["status"] = (
-                "completed" if result.get("success") else "failed"
-            )
-            COMPILATION_JOBS[job_id]["progress"] = 100
-            COMPILATION_JOBS[job_id]["step"] = (
-                "Complete!" if result.get("success") else "Failed"
-            )
-            COMPILATION_JOBS[job_id]["result"] = result
-
-    except Exception as e:
-        logger.error(f"[CompileFullAPI {job_id}] Error: {e}", exc_info=True)
-
-        # Update job with error
-        if job_id in COMPILATION_JOBS:
-            COMPILATION_JOBS[job_id]["status"] = "failed"
-            COMPILATION_JOBS[job_id]["step"] = "Error"
-            COMPILATION_JOBS[job_id]["log"].append(f"[ERROR] {str(e)}")
-            COMPILATION_JOBS[job_id]["result"] = {
-                "success": False,
-                "error": str(e),
-                "log": str(e),
-            }
-
-
 @api_login_optional
 @require_http_methods(["GET"])
 def compilation_job_status(request, project_id, job_id):
-    """Get compilation job status for polling."""
-    if job_id not in COMPILATION_JOBS:
-        return JsonResponse({"success": False, "error": "Job not found"}, status=404)
-
-    job = COMPILATION_JOBS[job_id]
-
-    # Check if job belongs to this project
-    if job["project_id"] != project_id:
-        return JsonResponse(
-            {"success": False, "error": "Job not found for this project"}, status=404
-        )
-
-    # Convert ANSI codes to HTML
-    from ...utils.ansi_to_html import ansi_to_html
+    """Get compilation job status (persisted, so any worker can answer)."""
+    from django.core.exceptions import ValidationError
+    from ...models import CompilationJob
+    from ...services.compilation import serialize_job
 
-    raw_log = "\n".join(job["log"])
-    html_log = ansi_to_html(raw_log)
+    try:
+        job = CompilationJob.objects.get(job_id=job_id, project_id=project_id)
+    except (CompilationJob.DoesNotExist, ValidationError):
+        return JsonResponse({"success": False, "error": "Job not found"}, status=404)
 
-    return JsonResponse(
-        {
-            "success": True,
-            "status": job["status"],
-            "progress": job["progress"],
-            "step": job["step"],
-            "log": raw_log,  # Plain text for parsing
-            "log_html": html_log,  # HTML with colors
-            "result": job["result"],
-        }
-    )
+    return JsonResponse({"success": True, **serialize_job(job)})
 
 
 section_history_view = section_view  # Temp stub
@@ -2127,7 +2002,7 @@ def upload_figures(request, project_id):
     try:
         from apps.project_app.models import Project
         from pathlib import Path
-        from ...tasks.indexer import index_project_figures, CELERY_AVAILABLE
+        from ...tasks.indexer import index_project_paths, CELERY_AVAILABLE
 
         project = Project.objects.get(id=project_id)
         user, is_visitor = get_user_for_request(request, project_id)
@@ -2178,11 +2053,12 @@ def upload_figures(request, project_id):
 
             logger.info(f"[Upload] Saved figure: {uploaded_file.name} ({uploaded_file.size} bytes)")
 
-        # Trigger indexing
+        # Index just the uploaded files
+        uploaded_paths = [f['path'] for f in uploaded_files]
         if CELERY_AVAILABLE:
-            index_project_figures.delay(project_id)
+            index_project_paths.delay(project_id, uploaded_paths)
         else:
-            index_project_figures(project_id)
+            index_project_paths(project_id, uploaded_paths)
 
         logger.info(f"[Upload] Uploaded {len(uploaded_files)} figures for project {project_id}")
 
@@ -2219,7 +2095,7 @@ def upload_tables(request, project_id):
     try:
         from apps.project_app.models import Project
         from pathlib import Path
-        from ...tasks.indexer import index_project_tables, CELERY_AVAILABLE
+        from ...tasks.indexer import index_project_paths, CELERY_AVAILABLE
 
         project = Project.objects.get(id=project_id)
         user, is_visitor = get_user_for_request(request, project_id)
@@ -2270,11 +2146,12 @@ def upload_tables(request, project_id):
 
             logger.info(f"[Upload] Saved table: {uploaded_file.name} ({uploaded_file.size} bytes)")
 
-        # Trigger indexing
+        # Index just the uploaded files
+        uploaded_paths = [f['path'] for f in uploaded_files]
         if CELERY_AVAILABLE:
-            index_project_tables.delay(project_id)
+            index_project_paths.delay(project_id, uploaded_paths)
         else:
-            index_project_tables(project_id)
+            index_project_paths(project_id, uploaded_paths)
 
         logger.info(f"[Upload] Uploaded {len(uploaded_files)} tables for project {project_id}")
 
@@ -2430,7 +2307,7 @@ def table_update_api(request, project_id, file_hash):
         from pathlib import Path
         from apps.project_app.models import Project
         from ...utils.project_db import get_project_db
-        from ...tasks.indexer import index_project_tables, CELERY_AVAILABLE
+        from ...tasks.indexer import index_project_paths, CELERY_AVAILABLE
 
         project = Project.objects.get(id=project_id)
         user, is_visitor = get_user_for_request(request, project_id)
@@ -2499,11 +2376,11 @@ def table_update_api(request, project_id, file_hash):
 
         logger.info(f"[Table Update API] Saved {len(data)} rows to {table['file_name']}")
 
-        # Re-index to update thumbnail and metadata
+        # Re-index the edited table to update thumbnail and metadata
         if CELERY_AVAILABLE:
-            index_project_tables.delay(project_id)
+            index_project_paths.delay(project_id, [table['file_path']])
         else:
-            index_project_tables(project_id)
+            index_project_paths(project_id, [table['file_path']])
 
         return JsonResponse({
             'success': True,
@@ -19,11 +19,13 @@ django.setup()
 # Import routing after Django setup
 from apps.writer_app import routing as writer_routing
 from apps.code_app import routing as code_routing
+from apps.scholar_app import routing as scholar_routing
 
 # Combine all WebSocket routes
 websocket_urlpatterns = (
     writer_routing.websocket_urlpatterns +
-    code_routing.websocket_urlpatterns
+    code_routing.websocket_urlpatterns +
+    scholar_routing.websocket_urlpatterns
 )
 
 application = ProtocolTypeRouter({
@@ -8,6 +8,7 @@ from django.core.asgi import get_asgi_application
 
 import apps.writer_app.routing
 import apps.code_app.routing
+import apps.scholar_app.routing
 
 application = ProtocolTypeRouter({
     # HTTP protocol
@@ -19,6 +20,7 @@ application = ProtocolTypeRouter({
             URLRouter([
                 *apps.writer_app.routing.websocket_urlpatterns,
                 *apps.code_app.routing.websocket_urlpatterns,
+                *apps.scholar_app.routing.websocket_urlpatterns,
             ])
         )
     ),